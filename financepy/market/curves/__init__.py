@@ -6,3 +6,4 @@ from .discount_curve_pwf import *
 from .discount_curve_pwl import *
 from .discount_curve_poly import *
 from .discount_curve_zeros import *
+from .curve_risk import *
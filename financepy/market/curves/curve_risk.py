@@ -0,0 +1,211 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from ...utils.error import FinError
+from ...utils.helpers import label_to_string
+
+###############################################################################
+# The curve being bumped must provide quotes() which returns its vector of
+# input quotes and update_quotes(quotes, in_place) which rebuilds it from a
+# new quote vector. IborSingleCurve, IborDualCurve, OISCurve and CDSCurve do
+# this. A dependent curve must provide update_libor_curve(curve, in_place) as
+# CDSCurve does so that it can be rebuilt on each of the bumped Ibor curves.
+###############################################################################
+
+
+def _value(product, valuation_date, curve, args, kwargs):
+    """ Value a product on a curve. Where the value is a dictionary, as it is
+    for a CDS, the full PV is used. """
+
+    v = product.value(valuation_date, curve, *args, **kwargs)
+
+    if isinstance(v, dict):
+        v = v['full_pv']
+
+    return v
+
+###############################################################################
+
+
+def _bumped_curve(curve, dependent_curve, quotes):
+    """ Rebuild a copy of the curve on the bumped quotes and, if there is a
+    dependent curve, rebuild a copy of that on the bumped curve. """
+
+    bumped_curve = curve.update_quotes(quotes, in_place=False)
+
+    if dependent_curve is not None:
+        bumped_curve = dependent_curve.update_libor_curve(bumped_curve,
+                                                          in_place=False)
+
+    return bumped_curve
+
+###############################################################################
+# Each worker process receives the curves and product once when it starts and
+# then only the bumped quote vectors. The workers are spawned rather than
+# forked.
+###############################################################################
+
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def _worker_value(quotes):
+
+    curve, dependent_curve, product, valuation_date, args, kwargs = \
+        _worker_state
+
+    bumped_curve = _bumped_curve(curve, dependent_curve, quotes)
+    return _value(product, valuation_date, bumped_curve, args, kwargs)
+
+###############################################################################
+
+
+class CurveRiskEngine():
+    """ Bump and rebuild risk engine for a curve which is built from a vector
+    of market quotes. The quotes are bumped in parallel and one at a time and
+    the curve is rebuilt from each bumped quote vector without copying the
+    calibration instruments. Curves built with the bootstrap engine share
+    their cached instrument layout and only re-solve the nodes after the
+    bumped quote. A dependent curve, such as a CDSCurve built on the Ibor
+    curve being bumped, can be given and it is then rebuilt on each bumped
+    curve and used to value the product. This gives interest rate risk for
+    credit products. Bumping the quotes of a CDSCurve gives the CS01. """
+
+    def __init__(self,
+                 curve,
+                 bump: float = 0.0001,
+                 dependent_curve=None,
+                 num_processes: int = 0):
+        """ Create the risk engine for a curve with a quote bump which is one
+        basis point by default. If num_processes is more than one then the
+        bumped curves are built and valued in a pool of processes. """
+
+        if bump == 0.0:
+            raise FinError("Bump must not be zero")
+
+        if num_processes < 0:
+            raise FinError("Number of processes must not be negative")
+
+        if dependent_curve is not None:
+            if hasattr(dependent_curve, "update_libor_curve") is False:
+                raise FinError("Dependent curve cannot be rebuilt on curve")
+
+        self._curve = curve
+        self._bump = bump
+        self._dependent_curve = dependent_curve
+        self._num_processes = num_processes
+        self._quotes = curve.quotes()
+
+    ###########################################################################
+
+    def _bumped_quotes(self):
+        """ Quote vectors with all quotes bumped and then each quote bumped
+        on its own. """
+
+        quotes = [self._quotes + self._bump]
+
+        for i in range(0, len(self._quotes)):
+            bumped_quotes = self._quotes.copy()
+            bumped_quotes[i] += self._bump
+            quotes.append(bumped_quotes)
+
+        return quotes
+
+    ###########################################################################
+
+    def bumped_curve(self,
+                     instrument_index: int = None):
+        """ Returns a rebuilt copy of the curve, or of the dependent curve if
+        there is one, with the quote of a single instrument bumped or with
+        all of the quotes bumped if the instrument index is None. The curves
+        passed to the engine are not changed. """
+
+        quotes = self._quotes.copy()
+
+        if instrument_index is None:
+            quotes += self._bump
+        elif instrument_index < 0 or instrument_index >= len(quotes):
+            raise FinError("Instrument index " + str(instrument_index) +
+                           " out of range")
+        else:
+            quotes[instrument_index] += self._bump
+
+        return _bumped_curve(self._curve, self._dependent_curve, quotes)
+
+    ###########################################################################
+
+    def bumped_curves(self):
+        """ Returns a list of the rebuilt curves with the parallel bump first
+        followed by the curves with each instrument bumped in turn. """
+
+        return [_bumped_curve(self._curve, self._dependent_curve, quotes)
+                for quotes in self._bumped_quotes()]
+
+    ###########################################################################
+
+    def ladder(self,
+               product,
+               valuation_date,
+               *args,
+               **kwargs):
+        """ Calculate the change in the value of a product for the parallel
+        bump and for the bump of each quote. The product is valued by calling
+        product.value(valuation_date, curve, *args, **kwargs) with the curve,
+        or with the dependent curve if there is one. Returns the parallel
+        DV01 or CS01 and a vector of the bucketed values. """
+
+        base_curve = self._curve
+        if self._dependent_curve is not None:
+            base_curve = self._dependent_curve
+
+        v0 = _value(product, valuation_date, base_curve, args, kwargs)
+
+        bumped_quotes = self._bumped_quotes()
+
+        if self._num_processes > 1:
+
+            state = (self._curve, self._dependent_curve, product,
+                     valuation_date, args, kwargs)
+
+            # Forking a process in which Numba has started threads can hang
+            context = multiprocessing.get_context("spawn")
+
+            with ProcessPoolExecutor(max_workers=self._num_processes,
+                                     mp_context=context,
+                                     initializer=_init_worker,
+                                     initargs=(state,)) as executor:
+                values = list(executor.map(_worker_value, bumped_quotes))
+
+        else:
+
+            values = []
+            for quotes in bumped_quotes:
+                bumped_curve = _bumped_curve(self._curve,
+                                             self._dependent_curve, quotes)
+                values.append(_value(product, valuation_date, bumped_curve,
+                                     args, kwargs))
+
+        values = np.array(values) - v0
+        return values[0], values[1:]
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("CURVE TYPE", type(self._curve).__name__)
+        s += label_to_string("NUM QUOTES", len(self._quotes))
+        s += label_to_string("BUMP", self._bump)
+        s += label_to_string("NUM PROCESSES", self._num_processes, "")
+        return s
+
+###############################################################################
@@ -8,6 +8,7 @@ import numpy as np
 from .interpolator import Interpolator, InterpTypes, interpolate
 
 from ...utils.date import Date
+from ...utils.date_array import DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.frequency import annual_frequency, FrequencyTypes
@@ -248,7 +249,7 @@ class DiscountCurve:
                                 maturityDt,
                                 freq_type)
 
-            flow_dates = schedule._generate()
+            flow_dates = list(schedule._generate())
             flow_dates[0] = effective_date
 
             day_counter = DayCount(day_count_type)
@@ -280,9 +281,10 @@ class DiscountCurve:
     ###############################################################################
 
     def df(self,
-           dt: (list, Date)):
+           dt: (list, Date, DateArray)):
         """ Function to calculate a discount factor from a date or a
-        vector of dates. """
+        vector of dates. The vector of dates can be a list of Dates or a
+        DateArray which avoids converting the dates on every call. """
 
         times = times_from_dates(dt, self._valuation_date, self._day_count_type)
         dfs = self._df(times)
@@ -303,10 +305,24 @@ class DiscountCurve:
                 self._interp_type is InterpTypes.LINEAR_ZERO_RATES or \
                 self._interp_type is InterpTypes.LINEAR_FWD_RATES:
 
-            df = interpolate(t,
-                             self._times,
-                             self._dfs,
-                             self._interp_type.value)
+            # If the interpolator holds the current grid then we can use its
+            # precomputed segment coefficients, which it refits itself if the
+            # discount factors were changed in place. Curves that replace
+            # their grid without refitting fall back to the direct kernel.
+            interpolator = getattr(self, "_interpolator", None)
+
+            if interpolator is not None and \
+                    interpolator._times is self._times and \
+                    interpolator._dfs is self._dfs:
+
+                df = interpolator._interpolate(t)
+
+            else:
+
+                df = interpolate(t,
+                                 self._times,
+                                 self._dfs,
+                                 self._interp_type.value)
 
         else:
 
@@ -28,6 +28,11 @@ class InterpTypes(Enum):
 
 # LINEAR_SWAP_RATES = 3
 
+# These schemes are evaluated by the numba kernels below and not by scipy
+_LINEAR_INTERP_TYPES = (InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES)
+
 ###############################################################################
 # TODO: GET RID OF THIS FUNCTION !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 ###############################################################################
@@ -78,12 +83,9 @@ def _uinterpolate(t, times, dfs, method):
     if t == times[0]:
         return dfs[0]
 
-    i = 0
-    while times[i] < t and i < num_points - 1:
-        i = i + 1
-
-    if t > times[i]:
-        i = num_points
+    # Binary search for the first grid time that is not less than t. This is
+    # num_points if t is beyond the last grid time.
+    i = np.searchsorted(times, t)
 
     yvalue = 0.0
 
@@ -194,6 +196,171 @@ def _vinterpolate(xValues,
 ###############################################################################
 
 
+@njit(float64[:](float64[:], float64[:], int64),
+      fastmath=True, cache=True, nogil=True)
+def _interpolation_coeffs(times, dfs, method):
+    """ Precompute the per-node quantities used by the three linear schemes
+    so that they are calculated once per fit and not once per query. These
+    are the zero rates for LINEAR_ZERO_RATES, the log discount factors for
+    FLAT_FWD_RATES and the segment forward rates for LINEAR_FWD_RATES. For
+    the latter the first element holds the log discount factor used on the
+    first segment. """
+
+    small = 1e-10
+    num_points = times.size
+    coeffs = np.zeros(num_points)
+
+    if method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+        for i in range(0, num_points):
+            if times[i] > 0.0:
+                coeffs[i] = -np.log(dfs[i]) / times[i]
+
+    elif method == InterpTypes.FLAT_FWD_RATES.value:
+
+        for i in range(0, num_points):
+            coeffs[i] = -np.log(dfs[i])
+
+    elif method == InterpTypes.LINEAR_FWD_RATES.value:
+
+        if num_points > 1:
+            coeffs[0] = -np.log(dfs[1] + small)
+
+        for i in range(1, num_points):
+            coeffs[i] = -np.log(dfs[i] / dfs[i - 1]) / (times[i] - times[i - 1])
+
+    return coeffs
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:], float64[:], int64),
+      fastmath=True, cache=True, nogil=True)
+def _vinterpolate_fitted(t_values, times, dfs, coeffs, method):
+    """ Vectorised version of _uinterpolate that uses the coefficients
+    precomputed by _interpolation_coeffs. The bracketing nodes of all of the
+    query times are found in a single binary search pass so the cost is
+    O(N log M) rather than O(N M) for N query times and M grid nodes. The
+    results are the same as calling _uinterpolate at each time. """
+
+    small = 1e-10
+    num_points = times.size
+    n = t_values.size
+    yvalues = np.empty(n)
+
+    if num_points < 2:
+        for k in range(0, n):
+            yvalues[k] = _uinterpolate(t_values[k], times, dfs, method)
+        return yvalues
+
+    indices = np.searchsorted(times, t_values)
+
+    if method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+        for k in range(0, n):
+
+            t = t_values[k]
+            i = indices[k]
+
+            if t == times[0]:
+                yvalues[k] = dfs[0]
+                continue
+
+            if i == 1:
+                r1 = coeffs[i]
+                r2 = coeffs[i]
+                dt = times[i] - times[i - 1]
+                rvalue = ((times[i] - t) * r1 + (t - times[i - 1]) * r2) / dt
+            elif i < num_points:
+                r1 = coeffs[i - 1]
+                r2 = coeffs[i]
+                dt = times[i] - times[i - 1]
+                rvalue = ((times[i] - t) * r1 + (t - times[i - 1]) * r2) / dt
+            else:
+                r1 = coeffs[num_points - 1]
+                r2 = coeffs[num_points - 1]
+                dt = times[num_points - 1] - times[num_points - 2]
+                rvalue = ((times[num_points - 1] - t) * r1 +
+                          (t - times[num_points - 2]) * r2) / dt
+
+            yvalues[k] = np.exp(-rvalue * t)
+
+    elif method == InterpTypes.FLAT_FWD_RATES.value:
+
+        for k in range(0, n):
+
+            t = t_values[k]
+            i = indices[k]
+
+            if t == times[0]:
+                yvalues[k] = dfs[0]
+                continue
+
+            if i < num_points:
+                rt1 = coeffs[i - 1]
+                rt2 = coeffs[i]
+                dt = times[i] - times[i - 1]
+                rtvalue = ((times[i] - t) * rt1 +
+                           (t - times[i - 1]) * rt2) / dt
+            else:
+                rt1 = coeffs[num_points - 2]
+                rt2 = coeffs[num_points - 1]
+                dt = times[num_points - 1] - times[num_points - 2]
+                rtvalue = ((times[num_points - 1] - t) * rt1 +
+                           (t - times[num_points - 2]) * rt2) / dt
+
+            yvalues[k] = np.exp(-rtvalue)
+
+    elif method == InterpTypes.LINEAR_FWD_RATES.value:
+
+        for k in range(0, n):
+
+            t = t_values[k]
+            i = indices[k]
+
+            if t == times[0]:
+                yvalues[k] = dfs[0]
+                continue
+
+            if i == 1:
+                yvalue = t * coeffs[0] / (times[i] + small)
+                yvalues[k] = np.exp(-yvalue)
+            elif i < num_points:
+                fwd1 = coeffs[i - 1]
+                fwd2 = coeffs[i]
+                dt = times[i] - times[i - 1]
+                fwd = ((times[i] - t) * fwd1 + (t - times[i - 1]) * fwd2) / dt
+                yvalues[k] = dfs[i - 1] * np.exp(-fwd * (t - times[i - 1]))
+            else:
+                fwd = coeffs[num_points - 1]
+                yvalues[k] = dfs[num_points - 1] * \
+                    np.exp(-fwd * (t - times[num_points - 1]))
+
+    else:
+        raise FinError("Invalid interpolation scheme.")
+
+    return yvalues
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _same_nodes(times, dfs, fit_times, fit_dfs):
+    """ Check that the nodes are still those the coefficients were fitted to
+    as curves can change their discount factors in place. """
+
+    if times.size != fit_times.size or dfs.size != fit_dfs.size:
+        return False
+
+    for i in range(0, times.size):
+        if times[i] != fit_times[i] or dfs[i] != fit_dfs[i]:
+            return False
+
+    return True
+
+###############################################################################
+
+
 class Interpolator():
 
     def __init__(self,
@@ -203,6 +370,9 @@ class Interpolator():
         self._interp_fn = None
         self._times = None
         self._dfs = None
+        self._coeffs = None
+        self._fit_times = None
+        self._fit_dfs = None
         self._refit_curve = False
 
     ###########################################################################
@@ -214,6 +384,14 @@ class Interpolator():
         self._times = times
         self._dfs = dfs
 
+        if self._interp_type in _LINEAR_INTERP_TYPES:
+            self._fit_times = np.array(times, dtype=np.float64)
+            self._fit_dfs = np.array(dfs, dtype=np.float64)
+            self._coeffs = _interpolation_coeffs(self._fit_times,
+                                                 self._fit_dfs,
+                                                 self._interp_type.value)
+            return
+
         if len(times) == 1:
             return
 
@@ -289,15 +467,27 @@ class Interpolator():
         if self._dfs is None:
             raise FinError("Dfs have not been set.")
 
+        if type(t) is float or type(t) is np.float64:
+
+            if np.abs(t) < gSmall and t >= 0.0:
+                return 1.0
+
+        return self._interpolate(t)
+
+    ###########################################################################
+
+    def _interpolate(self,
+                     t: (float, np.ndarray)):
+        """ Interpolate without the shortcut that returns a discount factor
+        of one at time zero. The linear schemes use the segment coefficients
+        precomputed when the interpolator was fitted. """
+
         if type(t) is float or type(t) is np.float64:
 
             if t < 0.0:
                 print(t)
                 raise FinError("Interpolate times must all be >= 0")
 
-            if np.abs(t) < gSmall:
-                return 1.0
-
             tvec = np.array([t])
 
         elif type(t) is np.ndarray:
@@ -341,8 +531,15 @@ class Interpolator():
 
         else:
 
-            out = _vinterpolate(tvec, self._times, self._dfs,
-                                self._interp_type.value)
+            times = np.asarray(self._times, np.float64)
+            dfs = np.asarray(self._dfs, np.float64)
+
+            # Refit if the nodes have been changed in place since the fit
+            if _same_nodes(times, dfs, self._fit_times, self._fit_dfs) is False:
+                self.fit(self._times, self._dfs)
+
+            out = _vinterpolate_fitted(tvec, times, dfs, self._coeffs,
+                                       self._interp_type.value)
 
         if type(t) is float or type(t) is np.float64:
             return out[0]
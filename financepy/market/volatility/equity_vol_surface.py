@@ -28,6 +28,8 @@ from ...models.sabr import vol_function_sabr_beta_half
 from ...utils.math import norminvcdf
 
 from ...models.black_scholes_analytic import bs_delta
+from ...models.black_scholes_analytic import bs_implied_volatility_batch
+from ...models.black_scholes_analytic import ImpliedVolStatus
 
 from ...utils.distribution import FinDistribution
 
@@ -272,6 +274,61 @@ class EquityVolSurface:
 
         self._build_vol_surface(finSolverType=finSolverType)
 
+###############################################################################
+
+    @classmethod
+    def from_prices(cls,
+                    valuation_date: Date,
+                    stock_price: float,
+                    discount_curve: DiscountCurve,
+                    dividend_curve: DiscountCurve,
+                    expiry_dates: (list),
+                    strikes: (list, np.ndarray),
+                    price_grid: (list, np.ndarray),
+                    option_type: OptionTypes = OptionTypes.EUROPEAN_CALL,
+                    volatility_function_type:VolFunctionTypes=VolFunctionTypes.CLARK,
+                    finSolverType:FinSolverTypes=FinSolverTypes.NELDER_MEAD):
+        """ Create the EquitySurface object from a grid of European option
+        prices for a list of strikes and expiry dates. The implied volatility
+        grid is solved in one pass using the batch implied volatility solver
+        and an error is raised if any of the prices cannot be matched. """
+
+        price_grid = np.asarray(price_grid, dtype=np.float64)
+        strikes = np.asarray(strikes, dtype=np.float64)
+
+        if price_grid.shape != (len(expiry_dates), len(strikes)):
+            raise FinError("Price grid must be nExpiryDates by nStrikes")
+
+        texp = np.zeros(len(expiry_dates))
+        r = np.zeros(len(expiry_dates))
+        q = np.zeros(len(expiry_dates))
+
+        for i in range(0, len(expiry_dates)):
+            texp[i] = (expiry_dates[i] - valuation_date) / gDaysInYear
+            r[i] = -np.log(discount_curve._df(texp[i])) / texp[i]
+            q[i] = -np.log(dividend_curve._df(texp[i])) / texp[i]
+
+        vols, status = bs_implied_volatility_batch(stock_price,
+                                                   texp[:, np.newaxis],
+                                                   strikes[np.newaxis, :],
+                                                   r[:, np.newaxis],
+                                                   q[:, np.newaxis],
+                                                   price_grid,
+                                                   option_type.value)
+
+        bad = np.argwhere(status != ImpliedVolStatus.CONVERGED.value)
+
+        if len(bad) > 0:
+            i, j = bad[0]
+            raise FinError("No implied volatility for expiry " +
+                           str(expiry_dates[i]) + " and strike " +
+                           str(strikes[j]) + ": " +
+                           ImpliedVolStatus(status[i, j]).name)
+
+        return cls(valuation_date, stock_price, discount_curve,
+                   dividend_curve, expiry_dates, strikes, vols,
+                   volatility_function_type, finSolverType)
+
 ###############################################################################
 
     def volatility_from_strike_date(self, K, expiry_date):
@@ -0,0 +1,138 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import time
+
+import numpy as np
+
+from ..utils.error import FinError
+
+###############################################################################
+# Adaptive Monte Carlo runs batches of paths until the standard error of the
+# estimate is within a requested absolute or relative tolerance or a time
+# budget is used up. After each batch the variance estimate says how many
+# more paths are needed and the next batch is sized to reach that number.
+# Batches at most double the paths done so far so that a noisy variance from
+# a small first batch does not lead to a huge overshoot, and they are cut so
+# that they are expected to end within the time budget. The samples of the
+# batches are combined with the pairwise update of the mean and the sum of
+# squared deviations so there is no loss of precision for many paths.
+###############################################################################
+
+ADAPTIVE_MC_MIN_PATHS = 4096
+ADAPTIVE_MC_MAX_PATHS = 100000000
+
+###############################################################################
+
+
+def adaptive_mc(sampler,
+                abs_tolerance: float = None,
+                rel_tolerance: float = None,
+                time_budget: float = None,
+                min_paths: int = ADAPTIVE_MC_MIN_PATHS,
+                max_paths: int = ADAPTIVE_MC_MAX_PATHS,
+                paths_per_sample: int = 1):
+    """ Run batches of sampler(first_sample, num_samples) which returns the
+    independent samples with these indices as an array with one row per
+    sample and one column per output. The batches are requested in order
+    with no gaps. The run stops when the standard error of every output is
+    below abs_tolerance or rel_tolerance times the size of its value,
+    whichever is larger, or when time_budget seconds have been used or
+    max_paths have been run. Each sample can stand for several paths, such
+    as an antithetic pair, and the path counts include this factor. Returns
+    the value, its standard error, the number of paths used and the wall
+    time in seconds. The value and standard error are arrays if there is
+    more than one output. """
+
+    if abs_tolerance is None and rel_tolerance is None and \
+            time_budget is None:
+        raise FinError("Need a tolerance or a time budget")
+
+    if min_paths < 2 * paths_per_sample:
+        raise FinError("Need at least two samples in the first batch")
+
+    if max_paths < min_paths:
+        raise FinError("Maximum paths must be at least the minimum paths")
+
+    start = time.perf_counter()
+
+    min_samples = min_paths // paths_per_sample
+    max_samples = max_paths // paths_per_sample
+
+    n = 0
+    mean = None
+    m2 = None
+    batch = min_samples
+
+    while True:
+
+        samples = np.asarray(sampler(n, batch), dtype=np.float64)
+
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+
+        if len(samples) != batch:
+            raise FinError("Sampler did not return one row per sample")
+
+        batch_mean = np.mean(samples, axis=0)
+        batch_m2 = np.sum((samples - batch_mean)**2, axis=0)
+
+        if mean is None:
+            mean = batch_mean
+            m2 = batch_m2
+        else:
+            delta = batch_mean - mean
+            total = n + batch
+            mean = mean + delta * batch / total
+            m2 = m2 + batch_m2 + delta * delta * n * batch / total
+
+        n += batch
+        elapsed = time.perf_counter() - start
+
+        std_error = np.sqrt(m2 / (n - 1) / n)
+
+        target = np.zeros(len(mean))
+        if abs_tolerance is not None:
+            target = np.maximum(target, abs_tolerance)
+        if rel_tolerance is not None:
+            target = np.maximum(target, rel_tolerance * np.abs(mean))
+
+        if abs_tolerance is not None or rel_tolerance is not None:
+            if np.all(std_error <= target):
+                break
+
+            # The standard error falls as one over the root of the samples
+            with np.errstate(divide="ignore"):
+                ratio = np.max((std_error / target)**2)
+            needed = n * ratio - n
+        else:
+            needed = np.inf
+
+        if n >= max_samples:
+            break
+
+        if time_budget is not None:
+            if elapsed >= time_budget:
+                break
+            remaining = (time_budget - elapsed) * n / max(elapsed, 1e-9)
+        else:
+            remaining = np.inf
+
+        batch = min(needed, n, max_samples - n, remaining)
+        batch = int(max(batch, min(min_samples, max_samples - n)))
+
+        if time_budget is not None and batch > remaining:
+            break
+
+    if len(mean) == 1:
+        value = mean[0]
+        std_error = std_error[0]
+    else:
+        value = mean
+
+    wall_time = time.perf_counter() - start
+
+    return value, std_error, n * paths_per_sample, wall_time
+
+###############################################################################
@@ -9,7 +9,9 @@ from ..utils.error import FinError
 from ..utils.math import accrued_interpolator
 from ..market.curves.interpolator import InterpTypes, _uinterpolate
 from ..utils.helpers import label_to_string
-from ..utils.global_types import FinExerciseTypes
+from .tree_cache import TreeCache
+from .tree_grid import TreeGridTypes, ShortRateTree
+from .tree_grid import option_exercise_types_to_int
 from ..utils.global_vars import gSmall
 
 interp = InterpTypes.FLAT_FWD_RATES.value
@@ -20,20 +22,6 @@ interp = InterpTypes.FLAT_FWD_RATES.value
 ###############################################################################
 
 
-def option_exercise_types_to_int(optionExerciseType):
-
-    if optionExerciseType == FinExerciseTypes.EUROPEAN:
-        return 1
-    if optionExerciseType == FinExerciseTypes.BERMUDAN:
-        return 2
-    if optionExerciseType == FinExerciseTypes.AMERICAN:
-        return 3
-    else:
-        raise FinError("Unknown option exercise type.")
-
-###############################################################################
-
-
 @njit(float64(float64, int64, float64[:, :], float64[:, :],
               float64, float64, float64),
       fastmath=True, cache=True)
@@ -641,11 +629,13 @@ def build_tree_fast(sigma, tree_times, num_time_steps, discount_factors):
 ###############################################################################
 
 
-class BDTTree():
+class BDTTree(ShortRateTree):
 
     def __init__(self,
                  sigma: float,
-                 num_time_steps: int = 100):
+                 num_time_steps: int = 100,
+                 tree_cache: TreeCache = None,
+                 grid_type: TreeGridTypes = TreeGridTypes.UNIFORM):
         """ Constructs the Black-Derman-Toy rate model in the case when the
         volatility is assumed to be constant. The short rate process simplifies
         and is given by d(log(r)) = theta(t) * dt + sigma * dW. Althopugh """
@@ -667,37 +657,7 @@ class BDTTree():
         self._pd = 0.50
         self._discount_curve = None
 
-###############################################################################
-
-    def build_tree(self, treeMat, df_times, df_values):
-
-        if isinstance(df_times, np.ndarray) is False:
-            raise FinError("DF TIMES must be a numpy vector")
-
-        if isinstance(df_values, np.ndarray) is False:
-            raise FinError("DF VALUES must be a numpy vector")
-
-        interp = InterpTypes.FLAT_FWD_RATES.value
-
-        treeMaturity = treeMat * (self._num_time_steps+1)/self._num_time_steps
-        tree_times = np.linspace(0.0, treeMaturity, self._num_time_steps + 2)
-        self._tree_times = tree_times
-
-        dfTree = np.zeros(shape=(self._num_time_steps+2))
-        dfTree[0] = 1.0
-
-        for i in range(1, self._num_time_steps+2):
-            t = tree_times[i]
-            dfTree[i] = _uinterpolate(t, df_times, df_values, interp)
-
-        self._df_times = df_times
-        self._dfs = df_values
-
-        self._Q, self._rt, self._dt \
-            = build_tree_fast(self._sigma,
-                              tree_times, self._num_time_steps, dfTree)
-
-        return
+        self._init_tree_cache(tree_cache, grid_type)
 
 ###############################################################################
 
@@ -706,6 +666,8 @@ class BDTTree():
         """ Value a bond option that can have European or American exercise
         using the Black-Derman-Toy model. The model uses a binomial tree. """
 
+        self._check_uniform_grid()
+
         exercise_typeInt = option_exercise_types_to_int(exercise_type)
 
         tmat = coupon_times[-1]
@@ -748,6 +710,15 @@ class BDTTree():
         if texp < 0.0:
             raise FinError("Option expiry time negative.")
 
+        if self._grid_type == TreeGridTypes.EVENT_ALIGNED:
+
+            return self._event_grid_bermudan_swaption(texp,
+                                                      strike,
+                                                      face_amount,
+                                                      coupon_times,
+                                                      coupon_flows,
+                                                      exercise_typeInt)
+
         #######################################################################
 
         payValue, recValue \
@@ -773,6 +744,8 @@ class BDTTree():
         Due to non-analytical bond price we need to extend tree out to bond
         maturity and take into account cash flows through time. """
 
+        self._check_uniform_grid()
+
         call_times = np.array(call_times)
         put_times = np.array(put_times)
 
@@ -791,6 +764,37 @@ class BDTTree():
         return {'bondwithoption': v['bondwithoption'],
                 'bondpure': v['bondpure']}
 
+###############################################################################
+
+    def _tree_params(self):
+        """ The parameters which identify the tree in the tree cache. """
+
+        return (self._sigma,)
+
+###############################################################################
+
+    def _build_tree_fast(self, tree_times, dfTree):
+        """ Build the binomial tree fitted to the discount factors dfTree at
+        the tree times. """
+
+        return build_tree_fast(self._sigma,
+                               tree_times, self._num_time_steps,
+                               dfTree)
+
+###############################################################################
+
+    def _set_tree(self, tree):
+
+        self._Q, self._rt, self._dt = tree
+
+###############################################################################
+
+    def _lattice_params(self):
+        """ Parameters of the event aligned lattice of this model, which is
+        the lognormal case with no mean reversion. """
+
+        return (0.0, self._sigma, True, 0.0)
+
 ###############################################################################
 
     def __repr__(self):
@@ -799,6 +803,7 @@ class BDTTree():
         s = "Black-Derman-Toy Model\n"
         s += label_to_string("Sigma", self._sigma)
         s += label_to_string("num_time_steps", self._num_time_steps)
+        s += label_to_string("grid_type", self._grid_type)
         return s
 
 ###############################################################################
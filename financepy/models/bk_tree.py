@@ -3,14 +3,17 @@
 ##############################################################################
 
 import numpy as np
-from numba import njit, float64, int64
+from numba import njit
 from math import ceil
 
 from ..utils.error import FinError
 from ..utils.math import accrued_interpolator
 from ..market.curves.interpolator import InterpTypes, _uinterpolate
 from ..utils.helpers import label_to_string
-from ..utils.global_types import FinExerciseTypes
+from .tree_cache import TreeCache
+from .tree_grid import TreeGridTypes, ShortRateTree
+from .tree_grid import option_exercise_types_to_int
+from .tree_grid import fit_lognormal_alpha
 from ..utils.global_vars import gSmall
 
 interp = InterpTypes.FLAT_FWD_RATES.value
@@ -28,118 +31,6 @@ interp = InterpTypes.FLAT_FWD_RATES.value
 ###############################################################################
 
 
-def option_exercise_types_to_int(optionExerciseType):
-
-    if optionExerciseType == FinExerciseTypes.EUROPEAN:
-        return 1
-    if optionExerciseType == FinExerciseTypes.BERMUDAN:
-        return 2
-    if optionExerciseType == FinExerciseTypes.AMERICAN:
-        return 3
-    else:
-        raise FinError("Unknown option exercise type.")
-
-###############################################################################
-
-
-@njit(float64(float64, int64, float64[:], float64, float64, float64, int64),
-      fastmath=True, cache=True)
-def f(alpha, nm, Q, P, dX, dt, N):
-
-    sumQZ = 0.0
-    for j in range(-nm, nm+1):
-        x = alpha + j*dX
-        rdt = np.exp(x)*dt
-        sumQZ += Q[j+N] * np.exp(-rdt)
-
-    obj_fn = sumQZ - P
-    return obj_fn
-
-###############################################################################
-
-
-@njit(float64(float64, int64, float64[:], float64, float64, float64, int64),
-      fastmath=True, cache=True)
-def fprime(alpha, nm, Q, P, dX, dt, N):
-
-    sumQZdZ = 0.0
-    for j in range(-nm, nm+1):
-        x = alpha + j*dX
-        rdt = np.exp(x)*dt
-        sumQZdZ += Q[j+N] * np.exp(-rdt) * np.exp(x)
-
-    deriv = -sumQZdZ*dt
-    return deriv
-
-###############################################################################
-# This is the secant method which is not used as I computed the derivative of
-# objective function with respect to the drift term
-###############################################################################
-
-
-@njit(float64(float64, int64, float64[:], float64, float64, float64, int64),
-      fastmath=True, cache=True)
-def search_root(x0, nm, Q, P, dX, dt, N):
-
-    #    print("Searching for root", x0)
-    max_iter = 50
-    max_error = 1e-8
-
-    x1 = x0 * 1.0001
-    f0 = f(x0, nm, Q, P, dX, dt, N)
-    f1 = f(x1, nm, Q, P, dX, dt, N)
-
-    for _ in range(0, max_iter):
-
-        df = f1 - f0
-
-        if df == 0.0:
-            raise FinError("Search for alpha fails due to zero derivative")
-
-        x = x1 - f1 * (x1 - x0) / df
-        x0, f0 = x1, f1
-        x1 = x
-        f1 = f(x1, nm, Q, P, dX, dt, N)
-
-        if (abs(f1) <= max_error):
-            return x1
-
-    raise FinError("Search root deriv FAILED to find alpha.")
-
-###############################################################################
-# This is Newton Raphson which is faster than the secant measure as it has the
-# analytical derivative  that is easy to calculate.
-###############################################################################
-
-
-@njit(float64(float64, int64, float64[:], float64, float64, float64, int64),
-      fastmath=True, cache=True)
-def search_root_deriv(x0, nm, Q, P, dX, dt, N):
-
-    max_iter = 50
-    max_error = 1e-8
-
-    for _ in range(0, max_iter):
-
-        fval = f(x0, nm, Q, P, dX, dt, N)
-
-        if abs(fval) <= max_error:
-            return x0
-
-        fderiv = fprime(x0, nm, Q, P, dX, dt, N)
-
-        if abs(fderiv) == 0.0:
-            print(x0, fval, fderiv)
-            raise FinError("Function derivative is zero.")
-
-        step = fval/fderiv
-        x0 = x0 - step
-
-    raise FinError("Search root deriv FAILED to find alpha.")
-
-###############################################################################
-
-
 @njit(fastmath=True, cache=True)
 def bermudan_swaption_tree_fast(texp, tmat,
                                 strike_price, face_amount,
@@ -760,9 +651,12 @@ def callable_puttable_bond_tree_fast(coupon_times, coupon_flows,
 ###############################################################################
 
 
-@njit(fastmath=True)
-def build_tree_fast(a, sigma, tree_times, num_time_steps, discount_factors):
-    """ Calibrate the tree to a term structure of interest rates. """
+@njit(fastmath=True, cache=True)
+def build_tree_fast(a, sigma, tree_times, num_time_steps, discount_factors,
+                    shift=0.0):
+    """ Calibrate the tree to a term structure of interest rates. The short
+    rate at node j is exp(alpha + j*dX) - shift where alpha is solved at each
+    step by the same Newton kernel as the event aligned lattices. """
 
     treeMaturity = tree_times[-1]
     dt = treeMaturity / (num_time_steps+1)
@@ -777,8 +671,7 @@ def build_tree_fast(a, sigma, tree_times, num_time_steps, discount_factors):
     pd = np.zeros(shape=(2*jmax+1))
 
     # The short rate goes out one step extra to have the final short rate
-    # This is the BK model so x = log(r)
-    X = np.zeros(shape=(num_time_steps+2, 2*jmax+1))
+    # This is the BK model so x = log(r + shift)
     rt = np.zeros(shape=(num_time_steps+2, 2*jmax+1))
 
     # probabilities start at time 0 and go out to one step before T
@@ -813,64 +706,80 @@ def build_tree_fast(a, sigma, tree_times, num_time_steps, discount_factors):
     # Time zero is trivial for the Arrow-Debreu price
     Q[0, jmax] = 1.0
 
+    # The exponentials of the nodes are the same at every step so the root
+    # search only needs those of the node discount factors which it leaves
+    # in z for the forward induction
+    ex = np.exp(np.arange(-jmax, jmax+1) * dX)
+    z = np.zeros(2*jmax+1)
+
     # Estimate short rate over first year
     r0 = -np.log(discount_factors[1])/tree_times[1]
 
-    # We initialise x0 with value of log of r0
-    x0 = np.log(r0)
+    # We initialise x0 with value of log of r0 + shift
+    x0 = np.log(max(r0 + shift, 1e-8))
 
     # Big loop over time steps
     for m in range(0, num_time_steps + 1):
 
         nm = min(m, jmax)
+        lo = jmax - nm
+        hi = jmax + nm + 1
 
         # Need to do drift adjustment which is non-linear and so requires
-        # a root search algorithm to find value of x0.
+        # a root search algorithm. It starts from the value extrapolated
+        # from the last two steps.
+        if m == 1:
+            x0 = alpha[0]
+        elif m > 1:
+            x0 = 2.0 * alpha[m-1] - alpha[m-2]
 
-        alpha[m] = search_root_deriv(x0, nm, Q[m], discount_factors[m + 1],
-                                     dX, dt, jmax)
+        alpha[m] = fit_lognormal_alpha(Q[m, lo:hi], ex[lo:hi], dt,
+                                       discount_factors[m + 1], shift,
+                                       x0, z[lo:hi])
 
-        x0 = alpha[m]
+        growth = np.exp(alpha[m])
 
-        for j in range(-nm, nm+1):
-            jN = j + jmax
-            X[m, jN] = alpha[m] + j*dX
-            rt[m, jN] = np.exp(X[m, jN])
+        for jN in range(lo, hi):
+            rt[m, jN] = growth * ex[jN] - shift
 
         # Loop over all nodes at time m to calculate next values of Q
         for j in range(-nm, nm+1):
 
             jN = j + jmax
-            rdt = np.exp(X[m, jN]) * dt
-            z = np.exp(-rdt)
+            qz = Q[m, jN] * z[jN]
 
             if j == jmax:
-                Q[m+1, jN] += Q[m, jN] * pu[jN] * z
-                Q[m+1, jN-1] += Q[m, jN] * pm[jN] * z
-                Q[m+1, jN-2] += Q[m, jN] * pd[jN] * z
+                Q[m+1, jN] += qz * pu[jN]
+                Q[m+1, jN-1] += qz * pm[jN]
+                Q[m+1, jN-2] += qz * pd[jN]
             elif j == -jmax:
-                Q[m+1, jN] += Q[m, jN] * pd[jN] * z
-                Q[m+1, jN+1] += Q[m, jN] * pm[jN] * z
-                Q[m+1, jN+2] += Q[m, jN] * pu[jN] * z
+                Q[m+1, jN] += qz * pd[jN]
+                Q[m+1, jN+1] += qz * pm[jN]
+                Q[m+1, jN+2] += qz * pu[jN]
             else:
-                Q[m+1, jN+1] += Q[m, jN] * pu[jN] * z
-                Q[m+1, jN] += Q[m, jN] * pm[jN] * z
-                Q[m+1, jN-1] += Q[m, jN] * pd[jN] * z
+                Q[m+1, jN+1] += qz * pu[jN]
+                Q[m+1, jN] += qz * pm[jN]
+                Q[m+1, jN-1] += qz * pd[jN]
 
     return (Q, pu, pm, pd, rt, dt)
 
 ##########################################################################
 
 
-class BKTree():
+class BKTree(ShortRateTree):
 
     def __init__(self,
                  sigma: float,
                  a: float,
-                 num_time_steps: int = 100):
+                 num_time_steps: int = 100,
+                 tree_cache: TreeCache = None,
+                 grid_type: TreeGridTypes = TreeGridTypes.UNIFORM,
+                 shift: float = 0.0):
         """ Constructs the Black Karasinski rate model. The speed of mean
         reversion a and volatility are passed in. The short rate process
-        is given by d(log(r)) = (theta(t) - a*log(r)) * dt  + sigma * dW """
+        is given by d(log(r)) = (theta(t) - a*log(r)) * dt  + sigma * dW. If
+        a shift is passed in it is r + shift that is lognormal so the short
+        rate can fall to -shift. """
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
@@ -881,8 +790,12 @@ class BKTree():
         if a < 1e-10:
             a = 1e-10
 
+        if shift < 0.0:
+            raise FinError("Shift should be >= 0.")
+
         self._a = a
         self._sigma = sigma
+        self._shift = shift
 
         if num_time_steps < 3:
             raise FinError("Drift fitting requires at least 3 time steps")
@@ -897,37 +810,7 @@ class BKTree():
         self._pd = None
         self._discount_curve = None
 
-###############################################################################
-
-    def build_tree(self, tmat, df_times, df_values):
-
-        if isinstance(df_times, np.ndarray) is False:
-            raise FinError("DF TIMES must be a numpy vector")
-
-        if isinstance(df_values, np.ndarray) is False:
-            raise FinError("DF VALUES must be a numpy vector")
-
-        interp = InterpTypes.FLAT_FWD_RATES.value
-
-        treeMaturity = tmat * (self._num_time_steps+1)/self._num_time_steps
-        tree_times = np.linspace(0.0, treeMaturity, self._num_time_steps + 2)
-        self._tree_times = tree_times
-
-        dfTree = np.zeros(shape=(self._num_time_steps+2))
-        dfTree[0] = 1.0
-
-        for i in range(1, self._num_time_steps+2):
-            t = tree_times[i]
-            dfTree[i] = _uinterpolate(t, df_times, df_values, interp)
-
-        self._df_times = df_times
-        self._dfs = df_values
-
-        self._Q, self._pu, self._pm, self._pd, self._rt, self._dt \
-            = build_tree_fast(self._a, self._sigma,
-                              tree_times, self._num_time_steps, dfTree)
-
-        return
+        self._init_tree_cache(tree_cache, grid_type)
 
 ###############################################################################
 
@@ -936,6 +819,8 @@ class BKTree():
         """ Value a bond option that has European or American exercise using
         the Black-Karasinski model. The model uses a trinomial tree. """
 
+        self._check_uniform_grid()
+
         exercise_typeInt = option_exercise_types_to_int(exercise_type)
 
         tmat = coupon_times[-1]
@@ -979,6 +864,15 @@ class BKTree():
         if texp < 0.0:
             raise FinError("Option expiry time negative.")
 
+        if self._grid_type == TreeGridTypes.EVENT_ALIGNED:
+
+            return self._event_grid_bermudan_swaption(texp,
+                                                      strike_price,
+                                                      face_amount,
+                                                      coupon_times,
+                                                      coupon_flows,
+                                                      exercise_typeInt)
+
         #######################################################################
 
         payValue, recValue \
@@ -1005,6 +899,8 @@ class BKTree():
         Due to non-analytical bond price we need to extend tree out to bond
         maturity and take into account cash flows through time. """
 
+        self._check_uniform_grid()
+
         call_times = np.array(call_times)
         put_times = np.array(put_times)
 
@@ -1024,6 +920,36 @@ class BKTree():
         return {'bondwithoption': v['bondwithoption'],
                 'bondpure': v['bondpure']}
 
+###############################################################################
+
+    def _tree_params(self):
+        """ The parameters which identify the tree in the tree cache. """
+
+        return (self._sigma, self._a, self._shift)
+
+###############################################################################
+
+    def _build_tree_fast(self, tree_times, dfTree):
+        """ Build the trinomial tree fitted to the discount factors dfTree at
+        the tree times. """
+
+        return build_tree_fast(self._a, self._sigma,
+                               tree_times, self._num_time_steps,
+                               dfTree, self._shift)
+
+###############################################################################
+
+    def _set_tree(self, tree):
+
+        self._Q, self._pu, self._pm, self._pd, self._rt, self._dt = tree
+
+###############################################################################
+
+    def _lattice_params(self):
+        """ Parameters of the event aligned lattice of this model. """
+
+        return (self._a, self._sigma, True, self._shift)
+
 ###############################################################################
 
     def __repr__(self):
@@ -1032,7 +958,9 @@ class BKTree():
         s = "Black-Karasinski Model\n"
         s += label_to_string("Sigma", self._sigma)
         s += label_to_string("a", self._a)
+        s += label_to_string("shift", self._shift)
         s += label_to_string("num_time_steps", self._num_time_steps)
+        s += label_to_string("grid_type", self._grid_type)
         return s
 
 ###############################################################################
@@ -3,11 +3,13 @@
 ##############################################################################
 
 import numpy as np
-from numba import float64, int64, vectorize, njit
+from enum import Enum
+from numba import float64, int64, vectorize, njit, prange
 
 from ..utils.global_types import OptionTypes
 from ..utils.global_vars import gSmall
-from ..utils.math import n_vect, n_prime_vect
+from ..utils.math import n_vect, n_prime_vect, N, nprime, norminvcdf
+from ..utils.math import INVROOT2PI
 from ..utils.error import FinError
 from ..utils.solver_1d import bisection, newton, newton_secant
 
@@ -184,6 +186,363 @@ def bs_vanna(s, t, k, r, q, v, option_type_value):
     vanna = np.exp(-q*t) * sqrtT * n_prime_vect(d1) * (d2/v)
     return vanna
 
+###############################################################################
+# Batch valuation of arrays of options. The value and all of the first and
+# second order greeks of each option are calculated in one pass so that the
+# exponentials and normal distribution terms are only evaluated once. The
+# greeks are the same as those returned by the scalar functions above.
+###############################################################################
+
+BS_BATCH_OUTPUTS = ("value", "delta", "gamma", "vega", "theta", "rho",
+                    "vanna", "volga")
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _bs_greeks(s, t, k, r, q, v, option_type_value, out, i):
+    """ Value and greeks of one option written into column i of out. """
+
+    if option_type_value == OptionTypes.EUROPEAN_CALL.value:
+        phi = 1.0
+    else:
+        phi = -1.0
+
+    k = max(k, gSmall)
+    t = max(t, gSmall)
+    v = max(v, gSmall)
+
+    sqrtT = np.sqrt(t)
+    vsqrtT = v * sqrtT
+    dq = np.exp(-q*t)
+    dr = np.exp(-r*t)
+    ss = s * dq
+    kk = k * dr
+    d1 = np.log(ss/kk) / vsqrtT + vsqrtT / 2.0
+    d2 = d1 - vsqrtT
+
+    nd1 = N(phi * d1)
+    nd2 = N(phi * d2)
+    npd1 = nprime(d1)
+    vega = ss * sqrtT * npd1
+
+    out[0, i] = phi * ss * nd1 - phi * kk * nd2
+    out[1, i] = phi * dq * nd1
+    out[2, i] = dq * npd1 / s / vsqrtT
+    out[3, i] = vega
+    out[4, i] = - ss * npd1 * v / 2.0 / sqrtT - phi * r * kk * nd2 \
+        + phi * q * ss * nd1
+    out[5, i] = phi * kk * t * nd2
+    out[6, i] = dq * sqrtT * npd1 * (d2/v)
+    out[7, i] = vega * d1 * d2 / v
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _bs_batch(s, t, k, r, q, v, option_type_values, out):
+    """ Loop over the options in a single thread. """
+
+    for i in range(0, len(s)):
+        _bs_greeks(s[i], t[i], k[i], r[i], q[i], v[i],
+                   option_type_values[i], out, i)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _bs_batch_parallel(s, t, k, r, q, v, option_type_values, out):
+    """ Loop over the options using all of the threads Numba has. """
+
+    for i in prange(0, len(s)):
+        _bs_greeks(s[i], t[i], k[i], r[i], q[i], v[i],
+                   option_type_values[i], out, i)
+
+###############################################################################
+
+
+def bs_value_batch(s, t, k, r, q, v, option_type_value, parallel=False):
+    """ Value a batch of European calls and puts using the Black-Scholes
+    model. The inputs are arrays, or scalars which are broadcast, of the
+    stock price, time to expiry, strike, interest rate, dividend yield,
+    volatility and option type value. Returns a dictionary of arrays of the
+    value, delta, gamma, vega, theta, rho, vanna and volga. Setting parallel
+    to True spreads the options over all threads which pays off for large
+    batches. """
+
+    s, t, k, r, q, v, option_type_value = \
+        np.broadcast_arrays(s, t, k, r, q, v, option_type_value)
+
+    # Broadcast views are read only and so the inputs are copied
+    option_type_value = np.array(option_type_value.ravel(), dtype=np.int64)
+
+    is_call = option_type_value == OptionTypes.EUROPEAN_CALL.value
+    is_put = option_type_value == OptionTypes.EUROPEAN_PUT.value
+
+    if not np.all(is_call | is_put):
+        raise FinError("Unknown option type value")
+
+    args = [np.array(x.ravel(), dtype=np.float64)
+            for x in (s, t, k, r, q, v)]
+
+    out = np.empty((len(BS_BATCH_OUTPUTS), len(option_type_value)))
+
+    if parallel is True:
+        _bs_batch_parallel(*args, option_type_value, out)
+    else:
+        _bs_batch(*args, option_type_value, out)
+
+    shape = s.shape
+    return {name: out[i].reshape(shape)
+            for i, name in enumerate(BS_BATCH_OUTPUTS)}
+
+###############################################################################
+# Batch implied volatility. Each price is converted to the normalised price
+# of an out-of-the-money option b(x, s) = price / (df * sqrt(F * K)) where
+# x = ln(F/K) and s is the total volatility sigma * sqrt(T). The price b(s) is
+# convex in s below the inflection point s_c = sqrt(2|x|) and concave above
+# it. Below s_c the solver works with ln(b) which is close to linear in 1/s
+# and above it with b itself. The initial guesses are closed form, the one
+# above s_c using the rational approximation to the inverse normal, and each
+# is refined by third order Householder steps within a bracket on s. The
+# prices are those of bs_value so its prices are recovered exactly. Bad
+# points do not raise but are flagged with a status code per option.
+###############################################################################
+
+
+class ImpliedVolStatus(Enum):
+    CONVERGED = 0
+    BELOW_INTRINSIC = 1
+    ABOVE_MAXIMUM = 2
+    NOT_CONVERGED = 3
+    BAD_INPUT = 4
+
+###############################################################################
+# Fastmath is not used here as the solver relies on infinite and NaN values
+###############################################################################
+
+
+@njit(cache=True)
+def _normalised_black(x, s, theta):
+    """ Black price of an option divided by df * sqrt(F * K). """
+
+    return theta * (np.exp(x/2.0) * N(theta * (x/s + s/2.0)) -
+                    np.exp(-x/2.0) * N(theta * (x/s - s/2.0)))
+
+###############################################################################
+
+
+@njit(cache=True)
+def _implied_total_vol(beta, x, theta, tol, max_iterations):
+    """ Total volatility of an out-of-the-money option, with theta * x not
+    positive, from its normalised price. Returns the total volatility and a
+    status code. The volatility is NaN unless the status is CONVERGED. """
+
+    b_max = np.exp(theta * x / 2.0)
+
+    if beta >= b_max:
+        return np.nan, ImpliedVolStatus.ABOVE_MAXIMUM.value
+
+    if beta == 0.0:
+        return 0.0, ImpliedVolStatus.CONVERGED.value
+
+    s_c = np.sqrt(2.0 * abs(x))
+
+    if s_c > 0.0:
+        b_c = _normalised_black(x, s_c, theta)
+    else:
+        b_c = 0.0
+
+    if beta < b_c:
+        # Leading order ln(b) is linear in 1/s^2 below the inflection point
+        use_log = True
+        lower = 0.0
+        upper = s_c
+        s = 1.0 / np.sqrt(1.0 / (s_c * s_c) +
+                          2.0 * np.log(b_c / beta) / (x * x))
+    else:
+        # Above it b_max - b is about 2 cosh(x/2) N(-s/2)
+        use_log = False
+        lower = s_c
+        upper = np.inf
+        p = (b_max - beta) / (np.exp(x/2.0) + np.exp(-x/2.0))
+        s = max(-2.0 * norminvcdf(p), s_c)
+
+    for _ in range(0, max_iterations):
+
+        b = _normalised_black(x, s, theta)
+
+        # The derivatives of b are b' times h0, h1 and h2
+        bp = INVROOT2PI * np.exp(-0.5 * (x * x / (s * s) + s * s / 4.0))
+        h1 = x * x / (s * s * s) - s / 4.0
+        h2 = h1 * h1 - 3.0 * x * x / (s * s * s * s) - 0.25
+
+        if use_log:
+
+            if b <= 0.0:
+                f = -np.inf
+            else:
+                f = np.log(b / beta)
+                g = bp / b
+                fp = g
+                fpp = g * (h1 - g)
+                fppp = g * (h2 - 3.0 * h1 * g + 2.0 * g * g)
+
+        else:
+
+            f = b - beta
+            fp = bp
+            fpp = bp * h1
+            fppp = bp * h2
+
+        if f < 0.0:
+            lower = s
+        else:
+            upper = s
+
+        if f == 0.0:
+            break
+
+        s_new = np.nan
+
+        if np.isfinite(f) and fp > 0.0:
+            nu = -f / fp
+            gamma = fpp / fp
+            delta = fppp / fp
+            denom = 1.0 + nu * (gamma + nu * delta / 6.0)
+            if denom != 0.0:
+                s_new = s + nu * (1.0 + 0.5 * nu * gamma) / denom
+
+        if abs(s_new - s) <= tol * s:
+            s = s_new
+            break
+
+        # Fall back to bisecting the bracket when the step leaves it
+        if not (s_new > lower and s_new < upper):
+            if np.isfinite(upper):
+                s_new = 0.5 * (lower + upper)
+            else:
+                s_new = 2.0 * s
+
+        s = s_new
+
+    b = _normalised_black(x, s, theta)
+
+    if abs(b - beta) <= 1e-8 * beta + 1e-15:
+        return s, ImpliedVolStatus.CONVERGED.value
+    else:
+        return np.nan, ImpliedVolStatus.NOT_CONVERGED.value
+
+###############################################################################
+
+
+@njit(cache=True)
+def _bs_implied_vol(s, t, k, r, q, price, option_type_value, tol,
+                    max_iterations, vols, status, i):
+    """ Implied volatility of one option written into element i of vols. """
+
+    vols[i] = np.nan
+
+    if option_type_value == OptionTypes.EUROPEAN_CALL.value:
+        theta = 1.0
+    elif option_type_value == OptionTypes.EUROPEAN_PUT.value:
+        theta = -1.0
+    else:
+        status[i] = ImpliedVolStatus.BAD_INPUT.value
+        return
+
+    if not (s > 0.0 and t > 0.0 and k > 0.0 and np.isfinite(r) and
+            np.isfinite(q) and np.isfinite(price) and np.isfinite(s) and
+            np.isfinite(t) and np.isfinite(k)):
+        status[i] = ImpliedVolStatus.BAD_INPUT.value
+        return
+
+    fwd = s * np.exp((r - q) * t)
+    df = np.exp(-r * t)
+    x = np.log(fwd / k)
+    beta = price / (df * np.sqrt(fwd * k))
+
+    # Use put call parity to switch to the out-of-the-money option
+    intrinsic = 0.0
+    if theta * x > 0.0:
+        intrinsic = theta * (np.exp(x/2.0) - np.exp(-x/2.0))
+        beta = beta - intrinsic
+        theta = -theta
+
+    # A time value within rounding error of zero is treated as zero
+    if beta < 0.0:
+        if beta < -1e-14 * (1.0 + intrinsic):
+            status[i] = ImpliedVolStatus.BELOW_INTRINSIC.value
+            return
+        beta = 0.0
+
+    total_vol, status[i] = _implied_total_vol(beta, x, theta, tol,
+                                              max_iterations)
+    vols[i] = total_vol / np.sqrt(t)
+
+###############################################################################
+
+
+@njit(cache=True)
+def _bs_implied_vol_batch(s, t, k, r, q, price, option_type_values, tol,
+                          max_iterations, vols, status):
+    """ Loop over the options in a single thread. """
+
+    for i in range(0, len(s)):
+        _bs_implied_vol(s[i], t[i], k[i], r[i], q[i], price[i],
+                        option_type_values[i], tol, max_iterations,
+                        vols, status, i)
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True)
+def _bs_implied_vol_batch_parallel(s, t, k, r, q, price, option_type_values,
+                                   tol, max_iterations, vols, status):
+    """ Loop over the options using all of the threads Numba has. """
+
+    for i in prange(0, len(s)):
+        _bs_implied_vol(s[i], t[i], k[i], r[i], q[i], price[i],
+                        option_type_values[i], tol, max_iterations,
+                        vols, status, i)
+
+###############################################################################
+
+
+def bs_implied_volatility_batch(s, t, k, r, q, price, option_type_value,
+                                parallel=False, tol=1e-12,
+                                max_iterations=10):
+    """ Calculate the Black-Scholes implied volatility of a batch of European
+    calls and puts. The inputs are arrays, or scalars which are broadcast, of
+    the stock price, time to expiry, strike, interest rate, dividend yield,
+    option price and option type value. Returns an array of volatilities and
+    an array of ImpliedVolStatus values. The volatility is NaN where the
+    price is below intrinsic value, above its upper bound, cannot be matched
+    within max_iterations or the inputs are not valid. Setting parallel to
+    True spreads the options over all threads. """
+
+    s, t, k, r, q, price, option_type_value = \
+        np.broadcast_arrays(s, t, k, r, q, price, option_type_value)
+
+    shape = s.shape
+
+    # Broadcast views are read only and so the inputs are copied
+    option_type_value = np.array(option_type_value.ravel(), dtype=np.int64)
+    args = [np.array(x.ravel(), dtype=np.float64)
+            for x in (s, t, k, r, q, price)]
+
+    vols = np.empty(len(option_type_value))
+    status = np.empty(len(option_type_value), dtype=np.int64)
+
+    if parallel is True:
+        _bs_implied_vol_batch_parallel(*args, option_type_value, tol,
+                                       max_iterations, vols, status)
+    else:
+        _bs_implied_vol_batch(*args, option_type_value, tol,
+                              max_iterations, vols, status)
+
+    return vols.reshape(shape), status.reshape(shape)
+
 ###############################################################################
 
 # @njit(fastmath=True, cache=True)
@@ -10,6 +10,11 @@ from numba import njit, float64, int64, prange
 from ..utils.global_types import OptionTypes
 from ..utils.error import FinError
 from ..models.sobol import get_gaussian_sobol
+from ..models.counter_rng import rng_key, counter_normal, sobol_uniform_1d
+from ..models.counter_rng import MC_CHUNK_SIZE
+from ..models.adaptive_mc import adaptive_mc
+from ..models.adaptive_mc import ADAPTIVE_MC_MIN_PATHS, ADAPTIVE_MC_MAX_PATHS
+from ..utils.math import norminvcdf
 from math import exp
 
 
@@ -178,48 +183,123 @@ def _value_mc_numba_only(s, t, K, option_type, r, q, v, num_paths, seed, useSobo
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _chunk_payoff(ss, vsqrtt, K, phi, key, first_path, last_path, useSobol):
+    """ Sum of the antithetic payoffs of the paths in a chunk. """
+
+    payoff = 0.0
+
+    for i in range(first_path, last_path):
+
+        if useSobol == 1:
+            g = norminvcdf(sobol_uniform_1d(i))
+        else:
+            g = counter_normal(key, i)
+
+        s_1 = ss * exp(+g * vsqrtt)
+        s_2 = ss * exp(-g * vsqrtt)
+        payoff += max(phi * (s_1 - K), 0.0)
+        payoff += max(phi * (s_2 - K), 0.0)
+
+    return payoff
+
+###############################################################################
+
+
 @njit(float64(float64, float64, float64, int64, float64, float64, float64,
               int64, int64, int64), fastmath=True, cache=True, parallel=True)
 def _value_mc_numba_parallel(s, t, K, option_type, r, q, v, num_paths, seed, useSobol):
-    # No use of Numpy vectorisation but NUMBA 
+    # Paths are generated in chunks across all threads with a counter based
+    # random number generator so no full size arrays are allocated and the
+    # value does not depend on the number of threads.
 
     num_paths = int(num_paths)
-    np.random.seed(seed)
     mu = r - q
     v2 = v ** 2
     vsqrtt = v * np.sqrt(t)
 
-    if useSobol == 1:
-        g = get_gaussian_sobol(num_paths, 1)[:, 0]
+    if option_type == OptionTypes.EUROPEAN_CALL.value:
+        phi = 1.0
+    elif option_type == OptionTypes.EUROPEAN_PUT.value:
+        phi = -1.0
     else:
-        g = np.random.standard_normal(num_paths)
+        raise FinError("Unknown option type.")
 
     ss = s * np.exp((mu - v2 / 2.0) * t)
+    key = rng_key(seed)
 
-    payoff1 = 0.0
-    payoff2 = 0.0
+    num_chunks = (num_paths + MC_CHUNK_SIZE - 1) // MC_CHUNK_SIZE
+    chunk_payoffs = np.zeros(num_chunks)
 
-    if option_type == OptionTypes.EUROPEAN_CALL.value:
+    for chunk in prange(0, num_chunks):
+        first_path = chunk * MC_CHUNK_SIZE
+        last_path = min(first_path + MC_CHUNK_SIZE, num_paths)
+        chunk_payoffs[chunk] = _chunk_payoff(ss, vsqrtt, K, phi, key,
+                                             first_path, last_path, useSobol)
 
-        for i in range(0, num_paths):
-            s_1 = ss * exp(+g[i] * vsqrtt)
-            s_2 = ss * exp(-g[i] * vsqrtt)
-            payoff1 += max(s_1 - K, 0.0)
-            payoff2 += max(s_2 - K, 0.0)
+    # Adding the chunks in order makes the sum independent of the threads
+    payoff = 0.0
+    for chunk in range(0, num_chunks):
+        payoff += chunk_payoffs[chunk]
 
-    elif option_type == OptionTypes.EUROPEAN_PUT.value:
+    average_payoff = payoff / 2.0 / num_paths
+    v = average_payoff * np.exp(-r * t)
+    return v
 
-        for i in range(0, num_paths):
-            s_1 = ss * exp(+g[i] * vsqrtt)
-            s_2 = ss * exp(-g[i] * vsqrtt)
-            payoff1 += max(K - s_1, 0.0)
-            payoff2 += max(K - s_2, 0.0)
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _pair_payoffs_parallel(ss, vsqrtt, K, phi, key, first_path, num_paths):
+    """ The average payoff of each antithetic pair of paths from first_path
+    using the same random numbers as _value_mc_numba_parallel. """
+
+    payoffs = np.empty(num_paths)
+    num_chunks = (num_paths + MC_CHUNK_SIZE - 1) // MC_CHUNK_SIZE
+
+    for chunk in prange(0, num_chunks):
+        start = chunk * MC_CHUNK_SIZE
+        end = min(start + MC_CHUNK_SIZE, num_paths)
+        for i in range(start, end):
+            g = counter_normal(key, first_path + i)
+            s_1 = ss * exp(+g * vsqrtt)
+            s_2 = ss * exp(-g * vsqrtt)
+            payoffs[i] = 0.5 * (max(phi * (s_1 - K), 0.0) +
+                                max(phi * (s_2 - K), 0.0))
+
+    return payoffs
 
+###############################################################################
+
+
+def value_mc_adaptive(s, t, K, option_type, r, q, v, seed,
+                      abs_tolerance=None, rel_tolerance=None,
+                      time_budget=None, min_paths=ADAPTIVE_MC_MIN_PATHS,
+                      max_paths=ADAPTIVE_MC_MAX_PATHS):
+    """ Value a European option by Monte Carlo adding batches of paths until
+    the standard error is within the tolerance or the time budget is used.
+    The paths are those of _value_mc_numba_parallel with pseudo random
+    numbers and are counted the same way, one per antithetic pair, so that
+    it gives the same value for the number of paths used. Returns the value,
+    its standard error, the number of paths and the wall time. """
+
+    if option_type == OptionTypes.EUROPEAN_CALL.value:
+        phi = 1.0
+    elif option_type == OptionTypes.EUROPEAN_PUT.value:
+        phi = -1.0
     else:
         raise FinError("Unknown option type.")
 
-    average_payoff = (payoff1 + payoff2) / 2.0 / num_paths
-    v = average_payoff * np.exp(-r * t)
-    return v
+    ss = s * np.exp((r - q - v * v / 2.0) * t)
+    vsqrtt = v * np.sqrt(t)
+    df = np.exp(-r * t)
+    key = np.uint64(rng_key(seed))
+
+    def sampler(first_path, num_paths):
+        return df * _pair_payoffs_parallel(ss, vsqrtt, K, phi, key,
+                                           first_path, num_paths)
+
+    return adaptive_mc(sampler, abs_tolerance, rel_tolerance, time_budget,
+                       min_paths, max_paths)
 
 ###############################################################################
@@ -0,0 +1,147 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from contextlib import contextmanager
+
+import numpy as np
+import numba
+from numba import njit
+
+from ..utils.math import norminvcdf
+from ..utils.error import FinError
+
+###############################################################################
+# Counter based random numbers for parallel Monte Carlo. The random number
+# with a given index is found by hashing the index with a key made from the
+# seed using the SplitMix64 mixing function. Any path can then be generated
+# by any thread in any order and the results do not depend on the number of
+# threads. The paths are split into chunks of MC_CHUNK_SIZE and the payoff of
+# each chunk is stored separately and added up in chunk order at the end so
+# that the sum is also the same whatever the number of threads.
+###############################################################################
+
+MC_CHUNK_SIZE = 4096
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_TWO_POW_M53 = 1.0 / 9007199254740992.0
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _splitmix64(z):
+    """ SplitMix64 finaliser which maps a 64 bit integer to a well mixed 64
+    bit integer. """
+
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def rng_key(seed):
+    """ The key of the random number stream for a seed. """
+
+    return _splitmix64(np.uint64(seed) * _GOLDEN_GAMMA + _GOLDEN_GAMMA)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def counter_bits(key, counter):
+    """ The 64 random bits with index counter in the stream with this key. """
+
+    return _splitmix64(key + (np.uint64(counter) + np.uint64(1)) *
+                       _GOLDEN_GAMMA)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def stream_seed(seed, stream):
+    """ The seed of the random number stream with index stream split from the
+    base seed. Each (seed, stream) pair is hashed by SplitMix64 so streams
+    split from different base seeds do not overlap as consecutive integer
+    seeds would. The seed has 32 bits so that it can seed NumPy. """
+
+    return np.int64(counter_bits(rng_key(seed), stream) >> np.uint64(32))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def counter_uniform(key, counter):
+    """ The uniform random number in (0, 1) with index counter in the stream
+    with this key. """
+
+    z = counter_bits(key, counter)
+    return (np.float64(z >> np.uint64(11)) + 0.5) * _TWO_POW_M53
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def counter_normal(key, counter):
+    """ The standard normal random number with index counter in the stream
+    with this key. """
+
+    return norminvcdf(counter_uniform(key, counter))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def sobol_uniform_1d(counter):
+    """ The first dimension of the Sobol sequence in the gray code order of
+    get_uniform_sobol where counter 0 is the first point. It is the bit
+    reversal of the gray code of counter + 1. """
+
+    n = np.uint64(counter) + np.uint64(1)
+    g = n ^ (n >> np.uint64(1))
+
+    x = np.uint64(0)
+    for _ in range(0, 32):
+        x = (x << np.uint64(1)) | (g & np.uint64(1))
+        g = g >> np.uint64(1)
+
+    return np.float64(x) / 4294967296.0
+
+###############################################################################
+
+
+def num_chunks(num_paths, chunk_size=MC_CHUNK_SIZE):
+    """ Number of chunks needed to hold a number of paths. """
+
+    return (num_paths + chunk_size - 1) // chunk_size
+
+###############################################################################
+
+
+@contextmanager
+def mc_threads(num_threads):
+    """ Context in which Numba parallel loops use num_threads threads. If it
+    is None then all of the threads Numba has are used. The number of threads
+    in use beforehand is restored on exit. """
+
+    if num_threads is None:
+        yield
+        return
+
+    if num_threads < 1 or num_threads > numba.config.NUMBA_NUM_THREADS:
+        raise FinError("Number of threads must be between 1 and " +
+                       str(numba.config.NUMBA_NUM_THREADS))
+
+    old_num_threads = numba.get_num_threads()
+    numba.set_num_threads(num_threads)
+
+    try:
+        yield
+    finally:
+        numba.set_num_threads(old_num_threads)
+
+###############################################################################
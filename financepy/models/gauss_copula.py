@@ -2,15 +2,67 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: Use Numba to speed this up more.
-
 import numpy as np
 
-from ..utils.math import N
-from ..utils.helpers import uniform_to_default_time
+from ..utils.math import n_vect
+from ..utils.error import FinError
+from ..utils.helpers import uniforms_to_default_times
 
 ###############################################################################
-# TODO:
+# The default times are generated with array operations. The uniforms of each
+# issuer are mapped to default times with one searchsorted call on the
+# cumulative hazards of its survival curve. For large portfolios the factor
+# versions build the correlated variables from a few common factors and an
+# idiosyncratic normal per credit so no correlation matrix or Cholesky
+# decomposition is needed. They return the default times as float32 by
+# default which halves the memory of the num_credits by trials matrix.
+###############################################################################
+
+
+def factor_loadings_matrix(factor_loadings,
+                           num_credits):
+    """ Check the factor loadings of the credits which are a vector for a one
+    factor model or a matrix with one row per credit and one column per
+    factor. Returns them as a matrix with the idiosyncratic weights. """
+
+    betas = np.array(factor_loadings, dtype=np.float64)
+
+    if betas.ndim == 1:
+        betas = betas[:, np.newaxis]
+
+    if betas.ndim != 2 or betas.shape[0] != num_credits:
+        raise FinError("Need one row of factor loadings for each credit")
+
+    beta2 = np.sum(betas * betas, axis=1)
+
+    if np.any(beta2 > 1.0):
+        raise FinError("Sum of squared factor loadings must not exceed one")
+
+    return betas, np.sqrt(1.0 - beta2)
+
+###############################################################################
+
+
+def antithetic_default_times(issuer_curves,
+                             u,
+                             dtype=np.float64):
+    """ Matrix of default times by credit and trial for the uniforms u, with
+    one row per credit, followed by those of the antithetic uniforms 1 - u. """
+
+    num_credits, num_trials = u.shape
+    corrTimes = np.empty(shape=(num_credits, 2 * num_trials), dtype=dtype)
+
+    for iCredit in range(0, num_credits):
+        issuer_curve = issuer_curves[iCredit]
+        times = issuer_curve._times
+        values = issuer_curve._values
+        corrTimes[iCredit, :num_trials] = \
+            uniforms_to_default_times(u[iCredit], times, values)
+        corrTimes[iCredit, num_trials:] = \
+            uniforms_to_default_times(1.0 - u[iCredit], times, values)
+
+    return corrTimes
+
 ###############################################################################
 
 
@@ -27,20 +79,40 @@ def default_times_gc(issuer_curves,
     c = np.linalg.cholesky(correlationMatrix)
     y = np.dot(c, x)
 
-    corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+    u1 = 1.0 - n_vect(y)
+
+    return antithetic_default_times(issuer_curves, u1)
+
+###############################################################################
+
+
+def default_times_factor_gc(issuer_curves,
+                            factor_loadings,
+                            num_trials,
+                            seed,
+                            dtype=np.float32):
+    """ Generate a matrix of default times by credit and trial using a
+    Gaussian copula in which the correlation of credits i and j is the sum
+    over the factors of the products of their factor loadings. The factor
+    loadings are a vector for a one factor model or a matrix with one column
+    per factor. The matrix is built one credit at a time so the memory is
+    that of the returned matrix. """
+
+    num_credits = len(issuer_curves)
+    betas, idio = factor_loadings_matrix(factor_loadings, num_credits)
+
+    np.random.seed(seed)
+    z = np.random.normal(0.0, 1.0, size=(betas.shape[1], num_trials))
+
+    corrTimes = np.empty(shape=(num_credits, 2 * num_trials), dtype=dtype)
 
     for iCredit in range(0, num_credits):
-        issuer_curve = issuer_curves[iCredit]
-        for iTrial in range(0, num_trials):
-            g = y[iCredit, iTrial]
-            u1 = 1.0 - N(g)
-            u2 = 1.0 - u1
-            times = issuer_curve._times
-            values = issuer_curve._values
-            t1 = uniform_to_default_time(u1, times, values)
-            t2 = uniform_to_default_time(u2, times, values)
-            corrTimes[iCredit, iTrial] = t1
-            corrTimes[iCredit, num_trials + iTrial] = t2
+        e = np.random.normal(0.0, 1.0, size=num_trials)
+        y = betas[iCredit] @ z + idio[iCredit] * e
+        u1 = 1.0 - n_vect(y)
+        corrTimes[iCredit:iCredit + 1] = \
+            antithetic_default_times(issuer_curves[iCredit:iCredit + 1],
+                                     u1[np.newaxis, :], dtype)
 
     return corrTimes
 
@@ -0,0 +1,454 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import time
+import multiprocessing
+from math import erfc, exp, log, sqrt
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numba import njit
+from scipy.optimize import least_squares
+
+from ..utils.error import FinError
+from ..utils.helpers import label_to_string
+from ..utils.math import INVROOT2PI
+from ..market.curves.interpolator import InterpTypes, _uinterpolate
+from .hw_tree import HWTree
+
+interp = InterpTypes.FLAT_FWD_RATES.value
+
+###############################################################################
+# Calibration of the Hull-White model to European swaptions. A swaption is an
+# option on a coupon bond and Jamshidian's decomposition values it as a sum of
+# options on zero coupon bonds. With a constant mean reversion a and a
+# piecewise constant volatility the bond prices at the expiry T are
+# P(T,t) = P(0,t) / P(0,T) exp(-B(T,t) x - B(T,t)^2 V / 2) where x is a
+# Gaussian factor with variance V = int_0^T sigma(u)^2 exp(-2a(T-u)) du, and
+# the zero coupon bond options are Black formulae in the bond price volatility
+# B(T,t) sqrt(V). As each zero coupon bond option is zero at its strike, which
+# is where the coupon bond is at the money, the derivative of the swaption
+# price with respect to a or the volatilities is the sum of the vegas of the
+# zero coupon bond options at fixed strikes times the derivatives of their
+# volatilities. These are analytic so the calibration is a least squares fit
+# with an exact Jacobian which converges in a few iterations, even faster
+# when it starts from the parameters of the previous calibration.
+###############################################################################
+
+HW_MIN_MEAN_REVERSION = 1e-4
+HW_MAX_MEAN_REVERSION = 2.0
+HW_MIN_SIGMA = 1e-6
+HW_MAX_SIGMA = 1.0
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _norm_cdf(x):
+    return 0.5 * erfc(-x / sqrt(2.0))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _variance_and_derivatives(a, sigmas, sigma_times, texp):
+    """ The variance of the Hull-White factor at texp and its derivatives with
+    respect to a and each of the volatilities. Volatility k applies up to
+    sigma_times[k] and the last one also applies after its time. """
+
+    num_sigmas = len(sigmas)
+    c = 2.0 * a
+
+    var = 0.0
+    dvar_da = 0.0
+    dvar_dsigma = np.zeros(num_sigmas)
+
+    start = 0.0
+
+    for k in range(0, num_sigmas):
+
+        if k < num_sigmas - 1:
+            end = min(sigma_times[k], texp)
+        else:
+            end = texp
+
+        if end > start:
+
+            # Integrate exp(-2a tau) over tau = texp - u for u in the bucket
+            tau0 = texp - end
+            tau1 = texp - start
+            e0 = exp(-c * tau0)
+            e1 = exp(-c * tau1)
+            integral = e0 * (-np.expm1(-c * (tau1 - tau0))) / c
+            dintegral_da = 2.0 * (e1 * (c * tau1 + 1.0) -
+                                  e0 * (c * tau0 + 1.0)) / (c * c)
+
+            s2 = sigmas[k] * sigmas[k]
+            var += s2 * integral
+            dvar_da += s2 * dintegral_da
+            dvar_dsigma[k] = 2.0 * sigmas[k] * integral
+
+        start = end
+
+        if start >= texp:
+            break
+
+    return var, dvar_da, dvar_dsigma
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def hw_swaption_prices_fast(a, sigmas, sigma_times, texps, flow_times, flows,
+                            df_expiry, df_flows, is_payer):
+    """ Prices of European swaptions per unit notional in the Hull-White
+    model with mean reversion a and a piecewise constant volatility, and the
+    Jacobian of the prices with respect to a and then each volatility. Row k
+    of flow_times, flows and df_flows holds the fixed leg flows of swaption k
+    after its expiry including the principal, padded with zero flows. The
+    floating leg is worth par at expiry. """
+
+    num_swaptions = len(texps)
+    num_sigmas = len(sigmas)
+
+    prices = np.zeros(num_swaptions)
+    jacobian = np.zeros((num_swaptions, 1 + num_sigmas))
+
+    for k in range(0, num_swaptions):
+
+        texp = texps[k]
+        var, dvar_da, dvar_dsigma = \
+            _variance_and_derivatives(a, sigmas, sigma_times, texp)
+
+        num_flows = flow_times.shape[1]
+        B = np.zeros(num_flows)
+        dB_da = np.zeros(num_flows)
+        A = np.zeros(num_flows)
+
+        for i in range(0, num_flows):
+            tau = flow_times[k, i] - texp
+            B[i] = -np.expm1(-a * tau) / a
+            dB_da[i] = (tau * exp(-a * tau) - B[i]) / a
+            A[i] = df_flows[k, i] / df_expiry[k] * exp(-0.5 * B[i] * B[i] *
+                                                        var)
+
+        # The factor value at which the coupon bond is worth par
+        x = 0.0
+        for _ in range(0, 100):
+            f = -1.0
+            fprime = 0.0
+            for i in range(0, num_flows):
+                z = flows[k, i] * A[i] * exp(-B[i] * x)
+                f += z
+                fprime -= B[i] * z
+            step = f / fprime
+            x -= step
+            if abs(step) < 1e-14:
+                break
+
+        sqrt_var = sqrt(max(var, 1e-300))
+        price = 0.0
+
+        for i in range(0, num_flows):
+
+            if flows[k, i] == 0.0:
+                continue
+
+            strike = A[i] * exp(-B[i] * x)
+            fwd = df_flows[k, i]
+            disc_strike = strike * df_expiry[k]
+            sigma_p = B[i] * sqrt_var
+
+            if sigma_p < 1e-12:
+                if is_payer[k]:
+                    price += flows[k, i] * max(disc_strike - fwd, 0.0)
+                else:
+                    price += flows[k, i] * max(fwd - disc_strike, 0.0)
+                continue
+
+            h = log(fwd / disc_strike) / sigma_p + 0.5 * sigma_p
+
+            if is_payer[k]:
+                zbo = disc_strike * _norm_cdf(sigma_p - h) - \
+                    fwd * _norm_cdf(-h)
+            else:
+                zbo = fwd * _norm_cdf(h) - \
+                    disc_strike * _norm_cdf(h - sigma_p)
+
+            price += flows[k, i] * zbo
+
+            vega = flows[k, i] * fwd * exp(-0.5 * h * h) * INVROOT2PI
+
+            dsigma_p_da = dB_da[i] * sqrt_var + \
+                B[i] * dvar_da / (2.0 * sqrt_var)
+
+            jacobian[k, 0] += vega * dsigma_p_da
+
+            for m in range(0, num_sigmas):
+                jacobian[k, 1 + m] += vega * B[i] * dvar_dsigma[m] / \
+                    (2.0 * sqrt_var)
+
+        prices[k] = price
+
+    return prices, jacobian
+
+###############################################################################
+
+
+class HWCalibration():
+    """ Calibrates the Hull-White mean reversion and piecewise constant
+    volatility to the prices of a set of European swaptions such as a
+    co-terminal strip or a full grid of expiries and tenors. The swaption
+    flows are set once and each call to calibrate fits the model to a
+    discount curve and a set of market prices. Each calibration starts from
+    the parameters found by the last one unless others are given. """
+
+    def __init__(self,
+                 texps: (list, np.ndarray),
+                 flow_times: list,
+                 flows: list,
+                 is_payer: (list, np.ndarray),
+                 sigma_times: (list, np.ndarray) = None,
+                 calibrate_a: bool = True,
+                 a: float = 0.05,
+                 sigma: float = 0.01):
+        """ Create the calibration from the expiry time of each swaption and
+        the times and sizes of its fixed leg flows after expiry per unit
+        notional including the principal. Volatility k applies up to
+        sigma_times[k] and the last one also applies after its time. With no
+        sigma_times the volatility is constant. If calibrate_a is False the
+        mean reversion is held at a. The starting volatility is sigma. """
+
+        num_swaptions = len(texps)
+
+        if num_swaptions == 0:
+            raise FinError("Need at least one swaption")
+
+        if len(flow_times) != num_swaptions or len(flows) != num_swaptions \
+                or len(is_payer) != num_swaptions:
+            raise FinError("Need flows and a payer flag for each swaption")
+
+        if sigma_times is None:
+            sigma_times = [np.inf]
+
+        sigma_times = np.array(sigma_times, dtype=np.float64)
+
+        if np.any(np.diff(sigma_times) <= 0.0):
+            raise FinError("Volatility times must be increasing")
+
+        max_flows = max(len(f) for f in flows)
+
+        self._texps = np.array(texps, dtype=np.float64)
+        self._flow_times = np.zeros((num_swaptions, max_flows))
+        self._flows = np.zeros((num_swaptions, max_flows))
+        self._is_payer = np.array(is_payer, dtype=np.bool_)
+
+        for k in range(0, num_swaptions):
+            n = len(flows[k])
+            self._flow_times[k, :n] = flow_times[k]
+            self._flow_times[k, n:] = flow_times[k][-1]
+            self._flows[k, :n] = flows[k]
+
+        if np.any(self._flow_times <= self._texps[:, np.newaxis]):
+            raise FinError("Swaption flows must be after its expiry")
+
+        self._sigma_times = sigma_times
+        self._calibrate_a = calibrate_a
+        self._a = max(a, HW_MIN_MEAN_REVERSION)
+        self._sigmas = np.full(len(sigma_times), sigma)
+
+    ###########################################################################
+
+    def _discount_factors(self, df_times, df_values):
+        """ The discount factors to the expiry and flow times. """
+
+        df_expiry = np.array([_uinterpolate(t, df_times, df_values, interp)
+                              for t in self._texps])
+
+        flat_times = self._flow_times.ravel()
+        df_flows = np.array([_uinterpolate(t, df_times, df_values, interp)
+                             for t in flat_times])
+
+        return df_expiry, df_flows.reshape(self._flow_times.shape)
+
+    ###########################################################################
+
+    def prices(self,
+               df_times: np.ndarray,
+               df_values: np.ndarray,
+               a: float = None,
+               sigmas: (list, np.ndarray) = None):
+        """ The model prices of the swaptions per unit notional and their
+        Jacobian with respect to a and the volatilities. The parameters are
+        those of the last calibration unless given. """
+
+        if a is None:
+            a = self._a
+
+        if sigmas is None:
+            sigmas = self._sigmas
+
+        if len(sigmas) != len(self._sigma_times):
+            raise FinError("Need one sigma per sigma time")
+
+        df_expiry, df_flows = self._discount_factors(df_times, df_values)
+
+        return hw_swaption_prices_fast(a, np.array(sigmas, dtype=np.float64),
+                                       self._sigma_times, self._texps,
+                                       self._flow_times, self._flows,
+                                       df_expiry, df_flows, self._is_payer)
+
+    ###########################################################################
+
+    def calibrate(self,
+                  df_times: np.ndarray,
+                  df_values: np.ndarray,
+                  market_prices: (list, np.ndarray),
+                  weights: (list, np.ndarray) = None,
+                  a: float = None,
+                  sigmas: (list, np.ndarray) = None,
+                  tol: float = 1e-12):
+        """ Fit the model to the market prices of the swaptions per unit
+        notional by weighted least squares. The fit starts from a and sigmas
+        if given, for example yesterday's parameters, or else from the last
+        calibration. Returns a dictionary with the parameters, the root mean
+        square and largest price errors, the number of Jacobian evaluations
+        and the time taken in seconds. """
+
+        start = time.perf_counter()
+
+        market_prices = np.array(market_prices, dtype=np.float64)
+
+        if len(market_prices) != len(self._texps):
+            raise FinError("Need a market price for each swaption")
+
+        if weights is None:
+            weights = np.ones(len(market_prices))
+
+        weights = np.array(weights, dtype=np.float64)
+
+        if a is not None:
+            self._a = max(a, HW_MIN_MEAN_REVERSION)
+
+        if sigmas is not None:
+            sigmas = np.array(sigmas, dtype=np.float64)
+            if len(sigmas) != len(self._sigma_times):
+                raise FinError("Need one sigma per sigma time")
+            self._sigmas = sigmas
+
+        df_expiry, df_flows = self._discount_factors(df_times, df_values)
+
+        args = (self._sigma_times, self._texps, self._flow_times, self._flows,
+                df_expiry, df_flows, self._is_payer)
+
+        fixed_a = self._a
+        calibrate_a = self._calibrate_a
+
+        def unpack(p):
+            if calibrate_a:
+                return p[0], p[1:]
+            return fixed_a, p
+
+        def residuals(p):
+            a, sigmas = unpack(p)
+            prices, _ = hw_swaption_prices_fast(a, sigmas, *args)
+            return weights * (prices - market_prices)
+
+        def jacobian(p):
+            a, sigmas = unpack(p)
+            _, jac = hw_swaption_prices_fast(a, sigmas, *args)
+            jac = jac * weights[:, np.newaxis]
+            if calibrate_a:
+                return jac
+            return jac[:, 1:]
+
+        num_sigmas = len(self._sigmas)
+        lower = np.full(num_sigmas, HW_MIN_SIGMA)
+        upper = np.full(num_sigmas, HW_MAX_SIGMA)
+        x0 = np.clip(self._sigmas, HW_MIN_SIGMA, HW_MAX_SIGMA)
+
+        if calibrate_a:
+            lower = np.concatenate(([HW_MIN_MEAN_REVERSION], lower))
+            upper = np.concatenate(([HW_MAX_MEAN_REVERSION], upper))
+            x0 = np.concatenate(([np.clip(self._a, HW_MIN_MEAN_REVERSION,
+                                          HW_MAX_MEAN_REVERSION)], x0))
+
+        opt = least_squares(residuals, x0, jac=jacobian, bounds=(lower, upper),
+                            method="trf", x_scale="jac",
+                            ftol=tol, xtol=tol, gtol=tol)
+
+        self._a, self._sigmas = unpack(opt.x)
+        self._sigmas = np.array(self._sigmas)
+
+        errors = opt.fun / weights
+
+        return {'a': self._a,
+                'sigmas': self._sigmas.copy(),
+                'rmse': np.sqrt(np.mean(errors**2)),
+                'max_error': np.max(np.abs(errors)),
+                'num_evaluations': opt.njev,
+                'time': time.perf_counter() - start}
+
+    ###########################################################################
+
+    def hw_tree(self,
+                num_time_steps: int = 100):
+        """ A Hull-White tree with the calibrated parameters. The tree has a
+        constant volatility so this needs a single volatility. """
+
+        if len(self._sigmas) != 1:
+            raise FinError("HWTree needs a constant volatility")
+
+        return HWTree(self._sigmas[0], self._a, num_time_steps)
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM SWAPTIONS", len(self._texps))
+        s += label_to_string("CALIBRATE A", self._calibrate_a)
+        s += label_to_string("A", self._a)
+        s += label_to_string("SIGMA TIMES", self._sigma_times)
+        s += label_to_string("SIGMAS", self._sigmas, "")
+        return s
+
+###############################################################################
+
+
+def _calibrate_task(task):
+    """ Run one calibration in a worker process. """
+
+    (calibration, df_times, df_values, market_prices) = task
+    return calibration.calibrate(df_times, df_values, market_prices)
+
+###############################################################################
+
+
+def calibrate_hw_parallel(tasks: list,
+                          num_processes: int = None):
+    """ Run a list of calibrations, such as one per currency, in a pool of
+    processes. Each task is a tuple of an HWCalibration, the discount curve
+    times and discount factors and the market prices. Returns the results of
+    the calibrations in order and sets each calibration to its parameters so
+    that the next calibration starts from them. """
+
+    if num_processes == 1 or len(tasks) == 1:
+        return [_calibrate_task(task) for task in tasks]
+
+    # Forked workers can hang if the parent has started numba's threads
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=num_processes,
+                             mp_context=context) as pool:
+        results = list(pool.map(_calibrate_task, tasks))
+
+    for task, result in zip(tasks, results):
+        calibration = task[0]
+        calibration._a = result['a']
+        calibration._sigmas = result['sigmas'].copy()
+
+    return results
+
+###############################################################################
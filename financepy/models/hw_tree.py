@@ -12,7 +12,9 @@ from ..utils.error import FinError
 from ..utils.math import N, accrued_interpolator
 from ..market.curves.interpolator import InterpTypes, _uinterpolate
 from ..utils.helpers import label_to_string
-from ..utils.global_types import FinExerciseTypes
+from .tree_cache import TreeCache
+from .tree_grid import TreeGridTypes, ShortRateTree
+from .tree_grid import option_exercise_types_to_int
 from ..utils.global_vars import gSmall
 
 interp = InterpTypes.FLAT_FWD_RATES.value
@@ -37,20 +39,6 @@ class FinHWEuropeanCalcType(Enum):
 ###############################################################################
 
 
-def option_exercise_types_to_int(optionExerciseType):
-
-    if optionExerciseType == FinExerciseTypes.EUROPEAN:
-        return 1
-    if optionExerciseType == FinExerciseTypes.BERMUDAN:
-        return 2
-    if optionExerciseType == FinExerciseTypes.AMERICAN:
-        return 3
-    else:
-        raise FinError("Unknown option exercise type.")
-
-###############################################################################
-
-
 @njit(fastmath=True, cache=True)
 def p_fast(t, T, Rt, delta, pt, ptd, pT, _sigma, _a):
     """ Forward discount factor as seen at some time t which may be in the
@@ -839,13 +827,15 @@ def fwd_full_bond_price(rt, *args):
 ###############################################################################
 
 
-class HWTree():
+class HWTree(ShortRateTree):
 
     def __init__(self,
                  sigma,
                  a,
                  num_time_steps=100,
-                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE):
+                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE,
+                 tree_cache: TreeCache = None,
+                 grid_type: TreeGridTypes = TreeGridTypes.UNIFORM):
         """ Constructs the Hull-White rate model. The speed of mean reversion
         a and volatility are passed in. The short rate process is given by
         dr = (theta(t) - ar) * dt  + sigma * dW. The model will switch to use
@@ -870,6 +860,8 @@ class HWTree():
         self._pm = None
         self._pd = None
         self._discount_curve = None
+
+        self._init_tree_cache(tree_cache, grid_type)
         self._treeBuilt = False
 
 ###############################################################################
@@ -989,6 +981,8 @@ class HWTree():
         corresponding bond price. User provides bond object and option details.
         """
 
+        self._check_uniform_grid()
+
         dt = self._dt
         tdelta = texp + dt
 
@@ -1057,6 +1051,8 @@ class HWTree():
         """ Price an option on a zero coupon bond using a HW trinomial
         tree. The discount curve was already supplied to the tree build. """
 
+        self._check_uniform_grid()
+
         if texp > tmat:
             raise FinError("Option expiry after bond matures.")
 
@@ -1116,6 +1112,13 @@ class HWTree():
         if texp < 0.0:
             raise FinError("Option expiry time negative.")
 
+        if self._grid_type == TreeGridTypes.EVENT_ALIGNED:
+
+            return self._event_grid_bermudan_swaption(texp, strike, face,
+                                                      coupon_times,
+                                                      coupon_flows,
+                                                      exercise_typeInt)
+
         #######################################################################
 
         payValue, recValue \
@@ -1139,6 +1142,8 @@ class HWTree():
         maturity. For European bond options, Jamshidian's model is
         faster and is used instead i.e. not this function. """
 
+        self._check_uniform_grid()
+
         exercise_typeInt = option_exercise_types_to_int(exercise_type)
 
         if exercise_typeInt == 1:
@@ -1215,6 +1220,8 @@ class HWTree():
         the option expiry date need to be solved. Also this function should be
         moved out of the class so it can be sped up using NUMBA. """
 
+        self._check_uniform_grid()
+
         coupon_times = np.array(coupon_times)
         coupon_flows = np.array(coupon_flows)
 
@@ -1244,6 +1251,8 @@ class HWTree():
         """ Discount factor as seen from now to time tmat as long as the time
         is on the tree grid. """
 
+        self._check_uniform_grid()
+
         if tmat == 0.0:
             return 1.0
 
@@ -1264,39 +1273,33 @@ class HWTree():
 
 ###############################################################################
 
-    def build_tree(self, treeMat, df_times, df_values):
-        """ Build the trinomial tree. """
+    def _tree_params(self):
+        """ The parameters which identify the tree in the tree cache. """
 
-        if isinstance(df_times, np.ndarray) is False:
-            raise FinError("DF TIMES must be a numpy vector")
+        return (self._sigma, self._a)
 
-        if isinstance(df_values, np.ndarray) is False:
-            raise FinError("DF VALUES must be a numpy vector")
+###############################################################################
+
+    def _build_tree_fast(self, tree_times, dfTree):
+        """ Build the trinomial tree fitted to the discount factors dfTree at
+        the tree times. """
 
-        # I wish to add on an additional time to the tree so that the second
-        # last time corresponds to a maturity treeMat. For this reason I scale
-        # up the maturity date of the tree as follows
-        treeMaturity = treeMat * (self._num_time_steps+1)/self._num_time_steps
+        return build_tree_fast(self._a, self._sigma,
+                               tree_times, self._num_time_steps,
+                               dfTree)
 
-        # The vector of times goes out to this maturity
-        tree_times = np.linspace(0.0, treeMaturity, self._num_time_steps + 2)
-        self._tree_times = tree_times
+###############################################################################
 
-        dfTree = np.zeros(shape=(self._num_time_steps+2))
-        dfTree[0] = 1.0
+    def _set_tree(self, tree):
 
-        for i in range(1, self._num_time_steps+2):
-            t = tree_times[i]
-            dfTree[i] = _uinterpolate(t, df_times, df_values, interp)
+        self._Q, self._pu, self._pm, self._pd, self._rt, self._dt = tree
 
-        self._df_times = df_times
-        self._dfs = df_values
+###############################################################################
 
-        self._Q, self._pu, self._pm, self._pd, self._rt, self._dt \
-            = build_tree_fast(self._a, self._sigma,
-                              tree_times, self._num_time_steps, dfTree)
+    def _lattice_params(self):
+        """ Parameters of the event aligned lattice of this model. """
 
-        return
+        return (self._a, self._sigma, False, 0.0)
 
 ###############################################################################
 
@@ -1307,6 +1310,7 @@ class HWTree():
         s += label_to_string("Sigma", self._sigma)
         s += label_to_string("a", self._a)
         s += label_to_string("num_time_steps", self._num_time_steps)
+        s += label_to_string("grid_type", self._grid_type)
         s += label_to_string("EuropeanCalcTypes", self._europeanCalcType)
         return s
 
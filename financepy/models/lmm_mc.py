@@ -10,6 +10,9 @@ from ..utils.error import FinError
 from ..utils.math import N
 from ..utils.math import norminvcdf
 from ..models.sobol import get_uniform_sobol
+from ..models.sobol import SobolGenerator
+from ..models.adaptive_mc import adaptive_mc
+from ..models.adaptive_mc import ADAPTIVE_MC_MIN_PATHS, ADAPTIVE_MC_MAX_PATHS
 
 # TO DO: SHIFTED LOGNORMAL
 # TO DO: TERMINAL MEASURE
@@ -508,6 +511,69 @@ def lmm_simulate_fwds_1f(numForwards, num_paths, numeraireIndex, fwd0, gammas,
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _lmm_factor_covariance(lambdas):
+    """ The sum over the factors of the products of the factor volatilities
+    at each pair of forward offsets. """
+
+    numFactors = len(lambdas)
+    numForwards = len(lambdas[0])
+    zz = np.zeros((numForwards, numForwards))
+
+    for m in range(0, numForwards):
+        for n in range(0, numForwards):
+            for q in range(0, numFactors):
+                zz[m, n] += lambdas[q][m] * lambdas[q][n]
+
+    return zz
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_evolve_step(fwdA, fwdB, g, j, numForwards, lambdas, zz, taus):
+    """ Evolve the forwards fwdA at time index j over one time step to get
+    the forwards fwdB at time index j+1 using a predictor corrector scheme
+    driven by the factor normals g. Only the forwards from j up to
+    numForwards - 1 are updated. The factor covariance zz is precomputed by
+    _lmm_factor_covariance. """
+
+    numFactors = len(lambdas)
+    dtj = taus[j]
+    sqrt_dtj = np.sqrt(dtj)
+
+    for k in range(j, numForwards):  # FORWARDS LOOP
+
+        muA = 0.0
+        for i in range(j+1, k+1):
+            fi = fwdA[i]
+            ti = taus[i]
+            muA += fi * ti * zz[i-j, k-j] / (1.0 + fi * ti)
+
+        itoTerm = zz[k-j, k-j]
+
+        randomTerm = 0.0
+        for q in range(0, numFactors):
+            wq = g[q]
+            randomTerm += lambdas[q][k-j] * wq
+        randomTerm *= sqrt_dtj
+
+        x = np.exp(muA * dtj - 0.5 * itoTerm * dtj + randomTerm)
+        fk = fwdA[k] * x
+
+        muB = 0.0
+        for i in range(j+1, k+1):
+            ti = taus[i]
+            muB += fk * ti * zz[i-j, k-j] / (1.0 + fk * ti)
+
+        muC = 0.5 * (muA + muB)
+
+        x = np.exp(muC * dtj - 0.5 * itoTerm * dtj + randomTerm)
+        fwdB[k] = fwdA[k] * x
+
+###############################################################################
+
+
 @jit(float64[:, :, :](int64, int64, int64, int64, float64[:], float64[:, :],
                       float64[:], int64, int64),
      cache=True, fastmath=True, parallel=useParallel)
@@ -530,7 +596,6 @@ def lmm_simulate_fwds_mf(numForwards, numFactors, num_paths, numeraireIndex, fwd
     num_paths = 2 * int(num_paths/2)
     halfNumPaths = int(num_paths/2)
     fwd = np.empty((num_paths, numForwards, numForwards))
-    fwdB = np.zeros(numForwards)
 
     num_times = numForwards
 
@@ -557,56 +622,17 @@ def lmm_simulate_fwds_mf(numForwards, numFactors, num_paths, numeraireIndex, fwd
     else:
         raise FinError("Use Sobol must be 0 or 1.")
 
+    zz = _lmm_factor_covariance(lambdas)
+
     for iPath in range(0, num_paths):
         # Initial value of forward curve at time 0
         for iFwd in range(0, numForwards):
             fwd[iPath, 0, iFwd] = fwd0[iFwd]
 
         for j in range(0, numForwards-1):  # TIME LOOP
-            dtj = taus[j]
-            sqrt_dtj = np.sqrt(dtj)
-
-            for k in range(j, numForwards):  # FORWARDS LOOP
-
-                muA = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwd[iPath, j, i]
-                    ti = taus[i]
-                    zz = 0.0
-                    for q in range(0, numFactors):
-                        zij = lambdas[q][i-j]
-                        zkj = lambdas[q][k-j]
-                        zz += zij * zkj
-                    muA += fi * ti * zz / (1.0 + fi * ti)
-
-                itoTerm = 0.0
-                for q in range(0, numFactors):
-                    itoTerm += lambdas[q][k-j] * lambdas[q][k-j]
-
-                randomTerm = 0.0
-                for q in range(0, numFactors):
-                    wq = gMatrix[iPath, j, q]
-                    randomTerm += lambdas[q][k-j] * wq
-                randomTerm *= sqrt_dtj
-
-                x = np.exp(muA * dtj - 0.5 * itoTerm * dtj + randomTerm)
-                fwdB[k] = fwd[iPath, j, k] * x
-
-                muB = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwdB[k]
-                    ti = taus[i]
-                    zz = 0.0
-                    for q in range(0, numFactors):
-                        zij = lambdas[q][i-j]
-                        zkj = lambdas[q][k-j]
-                        zz += zij * zkj
-                    muB += fi * ti * zz / (1.0 + fi * ti)
-
-                muC = 0.5 * (muA + muB)
-
-                x = np.exp(muC * dtj - 0.5 * itoTerm * dtj + randomTerm)
-                fwd[iPath, j+1, k] = fwd[iPath, j, k] * x
+            _lmm_evolve_step(fwd[iPath, j], fwd[iPath, j+1],
+                             gMatrix[iPath, j], j, numForwards, lambdas, zz,
+                             taus)
 
     return fwd
 
@@ -743,6 +769,35 @@ def lmm_swap_pricer(cpn, num_periods, num_paths, fwd0, fwds, taus):
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _lmm_swaption_payoff(fwdA, a, b, taus, strike, isPayer):
+    """ Payoff of a European swaption at its expiry time index a given the
+    forwards fwdA at that time for a swap on the forwards a to b - 1. """
+
+    pv01 = 0.0
+    df = 1.0
+
+    # Value the swap as if we were at time a with forward curve known
+    for k in range(a, b):
+        f = fwdA[k]
+        tau = taus[k]
+        df = df / (1.0 + tau * f)
+        pv01 = pv01 + tau * df
+
+    fwdSwapRate = (1.0 - df) / pv01
+
+    if isPayer == 1:
+        payRecSwaption = max(fwdSwapRate - strike, 0.0) * pv01
+    elif isPayer == 0:
+        payRecSwaption = max(strike - fwdSwapRate, 0.0) * pv01
+    else:
+        raise FinError("Unknown payRecSwaption value - must be 0 or 1")
+
+    return payRecSwaption
+
+###############################################################################
+
+
 @njit(float64(float64, int64, int64, int64, float64[:], float64[:, :, :],
               float64[:], int64), cache=True, fastmath=True, parallel=useParallel)
 def lmm_swaption_pricer(strike, a, b, num_paths, fwd0, fwds, taus, isPayer):
@@ -777,29 +832,219 @@ def lmm_swaption_pricer(strike, a, b, num_paths, fwd0, fwds, taus, isPayer):
         for k in range(0, a):
             numeraire *= (1.0 + taus[k] * fwds[iPath, k, k])
 
-        pv01 = 0.0
-        df = 1.0
+        payRecSwaption = _lmm_swaption_payoff(fwds[iPath, a], a, b, taus,
+                                              strike, isPayer)
 
-        # Value the swap as if we were at time a with forward curve known
-        for k in range(a, b):
-            f = fwds[iPath, a, k]
-            tau = taus[k]
-            df = df / (1.0 + tau * f)
-            pv01 = pv01 + tau * df
+        sumPayRecSwaption += payRecSwaption / (abs(numeraire) + 1e-10)
+
+    payRecPrice = sumPayRecSwaption / num_paths
+    return payRecPrice
+
+###############################################################################
 
-        fwdSwapRate = (1.0 - df) / pv01
 
-        if isPayer == 1:
-            payRecSwaption = max(fwdSwapRate - strike, 0.0) * pv01
-        elif isPayer == 0:
-            payRecSwaption = max(strike - fwdSwapRate, 0.0) * pv01
+@njit(cache=True)
+def _lmm_seed(seed):
+    np.random.seed(seed)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_pseudo_normals(numPairs, num_times, numFactors):
+    """ The next normals for numPairs antithetic pairs of paths drawn in the
+    same order as the simulations of the full forward paths. """
+
+    g = np.empty((numPairs, num_times, numFactors))
+    for iPath in range(0, numPairs):
+        for j in range(0, num_times):
+            for q in range(0, numFactors):
+                g[iPath, j, q] = np.random.normal()
+    return g
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _lmm_swaption_book_chunk(gMatrix, fwd0, lambdas, taus, strikes, aIndices,
+                             bIndices, isPayers):
+    """ Evolve each antithetic pair of paths driven by gMatrix and return the
+    pair average of the discounted payoff of each swaption. Only the current
+    forward curve of a path is kept. """
+
+    numPairs = len(gMatrix)
+    numForwards = len(fwd0)
+    numFactors = len(lambdas)
+    numSwaptions = len(strikes)
+    num_steps = np.max(aIndices)
+    numFwdsUsed = np.max(bIndices)
+
+    zz = _lmm_factor_covariance(lambdas)
+    fwdA = np.empty(numForwards)
+    fwdB = np.empty(numForwards)
+    g = np.empty(numFactors)
+    payoffs = np.zeros((numPairs, numSwaptions))
+
+    for iPair in range(0, numPairs):
+
+        for sign in (1.0, -1.0):
+
+            fwdA[:] = fwd0
+            numeraire = 1.0
+
+            for j in range(0, num_steps + 1):
+
+                for iSwaption in range(0, numSwaptions):
+                    if aIndices[iSwaption] == j:
+                        v = _lmm_swaption_payoff(fwdA, j, bIndices[iSwaption],
+                                                 taus, strikes[iSwaption],
+                                                 isPayers[iSwaption])
+                        payoffs[iPair, iSwaption] += \
+                            0.5 * v / (abs(numeraire) + 1e-10)
+
+                if j == num_steps:
+                    break
+
+                for q in range(0, numFactors):
+                    g[q] = sign * gMatrix[iPair, j, q]
+
+                _lmm_evolve_step(fwdA, fwdB, g, j, numFwdsUsed, lambdas, zz,
+                                 taus)
+                numeraire *= (1.0 + taus[j] * fwdA[j])
+                fwdA, fwdB = fwdB, fwdA
+
+    return payoffs
+
+###############################################################################
+
+
+def _lmm_swaption_book_sampler(numForwards, numFactors, fwd0, lambdas, taus,
+                               useSobol, seed, strikes, aIndices, bIndices,
+                               isPayers):
+    """ Check the inputs of a swaption book and return a function which
+    gives the discounted payoffs of the next antithetic pairs of paths with
+    one row per pair and one column per swaption. It must be called for
+    consecutive blocks of pairs starting from the first. """
+
+    lambdas = np.array(lambdas, dtype=np.float64)
+    fwd0 = np.array(fwd0, dtype=np.float64)
+    taus = np.array(taus, dtype=np.float64)
+    strikes = np.atleast_1d(np.array(strikes, dtype=np.float64))
+    numSwaptions = len(strikes)
+
+    aIndices = np.broadcast_to(np.array(aIndices, dtype=np.int64),
+                               numSwaptions).copy()
+    bIndices = np.broadcast_to(np.array(bIndices, dtype=np.int64),
+                               numSwaptions).copy()
+    isPayers = np.broadcast_to(np.array(isPayers, dtype=np.int64),
+                               numSwaptions).copy()
+
+    if len(lambdas) != numFactors:
+        raise FinError("Lambda does not have the right number of factors")
+
+    if len(lambdas[0]) != numForwards:
+        raise FinError("Lambda does not have the right number of forwards")
+
+    if len(fwd0) != numForwards or len(taus) != numForwards:
+        raise FinError("The length of fwd0 and taus must equal numForwards")
+
+    if np.any(aIndices < 0) or np.any(aIndices >= bIndices) or \
+            np.any(bIndices > numForwards):
+        raise FinError("Swaption indices must satisfy 0 <= a < b <= numForwards")
+
+    num_times = numForwards
+
+    if useSobol == 1:
+        sobol = SobolGenerator(num_times * numFactors)
+    elif useSobol == 0:
+        _lmm_seed(seed)
+    else:
+        raise FinError("Use Sobol must be 0 or 1.")
+
+    def sampler(firstPair, numPairs):
+
+        if useSobol == 1:
+            gMatrix = sobol.next_gaussian_chunk(numPairs)
+            gMatrix = gMatrix.reshape((numPairs, num_times, numFactors))
         else:
-            raise FinError("Unknown payRecSwaption value - must be 0 or 1")
+            gMatrix = _lmm_pseudo_normals(numPairs, num_times, numFactors)
 
-        sumPayRecSwaption += payRecSwaption / (abs(numeraire) + 1e-10)
+        return _lmm_swaption_book_chunk(gMatrix, fwd0, lambdas, taus, strikes,
+                                        aIndices, bIndices, isPayers)
 
-    payRecPrice = sumPayRecSwaption / num_paths
-    return payRecPrice
+    return sampler
+
+###############################################################################
+
+
+def lmm_swaption_book_pricer(numForwards, numFactors, num_paths, fwd0, lambdas,
+                             taus, useSobol, seed, strikes, aIndices, bIndices,
+                             isPayers, chunkSize=4096):
+    """ Price a book of European swaptions in the multi-factor LMM without
+    storing the simulated forward curves. Swaption i expires at forward index
+    aIndices[i] and its swap runs to forward index bIndices[i]. The paths are
+    generated in chunks of antithetic pairs using the same random numbers as
+    lmm_simulate_fwds_mf and each is only evolved to the last expiry. The
+    memory used grows with the chunk size and the number of forwards but not
+    with the number of paths. Returns the values and their standard errors
+    which treat each antithetic pair as one sample. The values are those of
+    lmm_swaption_pricer applied to the full forward paths. """
+
+    if chunkSize < 1:
+        raise FinError("Chunk size must be positive")
+
+    # Even number of paths for antithetics
+    halfNumPaths = int(num_paths/2)
+
+    if halfNumPaths < 2:
+        raise FinError("Need at least four paths")
+
+    sampler = _lmm_swaption_book_sampler(numForwards, numFactors, fwd0,
+                                         lambdas, taus, useSobol, seed,
+                                         strikes, aIndices, bIndices,
+                                         isPayers)
+
+    sums = 0.0
+    sumSquares = 0.0
+
+    numPairsDone = 0
+    while numPairsDone < halfNumPaths:
+
+        numPairs = min(chunkSize, halfNumPaths - numPairsDone)
+        payoffs = sampler(numPairsDone, numPairs)
+        sums = sums + np.sum(payoffs, axis=0)
+        sumSquares = sumSquares + np.sum(payoffs * payoffs, axis=0)
+        numPairsDone += numPairs
+
+    values = sums / halfNumPaths
+    variances = (sumSquares - halfNumPaths * values * values) / \
+        (halfNumPaths - 1)
+    stdErrors = np.sqrt(np.maximum(variances, 0.0) / halfNumPaths)
+
+    return values, stdErrors
+
+###############################################################################
+
+
+def lmm_swaption_book_adaptive(numForwards, numFactors, fwd0, lambdas, taus,
+                               seed, strikes, aIndices, bIndices, isPayers,
+                               abs_tolerance=None, rel_tolerance=None,
+                               time_budget=None,
+                               min_paths=ADAPTIVE_MC_MIN_PATHS,
+                               max_paths=ADAPTIVE_MC_MAX_PATHS):
+    """ Price a book of European swaptions as in lmm_swaption_book_pricer
+    with pseudo random numbers, adding batches of paths until the standard
+    error of every swaption is within the tolerance or the time budget is
+    used. Returns the values, their standard errors, the number of paths and
+    the wall time. The values are those of lmm_swaption_book_pricer with the
+    same number of paths. """
+
+    sampler = _lmm_swaption_book_sampler(numForwards, numFactors, fwd0,
+                                         lambdas, taus, 0, seed, strikes,
+                                         aIndices, bIndices, isPayers)
+
+    return adaptive_mc(sampler, abs_tolerance, rel_tolerance, time_budget,
+                       min_paths, max_paths, paths_per_sample=2)
 
 ###############################################################################
 
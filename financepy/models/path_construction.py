@@ -0,0 +1,296 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from enum import Enum
+
+import numpy as np
+from numba import njit
+
+from ..utils.error import FinError
+from ..utils.helpers import label_to_string
+from .sobol import SobolGenerator, SobolScrambleTypes, SOBOL_MAX_DIMENSION
+from .counter_rng import rng_key, counter_normal
+
+###############################################################################
+# Brownian paths driven by a Sobol sequence. Each path on a grid of times
+# needs one normal per time and factor. The quasi random numbers in the first
+# Sobol dimensions are the most evenly spread so the path construction decides
+# which features of the path they drive. With incremental construction each
+# dimension drives one time step. The Brownian bridge uses the first dimension
+# for the terminal value and then fills in the mid points of the intervals.
+# PCA uses the first dimension for the largest principal component of the
+# path covariance. Both concentrate most of the variance in the first few
+# dimensions which is where QMC beats pseudo random numbers. Dimensions beyond
+# the last Sobol dimension are filled with counter based pseudo random numbers.
+###############################################################################
+
+
+class PathConstructionTypes(Enum):
+    INCREMENTAL = 1
+    BROWNIAN_BRIDGE = 2
+    PCA = 3
+
+###############################################################################
+
+
+def _bridge_layout(times):
+    """ The order in which the Brownian bridge fills the times, with the
+    indices of the known points either side and the weights and standard
+    deviation of the conditional normal of each point. A left index of zero
+    means that the left point is time zero where the Brownian motion is zero,
+    otherwise the left point has index left_index - 1. """
+
+    num_times = len(times)
+
+    bridge_index = np.zeros(num_times, dtype=np.int64)
+    left_index = np.zeros(num_times, dtype=np.int64)
+    right_index = np.zeros(num_times, dtype=np.int64)
+    left_weight = np.zeros(num_times)
+    right_weight = np.zeros(num_times)
+    std_dev = np.zeros(num_times)
+
+    filled = np.zeros(num_times, dtype=np.bool_)
+    filled[num_times - 1] = True
+    bridge_index[0] = num_times - 1
+    std_dev[0] = np.sqrt(times[num_times - 1])
+
+    j = 0
+    for i in range(1, num_times):
+
+        while filled[j]:
+            j += 1
+
+        k = j
+        while not filled[k]:
+            k += 1
+
+        # the times j to k-1 are not filled and time k is
+        m = j + ((k - 1 - j) >> 1)
+        filled[m] = True
+
+        if j > 0:
+            t_left = times[j - 1]
+        else:
+            t_left = 0.0
+
+        bridge_index[i] = m
+        left_index[i] = j
+        right_index[i] = k
+        left_weight[i] = (times[k] - times[m]) / (times[k] - t_left)
+        right_weight[i] = (times[m] - t_left) / (times[k] - t_left)
+        std_dev[i] = np.sqrt((times[m] - t_left) * (times[k] - times[m]) /
+                             (times[k] - t_left))
+
+        j = k + 1
+        if j >= num_times:
+            j = 0
+
+    return (bridge_index, left_index, right_index,
+            left_weight, right_weight, std_dev)
+
+###############################################################################
+
+
+def _pca_matrix(times):
+    """ Matrix whose columns are the principal components of the covariance
+    min(t_i, t_j) of the Brownian motion at the times scaled by the square
+    root of their eigenvalues, largest first. """
+
+    cov = np.minimum.outer(times, times)
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    order = np.argsort(eigenvalues)[::-1]
+    eigenvalues = np.maximum(eigenvalues[order], 0.0)
+    return eigenvectors[:, order] * np.sqrt(eigenvalues)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _bridge_build(z, bridge_index, left_index, right_index,
+                  left_weight, right_weight, std_dev):
+    """ Build the Brownian motion at each time from the normals in z which
+    are in bridge order. """
+
+    num_paths, num_times = z.shape
+    w = np.empty((num_paths, num_times))
+
+    for p in range(0, num_paths):
+
+        w[p, bridge_index[0]] = std_dev[0] * z[p, 0]
+
+        for i in range(1, num_times):
+            j = left_index[i]
+            k = right_index[i]
+            m = bridge_index[i]
+
+            if j > 0:
+                w[p, m] = left_weight[i] * w[p, j - 1] + \
+                    right_weight[i] * w[p, k] + std_dev[i] * z[p, i]
+            else:
+                w[p, m] = right_weight[i] * w[p, k] + std_dev[i] * z[p, i]
+
+    return w
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _fill_pseudo_normals(z, key, first_path, first_dimension):
+    """ Fill the dimensions from first_dimension onwards with counter based
+    normals so that each path gets the same numbers however it is chunked. """
+
+    num_paths, num_dimensions = z.shape
+
+    for p in range(0, num_paths):
+        offset = (first_path + p) * num_dimensions
+        for d in range(first_dimension, num_dimensions):
+            z[p, d] = counter_normal(key, offset + d)
+
+###############################################################################
+
+
+class BrownianPathGenerator():
+    """ Generates chunks of paths of independent Brownian motions on a grid of
+    times using scrambled Sobol numbers and a choice of path construction. The
+    paths follow on from each other so a large number of paths can be built
+    chunk by chunk. """
+
+    def __init__(self,
+                 times: (list, np.ndarray),
+                 num_factors: int = 1,
+                 path_construction: PathConstructionTypes =
+                 PathConstructionTypes.BROWNIAN_BRIDGE,
+                 scramble_type: SobolScrambleTypes = SobolScrambleTypes.OWEN,
+                 seed: int = 0):
+        """ Create a generator of num_factors Brownian motions at the times
+        which must be positive and increasing. The seed sets the scrambling
+        of the Sobol points and any pseudo random numbers. """
+
+        times = np.array(times, dtype=np.float64)
+
+        if len(times) == 0:
+            raise FinError("Path needs at least one time")
+
+        if times[0] <= 0.0 or np.any(np.diff(times) <= 0.0):
+            raise FinError("Path times must be positive and increasing")
+
+        if num_factors < 1:
+            raise FinError("Number of factors must be at least one")
+
+        if isinstance(path_construction, PathConstructionTypes) is False:
+            raise FinError("Unknown path construction " +
+                           str(path_construction))
+
+        self._times = times
+        self._num_factors = num_factors
+        self._path_construction = path_construction
+        self._scramble_type = scramble_type
+        self._seed = seed
+
+        self._num_dimensions = len(times) * num_factors
+        self._num_sobol_dimensions = min(self._num_dimensions,
+                                         SOBOL_MAX_DIMENSION)
+        self._sobol = SobolGenerator(self._num_sobol_dimensions,
+                                     scramble_type, seed)
+        # Numba returns the key as a Python integer which must be passed back
+        # as unsigned or the keys below 2**63 would be typed as signed
+        self._key = np.uint64(rng_key(seed))
+        self._path_index = 0
+
+        if path_construction == PathConstructionTypes.BROWNIAN_BRIDGE:
+            self._bridge = _bridge_layout(times)
+        elif path_construction == PathConstructionTypes.PCA:
+            self._pca = _pca_matrix(times)
+
+    ###########################################################################
+
+    def reset(self):
+        """ Return to the first path. """
+
+        self._sobol.reset()
+        self._path_index = 0
+
+    ###########################################################################
+
+    def skip(self,
+             num_paths: int):
+        """ Move forward by num_paths paths without generating them. """
+
+        self._sobol.skip(num_paths)
+        self._path_index += num_paths
+
+    ###########################################################################
+
+    def _next_drivers(self, num_paths):
+        """ The normals driving the paths with shape (paths, times, factors).
+        Driver k of factor f comes from dimension k * num_factors + f. """
+
+        z = self._sobol.next_gaussian_chunk(num_paths)
+
+        if self._num_sobol_dimensions < self._num_dimensions:
+            z = np.concatenate((z, np.empty((num_paths, self._num_dimensions -
+                                             self._num_sobol_dimensions))),
+                               axis=1)
+            _fill_pseudo_normals(z, self._key, self._path_index,
+                                 self._num_sobol_dimensions)
+
+        self._path_index += num_paths
+
+        return z.reshape((num_paths, len(self._times), self._num_factors))
+
+    ###########################################################################
+
+    def next_chunk(self,
+                   num_paths: int):
+        """ Returns the values of the Brownian motions at the times for the
+        next num_paths paths as an array of shape (paths, times, factors). """
+
+        z = self._next_drivers(num_paths)
+        w = np.empty(z.shape)
+
+        for f in range(0, self._num_factors):
+
+            zf = np.ascontiguousarray(z[:, :, f])
+
+            if self._path_construction == PathConstructionTypes.INCREMENTAL:
+                dt = np.diff(self._times, prepend=0.0)
+                w[:, :, f] = np.cumsum(zf * np.sqrt(dt), axis=1)
+            elif self._path_construction == \
+                    PathConstructionTypes.BROWNIAN_BRIDGE:
+                w[:, :, f] = _bridge_build(zf, *self._bridge)
+            else:
+                w[:, :, f] = zf @ self._pca.T
+
+        return w
+
+    ###########################################################################
+
+    def next_normals(self,
+                     num_paths: int):
+        """ Returns the increments of the Brownian motions over each time step
+        divided by the square root of the step for the next num_paths paths.
+        These are independent standard normals which can be used in place of
+        pseudo random normals by any time stepping scheme. """
+
+        if self._path_construction == PathConstructionTypes.INCREMENTAL:
+            return self._next_drivers(num_paths)
+
+        w = self.next_chunk(num_paths)
+        dt = np.diff(self._times, prepend=0.0)
+        dw = np.diff(w, axis=1, prepend=0.0)
+        return dw / np.sqrt(dt)[np.newaxis, :, np.newaxis]
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM TIMES", len(self._times))
+        s += label_to_string("NUM FACTORS", self._num_factors)
+        s += label_to_string("PATH CONSTRUCTION", self._path_construction)
+        s += label_to_string("SCRAMBLE TYPE", self._scramble_type)
+        s += label_to_string("SEED", self._seed, "")
+        return s
+
+###############################################################################
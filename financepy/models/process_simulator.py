@@ -9,8 +9,12 @@ from numba import njit, float64, int64
 import numpy as np
 
 from ..utils.error import FinError
-from ..utils.math import norminvcdf
+from ..utils.math import norminvcdf, N
 from ..utils.helpers import label_to_string
+from .path_construction import BrownianPathGenerator
+from .adaptive_mc import adaptive_mc
+from .adaptive_mc import ADAPTIVE_MC_MIN_PATHS, ADAPTIVE_MC_MAX_PATHS
+from .counter_rng import stream_seed
 
 ###############################################################################
 
@@ -38,7 +42,17 @@ class FinProcessSimulator():
             model_params,
             numAnnSteps,
             num_paths,
-            seed):
+            seed,
+            path_construction=None):
+        """ Returns the simulated paths of the process. If a path construction
+        of type PathConstructionTypes is given then the paths are driven by
+        scrambled Sobol numbers ordered by that construction rather than by
+        pseudo random numbers. """
+
+        if path_construction is not None:
+            return self._get_process_qmc(process_type, t, model_params,
+                                         numAnnSteps, num_paths, seed,
+                                         path_construction)
 
         if process_type == ProcessTypes.GBM:
             (stock_price, drift, volatility, scheme) = model_params
@@ -85,6 +99,285 @@ class FinProcessSimulator():
         else:
             raise FinError("Unknown process" + str(process_type))
 
+    ###########################################################################
+
+    def get_process_stats(
+            self,
+            process_type,
+            t,
+            model_params,
+            numAnnSteps,
+            num_paths,
+            seed,
+            accumulators):
+        """ Returns the statistics of each simulated path for the list of
+        accumulators without storing the paths, together with the mean of
+        each accumulator over the paths and its standard error. Each
+        accumulator is either a PathAccumulatorTypes or a tuple of the type,
+        the first time step it observes and, for the barrier types, the level
+        or, for the discounted sum, the discount rate. The values match those
+        of the paths returned by get_process with the same seed. """
+
+        if process_type == ProcessTypes.GBM:
+            (stock_price, drift, volatility, scheme) = model_params
+            stats = get_gbm_path_stats(num_paths, numAnnSteps, t, drift,
+                                       stock_price, volatility, scheme.value,
+                                       seed, accumulators)
+
+        elif process_type == ProcessTypes.HESTON:
+            (stock_price, drift, v0, kappa, theta, sigma, rho, scheme) = model_params
+            stats = get_heston_path_stats(num_paths, numAnnSteps, t, drift,
+                                          stock_price, v0, kappa, theta,
+                                          sigma, rho, scheme.value, seed,
+                                          accumulators)
+
+        else:
+            raise FinError("Path statistics not available for process " +
+                           str(process_type))
+
+        means, std_errors = path_stats_mean_and_error(stats, num_paths)
+        return stats, means, std_errors
+
+    ###########################################################################
+
+    def value_adaptive(
+            self,
+            process_type,
+            t,
+            model_params,
+            numAnnSteps,
+            payoff,
+            seed,
+            abs_tolerance=None,
+            rel_tolerance=None,
+            time_budget=None,
+            min_paths=ADAPTIVE_MC_MIN_PATHS,
+            max_paths=ADAPTIVE_MC_MAX_PATHS):
+        """ Estimate the expectation of payoff(paths), a function returning
+        one discounted payoff for each row of a matrix of simulated paths, by
+        simulating batches of paths until the standard error is within the
+        tolerance or the time budget is used. Each batch is simulated with
+        its own seed split from the seed and the index of the batch so that
+        batches of runs with different seeds do not share random numbers.
+        Antithetic pairs are averaged before the standard error is found.
+        Returns the value, its standard error, the number of paths and the
+        wall time. """
+
+        batch_index = 0
+
+        def sampler(first_path, num_paths):
+
+            nonlocal batch_index
+
+            paths = self.get_process(process_type, t, model_params,
+                                     numAnnSteps, num_paths,
+                                     stream_seed(seed, batch_index))
+            batch_index += 1
+
+            samples = np.asarray(payoff(paths), dtype=np.float64)
+
+            if len(samples) == 2 * num_paths:
+                samples = 0.5 * (samples[:num_paths] + samples[num_paths:])
+
+            return samples
+
+        scheme = model_params[-1]
+
+        if scheme in (FinGBMNumericalScheme.ANTITHETIC,
+                      FinVasicekNumericalScheme.ANTITHETIC):
+            paths_per_sample = 2
+        else:
+            paths_per_sample = 1
+
+        return adaptive_mc(sampler, abs_tolerance, rel_tolerance, time_budget,
+                           min_paths, max_paths, paths_per_sample)
+
+    ###########################################################################
+
+    def _get_process_qmc(
+            self,
+            process_type,
+            t,
+            model_params,
+            numAnnSteps,
+            num_paths,
+            seed,
+            path_construction):
+
+        if process_type == ProcessTypes.GBM:
+            (stock_price, drift, volatility, scheme) = model_params
+            paths = get_gbm_paths_qmc(num_paths, numAnnSteps, t, drift,
+                                      stock_price, volatility, scheme.value,
+                                      seed, path_construction)
+            return paths
+
+        elif process_type == ProcessTypes.HESTON:
+            (stock_price, drift, v0, kappa, theta, sigma, rho, scheme) = model_params
+            paths = get_heston_paths_qmc(num_paths, numAnnSteps, t, drift,
+                                         stock_price, v0, kappa, theta, sigma,
+                                         rho, scheme.value, seed,
+                                         path_construction)
+            return paths
+
+        elif process_type == ProcessTypes.VASICEK:
+            (r0, kappa, theta, sigma, scheme) = model_params
+            paths = get_vasicek_paths_qmc(num_paths, numAnnSteps, t, r0,
+                                          kappa, theta, sigma, scheme.value,
+                                          seed, path_construction)
+            return paths
+
+        elif process_type == ProcessTypes.CIR:
+            (r0, kappa, theta, sigma, scheme) = model_params
+            paths = get_cir_paths_qmc(num_paths, numAnnSteps, t, r0, kappa,
+                                      theta, sigma, scheme.value, seed,
+                                      path_construction)
+            return paths
+
+        else:
+            raise FinError("Unknown process" + str(process_type))
+
+###############################################################################
+# Instead of returning the full matrix of paths, which needs memory of order
+# paths x steps, the simulators can update a set of statistics of each path as
+# they step forward and keep only the current state. Each accumulator has a
+# type, the first time step it looks at and a level for the barrier types. The
+# discounted sum adds up the value at each step discounted to time zero at a
+# continuously compounded rate which is passed in place of the level. The
+# statistics are the same as those found from the full paths with the same
+# seed as the random numbers are drawn in the same order.
+###############################################################################
+
+
+class PathAccumulatorTypes(Enum):
+    FINAL = 1
+    AVERAGE = 2
+    MINIMUM = 3
+    MAXIMUM = 4
+    DOWN_HIT = 5
+    UP_HIT = 6
+    DISCOUNTED_SUM = 7
+
+###############################################################################
+
+
+def accumulator_arrays(accumulators):
+    """ Convert a list of accumulators, each a PathAccumulatorTypes or a
+    tuple of the type, the first time step and the barrier level or the
+    discount rate, into the arrays used by the simulators. """
+
+    num_accumulators = len(accumulators)
+    acc_types = np.zeros(num_accumulators, dtype=np.int64)
+    acc_first_steps = np.zeros(num_accumulators, dtype=np.int64)
+    acc_levels = np.zeros(num_accumulators)
+
+    for i, accumulator in enumerate(accumulators):
+
+        if isinstance(accumulator, PathAccumulatorTypes):
+            accumulator = (accumulator,)
+
+        acc_type = accumulator[0]
+
+        if isinstance(acc_type, PathAccumulatorTypes) is False:
+            raise FinError("Unknown path accumulator " + str(acc_type))
+
+        acc_types[i] = acc_type.value
+
+        if len(accumulator) > 1:
+            acc_first_steps[i] = accumulator[1]
+
+        if len(accumulator) > 2:
+            acc_levels[i] = accumulator[2]
+        elif acc_type in (PathAccumulatorTypes.DOWN_HIT,
+                          PathAccumulatorTypes.UP_HIT):
+            raise FinError("Barrier accumulator needs a level")
+
+    return acc_types, acc_first_steps, acc_levels
+
+###############################################################################
+
+
+def path_stats_mean_and_error(stats, num_paths):
+    """ The mean over the paths of each column of the path statistics and its
+    standard error. The rows of the antithetic scheme, twice as many as the
+    paths, are averaged in pairs first as the pairs are not independent. """
+
+    if len(stats) == 2 * num_paths:
+        stats = 0.5 * (stats[:num_paths] + stats[num_paths:])
+
+    num_samples = len(stats)
+
+    if num_samples < 2:
+        raise FinError("Need at least two paths for a standard error")
+
+    means = np.mean(stats, axis=0)
+    std_errors = np.std(stats, axis=0, ddof=1) / np.sqrt(num_samples)
+    return means, std_errors
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _init_stats(num_rows, acc_types):
+
+    stats = np.zeros((num_rows, len(acc_types)))
+
+    for a in range(0, len(acc_types)):
+        if acc_types[a] == PathAccumulatorTypes.MINIMUM.value:
+            stats[:, a] = np.inf
+        elif acc_types[a] == PathAccumulatorTypes.MAXIMUM.value:
+            stats[:, a] = -np.inf
+
+    return stats
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _record_step(paths, stats, ip, it, s, acc_types, acc_first_steps,
+                 acc_levels, dt):
+    """ Store the value s of path ip at step it in the paths if they are kept
+    and update the statistics of the path. The steps are dt apart. """
+
+    if paths.shape[0] > 0:
+        paths[ip, it] = s
+
+    for a in range(0, len(acc_types)):
+
+        if it < acc_first_steps[a]:
+            continue
+
+        acc_type = acc_types[a]
+
+        if acc_type == PathAccumulatorTypes.FINAL.value:
+            stats[ip, a] = s
+        elif acc_type == PathAccumulatorTypes.AVERAGE.value:
+            stats[ip, a] += s
+        elif acc_type == PathAccumulatorTypes.MINIMUM.value:
+            stats[ip, a] = min(stats[ip, a], s)
+        elif acc_type == PathAccumulatorTypes.MAXIMUM.value:
+            stats[ip, a] = max(stats[ip, a], s)
+        elif acc_type == PathAccumulatorTypes.DOWN_HIT.value:
+            if s <= acc_levels[a]:
+                stats[ip, a] = 1.0
+        elif acc_type == PathAccumulatorTypes.UP_HIT.value:
+            if s >= acc_levels[a]:
+                stats[ip, a] = 1.0
+        elif acc_type == PathAccumulatorTypes.DISCOUNTED_SUM.value:
+            stats[ip, a] += s * np.exp(-acc_levels[a] * it * dt)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _finish_stats(stats, num_steps, acc_types, acc_first_steps):
+    """ Turn the sums into averages over the steps from the first step. """
+
+    for a in range(0, len(acc_types)):
+        if acc_types[a] == PathAccumulatorTypes.AVERAGE.value:
+            num_obs = num_steps + 1 - acc_first_steps[a]
+            if num_obs > 0:
+                stats[:, a] /= num_obs
+
 ###############################################################################
 
 
@@ -96,27 +389,59 @@ class FinHestonNumericalScheme(Enum):
 ###############################################################################
 
 
-@njit(float64[:, :](int64, int64, float64, float64, float64, float64, float64,
-                    float64, float64, float64, int64, int64),
-      cache=True, fastmath=True)
-def get_heston_paths(num_paths,
-                     numAnnSteps,
-                     t,
-                     drift,
-                     s0,
-                     v0,
-                     kappa,
-                     theta,
-                     sigma,
-                     rho,
-                     scheme,
-                     seed):
+@njit(cache=True, fastmath=True)
+def _path_normals(z, iPath, num_steps):
+    """ The normals of path iPath taken from z with shape (paths, steps) or,
+    if z is empty, drawn from the generator. """
+
+    if z.shape[0] == 0:
+        return np.random.normal(0.0, 1.0, size=(num_steps))
+
+    return z[iPath]
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _heston_path_normals(z, iPath, num_steps, scheme):
+    """ The two normals of each step of path iPath with the uniform needed by
+    the quadratic exponential scheme in the third column. They are taken
+    from z with shape (paths, steps, factors), where the uniform comes from
+    a third normal, or if z is empty they are drawn from the generator. """
+
+    quadexp = scheme == FinHestonNumericalScheme.QUADEXP.value
+    zp = np.zeros((num_steps, 3))
+
+    if z.shape[0] == 0:
+        for iStep in range(0, num_steps):
+            zp[iStep, 0] = np.random.normal(0.0, 1.0)
+            zp[iStep, 1] = np.random.normal(0.0, 1.0)
+            if quadexp:
+                zp[iStep, 2] = np.random.uniform(0.0, 1.0)
+    else:
+        for iStep in range(0, num_steps):
+            zp[iStep, 0] = z[iPath, iStep, 0]
+            zp[iStep, 1] = z[iPath, iStep, 1]
+            if quadexp:
+                zp[iStep, 2] = N(z[iPath, iStep, 2])
+
+    return zp
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _heston_simulate(num_paths, numAnnSteps, t, drift, s0, v0, kappa, theta,
+                     sigma, rho, scheme, seed, z, sPaths, acc_types,
+                     acc_first_steps, acc_levels):
+    """ Simulate Heston paths storing them in sPaths unless it is empty and
+    returning the statistics of the accumulators. The normals come from z
+    with shape (paths, steps, factors) or if it is empty from the seed. """
 
     np.random.seed(seed)
     dt = 1.0 / numAnnSteps
     num_steps = int(t / dt)
-    sPaths = np.empty(shape=(num_paths, num_steps + 1))
-    sPaths[:, 0] = s0
+    stats = _init_stats(num_paths, acc_types)
     sdt = sqrt(dt)
     rhohat = sqrt(1.0 - rho * rho)
     sigma2 = sigma * sigma
@@ -124,11 +449,14 @@ def get_heston_paths(num_paths,
     if scheme == FinHestonNumericalScheme.EULER.value:
         # Basic scheme to first order with truncation on variance
         for iPath in range(0, num_paths):
+            zp = _heston_path_normals(z, iPath, num_steps, scheme)
             s = s0
             v = v0
+            _record_step(sPaths, stats, iPath, 0, s0, acc_types,
+                         acc_first_steps, acc_levels, dt)
             for iStep in range(1, num_steps + 1):
-                z1 = np.random.normal(0.0, 1.0) * sdt
-                z2 = np.random.normal(0.0, 1.0) * sdt
+                z1 = zp[iStep - 1, 0] * sdt
+                z2 = zp[iStep - 1, 1] * sdt
                 zV = z1
                 zS = rho * z1 + rhohat * z2
                 vplus = max(v, 0.0)
@@ -137,22 +465,27 @@ def get_heston_paths(num_paths,
                     rtvplus * zV + 0.25 * sigma2 * (zV * zV - dt)
                 s += drift * s * dt + rtvplus * s * \
                     zS + 0.5 * s * vplus * (zV * zV - dt)
-                sPaths[iPath, iStep] = s
+                _record_step(sPaths, stats, iPath, iStep, s, acc_types,
+                             acc_first_steps, acc_levels, dt)
 
     elif scheme == FinHestonNumericalScheme.EULERLOG.value:
         # Basic scheme to first order with truncation on variance
         for iPath in range(0, num_paths):
+            zp = _heston_path_normals(z, iPath, num_steps, scheme)
             x = log(s0)
             v = v0
+            _record_step(sPaths, stats, iPath, 0, s0, acc_types,
+                         acc_first_steps, acc_levels, dt)
             for iStep in range(1, num_steps + 1):
-                zV = np.random.normal(0.0, 1.0) * sdt
-                zS = rho * zV + rhohat * np.random.normal(0.0, 1.0) * sdt
+                zV = zp[iStep - 1, 0] * sdt
+                zS = rho * zV + rhohat * zp[iStep - 1, 1] * sdt
                 vplus = max(v, 0.0)
                 rtvplus = sqrt(vplus)
                 x += (drift - 0.5 * vplus) * dt + rtvplus * zS
                 v += kappa * (theta - vplus) * dt + sigma * \
                     rtvplus * zV + sigma2 * (zV * zV - dt) / 4.0
-                sPaths[iPath, iStep] = exp(x)
+                _record_step(sPaths, stats, iPath, iStep, exp(x), acc_types,
+                             acc_first_steps, acc_levels, dt)
 
     elif scheme == FinHestonNumericalScheme.QUADEXP.value:
         # Due to Leif Andersen(2006)
@@ -171,16 +504,19 @@ def get_heston_paths(num_paths,
         c2 = theta * sigma2 * ((1.0 - Q)**2) / 2.0 / kappa
 
         for iPath in range(0, num_paths):
+            zp = _heston_path_normals(z, iPath, num_steps, scheme)
             x = log(s0)
             vn = v0
+            _record_step(sPaths, stats, iPath, 0, s0, acc_types,
+                         acc_first_steps, acc_levels, dt)
             for iStep in range(1, num_steps + 1):
-                zV = np.random.normal(0, 1)
-                zS = rho * zV + rhohat * np.random.normal(0, 1)
+                zV = zp[iStep - 1, 0]
+                zS = rho * zV + rhohat * zp[iStep - 1, 1]
                 m = theta + (vn - theta) * Q
                 m2 = m * m
                 s2 = c1 * vn + c2
                 psi = s2 / m2
-                u = np.random.uniform(0.0, 1.0)
+                u = zp[iStep - 1, 2]
 
                 if psi <= psic:
                     b2 = 2.0 / psi - 1.0 + \
@@ -206,25 +542,88 @@ def get_heston_paths(num_paths,
 
                 x += mu * dt + K0 + (K1 * vn + K2 * vnp) + \
                     sqrt(K3 * vn + K4 * vnp) * zS
-                sPaths[iPath, iStep] = exp(x)
+                _record_step(sPaths, stats, iPath, iStep, exp(x), acc_types,
+                             acc_first_steps, acc_levels, dt)
                 vn = vnp
     else:
         raise FinError("Unknown FinHestonNumericalSchme")
 
+    _finish_stats(stats, num_steps, acc_types, acc_first_steps)
+
+    return stats
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _heston_paths(num_paths, numAnnSteps, t, drift, s0, v0, kappa, theta,
+                  sigma, rho, scheme, seed, z):
+
+    num_steps = int(t / (1.0 / numAnnSteps))
+    sPaths = np.empty(shape=(num_paths, num_steps + 1))
+    no_types = np.zeros(0, dtype=np.int64)
+
+    _heston_simulate(num_paths, numAnnSteps, t, drift, s0, v0, kappa, theta,
+                     sigma, rho, scheme, seed, z, sPaths, no_types, no_types,
+                     np.zeros(0))
+
     return sPaths
 
 ###############################################################################
 
 
+@njit(float64[:, :](int64, int64, float64, float64, float64, float64, float64,
+                    float64, float64, float64, int64, int64),
+      cache=True, fastmath=True)
+def get_heston_paths(num_paths,
+                     numAnnSteps,
+                     t,
+                     drift,
+                     s0,
+                     v0,
+                     kappa,
+                     theta,
+                     sigma,
+                     rho,
+                     scheme,
+                     seed):
+
+    return _heston_paths(num_paths, numAnnSteps, t, drift, s0, v0, kappa,
+                         theta, sigma, rho, scheme, seed,
+                         np.zeros((0, 0, 0)))
+
+###############################################################################
+
+
+def get_heston_path_stats(num_paths, numAnnSteps, t, drift, s0, v0, kappa,
+                          theta, sigma, rho, scheme, seed, accumulators):
+    """ The statistics of Heston paths for a list of accumulators found
+    without storing the paths. Returns an array with a row for each path and
+    a column for each accumulator. """
+
+    acc_types, acc_first_steps, acc_levels = accumulator_arrays(accumulators)
+
+    return _heston_simulate(num_paths, numAnnSteps, t, drift, s0, v0, kappa,
+                            theta, sigma, rho, scheme, seed,
+                            np.zeros((0, 0, 0)), np.empty((0, 0)),
+                            acc_types, acc_first_steps, acc_levels)
+
+###############################################################################
+
+
 class FinGBMNumericalScheme(Enum):
     NORMAL = 1
     ANTITHETIC = 2
 
 ###############################################################################
 
-@njit(float64[:, :](int64, int64, float64, float64, float64,
-                    float64, int64, int64), cache=True, fastmath=True)
-def get_gbm_paths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, seed):
+@njit(cache=True, fastmath=True)
+def _gbm_simulate(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme,
+                  seed, z, Sall, acc_types, acc_first_steps, acc_levels):
+    """ Simulate GBM paths storing them in Sall unless it is empty and
+    returning the statistics of the accumulators. Only the current value of
+    each path is kept as it steps forward. The normals come from z with shape
+    (steps, paths) or if it is empty from the seed one step at a time. """
 
     np.random.seed(seed)
     dt = 1.0 / numAnnSteps
@@ -233,56 +632,102 @@ def get_gbm_paths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, see
     m = exp((mu - sigma * sigma / 2.0) * dt)
 
     if scheme == FinGBMNumericalScheme.NORMAL.value:
+        num_rows = num_paths
+    elif scheme == FinGBMNumericalScheme.ANTITHETIC.value:
+        num_rows = 2 * num_paths
+    else:
+        raise FinError("Unknown FinGBMNumericalScheme")
 
-        Sall = np.empty((num_paths, num_time_steps + 1))
-        Sall[:, 0] = stock_price
-        for it in range(1, num_time_steps + 1):
-            g1D = np.random.standard_normal((num_paths))
-            for ip in range(0, num_paths):
-                w = np.exp(g1D[ip] * vsqrt_dt)
-                Sall[ip, it] = Sall[ip, it - 1] * m * w
+    s = np.full(num_rows, stock_price)
+    stats = _init_stats(num_rows, acc_types)
 
-    elif scheme == FinGBMNumericalScheme.ANTITHETIC.value:
+    for ip in range(0, num_rows):
+        _record_step(Sall, stats, ip, 0, stock_price, acc_types,
+                     acc_first_steps, acc_levels, dt)
 
-        Sall = np.empty((2 * num_paths, num_time_steps + 1))
-        Sall[:, 0] = stock_price
-        for it in range(1, num_time_steps + 1):
+    for it in range(1, num_time_steps + 1):
+
+        if z.shape[0] == 0:
             g1D = np.random.standard_normal((num_paths))
-            for ip in range(0, num_paths):
-                w = np.exp(g1D[ip] * vsqrt_dt)
-                Sall[ip, it] = Sall[ip, it - 1] * m * w
-                Sall[ip + num_paths, it] = Sall[ip + num_paths, it - 1] * m / w
+        else:
+            g1D = z[it - 1]
 
+        for ip in range(0, num_paths):
+            w = np.exp(g1D[ip] * vsqrt_dt)
+            s[ip] = s[ip] * m * w
+            _record_step(Sall, stats, ip, it, s[ip], acc_types,
+                         acc_first_steps, acc_levels, dt)
+
+            if num_rows > num_paths:
+                ia = ip + num_paths
+                s[ia] = s[ia] * m / w
+                _record_step(Sall, stats, ia, it, s[ia], acc_types,
+                             acc_first_steps, acc_levels, dt)
+
+    _finish_stats(stats, num_time_steps, acc_types, acc_first_steps)
+
+    return stats
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _gbm_paths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme,
+               seed, z):
+
+    num_time_steps = int(t / (1.0 / numAnnSteps) + 0.50)
+
+    if scheme == FinGBMNumericalScheme.ANTITHETIC.value:
+        Sall = np.empty((2 * num_paths, num_time_steps + 1))
     else:
+        Sall = np.empty((num_paths, num_time_steps + 1))
 
-        raise FinError("Unknown FinGBMNumericalScheme")
+    no_types = np.zeros(0, dtype=np.int64)
 
-#    m = np.mean(Sall[:, -1])
-#    v = np.var(Sall[:, -1]/Sall[:, 0])
-#    print("GBM", num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, m,v)
+    _gbm_simulate(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme,
+                  seed, z, Sall, no_types, no_types, np.zeros(0))
 
     return Sall
 
 ###############################################################################
 
 
+@njit(float64[:, :](int64, int64, float64, float64, float64,
+                    float64, int64, int64), cache=True, fastmath=True)
+def get_gbm_paths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, seed):
+
+    return _gbm_paths(num_paths, numAnnSteps, t, mu, stock_price, sigma,
+                      scheme, seed, np.zeros((0, 0)))
+
+###############################################################################
+
+
+def get_gbm_path_stats(num_paths, numAnnSteps, t, mu, stock_price, sigma,
+                       scheme, seed, accumulators):
+    """ The statistics of GBM paths for a list of accumulators found without
+    storing the paths. Returns an array with a row for each path, twice as
+    many for the antithetic scheme, and a column for each accumulator. """
+
+    acc_types, acc_first_steps, acc_levels = accumulator_arrays(accumulators)
+
+    return _gbm_simulate(num_paths, numAnnSteps, t, mu, stock_price, sigma,
+                         scheme, seed, np.zeros((0, 0)), np.empty((0, 0)),
+                         acc_types, acc_first_steps, acc_levels)
+
+###############################################################################
+
+
 class FinVasicekNumericalScheme(Enum):
     NORMAL = 1
     ANTITHETIC = 2
 
 ###############################################################################
 
-@njit(float64[:, :](int64, int64, float64, float64, float64,
-                    float64, float64, int64, int64), cache=True, fastmath=True)
-def get_vasicek_paths(num_paths,
-                      numAnnSteps,
-                      t,
-                      r0,
-                      kappa,
-                      theta,
-                      sigma,
-                      scheme,
-                      seed):
+@njit(cache=True, fastmath=True)
+def _vasicek_simulate(num_paths, numAnnSteps, t, r0, kappa, theta, sigma,
+                      scheme, seed, z):
+    """ Simulate Vasicek paths with the normals from z with shape (paths,
+    steps) or if it is empty from the seed one path at a time. """
 
     np.random.seed(seed)
     dt = 1.0 / numAnnSteps
@@ -294,9 +739,9 @@ def get_vasicek_paths(num_paths,
         rate_path[:, 0] = r0
         for iPath in range(0, num_paths):
             r = r0
-            z = np.random.normal(0.0, 1.0, size=(num_steps))
+            zp = _path_normals(z, iPath, num_steps)
             for iStep in range(1, num_steps + 1):
-                r += kappa * (theta - r) * dt + z[iStep - 1] * sigmasqrt_dt
+                r += kappa * (theta - r) * dt + zp[iStep - 1] * sigmasqrt_dt
                 rate_path[iPath, iStep] = r
     elif scheme == FinVasicekNumericalScheme.ANTITHETIC.value:
         rate_path = np.empty((2 * num_paths, num_steps + 1))
@@ -304,19 +749,40 @@ def get_vasicek_paths(num_paths,
         for iPath in range(0, num_paths):
             r1 = r0
             r2 = r0
-            z = np.random.normal(0.0, 1.0, size=(num_steps))
+            zp = _path_normals(z, iPath, num_steps)
             for iStep in range(1, num_steps + 1):
                 r1 = r1 + kappa * (theta - r1) * dt + \
-                    z[iStep - 1] * sigmasqrt_dt
+                    zp[iStep - 1] * sigmasqrt_dt
                 r2 = r2 + kappa * (theta - r2) * dt - \
-                    z[iStep - 1] * sigmasqrt_dt
+                    zp[iStep - 1] * sigmasqrt_dt
                 rate_path[iPath, iStep] = r1
                 rate_path[iPath + num_paths, iStep] = r2
+    else:
+        raise FinError("Unknown FinVasicekNumericalScheme")
+
     return rate_path
 
 ###############################################################################
 
 
+@njit(float64[:, :](int64, int64, float64, float64, float64,
+                    float64, float64, int64, int64), cache=True, fastmath=True)
+def get_vasicek_paths(num_paths,
+                      numAnnSteps,
+                      t,
+                      r0,
+                      kappa,
+                      theta,
+                      sigma,
+                      scheme,
+                      seed):
+
+    return _vasicek_simulate(num_paths, numAnnSteps, t, r0, kappa, theta,
+                             sigma, scheme, seed, np.zeros((0, 0)))
+
+###############################################################################
+
+
 class CIRNumericalScheme(Enum):
     EULER = 1
     LOGNORMAL = 2
@@ -326,17 +792,11 @@ class CIRNumericalScheme(Enum):
 
 ###############################################################################
 
-@njit(float64[:, :](int64, int64, float64, float64, float64,
-                    float64, float64, int64, int64), cache=True, fastmath=True)
-def get_cir_paths(num_paths,
-                  numAnnSteps,
-                  t,
-                  r0,
-                  kappa,
-                  theta,
-                  sigma,
-                  scheme,
-                  seed):
+@njit(cache=True, fastmath=True)
+def _cir_simulate(num_paths, numAnnSteps, t, r0, kappa, theta, sigma, scheme,
+                  seed, z):
+    """ Simulate CIR paths with the normals from z with shape (paths, steps)
+    or if it is empty from the seed one path at a time. """
 
     np.random.seed(seed)
     dt = 1.0 / numAnnSteps
@@ -348,12 +808,12 @@ def get_cir_paths(num_paths,
         sigmasqrt_dt = sigma * sqrt(dt)
         for iPath in range(0, num_paths):
             r = r0
-            z = np.random.normal(0.0, 1.0, size=(num_steps))
+            zp = _path_normals(z, iPath, num_steps)
             for iStep in range(1, num_steps + 1):
                 rplus = max(r, 0.0)
                 sqrtrplus = sqrt(rplus)
                 r = r + kappa * (theta - rplus) * dt + \
-                    sigmasqrt_dt * z[iStep - 1] * sqrtrplus
+                    sigmasqrt_dt * zp[iStep - 1] * sqrtrplus
                 rate_path[iPath, iStep] = r
 
     elif scheme == CIRNumericalScheme.LOGNORMAL.value:
@@ -361,12 +821,12 @@ def get_cir_paths(num_paths,
         y = 1.0 - x
         for iPath in range(0, num_paths):
             r = r0
-            z = np.random.normal(0.0, 1.0, size=(num_steps))
+            zp = _path_normals(z, iPath, num_steps)
             for iStep in range(1, num_steps + 1):
                 mean = x * r + theta * y
                 var = sigma * sigma * y * (x * r + 0.50 * theta * y) / kappa
                 sig = sqrt(log(1.0 + var / (mean * mean)))
-                r = mean * exp(-0.5 * sig * sig + sig * z[iStep - 1])
+                r = mean * exp(-0.5 * sig * sig + sig * zp[iStep - 1])
                 rate_path[iPath, iStep] = r
 
     elif scheme == CIRNumericalScheme.MILSTEIN.value:
@@ -374,12 +834,12 @@ def get_cir_paths(num_paths,
         sigma2dt = sigma * sigma * dt / 4.0
         for iPath in range(0, num_paths):
             r = r0
-            z = np.random.normal(0.0, 1.0, size=(num_steps))
+            zp = _path_normals(z, iPath, num_steps)
             for iStep in range(1, num_steps + 1):
                 sqrtrplus = sqrt(max(r, 0.0))
                 r = r + kappa * (theta - r) * dt + \
-                    z[iStep - 1] * sigmasqrt_dt * sqrtrplus
-                r = r + sigma2dt * (z[iStep - 1]**2 - 1.0)
+                    zp[iStep - 1] * sigmasqrt_dt * sqrtrplus
+                r = r + sigma2dt * (zp[iStep - 1]**2 - 1.0)
                 rate_path[iPath, iStep] = r
 
     elif scheme == CIRNumericalScheme.KAHLJACKEL.value:
@@ -387,9 +847,9 @@ def get_cir_paths(num_paths,
         sqrt_dt = sqrt(dt)
         for iPath in range(0, num_paths):
             r = r0
-            z = np.random.normal(0.0, 1.0, size=(num_steps))
+            zp = _path_normals(z, iPath, num_steps)
             for iStep in range(1, num_steps + 1):
-                beta = z[iStep - 1] / sqrt_dt
+                beta = zp[iStep - 1] / sqrt_dt
                 sqrtrplus = sqrt(max(r, 0.0))
                 c = 1.0 + (sigma * beta - 2.0 * kappa *
                            sqrtrplus) * dt / 4.0 / sqrtrplus
@@ -397,6 +857,121 @@ def get_cir_paths(num_paths,
                          beta * sqrtrplus) * c * dt
                 rate_path[iPath, iStep] = r
 
+    else:
+        raise FinError("Unknown CIRNumericalScheme")
+
     return rate_path
 
 ###############################################################################
+
+
+@njit(float64[:, :](int64, int64, float64, float64, float64,
+                    float64, float64, int64, int64), cache=True, fastmath=True)
+def get_cir_paths(num_paths,
+                  numAnnSteps,
+                  t,
+                  r0,
+                  kappa,
+                  theta,
+                  sigma,
+                  scheme,
+                  seed):
+
+    return _cir_simulate(num_paths, numAnnSteps, t, r0, kappa, theta, sigma,
+                         scheme, seed, np.zeros((0, 0)))
+
+###############################################################################
+# The functions below simulate the same processes and schemes as those above
+# but take their normals from Sobol Brownian paths built with a choice of path
+# construction. The normals are the Brownian increments over each time step
+# scaled to unit variance so the time stepping is unchanged. They are passed
+# to the same simulation kernels as the pseudo random normals.
+###############################################################################
+
+
+def _qmc_normals(num_paths, num_steps, dt, num_factors, path_construction,
+                 seed):
+    """ Normals with shape (paths, steps, factors) from Sobol Brownian paths
+    on a grid of num_steps steps of length dt. """
+
+    if num_steps == 0:
+        return np.zeros((num_paths, 0, num_factors))
+
+    times = dt * np.arange(1, num_steps + 1)
+    generator = BrownianPathGenerator(times, num_factors, path_construction,
+                                      seed=seed)
+    return generator.next_normals(num_paths)
+
+###############################################################################
+
+
+def get_heston_paths_qmc(num_paths, numAnnSteps, t, drift, s0, v0, kappa,
+                         theta, sigma, rho, scheme, seed, path_construction):
+    """ Heston paths driven by Sobol numbers with the given path
+    construction. The quadratic exponential scheme uses a third factor for
+    its uniforms. """
+
+    dt = 1.0 / numAnnSteps
+    num_steps = int(t / dt)
+
+    num_factors = 2
+    if scheme == FinHestonNumericalScheme.QUADEXP.value:
+        num_factors = 3
+
+    z = _qmc_normals(num_paths, num_steps, dt, num_factors,
+                     path_construction, seed)
+
+    return _heston_paths(num_paths, numAnnSteps, t, drift, s0, v0, kappa,
+                         theta, sigma, rho, scheme, seed, z)
+
+###############################################################################
+
+
+def get_gbm_paths_qmc(num_paths, numAnnSteps, t, mu, stock_price, sigma,
+                      scheme, seed, path_construction):
+    """ GBM paths driven by Sobol numbers with the given path construction
+    on the same time grid as get_gbm_paths. """
+
+    dt = 1.0 / numAnnSteps
+    num_time_steps = int(t / dt + 0.50)
+
+    z = _qmc_normals(num_paths, num_time_steps, dt, 1, path_construction,
+                     seed)
+
+    return _gbm_paths(num_paths, numAnnSteps, t, mu, stock_price, sigma,
+                      scheme, seed, np.ascontiguousarray(z[:, :, 0].T))
+
+###############################################################################
+
+
+def get_vasicek_paths_qmc(num_paths, numAnnSteps, t, r0, kappa, theta, sigma,
+                          scheme, seed, path_construction):
+    """ Vasicek paths driven by Sobol numbers with the given path
+    construction. """
+
+    dt = 1.0 / numAnnSteps
+    num_steps = int(t / dt)
+
+    z = _qmc_normals(num_paths, num_steps, dt, 1, path_construction, seed)
+
+    return _vasicek_simulate(num_paths, numAnnSteps, t, r0, kappa, theta,
+                             sigma, scheme, seed,
+                             np.ascontiguousarray(z[:, :, 0]))
+
+###############################################################################
+
+
+def get_cir_paths_qmc(num_paths, numAnnSteps, t, r0, kappa, theta, sigma,
+                      scheme, seed, path_construction):
+    """ CIR paths driven by Sobol numbers with the given path
+    construction. """
+
+    dt = 1.0 / numAnnSteps
+    num_steps = int(t / dt)
+
+    z = _qmc_normals(num_paths, num_steps, dt, 1, path_construction, seed)
+
+    return _cir_simulate(num_paths, numAnnSteps, t, r0, kappa, theta, sigma,
+                         scheme, seed, np.ascontiguousarray(z[:, :, 0]))
+
+###############################################################################
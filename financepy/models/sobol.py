@@ -31,10 +31,15 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import os
+from enum import Enum
+
 import numpy as np
 from numba import njit
 
-from financepy.utils.math import norminvcdf
+from financepy.utils.math import norminvcdf, norminvcdf_vect
+from financepy.utils.error import FinError
+from financepy.utils.helpers import label_to_string
+from financepy.models.counter_rng import rng_key, counter_bits
 
 ###############################################################################
 # This code loads sobol coefficients from binary numpy file and allocates
@@ -141,3 +146,272 @@ def get_uniform_sobol(num_points, dimension):
     return points
 
 ###############################################################################
+# The SobolGenerator below produces the same points as get_uniform_sobol but
+# keeps its position in the sequence so that the points can be drawn in chunks
+# of any size without holding all of them in memory. The direction numbers are
+# computed once for 32 bits and cached. Point p is the gray code point p + 1 so
+# the state after p points is the XOR of the direction numbers of the set bits
+# of the gray code of p which lets the generator skip ahead in one step.
+###############################################################################
+
+SOBOL_NUM_BITS = 32
+SOBOL_MAX_DIMENSION = len(sArr) + 1
+SOBOL_MAX_POINTS = 2**SOBOL_NUM_BITS - 1
+
+_TWO_POW_32 = 4294967296.0
+_MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+class SobolScrambleTypes(Enum):
+    NONE = 1
+    DIGITAL_SHIFT = 2
+    OWEN = 3
+
+###############################################################################
+
+
+@njit(cache=True)
+def _sobol_direction_numbers(dimension, s_arr, a_arr, m_arr):
+    """ Direction numbers for each dimension scaled by 2**32. Column i holds
+    the direction number used when bit i is the lowest zero bit of the point
+    index. """
+
+    v = np.zeros((dimension, SOBOL_NUM_BITS), dtype=np.uint64)
+
+    for i in range(0, SOBOL_NUM_BITS):
+        v[0, i] = np.uint64(1) << np.uint64(SOBOL_NUM_BITS - 1 - i)
+
+    for j in range(1, dimension):
+
+        s = s_arr[j-1]
+        a = a_arr[j-1]
+
+        for i in range(0, min(s, SOBOL_NUM_BITS)):
+            v[j, i] = np.uint64(m_arr[j-1, i]) << \
+                np.uint64(SOBOL_NUM_BITS - 1 - i)
+
+        for i in range(s, SOBOL_NUM_BITS):
+            v[j, i] = v[j, i-s] ^ (v[j, i-s] >> np.uint64(s))
+            for k in range(1, s):
+                if (a >> (s - 1 - k)) & 1:
+                    v[j, i] = v[j, i] ^ v[j, i-k]
+
+    return v
+
+###############################################################################
+
+
+_direction_numbers_cache = None
+
+
+def sobol_direction_numbers(dimension: int):
+    """ Returns the cached array of direction numbers for the first dimension
+    dimensions. The cache is extended when more dimensions are needed. """
+
+    global _direction_numbers_cache
+
+    if dimension < 1 or dimension > SOBOL_MAX_DIMENSION:
+        raise FinError("Sobol dimension must be between 1 and " +
+                       str(SOBOL_MAX_DIMENSION))
+
+    if _direction_numbers_cache is None or \
+            _direction_numbers_cache.shape[0] < dimension:
+        _direction_numbers_cache = _sobol_direction_numbers(dimension, sArr,
+                                                            aArr, m_i)
+
+    return _direction_numbers_cache[:dimension]
+
+###############################################################################
+
+
+@njit(cache=True)
+def _reverse_bits_32(x):
+
+    x = ((x >> np.uint64(1)) & np.uint64(0x55555555)) | \
+        ((x & np.uint64(0x55555555)) << np.uint64(1))
+    x = ((x >> np.uint64(2)) & np.uint64(0x33333333)) | \
+        ((x & np.uint64(0x33333333)) << np.uint64(2))
+    x = ((x >> np.uint64(4)) & np.uint64(0x0F0F0F0F)) | \
+        ((x & np.uint64(0x0F0F0F0F)) << np.uint64(4))
+    x = ((x >> np.uint64(8)) & np.uint64(0x00FF00FF)) | \
+        ((x & np.uint64(0x00FF00FF)) << np.uint64(8))
+    x = (x >> np.uint64(16)) | ((x & np.uint64(0x0000FFFF)) << np.uint64(16))
+    return x & _MASK_32
+
+###############################################################################
+
+
+@njit(cache=True)
+def _owen_scramble_32(x, seed):
+    """ Nested uniform scrambling of a 32 bit point using the hash based
+    Laine-Karras permutation of Burley (2020). The hash of the reversed bits
+    only lets each bit depend on the bits above it in the point. """
+
+    x = _reverse_bits_32(x)
+    x = (x + seed) & _MASK_32
+    x = (x ^ (x * np.uint64(0x6c50b47c))) & _MASK_32
+    x = (x ^ (x * np.uint64(0xb82f1e52))) & _MASK_32
+    x = (x ^ (x * np.uint64(0xc7afe638))) & _MASK_32
+    x = (x ^ (x * np.uint64(0x8d22f6e6))) & _MASK_32
+    return _reverse_bits_32(x)
+
+###############################################################################
+
+
+@njit(cache=True)
+def _sobol_state(v, index):
+    """ The scaled point with gray code index index. """
+
+    dimension = v.shape[0]
+    x = np.zeros(dimension, dtype=np.uint64)
+
+    g = np.uint64(index) ^ (np.uint64(index) >> np.uint64(1))
+    bit = 0
+
+    while g > np.uint64(0):
+        if g & np.uint64(1):
+            for j in range(0, dimension):
+                x[j] = x[j] ^ v[j, bit]
+        g = g >> np.uint64(1)
+        bit += 1
+
+    return x
+
+###############################################################################
+
+
+@njit(cache=True)
+def _sobol_chunk(v, x, index, scramble_type_value, scrambles, out):
+    """ Fill the rows of out with the points after the point with gray code
+    index index whose scaled value is held in x. The state x is updated in
+    place. """
+
+    num_points, dimension = out.shape
+
+    for p in range(0, num_points):
+
+        c = 0
+        value = index
+        while value & 1:
+            value >>= 1
+            c += 1
+
+        index += 1
+
+        for j in range(0, dimension):
+            x[j] = x[j] ^ v[j, c]
+
+            if scramble_type_value == 1:
+                out[p, j] = x[j] / _TWO_POW_32
+            elif scramble_type_value == 2:
+                out[p, j] = ((x[j] ^ scrambles[j]) + 0.5) / _TWO_POW_32
+            else:
+                y = _owen_scramble_32(x[j], scrambles[j])
+                out[p, j] = (y + 0.5) / _TWO_POW_32
+
+###############################################################################
+
+
+@njit(cache=True)
+def _scramble_seeds(dimension, seed):
+
+    key = rng_key(seed)
+    scrambles = np.zeros(dimension, dtype=np.uint64)
+    for j in range(0, dimension):
+        scrambles[j] = counter_bits(key, j) >> np.uint64(32)
+    return scrambles
+
+###############################################################################
+
+
+class SobolGenerator():
+    """ Stateful Sobol quasi random number generator which returns the points
+    of get_uniform_sobol in chunks so that very large numbers of paths can be
+    generated with a fixed amount of memory. The points can be scrambled with
+    a random digital shift or with Owen nested uniform scrambling where the
+    randomisation is set by the seed. Scrambled points are moved to the
+    middle of their 2**-32 interval so that they are never zero. """
+
+    def __init__(self,
+                 dimension: int,
+                 scramble_type: SobolScrambleTypes = SobolScrambleTypes.NONE,
+                 seed: int = 0):
+        """ Create a generator of points with dimension dimensions, at most
+        SOBOL_MAX_DIMENSION, with an optional scrambling of the points. """
+
+        if isinstance(scramble_type, SobolScrambleTypes) is False:
+            raise FinError("Unknown Sobol scramble type " + str(scramble_type))
+
+        self._dimension = dimension
+        self._scramble_type = scramble_type
+        self._seed = seed
+        self._v = sobol_direction_numbers(dimension)
+        self._scrambles = _scramble_seeds(dimension, seed)
+        self.reset()
+
+    ###########################################################################
+
+    def reset(self):
+        """ Return to the first point of the sequence. """
+
+        self._index = 0
+        self._x = np.zeros(self._dimension, dtype=np.uint64)
+
+    ###########################################################################
+
+    def skip(self,
+             num_points: int):
+        """ Move forward by num_points points without generating them. """
+
+        if num_points < 0:
+            raise FinError("Number of points to skip must not be negative")
+
+        if self._index + num_points > SOBOL_MAX_POINTS:
+            raise FinError("Sobol sequence limited to " +
+                           str(SOBOL_MAX_POINTS) + " points")
+
+        self._index += num_points
+        self._x = _sobol_state(self._v, self._index)
+
+    ###########################################################################
+
+    def next_chunk(self,
+                   num_points: int):
+        """ Returns the next num_points points as an array of uniforms with
+        one row per point and one column per dimension. """
+
+        if num_points < 0:
+            raise FinError("Number of points must not be negative")
+
+        if self._index + num_points > SOBOL_MAX_POINTS:
+            raise FinError("Sobol sequence limited to " +
+                           str(SOBOL_MAX_POINTS) + " points")
+
+        out = np.empty((num_points, self._dimension))
+        _sobol_chunk(self._v, self._x, self._index,
+                     self._scramble_type.value, self._scrambles, out)
+        self._index += num_points
+        return out
+
+    ###########################################################################
+
+    def next_gaussian_chunk(self,
+                            num_points: int):
+        """ Returns the next num_points points transformed to independent
+        standard normals. """
+
+        points = self.next_chunk(num_points)
+        return norminvcdf_vect(points, out=points)
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("DIMENSION", self._dimension)
+        s += label_to_string("SCRAMBLE TYPE", self._scramble_type)
+        s += label_to_string("SEED", self._seed)
+        s += label_to_string("INDEX", self._index, "")
+        return s
+
+###############################################################################
@@ -2,11 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from math import sqrt
 import numpy as np
 from scipy.stats import t as student
 
-from ..utils.helpers import uniform_to_default_time
+from .gauss_copula import antithetic_default_times, factor_loadings_matrix
 
 ###############################################################################
 
@@ -19,6 +18,8 @@ class StudentTCopula():
                       degreesOfFreedom,
                       num_trials,
                       seed):
+        """ Generate a matrix of default times by credit and trial using a
+        Student-T copula with a full rank correlation matrix. """
 
         np.random.seed(seed)
         num_credits = len(issuer_curves)
@@ -26,22 +27,42 @@ class StudentTCopula():
         c = np.linalg.cholesky(correlationMatrix)
         y = np.dot(c, x)
 
-        corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
-
-        for iTrial in range(0, num_trials):
-            chi2 = np.random.chisquare(degreesOfFreedom)
-            c = sqrt(chi2 / degreesOfFreedom)
-            for iCredit in range(0, num_credits):
-                issuer_curve = issuer_curves[iCredit]
-                g = y[iCredit, iTrial] / c
-                u1 = student.cdf(g, degreesOfFreedom)
-                u2 = 1.0 - u1
-                times = issuer_curve._times
-                values = issuer_curve._values
-                t1 = uniform_to_default_time(u1, times, values)
-                t2 = uniform_to_default_time(u2, times, values)
-                corrTimes[iCredit, iTrial] = t1
-                corrTimes[iCredit, iTrial + num_trials] = t2
+        chi2 = np.random.chisquare(degreesOfFreedom, size=num_trials)
+        c = np.sqrt(chi2 / degreesOfFreedom)
+        u1 = student.cdf(y / c, degreesOfFreedom)
+
+        return antithetic_default_times(issuer_curves, u1)
+
+    ###########################################################################
+
+    def default_times_factor(self,
+                             issuer_curves,
+                             factor_loadings,
+                             degreesOfFreedom,
+                             num_trials,
+                             seed,
+                             dtype=np.float32):
+        """ Generate a matrix of default times by credit and trial using a
+        Student-T copula whose Gaussian part has a factor structure with
+        these factor loadings as in default_times_factor_gc. """
+
+        num_credits = len(issuer_curves)
+        betas, idio = factor_loadings_matrix(factor_loadings, num_credits)
+
+        np.random.seed(seed)
+        z = np.random.normal(0.0, 1.0, size=(betas.shape[1], num_trials))
+        chi2 = np.random.chisquare(degreesOfFreedom, size=num_trials)
+        c = np.sqrt(chi2 / degreesOfFreedom)
+
+        corrTimes = np.empty(shape=(num_credits, 2 * num_trials), dtype=dtype)
+
+        for iCredit in range(0, num_credits):
+            e = np.random.normal(0.0, 1.0, size=num_trials)
+            y = betas[iCredit] @ z + idio[iCredit] * e
+            u1 = student.cdf(y / c, degreesOfFreedom)
+            corrTimes[iCredit:iCredit + 1] = \
+                antithetic_default_times(issuer_curves[iCredit:iCredit + 1],
+                                         u1[np.newaxis, :], dtype)
 
         return corrTimes
 
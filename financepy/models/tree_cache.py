@@ -0,0 +1,188 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from ..utils.error import FinError
+from ..utils.helpers import label_to_string
+from ..market.curves.interpolator import InterpTypes, _uinterpolate
+
+###############################################################################
+# Building a short rate lattice fits the drift at every time step to the
+# discount curve. When many trades are valued with the same model parameters
+# on the same curve and time grid the lattice is the same for all of them so
+# the tree models keep the lattices they build in a cache. The key is made
+# from the model type and parameters, the bytes of the tree times and a digest
+# of the discount curve times and values. The cache holds a fixed number of
+# lattices and drops the least recently used one when it is full. A model can
+# also prebuild its lattice out to the longest maturity of a book of trades
+# so that the trades are all valued on the same lattice.
+###############################################################################
+
+TREE_CACHE_SIZE = 32
+
+###############################################################################
+
+
+def curve_fingerprint(df_times, df_values):
+    """ A digest of the discount curve times and values used to fit a tree so
+    that trees fitted to the same curve can be recognised. """
+
+    digest = hashlib.sha1(np.ascontiguousarray(df_times,
+                                               dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(df_values,
+                                       dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+###############################################################################
+
+
+def tree_cache_key(model_type, model_params, tree_times, df_times, df_values):
+    """ The key of a lattice in the cache. """
+
+    tree_times = np.ascontiguousarray(tree_times, dtype=np.float64)
+
+    return (model_type, tuple(model_params), tree_times.tobytes(),
+            curve_fingerprint(df_times, df_values))
+
+###############################################################################
+
+
+class TreeCache():
+    """ Least recently used cache of short rate lattices which records the
+    number of hits, misses and evictions. A maximum size of zero turns the
+    caching off. """
+
+    def __init__(self,
+                 max_size: int = TREE_CACHE_SIZE):
+
+        if max_size < 0:
+            raise FinError("Cache size must not be negative")
+
+        self._max_size = max_size
+        self._trees = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    ###########################################################################
+
+    def get(self, key):
+        """ The lattice with this key or None if it is not in the cache. """
+
+        tree = self._trees.get(key)
+
+        if tree is None:
+            self._misses += 1
+            return None
+
+        self._trees.move_to_end(key)
+        self._hits += 1
+        return tree
+
+    ###########################################################################
+
+    def put(self, key, tree):
+        """ Add a lattice, dropping the least recently used ones if the cache
+        is then over its maximum size. """
+
+        if self._max_size == 0:
+            return
+
+        self._trees[key] = tree
+        self._trees.move_to_end(key)
+
+        while len(self._trees) > self._max_size:
+            self._trees.popitem(last=False)
+            self._evictions += 1
+
+    ###########################################################################
+
+    def clear(self):
+        """ Remove all of the lattices and reset the statistics. """
+
+        self._trees.clear()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    ###########################################################################
+
+    def stats(self):
+        """ Dictionary of the cache size and the number of hits, misses and
+        evictions. """
+
+        return {'size': len(self._trees),
+                'max_size': self._max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions}
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("SIZE", len(self._trees))
+        s += label_to_string("MAX SIZE", self._max_size)
+        s += label_to_string("HITS", self._hits)
+        s += label_to_string("MISSES", self._misses)
+        s += label_to_string("EVICTIONS", self._evictions, "")
+        return s
+
+###############################################################################
+
+# The cache shared by all tree models that are not given their own
+TREE_CACHE = TreeCache()
+
+###############################################################################
+
+
+def prebuilt_tree_covers(prebuilt, treeMat, num_time_steps, df_times,
+                         df_values):
+    """ Whether a prebuilt lattice, recorded as its maturity, number of time
+    steps and curve fingerprint, can value a trade needing a tree out to
+    treeMat fitted to this curve. """
+
+    if prebuilt is None:
+        return False
+
+    (prebuiltMat, prebuiltSteps, fingerprint) = prebuilt
+
+    return treeMat <= prebuiltMat and num_time_steps == prebuiltSteps and \
+        fingerprint == curve_fingerprint(df_times, df_values)
+
+###############################################################################
+
+
+def cached_tree(tree_cache, model_type, model_params, tree_times, df_times,
+                df_values, build):
+    """ The tree with nodes at the tree times fitted to the discount curve. It
+    is taken from the cache if it is there. Otherwise the discount factors at
+    the tree times are interpolated from the curve with flat forward rates and
+    passed to build, which returns the tree that is then added to the cache.
+    """
+
+    key = tree_cache_key(model_type, model_params, tree_times, df_times,
+                         df_values)
+    tree = tree_cache.get(key)
+
+    if tree is None:
+
+        interp = InterpTypes.FLAT_FWD_RATES.value
+        dfTree = np.ones(len(tree_times))
+
+        for i in range(1, len(tree_times)):
+            dfTree[i] = _uinterpolate(tree_times[i], df_times, df_values,
+                                      interp)
+
+        tree = build(dfTree)
+        tree_cache.put(key, tree)
+
+    return tree
+
+###############################################################################
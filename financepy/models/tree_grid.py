@@ -0,0 +1,682 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from enum import Enum
+from math import ceil
+
+import numpy as np
+from numba import njit, prange
+
+from ..utils.error import FinError
+from ..utils.global_types import FinExerciseTypes
+from .tree_cache import TREE_CACHE, cached_tree, curve_fingerprint
+from .tree_cache import prebuilt_tree_covers
+
+###############################################################################
+# Short rate lattices on any grid of times. The trees with uniform steps have
+# to map coupon and exercise dates to the nearest node which needs many steps
+# to converge. Here the grid can have a node exactly on every coupon and
+# exercise date. The lattice is built for the mean reverting Gaussian factor
+# dx = -a x dt + sigma dW following Hull and White's procedure for unequal
+# time steps. The node spacing at each time is set by the variance over the
+# step that leads to it and the branching from each node is centred on the
+# node nearest to the exact conditional mean. The probabilities then match
+# the conditional mean and variance exactly. The number of nodes stops growing
+# once the branching at the edge has to bend inwards to keep the middle
+# probability positive, just as for the uniform trees. The short rate is
+# alpha + x for Hull-White and exp(alpha + x) for Black-Karasinski, where
+# alpha is fitted at each time to the discount curve. Shifting the lognormal
+# rate down by a constant lets it go negative. The Black-Derman-Toy
+# model with a constant volatility is the lognormal case with no mean
+# reversion. A book of trades can share one lattice and be rolled back in a
+# single sweep with the trades split across threads.
+###############################################################################
+
+# Largest e = x/dx - k for which the middle probability 2/3 - e^2 is positive
+_EDGE_SHIFT = 1.0 - np.sqrt(2.0 / 3.0)
+
+
+class TreeGridTypes(Enum):
+    UNIFORM = 1
+    EVENT_ALIGNED = 2
+
+###############################################################################
+
+
+def event_time_grid(event_times,
+                    tmat,
+                    num_time_steps,
+                    refine_times=None,
+                    refine_steps=2,
+                    min_step=0.0):
+    """ Grid of times from zero to tmat with a node on every event time and
+    about num_time_steps steps. The steps between consecutive events are equal
+    and there are as many in each interval as its share of the grid. The step
+    before each refine time, such as an exercise date, is split into
+    refine_steps equal steps as the value is least smooth there. An event
+    closer than min_step to the previous node on an event, or to tmat, does
+    not get its own node so that the dates of a large book of trades do not
+    lead to a grid of many tiny steps. """
+
+    if tmat <= 0.0:
+        raise FinError("Grid maturity must be positive")
+
+    if num_time_steps < 1:
+        raise FinError("Need at least one time step")
+
+    event_times = np.asarray(event_times, dtype=np.float64)
+    event_times = np.unique(event_times[(event_times > 0.0) &
+                                        (event_times < tmat)])
+
+    knots = [0.0]
+
+    for t in event_times:
+        if t - knots[-1] >= min_step and tmat - t >= min_step:
+            knots.append(t)
+
+    knots.append(tmat)
+
+    if refine_times is None:
+        refine_times = np.zeros(0)
+
+    refine_times = np.asarray(refine_times, dtype=np.float64)
+
+    grid = [np.array([0.0])]
+
+    for i in range(1, len(knots)):
+
+        t0 = knots[i - 1]
+        t1 = knots[i]
+        n = max(1, int(round(num_time_steps * (t1 - t0) / tmat)))
+        times = np.linspace(t0, t1, n + 1)[1:]
+
+        if refine_steps > 1 and np.any(np.abs(refine_times - t1) < 1e-12):
+            last = np.linspace(times[-2] if n > 1 else t0, t1,
+                               refine_steps + 1)[1:]
+            times = np.concatenate((times[:-1], last))
+
+        grid.append(times)
+
+    return np.concatenate(grid)
+
+###############################################################################
+
+
+def grid_steps(tree_times, times):
+    """ The index of the grid node nearest to each of the times. """
+
+    times = np.asarray(times, dtype=np.float64)
+    steps = np.searchsorted(tree_times, times)
+    steps = np.clip(steps, 1, len(tree_times) - 1)
+    left = times - tree_times[steps - 1] < tree_times[steps] - times
+    return steps - left
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def fit_lognormal_alpha(Q, ex, dt, df, shift, alpha, z):
+    """ Newton solve for the alpha such that the Arrow-Debreu prices Q of the
+    nodes with rates exp(alpha) * ex - shift reprice the discount factor df
+    at the end of the step, where ex holds exp(x) at each node so that each
+    iteration only takes the exponentials of the node discount factors. The
+    search starts from alpha. The discount factors over the step of the nodes
+    at the solution are left in z for the forward induction. """
+
+    growth = np.exp(shift * dt)
+
+    for _ in range(0, 50):
+
+        u = np.exp(alpha) * dt
+        f = -df
+        fprime = 0.0
+
+        for j in range(0, len(Q)):
+            v = u * ex[j]
+            z[j] = growth * np.exp(-v)
+            qz = Q[j] * z[j]
+            f += qz
+            fprime -= qz * v
+
+        if fprime == 0.0:
+            raise FinError("Search for alpha fails due to zero derivative")
+
+        step = f / fprime
+
+        # The last step is within rounding so z is left at this alpha
+        if abs(step) < 1e-10:
+            return alpha
+
+        alpha -= step
+
+    raise FinError("Search for alpha failed to converge.")
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def build_lattice_fast(a, sigma, tree_times, discount_factors, lognormal,
+                       shift=0.0):
+    """ Fit a trinomial lattice with nodes at the tree times to the discount
+    factors at these times. For the lognormal models the short rate is
+    exp(alpha + x) - shift. Returns the Arrow-Debreu prices Q and the short
+    rates rt at each time and node, the number of nodes either side of the
+    centre at each time, the node spacing in x at each time and the index of
+    the centre of the branching and the up, middle and down probabilities
+    from each node. Node j at time i is in column j + jmax where jmax is the
+    largest number of nodes either side of the centre. """
+
+    num_times = len(tree_times)
+    dt = np.diff(tree_times)
+
+    node_range = np.zeros(num_times, dtype=np.int64)
+    dx = np.zeros(num_times)
+
+    for i in range(0, num_times - 1):
+        if a > 1e-10:
+            var = sigma * sigma * (1.0 - np.exp(-2.0 * a * dt[i])) / (2.0 * a)
+        else:
+            var = sigma * sigma * dt[i]
+        dx[i + 1] = np.sqrt(3.0 * var)
+
+    dx[0] = dx[1]
+
+    # The fewest nodes for which the edge branching keeps the middle
+    # probability positive. This is fewer than the nodes that can be reached
+    # once mean reversion pulls the edge nodes inwards.
+    for i in range(0, num_times - 1):
+        shrink = np.exp(-a * dt[i]) * dx[i] / dx[i + 1]
+        node_range[i + 1] = ceil(node_range[i] * shrink + _EDGE_SHIFT - 1e-12)
+
+    jmax = np.max(node_range)
+    num_nodes = 2 * jmax + 1
+
+    centre = np.zeros((num_times, num_nodes), dtype=np.int64)
+    pu = np.zeros((num_times, num_nodes))
+    pm = np.zeros((num_times, num_nodes))
+    pd = np.zeros((num_times, num_nodes))
+
+    for i in range(0, num_times - 1):
+        shrink = np.exp(-a * dt[i]) * dx[i] / dx[i + 1]
+        kmax = node_range[i + 1] - 1
+        for j in range(-node_range[i], node_range[i] + 1):
+            jN = j + jmax
+            m = j * shrink
+            k = min(max(int(np.floor(m + 0.5)), -kmax), kmax)
+            e = m - k
+            centre[i, jN] = k
+            pu[i, jN] = 1.0 / 6.0 + 0.5 * (e * e + e)
+            pm[i, jN] = 2.0 / 3.0 - e * e
+            pd[i, jN] = 1.0 / 6.0 + 0.5 * (e * e - e)
+
+    Q = np.zeros((num_times, num_nodes))
+    rt = np.zeros((num_times, num_nodes))
+    Q[0, jmax] = 1.0
+    z = np.zeros(num_nodes)
+    alpha = 0.0
+    alpha_last = 0.0
+
+    for i in range(0, num_times - 1):
+
+        nm = node_range[i]
+        x = np.arange(-nm, nm + 1) * dx[i]
+        q = Q[i, jmax - nm:jmax + nm + 1]
+        zi = z[jmax - nm:jmax + nm + 1]
+
+        if lognormal:
+            # Start from the alpha extrapolated from the last two steps
+            if i == 0:
+                fwd = -np.log(discount_factors[1]) / dt[0]
+                guess = np.log(max(fwd + shift, 1e-8))
+            elif i == 1:
+                guess = alpha
+            else:
+                guess = alpha + (alpha - alpha_last) * dt[i - 1] / dt[i - 2]
+            alpha_last = alpha
+            ex = np.exp(x)
+            alpha = fit_lognormal_alpha(q, ex, dt[i],
+                                        discount_factors[i + 1], shift,
+                                        guess, zi)
+            growth = np.exp(alpha)
+            for j in range(-nm, nm + 1):
+                rt[i, j + jmax] = growth * ex[j + nm] - shift
+        else:
+            sumQZ = 0.0
+            for j in range(-nm, nm + 1):
+                sumQZ += q[j + nm] * np.exp(-x[j + nm] * dt[i])
+            alpha = np.log(sumQZ / discount_factors[i + 1]) / dt[i]
+            for j in range(-nm, nm + 1):
+                rt[i, j + jmax] = alpha + x[j + nm]
+                zi[j + nm] = np.exp(-rt[i, j + jmax] * dt[i])
+
+        for j in range(-nm, nm + 1):
+            jN = j + jmax
+            kN = centre[i, jN] + jmax
+            qz = Q[i, jN] * zi[j + nm]
+            Q[i + 1, kN + 1] += pu[i, jN] * qz
+            Q[i + 1, kN] += pm[i, jN] * qz
+            Q[i + 1, kN - 1] += pd[i, jN] * qz
+
+    return (Q, rt, node_range, dx, centre, pu, pm, pd)
+
+###############################################################################
+
+
+def build_lattice(model_type, a, sigma, lognormal, tree_times, df_times,
+                  df_values, tree_cache, shift=0.0):
+    """ Build the lattice on the tree times fitted to the discount curve, or
+    take it from the tree cache if it has already been built. """
+
+    return cached_tree(tree_cache, model_type, (a, sigma, lognormal, shift),
+                       tree_times, df_times, df_values,
+                       lambda dfTree: build_lattice_fast(a, sigma, tree_times,
+                                                         dfTree, lognormal,
+                                                         shift))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _roll_back(values, rolled, i, node_range, centre, wu, wm, wd):
+    """ Set rolled to the discounted expectation at time i of the values at
+    time i + 1 using the branch probabilities times the one step discount
+    factor of each node. Only the nodes at time i are written. """
+
+    jmax = (wu.shape[1] - 1) // 2
+
+    for j in range(-node_range[i], node_range[i] + 1):
+        jN = j + jmax
+        kN = centre[i, jN] + jmax
+        rolled[jN] = wu[i, jN] * values[kN + 1] + wm[i, jN] * values[kN] + \
+            wd[i, jN] * values[kN - 1]
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def lattice_bermudan_swaption_batch_fast(tree_times, rt, node_range, centre,
+                                         pu, pm, pd,
+                                         flow_steps, flows, exercise_steps,
+                                         strike_prices, face_amounts):
+    """ Value the options to pay and receive fixed on a book of swaps on the
+    same lattice. Row k of flow_steps and flows holds the grid index and size
+    of each fixed leg flow of trade k, including the principal, in increasing
+    order of time and padded with -1 steps. Row k of exercise_steps holds the
+    grid index of each exercise date of trade k in the same way. On exercise
+    the trade enters the swap of the flows after that time with a floating
+    leg worth the strike price. The trades are rolled back in parallel. The
+    deltas are the change in value per unit change in the short rate over
+    the first step. """
+
+    num_trades = flow_steps.shape[0]
+    num_nodes = rt.shape[1]
+    jmax = (num_nodes - 1) // 2
+
+    pay_values = np.zeros(num_trades)
+    rec_values = np.zeros(num_trades)
+    pay_deltas = np.zeros(num_trades)
+    rec_deltas = np.zeros(num_trades)
+
+    dr = rt[1, jmax + 1] - rt[1, jmax - 1]
+
+    # The discounted branch weights are shared by all of the trades
+    wu = np.zeros(rt.shape)
+    wm = np.zeros(rt.shape)
+    wd = np.zeros(rt.shape)
+
+    for i in range(0, len(tree_times) - 1):
+        dt = tree_times[i + 1] - tree_times[i]
+        for j in range(-node_range[i], node_range[i] + 1):
+            jN = j + jmax
+            df = np.exp(-rt[i, jN] * dt)
+            wu[i, jN] = pu[i, jN] * df
+            wm[i, jN] = pm[i, jN] * df
+            wd[i, jN] = pd[i, jN] * df
+
+    for k in prange(num_trades):
+
+        fixed_leg = np.zeros(num_nodes)
+        pay = np.zeros(num_nodes)
+        rec = np.zeros(num_nodes)
+        fixed_leg_next = np.zeros(num_nodes)
+        pay_next = np.zeros(num_nodes)
+        rec_next = np.zeros(num_nodes)
+
+        iFlow = flow_steps.shape[1] - 1
+        while flow_steps[k, iFlow] < 0:
+            iFlow -= 1
+
+        iExercise = exercise_steps.shape[1] - 1
+        while iExercise >= 0 and exercise_steps[k, iExercise] < 0:
+            iExercise -= 1
+
+        float_leg_value = strike_prices[k] * face_amounts[k]
+        last_step = flow_steps[k, iFlow]
+
+        for i in range(last_step, -1, -1):
+
+            if i < last_step:
+                fixed_leg, fixed_leg_next = fixed_leg_next, fixed_leg
+                pay, pay_next = pay_next, pay
+                rec, rec_next = rec_next, rec
+                _roll_back(fixed_leg_next, fixed_leg, i, node_range, centre,
+                           wu, wm, wd)
+                _roll_back(pay_next, pay, i, node_range, centre, wu, wm, wd)
+                _roll_back(rec_next, rec, i, node_range, centre, wu, wm, wd)
+
+            # The fixed leg value excludes the flows at this time
+            if iExercise >= 0 and exercise_steps[k, iExercise] == i:
+                for j in range(-node_range[i], node_range[i] + 1):
+                    jN = j + jmax
+                    payExercise = max(float_leg_value - fixed_leg[jN], 0.0)
+                    recExercise = max(fixed_leg[jN] - float_leg_value, 0.0)
+                    pay[jN] = max(pay[jN], payExercise)
+                    rec[jN] = max(rec[jN], recExercise)
+
+            while iExercise >= 0 and exercise_steps[k, iExercise] == i:
+                iExercise -= 1
+
+            while iFlow >= 0 and flow_steps[k, iFlow] == i:
+                flow = flows[k, iFlow] * face_amounts[k]
+                for j in range(-node_range[i], node_range[i] + 1):
+                    fixed_leg[j + jmax] += flow
+                iFlow -= 1
+
+            if i == 1:
+                pay_deltas[k] = (pay[jmax + 1] - pay[jmax - 1]) / dr
+                rec_deltas[k] = (rec[jmax + 1] - rec[jmax - 1]) / dr
+
+        pay_values[k] = pay[jmax]
+        rec_values[k] = rec[jmax]
+
+    return pay_values, rec_values, pay_deltas, rec_deltas
+
+###############################################################################
+
+
+def _exercise_times(texp, coupon_times, exercise_typeInt):
+    """ The expiry date for European exercise or the expiry and the coupon
+    dates after it other than the maturity for Bermudan exercise. """
+
+    tmat = coupon_times[-1]
+
+    if texp > tmat:
+        raise FinError("Option expiry after bond matures.")
+
+    if texp < 0.0:
+        raise FinError("Option expiry time negative.")
+
+    if exercise_typeInt == 1:
+        return np.array([texp])
+    elif exercise_typeInt == 2:
+        return coupon_times[(coupon_times >= texp) & (coupon_times < tmat)]
+    else:
+        raise FinError("American optionality not tested.")
+
+###############################################################################
+
+
+def event_grid_bermudan_swaption_batch(model_type, a, sigma, lognormal,
+                                       num_time_steps, tree_cache,
+                                       texps, strike_prices, face_amounts,
+                                       coupon_times, coupon_flows,
+                                       exercise_typeInts, df_times, df_values,
+                                       shift=0.0):
+    """ Value a book of Bermudan swaptions on one lattice with nodes on the
+    expiry and coupon dates of all of them, except that dates within half a
+    step of a node are moved onto it. For each trade the coupon times
+    start with the expiry date and the last is the maturity when the
+    principal is paid. The exercise type is 1 for European and 2 for Bermudan
+    exercise on the expiry date and the coupon dates after it other than the
+    maturity. Returns arrays of the values and short rate deltas of the
+    options to pay and receive fixed. """
+
+    num_trades = len(texps)
+
+    if len(coupon_times) != num_trades or len(coupon_flows) != num_trades:
+        raise FinError("Need coupon times and flows for each trade")
+
+    texps = np.asarray(texps, dtype=np.float64)
+    strike_prices = np.broadcast_to(np.asarray(strike_prices, np.float64),
+                                    (num_trades,)).copy()
+    face_amounts = np.broadcast_to(np.asarray(face_amounts, np.float64),
+                                   (num_trades,)).copy()
+    exercise_typeInts = np.broadcast_to(np.asarray(exercise_typeInts),
+                                        (num_trades,))
+
+    coupon_times = [np.asarray(c, dtype=np.float64) for c in coupon_times]
+    coupon_flows = [np.asarray(c, dtype=np.float64) for c in coupon_flows]
+    exercise_times = [_exercise_times(texps[k], coupon_times[k],
+                                      exercise_typeInts[k])
+                      for k in range(0, num_trades)]
+
+    all_times = np.concatenate(coupon_times)
+    all_exercise_times = np.unique(np.concatenate(exercise_times))
+    tmat = np.max(all_times)
+
+    # Dates less than half a step from a node are moved onto it
+    tree_times = event_time_grid(all_times, tmat, num_time_steps,
+                                 all_exercise_times,
+                                 min_step=0.5 * tmat / num_time_steps)
+
+    (Q, rt, node_range, dx, centre, pu, pm, pd) = \
+        build_lattice(model_type, a, sigma, lognormal, tree_times,
+                      df_times, df_values, tree_cache, shift)
+
+    max_flows = max(len(c) for c in coupon_times)
+    max_exercises = max(len(e) for e in exercise_times)
+
+    flow_steps = np.full((num_trades, max_flows), -1, dtype=np.int64)
+    flows = np.zeros((num_trades, max_flows))
+    exercise_steps = np.full((num_trades, max_exercises), -1, dtype=np.int64)
+
+    for k in range(0, num_trades):
+        n = len(coupon_times[k])
+        flow_steps[k, :n] = grid_steps(tree_times, coupon_times[k])
+        flows[k, :n] = coupon_flows[k]
+        flows[k, n - 1] += 1.0
+        m = len(exercise_times[k])
+        exercise_steps[k, :m] = grid_steps(tree_times, exercise_times[k])
+
+    payValues, recValues, payDeltas, recDeltas = \
+        lattice_bermudan_swaption_batch_fast(tree_times, rt, node_range,
+                                             centre, pu, pm, pd,
+                                             flow_steps, flows,
+                                             exercise_steps,
+                                             strike_prices, face_amounts)
+
+    return {'pay': payValues, 'rec': recValues,
+            'pay_delta': payDeltas, 'rec_delta': recDeltas}
+
+###############################################################################
+
+
+def event_grid_bermudan_swaption(model_type, a, sigma, lognormal,
+                                 num_time_steps, tree_cache,
+                                 texp, strike_price, face_amount,
+                                 coupon_times, coupon_flows,
+                                 exercise_typeInt, df_times, df_values,
+                                 shift=0.0):
+    """ Value a Bermudan swaption on a lattice with nodes on its expiry and
+    coupon dates. The coupon times start with the expiry date and the last is
+    the maturity when the principal is paid. The exercise type is 1 for
+    European and 2 for Bermudan when the exercise dates are the expiry date
+    and the coupon dates after it other than the maturity. """
+
+    v = event_grid_bermudan_swaption_batch(model_type, a, sigma, lognormal,
+                                           num_time_steps, tree_cache,
+                                           [texp], strike_price, face_amount,
+                                           [coupon_times], [coupon_flows],
+                                           exercise_typeInt,
+                                           df_times, df_values, shift)
+
+    return {'pay': v['pay'][0], 'rec': v['rec'][0]}
+
+###############################################################################
+
+
+def option_exercise_types_to_int(optionExerciseType):
+
+    if optionExerciseType == FinExerciseTypes.EUROPEAN:
+        return 1
+    if optionExerciseType == FinExerciseTypes.BERMUDAN:
+        return 2
+    if optionExerciseType == FinExerciseTypes.AMERICAN:
+        return 3
+    else:
+        raise FinError("Unknown option exercise type.")
+
+###############################################################################
+
+
+class ShortRateTree():
+    """ Tree caching and grid handling shared by HWTree, BKTree and BDTTree.
+    The model holds its number of time steps and provides _tree_params, the
+    parameters that identify its uniform tree in the cache, _build_tree_fast,
+    which builds that tree from the discount factors at the tree times,
+    _set_tree, which unpacks it, and _lattice_params, the mean reversion,
+    volatility, whether the rate is lognormal and the shift of its event
+    aligned lattice. """
+
+    def _init_tree_cache(self, tree_cache, grid_type):
+        """ Share trees through tree_cache, or TREE_CACHE if it is None, and
+        check the grid type. """
+
+        # Trees are shared through this cache which is TREE_CACHE if None
+        if tree_cache is None:
+            tree_cache = TREE_CACHE
+
+        self._tree_cache = tree_cache
+        self._prebuilt_tree = None
+
+        # Bermudan swaptions can be valued on a lattice with nodes on their
+        # expiry and coupon dates instead of the uniform tree
+        if isinstance(grid_type, TreeGridTypes) is False:
+            raise FinError("Unknown tree grid type " + str(grid_type))
+
+        self._grid_type = grid_type
+
+    ###########################################################################
+
+    def build_tree(self, treeMat, df_times, df_values):
+        """ Build the tree fitted to the discount curve out to treeMat, or
+        take it from the tree cache if it has already been built. """
+
+        if isinstance(df_times, np.ndarray) is False:
+            raise FinError("DF TIMES must be a numpy vector")
+
+        if isinstance(df_values, np.ndarray) is False:
+            raise FinError("DF VALUES must be a numpy vector")
+
+        if prebuilt_tree_covers(self._prebuilt_tree, treeMat,
+                                self._num_time_steps, df_times, df_values):
+            return
+
+        # Swaptions build their own lattice on their dates from this curve
+        if self._grid_type == TreeGridTypes.EVENT_ALIGNED:
+            self._df_times = df_times
+            self._dfs = df_values
+            return
+
+        # I wish to add on an additional time to the tree so that the second
+        # last time corresponds to a maturity treeMat. For this reason I scale
+        # up the maturity date of the tree as follows
+        treeMaturity = treeMat * (self._num_time_steps+1)/self._num_time_steps
+
+        # The vector of times goes out to this maturity
+        tree_times = np.linspace(0.0, treeMaturity, self._num_time_steps + 2)
+        self._tree_times = tree_times
+
+        self._df_times = df_times
+        self._dfs = df_values
+
+        tree = cached_tree(self._tree_cache, type(self).__name__,
+                           self._tree_params(), tree_times,
+                           df_times, df_values,
+                           lambda dfTree: self._build_tree_fast(tree_times,
+                                                                dfTree))
+
+        self._set_tree(tree)
+
+    ###########################################################################
+
+    def prebuild_tree(self, treeMat, df_times, df_values):
+        """ Build the tree out to treeMat and keep it so that the trades on
+        this discount curve that mature by treeMat are all valued on it. Their
+        own calls to build_tree then reuse it until release_tree is called.
+        The time step is that of the longest trade so the exercise dates of
+        the shorter trades must also fall on the tree time grid. """
+
+        self._prebuilt_tree = None
+        self.build_tree(treeMat, df_times, df_values)
+        self._prebuilt_tree = (treeMat, self._num_time_steps,
+                               curve_fingerprint(df_times, df_values))
+
+    ###########################################################################
+
+    def release_tree(self):
+        """ Stop reusing the prebuilt tree so that build_tree builds the tree
+        each trade asks for. """
+
+        self._prebuilt_tree = None
+
+    ###########################################################################
+
+    def _event_grid_bermudan_swaption(self, texp, strike_price, face_amount,
+                                      coupon_times, coupon_flows,
+                                      exercise_typeInt):
+        """ Value a Bermudan swaption on a lattice with nodes on its expiry
+        and coupon dates fitted to the curve passed to build_tree. """
+
+        (a, sigma, lognormal, shift) = self._lattice_params()
+
+        return event_grid_bermudan_swaption(type(self).__name__,
+                                            a, sigma, lognormal,
+                                            self._num_time_steps,
+                                            self._tree_cache,
+                                            texp, strike_price, face_amount,
+                                            coupon_times, coupon_flows,
+                                            exercise_typeInt,
+                                            self._df_times, self._dfs, shift)
+
+    ###########################################################################
+
+    def bermudan_swaption_batch(self, texps, strike_prices, face_amounts,
+                                coupon_times, coupon_flows, exercise_types,
+                                df_times, df_values):
+        """ Value a book of swaptions in one backward induction through a
+        lattice with nodes on all of their expiry and coupon dates, whatever
+        the grid type. The coupon times and flows are lists with one array
+        per trade and the exercise types can be one type for all trades or a
+        list. Returns arrays of the pay and receive values and their deltas to
+        the short rate. """
+
+        if isinstance(exercise_types, FinExerciseTypes):
+            exercise_types = [exercise_types]
+
+        exercise_typeInts = [option_exercise_types_to_int(exercise_type)
+                             for exercise_type in exercise_types]
+
+        (a, sigma, lognormal, shift) = self._lattice_params()
+
+        return event_grid_bermudan_swaption_batch(type(self).__name__,
+                                                  a, sigma, lognormal,
+                                                  self._num_time_steps,
+                                                  self._tree_cache,
+                                                  texps, strike_prices,
+                                                  face_amounts,
+                                                  coupon_times, coupon_flows,
+                                                  exercise_typeInts,
+                                                  df_times, df_values, shift)
+
+    ###########################################################################
+
+    def _check_uniform_grid(self):
+        """ Only swaptions can be valued on event aligned grids. """
+
+        if self._grid_type != TreeGridTypes.UNIFORM:
+            raise FinError("Only swaptions can use grid type " +
+                           str(self._grid_type))
+
+###############################################################################
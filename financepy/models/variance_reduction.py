@@ -0,0 +1,145 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from enum import Enum
+
+import numpy as np
+
+from ..utils.error import FinError
+
+###############################################################################
+# Variance reduction for Monte Carlo pricers. The functions act on arrays of
+# normals or of payoff samples so that any pricer can use them.
+# - Antithetic paths come in pairs driven by z and -z. The pair averages are
+#   independent and give the estimate and its standard error.
+# - Moment matching rescales the normals of each time step so that their
+#   sample mean is zero and their sample variance is one.
+# - Control variates subtract from the payoff the deviations of other payoffs
+#   from their known means, weighted by the regression coefficients.
+# - Importance sampling shifts the mean of a Gaussian driver so that more
+#   paths land where the payoff is non-zero and weights each sample by the
+#   likelihood ratio of the original to the shifted density.
+###############################################################################
+
+
+class VarianceReductionTypes(Enum):
+    ANTITHETIC = 1
+    CONTROL_VARIATE = 2
+    MOMENT_MATCHING = 3
+    IMPORTANCE_SAMPLING = 4
+
+###############################################################################
+
+
+def check_variance_reduction(variance_reduction):
+    """ Check a list of VarianceReductionTypes and return it as a set. None
+    means no variance reduction. """
+
+    if variance_reduction is None:
+        return set()
+
+    if isinstance(variance_reduction, VarianceReductionTypes):
+        variance_reduction = [variance_reduction]
+
+    for technique in variance_reduction:
+        if isinstance(technique, VarianceReductionTypes) is False:
+            raise FinError("Unknown variance reduction " + str(technique))
+
+    return set(variance_reduction)
+
+###############################################################################
+
+
+def antithetic_pair_means(samples):
+    """ The averages of the antithetic pairs where sample i is paired with
+    sample i + n/2 as returned by the ANTITHETIC numerical schemes. """
+
+    num_pairs = len(samples) // 2
+    return 0.5 * (samples[:num_pairs] + samples[num_pairs:2 * num_pairs])
+
+###############################################################################
+
+
+def moment_match_normals(z):
+    """ Shift and scale the normals in each column so that they have a sample
+    mean of zero and a sample standard deviation of one. """
+
+    if len(z) < 2:
+        raise FinError("Moment matching needs at least two samples")
+
+    mean = np.mean(z, axis=0)
+    std = np.std(z, axis=0)
+    std = np.where(std > 0.0, std, 1.0)
+    return (z - mean) / std
+
+###############################################################################
+
+
+def control_variate_samples(samples, controls, control_means):
+    """ Adjust the samples using the control samples which are the columns of
+    controls and whose expected values are control_means. The coefficients
+    are found by least squares regression of the samples on the controls.
+    Returns the adjusted samples, which have the same mean in expectation and
+    a smaller variance, and the coefficients. """
+
+    controls = np.asarray(controls, dtype=np.float64)
+
+    if controls.ndim == 1:
+        controls = controls[:, np.newaxis]
+
+    control_means = np.atleast_1d(np.asarray(control_means, dtype=np.float64))
+
+    if controls.shape[0] != len(samples):
+        raise FinError("Need one row of controls for each sample")
+
+    if controls.shape[1] != len(control_means):
+        raise FinError("Need one mean for each control")
+
+    centred = controls - np.mean(controls, axis=0)
+    beta = np.linalg.lstsq(centred, samples - np.mean(samples),
+                           rcond=None)[0]
+
+    adjusted = samples - (controls - control_means) @ beta
+    return adjusted, beta
+
+###############################################################################
+
+
+def lognormal_shift(fwd, strike, t, volatility):
+    """ The drift of the Brownian motion which moves the median of a
+    lognormal variable with mean fwd and this volatility at time t to the
+    strike. This centres the paths on the strike of a digital option. """
+
+    return (np.log(strike / fwd) + 0.5 * volatility * volatility * t) / \
+        (volatility * t)
+
+###############################################################################
+
+
+def gaussian_shift(w, theta, t):
+    """ Shift the Brownian motion values w at time t by the drift theta * t
+    and return them with the likelihood ratios which turn an expectation
+    under the shifted density into one under the original density. """
+
+    w_shifted = w + theta * t
+    likelihood_ratio = np.exp(-theta * w_shifted + 0.5 * theta * theta * t)
+    return w_shifted, likelihood_ratio
+
+###############################################################################
+
+
+def variance_ratio(plain_samples, reduced_std_error):
+    """ The variance of the plain Monte Carlo estimate from the independent
+    samples divided by the variance of the reduced estimate with standard
+    error reduced_std_error. This is the factor by which the number of paths
+    would have to grow to get the same accuracy without variance reduction. """
+
+    plain_variance = np.var(plain_samples, ddof=1) / len(plain_samples)
+
+    if reduced_std_error <= 0.0:
+        return np.inf
+
+    return plain_variance / (reduced_std_error * reduced_std_error)
+
+###############################################################################
@@ -6,7 +6,6 @@
 import numpy as np
 from numba import njit, float64, int64
 from math import exp, log
-from copy import deepcopy
 
 from ...utils.date import Date
 from ...utils.error import FinError
@@ -14,10 +13,12 @@ from ...utils.calendar import Calendar, CalendarTypes
 from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import annual_frequency, FrequencyTypes
+from ...utils.schedule import schedule_cache
 from ...utils.global_vars import gDaysInYear
 from ...utils.math import ONE_MILLION
 from ...utils.helpers import label_to_string, table_to_string
 from ...market.curves.interpolator import InterpTypes, _uinterpolate
+from ...market.curves.curve_risk import CurveRiskEngine
 
 from ...utils.helpers import check_argument_types
 
@@ -232,13 +233,32 @@ class CDS:
     ###############################################################################
 
     def _generate_adjusted_cds_payment_dates(self):
-        """ Generate CDS payment dates which have been holiday adjusted."""
+        """ Generate CDS payment dates which have been holiday adjusted. These
+        are shared with all CDS contracts with the same dates and conventions
+        and so are held as a tuple. """
+
+        key = ("CDS",
+               self._step_in_date._excel_date,
+               self._maturity_date._excel_date,
+               self._freq_type,
+               self._calendar_type,
+               self._bus_day_adjust_type,
+               self._date_gen_rule_type)
+
+        self._adjusted_dates = schedule_cache.lookup(key,
+                                                     self._cds_payment_dates)
+
+    ###############################################################################
+
+    def _cds_payment_dates(self):
+        """ Calculate the list of holiday adjusted CDS payment dates. """
+
         frequency = annual_frequency(self._freq_type)
         calendar = Calendar(self._calendar_type)
         start_date = self._step_in_date
         end_date = self._maturity_date
 
-        self._adjusted_dates = []
+        adjusted_dates = []
         num_months = int(12.0 / frequency)
 
         unadjusted_schedule_dates = []
@@ -260,19 +280,19 @@ class CDS:
             # reverse order
             for i in range(0, flow_num):
                 dt = unadjusted_schedule_dates[flow_num - i - 1]
-                self._adjusted_dates.append(dt)
+                adjusted_dates.append(dt)
 
             # holiday adjust dates except last one
             for i in range(0, flow_num - 1):
-                dt = calendar.adjust(self._adjusted_dates[i],
+                dt = calendar.adjust(adjusted_dates[i],
                                      self._bus_day_adjust_type)
 
-                self._adjusted_dates[i] = dt
+                adjusted_dates[i] = dt
 
-            finalDate = self._adjusted_dates[flow_num - 1]
+            finalDate = adjusted_dates[flow_num - 1]
 
             # Final date is moved forward by one day
-            self._adjusted_dates[flow_num - 1] = finalDate.add_days(1)
+            adjusted_dates[flow_num - 1] = finalDate.add_days(1)
 
         elif self._date_gen_rule_type == DateGenRuleTypes.FORWARD:
 
@@ -291,15 +311,17 @@ class CDS:
                 dt = calendar.adjust(unadjusted_schedule_dates[i],
                                      self._bus_day_adjust_type)
 
-                self._adjusted_dates.append(dt)
+                adjusted_dates.append(dt)
 
             finalDate = end_date.add_days(1)
-            self._adjusted_dates.append(finalDate)
+            adjusted_dates.append(finalDate)
 
         else:
             raise FinError("Unknown DateGenRuleType:" +
                            str(self._date_gen_rule_type))
 
+        return adjusted_dates
+
     ###############################################################################
 
     def _calc_flows(self):
@@ -386,12 +408,8 @@ class CDS:
 
         bump = 0.0001  # 1 basis point
 
-        # we create a deep copy to avoid state issues
-        bumpedIssuerCurve = deepcopy(issuer_curve)
-        for cds in bumpedIssuerCurve._cds_contracts:
-            cds._running_coupon += bump
-
-        bumpedIssuerCurve._build_curve()
+        # The issuer curve is rebuilt on bumped quotes and is not changed
+        bumpedIssuerCurve = CurveRiskEngine(issuer_curve, bump).bumped_curve()
 
         v1 = self.value(valuation_date,
                         bumpedIssuerCurve,
@@ -422,32 +440,13 @@ class CDS:
                         prot_method,
                         num_steps_per_year)
 
-        # we create a deep copy to avoid state issues
-        new_issuer_curve = deepcopy(issuer_curve)
-
         bump = 0.0001  # 1 basis point
 
-        for depo in new_issuer_curve._libor_curve._usedDeposits:
-            depo._deposit_rate += bump
-
-        for fra in new_issuer_curve._libor_curve._usedFRAs:
-            fra._fraRate += bump
-
-        for swap in new_issuer_curve._libor_curve._usedSwaps:
-            cpn = swap._fixed_leg._coupon
-            swap._fixed_leg._coupon = cpn + bump
-
-            # Need to regenerate fixed leg payments with bumped coupon
-            # I could call swap._fixed_leg.generate_payments() but it is 
-            # overkill as it has to do all the schedule generation which is 
-            # not needed as the dates are unchanged
-            num_payments = len(swap._fixed_leg._payments)
-            for i in range(0, num_payments):
-                old_pmt = swap._fixed_leg._payments[i]
-                swap._fixed_leg._payments[i] = old_pmt * (cpn + bump) / cpn  
-
-        new_issuer_curve._libor_curve._build_curve()
-        new_issuer_curve._build_curve()
+        # The Ibor curve is rebuilt on bumped quotes and the issuer curve is
+        # then rebuilt on it. Neither of the curves passed in is changed.
+        engine = CurveRiskEngine(issuer_curve._libor_curve, bump,
+                                 dependent_curve=issuer_curve)
+        new_issuer_curve = engine.bumped_curve()
 
         v1 = self.value(valuation_date,
                         new_issuer_curve,
@@ -2,10 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: There are several speed ups for the Monte-Carlo including calculating
-# all default baskets at the same time.
+from math import sqrt, log
 
 import numpy as np
+from numba import njit, prange
 
 from ...utils.error import FinError
 
@@ -19,19 +19,195 @@ from ...products.credit.cds import CDS
 from ...models.gauss_copula_onefactor import homog_basket_loss_dbn
 from ...models.gauss_copula import default_times_gc
 from ...models.student_t_copula import StudentTCopula
+from ...models.adaptive_mc import adaptive_mc
+from ...models.adaptive_mc import ADAPTIVE_MC_MIN_PATHS, ADAPTIVE_MC_MAX_PATHS
+from ...models.counter_rng import rng_key, counter_normal, counter_uniform
+from ...models.counter_rng import MC_CHUNK_SIZE, mc_threads
 
 from ...products.credit.cds_curve import CDSCurve
 
 from ...utils.global_vars import gDaysInYear
-from ...utils.math import ONE_MILLION
+from ...utils.math import ONE_MILLION, N, student_t_cdf
 from ...market.curves.interpolator import interpolate, InterpTypes
 
-from ...utils.helpers import check_argument_types
+from ...utils.helpers import check_argument_types, uniform_to_default_time
 from ...utils.date import Date
 from ...utils.helpers import label_to_string
 
 ###############################################################################
-# TODO: Convert functions to use NUMBA!!
+# The compiled Monte Carlo engine simulates the default times of all credits
+# in parallel chunks of trials using counter based random numbers so that the
+# results do not depend on the number of threads. Each trial's default times
+# are then sorted once which gives the nth default time for every n so all of
+# the nth to default baskets are priced from the same default times. Trials
+# are processed in batches of BASKET_MC_BATCH_SIZE draws to bound the memory.
+###############################################################################
+
+BASKET_MC_BATCH_SIZE = 65536
+
+# Counters reserved per trial for the chi-square draw of the Student-T copula
+_CHI2_COUNTERS = 64
+
+###############################################################################
+
+
+def _survival_grids(issuer_curves):
+    """ The survival curve times and values of the issuers padded into arrays
+    with one row per issuer, the number of points of each issuer and their
+    recovery rates. """
+
+    num_credits = len(issuer_curves)
+
+    num_points = np.array([len(c._times) for c in issuer_curves],
+                          dtype=np.int64)
+
+    surv_times = np.zeros((num_credits, np.max(num_points)))
+    surv_values = np.zeros((num_credits, np.max(num_points)))
+    recovery_rates = np.zeros(num_credits)
+
+    for iCredit in range(0, num_credits):
+        n = num_points[iCredit]
+        surv_times[iCredit, :n] = issuer_curves[iCredit]._times
+        surv_values[iCredit, :n] = issuer_curves[iCredit]._values
+        recovery_rates[iCredit] = issuer_curves[iCredit]._recovery_rate
+
+    return surv_times, surv_values, num_points, recovery_rates
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _counter_chisquare(key, draw, dof):
+    """ Chi-square random number with dof degrees of freedom for a draw. It is
+    twice a gamma random number found with the Marsaglia-Tsang method using
+    the counter based random numbers reserved for the draw. """
+
+    a = 0.5 * dof
+    base = draw * _CHI2_COUNTERS
+    boost = 1.0
+
+    if a < 1.0:
+        u = counter_uniform(key, base + _CHI2_COUNTERS - 1)
+        boost = u ** (1.0 / a)
+        a += 1.0
+
+    d = a - 1.0 / 3.0
+    c = 1.0 / sqrt(9.0 * d)
+    g = d
+
+    for k in range(0, (_CHI2_COUNTERS - 1) // 2):
+
+        x = counter_normal(key, base + 2 * k)
+        v = 1.0 + c * x
+
+        if v <= 0.0:
+            continue
+
+        v = v * v * v
+        u = counter_uniform(key, base + 2 * k + 1)
+
+        if log(u) < 0.5 * x * x + d - d * v + d * log(v):
+            g = d * v
+            break
+
+    return 2.0 * g * boost
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _basket_default_times(chol, surv_times, surv_values, num_points, key,
+                          chi_key, dof, first_draw, num_draws):
+    """ Default times by credit for the draws from first_draw. Each draw
+    gives a trial and its antithetic partner which are stored num_draws
+    columns apart as in default_times_gc. A dof of zero selects the Gaussian
+    copula, otherwise the Student-T copula is used. """
+
+    num_credits = chol.shape[0]
+    default_times = np.empty((num_credits, 2 * num_draws))
+    num_chunks = (num_draws + MC_CHUNK_SIZE - 1) // MC_CHUNK_SIZE
+
+    for chunk in prange(0, num_chunks):
+
+        z = np.empty(num_credits)
+        start = chunk * MC_CHUNK_SIZE
+        end = min(start + MC_CHUNK_SIZE, num_draws)
+
+        for i in range(start, end):
+
+            draw = first_draw + i
+
+            for iCredit in range(0, num_credits):
+                z[iCredit] = counter_normal(key, draw * num_credits + iCredit)
+
+            if dof > 0.0:
+                scale = sqrt(_counter_chisquare(chi_key, draw, dof) / dof)
+
+            for iCredit in range(0, num_credits):
+
+                g = 0.0
+                for j in range(0, iCredit + 1):
+                    g += chol[iCredit, j] * z[j]
+
+                if dof > 0.0:
+                    u1 = student_t_cdf(g / scale, dof)
+                else:
+                    u1 = 1.0 - N(g)
+
+                u2 = 1.0 - u1
+
+                n = num_points[iCredit]
+                times = surv_times[iCredit, :n]
+                values = surv_values[iCredit, :n]
+                default_times[iCredit, i] = \
+                    uniform_to_default_time(u1, times, values)
+                default_times[iCredit, num_draws + i] = \
+                    uniform_to_default_time(u2, times, values)
+
+    return default_times
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _nth_default_times(default_times, recovery_rates):
+    """ The default times of each trial in increasing order and the recovery
+    rate of the credit with each of them, one row per trial. If credits
+    default at the same time the one with the lowest index is used. """
+
+    num_credits, num_trials = default_times.shape
+    taus = np.empty((num_trials, num_credits))
+    recoveries = np.empty((num_trials, num_credits))
+    num_chunks = (num_trials + MC_CHUNK_SIZE - 1) // MC_CHUNK_SIZE
+
+    for chunk in prange(0, num_chunks):
+
+        order = np.empty(num_credits, dtype=np.int64)
+        start = chunk * MC_CHUNK_SIZE
+        end = min(start + MC_CHUNK_SIZE, num_trials)
+
+        for iTrial in range(start, end):
+
+            # Stable insertion sort keeps tied credits in index order
+            for iCredit in range(0, num_credits):
+                tau = default_times[iCredit, iTrial]
+                k = iCredit
+                while k > 0 and taus[iTrial, k - 1] > tau:
+                    taus[iTrial, k] = taus[iTrial, k - 1]
+                    order[k] = order[k - 1]
+                    k -= 1
+                taus[iTrial, k] = tau
+                order[k] = iCredit
+
+            recoveries[iTrial, 0] = recovery_rates[order[0]]
+            for n in range(1, num_credits):
+                if taus[iTrial, n] == taus[iTrial, n - 1]:
+                    recoveries[iTrial, n] = recoveries[iTrial, n - 1]
+                else:
+                    recoveries[iTrial, n] = recovery_rates[order[n]]
+
+    return taus, recoveries
+
 ###############################################################################
 
 
@@ -77,17 +253,11 @@ class CDSBasket:
 
 ###############################################################################
 
-    def value_legs_mc(self,
-                      valuation_date,
-                      nToDefault,
-                      default_times,
-                      issuer_curves,
-                      libor_curve):
-        """ Value the legs of the default basket using Monte Carlo. The default
-        times are an input so this valuation is not model dependent. """
-
-        num_credits = default_times.shape[0]
-        num_trials = default_times.shape[1]
+    def _leg_grid(self,
+                  valuation_date,
+                  libor_curve):
+        """ The risky PV01 to each payment date, the average accrual factor
+        and the time to maturity used to value the legs on each trial. """
 
         adjusted_dates = self._cds_contract._adjusted_dates
         num_flows = len(adjusted_dates)
@@ -109,49 +279,129 @@ class CDSBasket:
 
         tmat = (self._maturity_date - valuation_date) / gDaysInYear
 
-        rpv01 = 0.0
-        prot = 0.0
+        return (rpv01ToTimes, averageAccrualFactor, tmat)
 
-        assetTau = np.zeros(num_credits)
+###############################################################################
 
-        for iTrial in range(0, num_trials):
-            for iCredit in range(0, num_credits):
-                assetTau[iCredit] = default_times[iCredit, iTrial]
+    def _nth_legs(self,
+                  taus,
+                  recoveries,
+                  leg_grid,
+                  libor_curve):
+        """ The risky PV01 and the protection leg value of each trial given
+        the nth default times and the recovery rates of the credits that
+        default at them. The arrays can have any shape. """
 
-            # ORDER THE DEFAULT TIMES
-            assetTau.sort()
+        (rpv01ToTimes, averageAccrualFactor, tmat) = leg_grid
 
-            # GET THE Nth DEFAULT TIME
-            minTau = assetTau[nToDefault - 1]
+        defaulted = taus < tmat
+        t = np.where(defaulted, taus, tmat)
 
-            if minTau < tmat:
-                numPaymentsIndex = int(minTau / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[numPaymentsIndex]
-                rpv01Trial += (minTau - numPaymentsIndex *
-                               averageAccrualFactor)
+        numPaymentsIndex = (t / averageAccrualFactor).astype(np.int64)
+        rpv01 = rpv01ToTimes[numPaymentsIndex] + \
+            np.where(defaulted, t - numPaymentsIndex * averageAccrualFactor,
+                     0.0)
 
-                # DETERMINE IDENTITY OF N-TO-DEFAULT CREDIT IF BASKET NOT HOMO
-                assetIndex = 0
-                for iCredit in range(0, num_credits):
-                    if minTau == default_times[iCredit, iTrial]:
-                        assetIndex = iCredit
-                        break
+        # Only the trials with a default need a discount factor
+        prot = np.zeros(t.shape)
+        prot[defaulted] = (1.0 - recoveries[defaulted]) * \
+            libor_curve._df(taus[defaulted])
 
-                protTrial = (1.0 - issuer_curves[assetIndex]._recovery_rate)
-                protTrial *= libor_curve._df(minTau)
+        return (rpv01, prot)
+
+###############################################################################
 
-            else:
+    def _trial_legs(self,
+                    valuation_date,
+                    nToDefault,
+                    default_times,
+                    issuer_curves,
+                    libor_curve):
+        """ The risky PV01 and the protection leg value of the default basket
+        in each trial of the default times. """
 
-                numPaymentsIndex = int(tmat / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[numPaymentsIndex]
-                protTrial = 0.0
+        recovery_rates = np.array([c._recovery_rate for c in issuer_curves])
 
-            rpv01 += rpv01Trial
-            prot += protTrial
+        (taus, recoveries) = _nth_default_times(default_times, recovery_rates)
 
-        rpv01 = rpv01 / num_trials
-        prot = prot / num_trials
-        return (rpv01, prot)
+        leg_grid = self._leg_grid(valuation_date, libor_curve)
+
+        return self._nth_legs(taus[:, nToDefault - 1],
+                              recoveries[:, nToDefault - 1],
+                              leg_grid, libor_curve)
+
+###############################################################################
+
+    def _basket_trials(self,
+                       valuation_date,
+                       issuer_curves,
+                       correlationMatrix,
+                       libor_curve,
+                       seed,
+                       degreesOfFreedom):
+        """ Returns a function which simulates the default times of a batch
+        of draws with the compiled engine and returns the risky PV01 and the
+        protection leg value of every nth to default basket on each trial,
+        with one row per trial and one column per n. The trial of draw i is
+        in row i and its antithetic partner is num_draws rows later. """
+
+        (surv_times, surv_values, num_points, recovery_rates) = \
+            _survival_grids(issuer_curves)
+
+        correlationMatrix = np.array(correlationMatrix, dtype=np.float64)
+
+        if correlationMatrix.shape != (len(issuer_curves), len(issuer_curves)):
+            raise FinError("Correlation matrix must be num_credits square")
+
+        try:
+            chol = np.linalg.cholesky(correlationMatrix)
+        except np.linalg.LinAlgError:
+            raise FinError("Correlation matrix is not positive definite")
+
+        if degreesOfFreedom is None:
+            dof = 0.0
+        elif degreesOfFreedom > 0.0:
+            dof = float(degreesOfFreedom)
+        else:
+            raise FinError("Degrees of freedom must be positive")
+
+        leg_grid = self._leg_grid(valuation_date, libor_curve)
+
+        # Numba returns the keys as Python integers which must be passed back
+        # as unsigned or the keys below 2**63 would be typed as signed
+        key = np.uint64(rng_key(seed))
+        chi_key = np.uint64(rng_key(key))
+
+        def trials(first_draw, num_draws):
+
+            default_times = _basket_default_times(chol, surv_times,
+                                                  surv_values, num_points,
+                                                  key, chi_key, dof,
+                                                  first_draw, num_draws)
+
+            (taus, recoveries) = _nth_default_times(default_times,
+                                                    recovery_rates)
+
+            return self._nth_legs(taus, recoveries, leg_grid, libor_curve)
+
+        return trials
+
+###############################################################################
+
+    def value_legs_mc(self,
+                      valuation_date,
+                      nToDefault,
+                      default_times,
+                      issuer_curves,
+                      libor_curve):
+        """ Value the legs of the default basket using Monte Carlo. The default
+        times are an input so this valuation is not model dependent. """
+
+        (rpv01, prot) = self._trial_legs(valuation_date, nToDefault,
+                                         default_times, issuer_curves,
+                                         libor_curve)
+
+        return (np.mean(rpv01), np.mean(prot))
 
 ###############################################################################
 
@@ -230,6 +480,106 @@ class CDSBasket:
 
         return (value, rpv01, spd)
 
+###############################################################################
+
+    def value_all_mc(self,
+                     valuation_date,
+                     issuer_curves,
+                     correlationMatrix,
+                     libor_curve,
+                     num_trials,
+                     seed,
+                     degreesOfFreedom=None,
+                     num_threads=None):
+        """ Value the first to default through to the last to default baskets
+        on the same default times using the compiled multi-threaded engine.
+        The copula is Gaussian or Student-T if degreesOfFreedom is given. As
+        in value_gaussian_mc each of the num_trials draws also gives an
+        antithetic trial. The values do not depend on the number of threads
+        which is all of those Numba has if num_threads is None. Returns arrays
+        of the value, risky PV01 and spread with element n - 1 for the nth to
+        default basket. """
+
+        num_credits = len(issuer_curves)
+
+        if num_credits == 0:
+            raise FinError("Num Credits is zero")
+
+        if num_trials < 1:
+            raise FinError("Number of trials must be positive")
+
+        trials = self._basket_trials(valuation_date, issuer_curves,
+                                     correlationMatrix, libor_curve, seed,
+                                     degreesOfFreedom)
+
+        rpv01 = np.zeros(num_credits)
+        prot_pv = np.zeros(num_credits)
+
+        with mc_threads(num_threads):
+            for first_draw in range(0, num_trials, BASKET_MC_BATCH_SIZE):
+                num_draws = min(BASKET_MC_BATCH_SIZE, num_trials - first_draw)
+                (rpv01_trials, prot_trials) = trials(first_draw, num_draws)
+                rpv01 += np.sum(rpv01_trials, axis=0)
+                prot_pv += np.sum(prot_trials, axis=0)
+
+        rpv01 /= 2 * num_trials
+        prot_pv /= 2 * num_trials
+
+        spd = prot_pv / rpv01
+        value = self._notional * (prot_pv - self._running_coupon * rpv01)
+
+        if not self._long_protection:
+            value = value * -1.0
+
+        return (value, rpv01, spd)
+
+###############################################################################
+
+    def value_mc_adaptive(self,
+                          valuation_date,
+                          nToDefault,
+                          issuer_curves,
+                          correlationMatrix,
+                          libor_curve,
+                          seed,
+                          degreesOfFreedom=None,
+                          abs_tolerance=None,
+                          rel_tolerance=None,
+                          time_budget=None,
+                          min_trials=ADAPTIVE_MC_MIN_PATHS,
+                          max_trials=ADAPTIVE_MC_MAX_PATHS):
+        """ Value the default basket with a Gaussian copula, or a Student-T
+        copula if degreesOfFreedom is given, adding batches of trials until
+        the standard error of the value is within the tolerance or the time
+        budget is used. The trials are those of value_all_mc with the same
+        seed and are counted the same way, two per draw. Returns the value,
+        its standard error, the number of trials and the wall time. """
+
+        num_credits = len(issuer_curves)
+
+        if nToDefault > num_credits or nToDefault < 1:
+            raise FinError("nToDefault must be 1 to num_credits")
+
+        sign = 1.0 if self._long_protection else -1.0
+
+        trials = self._basket_trials(valuation_date, issuer_curves,
+                                     correlationMatrix, libor_curve, seed,
+                                     degreesOfFreedom)
+
+        def sampler(first_draw, num_draws):
+
+            (rpv01, prot) = trials(first_draw, num_draws)
+
+            values = sign * self._notional * \
+                (prot[:, nToDefault - 1] -
+                 self._running_coupon * rpv01[:, nToDefault - 1])
+
+            # Each draw gives an antithetic pair of trials
+            return 0.5 * (values[:num_draws] + values[num_draws:])
+
+        return adaptive_mc(sampler, abs_tolerance, rel_tolerance, time_budget,
+                           min_trials, max_trials, paths_per_sample=2)
+
 ###############################################################################
 
     def value_1f_gaussian_homo(self,
@@ -2,6 +2,7 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import copy
 import numpy as np
 import scipy.optimize as optimize
 
@@ -166,6 +167,65 @@ class CDSCurve:
             optimize.newton(f, x0=q, fprime=None, args=argtuple,
                             tol=1e-7, maxiter=50, fprime2=None)
 
+###############################################################################
+
+    def quotes(self):
+        """ Returns a vector of the running coupons of the CDS contracts used
+        to build the curve. """
+
+        return np.array([cds._running_coupon for cds in self._cds_contracts])
+
+###############################################################################
+
+    def update_quotes(self,
+                      quotes: np.ndarray,
+                      in_place: bool = True):
+        """ Rebuild the curve from a new vector of CDS running coupons. The
+        CDS contracts passed in are not changed as the curve is rebuilt using
+        shallow copies which only differ in their coupon. If in_place is False
+        then this curve is left unchanged and a new curve is returned. """
+
+        if len(quotes) != len(self._cds_contracts):
+            raise FinError("Need " + str(len(self._cds_contracts)) +
+                           " quotes")
+
+        cds_contracts = []
+        for cds, coupon in zip(self._cds_contracts, quotes):
+            bumped_cds = copy.copy(cds)
+            bumped_cds._running_coupon = coupon
+            bumped_cds._flows = [accrual_factor * coupon * cds._notional
+                                 for accrual_factor in cds._accrual_factors]
+            cds_contracts.append(bumped_cds)
+
+        curve = self
+        if in_place is False:
+            curve = copy.copy(self)
+
+        curve._cds_contracts = cds_contracts
+        curve._build_curve()
+        return curve
+
+###############################################################################
+
+    def update_libor_curve(self,
+                           libor_curve,
+                           in_place: bool = True):
+        """ Rebuild the survival curve on a different Ibor curve such as one
+        whose quotes have been bumped. If in_place is False then this curve is
+        left unchanged and a new curve is returned. """
+
+        if self._valuation_date != libor_curve._valuation_date:
+            raise FinError(
+                "Curve does not have same valuation date as Issuer curve.")
+
+        curve = self
+        if in_place is False:
+            curve = copy.copy(self)
+
+        curve._libor_curve = libor_curve
+        curve._build_curve()
+        return curve
+
 ###############################################################################
 
     def fwd(self, dt):
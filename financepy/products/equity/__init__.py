@@ -15,6 +15,7 @@ from .equity_rainbow_option import *
 from .equity_vanilla_option import *
 from .equity_variance_swap import *
 from .equity_one_touch_option import *
+from .equity_mc_engine import *
 
 
 # dividend_curve = FinDiscountCurveFlat(valuation_date, dividend_yield)
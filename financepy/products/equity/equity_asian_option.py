@@ -7,7 +7,6 @@ import numpy as np
 from numba import njit
 
 # TODO: Add perturbatory risk using the analytical methods !!
-# TODO: Add Sobol to Monte Carlo
 
 from ...utils.math import covar
 from ...utils.global_vars import gDaysInYear
@@ -17,6 +16,7 @@ from ...utils.global_types import OptionTypes
 from ...utils.helpers import check_argument_types, label_to_string
 from ...utils.date import Date
 from ...market.curves.discount_curve import DiscountCurve
+from ...models.path_construction import BrownianPathGenerator
 
 from ...utils.math import N
 
@@ -343,6 +343,91 @@ def _value_mc_fast_cv_numba(t0, t, tau, K, n, option_type, stock_price,
 ###############################################################################
 
 
+def _averaging_adjustment(t0, t, tau, K, n, accruedAverage):
+    """ Inside the averaging period the accrued average is taken into the
+    strike and the option is rescaled to one on the remaining average. This
+    returns the adjusted start time, strike, number of observations and the
+    multiplier of the value. """
+
+    if t0 >= 0.0:
+        return t0, K, n, 1.0
+
+    if accruedAverage is None:
+        raise FinError(errorStr)
+
+    K = (K * tau + accruedAverage * t0) / t
+    multiplier = t / tau
+    n = int(n * t / tau + 0.5) + 1
+    return 0.0, K, n, multiplier
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _value_mc_paths_cv_numba(t, K, n, option_type, stock_price,
+                             interest_rate, dividend_yield, volatility,
+                             times, w, multiplier, v_g_exact):
+    """ Control variate valuation of the Asian option on Brownian paths w at
+    the times. The last n times are the averaging dates. Each path is used
+    with its antithetic path. """
+
+    num_paths, num_times = w.shape
+    first = num_times - n
+    mu = interest_rate - dividend_yield
+    v2 = volatility**2
+
+    payoff_a = np.empty(2 * num_paths)
+    payoff_g = np.empty(2 * num_paths)
+
+    for ip in range(0, num_paths):
+
+        s_1_arithmetic = 0.0
+        s_2_arithmetic = 0.0
+        ln_s_1_geometric = 0.0
+        ln_s_2_geometric = 0.0
+
+        for j in range(first, num_times):
+            drift = (mu - v2 / 2.0) * times[j]
+            x_1 = drift + volatility * w[ip, j]
+            x_2 = drift - volatility * w[ip, j]
+            s_1_arithmetic += np.exp(x_1)
+            s_2_arithmetic += np.exp(x_2)
+            ln_s_1_geometric += x_1
+            ln_s_2_geometric += x_2
+
+        s_1_arithmetic = stock_price * s_1_arithmetic / n
+        s_2_arithmetic = stock_price * s_2_arithmetic / n
+        s_1_geometric = stock_price * np.exp(ln_s_1_geometric / n)
+        s_2_geometric = stock_price * np.exp(ln_s_2_geometric / n)
+
+        if option_type == OptionTypes.EUROPEAN_CALL:
+            payoff_a[ip] = max(s_1_arithmetic - K, 0.0)
+            payoff_a[ip + num_paths] = max(s_2_arithmetic - K, 0.0)
+            payoff_g[ip] = max(s_1_geometric - K, 0.0)
+            payoff_g[ip + num_paths] = max(s_2_geometric - K, 0.0)
+        elif option_type == OptionTypes.EUROPEAN_PUT:
+            payoff_a[ip] = max(K - s_1_arithmetic, 0.0)
+            payoff_a[ip + num_paths] = max(K - s_2_arithmetic, 0.0)
+            payoff_g[ip] = max(K - s_1_geometric, 0.0)
+            payoff_g[ip + num_paths] = max(K - s_2_geometric, 0.0)
+        else:
+            raise FinError("Unknown Option Type")
+
+    m = covar(payoff_a, payoff_g)
+
+    if np.abs(m[1][1]) < 1e-10:
+        lam = 0.0
+    else:
+        lam = m[0][1] / m[1][1]
+
+    v_a = np.mean(payoff_a) * np.exp(-interest_rate * t) * multiplier
+    v_g = np.mean(payoff_g) * np.exp(-interest_rate * t) * multiplier
+
+    return v_a + lam * (v_g_exact - v_g)
+
+###############################################################################
+
+
 class EquityAsianOption:
     """ Class for an Equity Asian Option. This is an option with a final payoff
     linked to the averaging of the stock price over some specified period
@@ -735,10 +820,13 @@ class EquityAsianOption:
                  model,
                  num_paths: int,
                  seed: int,
-                 accruedAverage: float):
+                 accruedAverage: float,
+                 path_construction=None):
         """ Monte Carlo valuation of the Asian Average option using a control
         variate method that improves accuracy and reduces the variance of the
-        price. This uses Numpy and Numba. This is the standard MC pricer. """
+        price. This uses Numpy and Numba. This is the standard MC pricer. If a
+        path construction of type PathConstructionTypes is given then the
+        paths are driven by scrambled Sobol numbers in that order. """
 
         # the years to the start of the averaging period
         t0 = (self._startAveragingDate - valuation_date) / gDaysInYear
@@ -761,6 +849,24 @@ class EquityAsianOption:
                                           model,
                                           accruedAverage)
 
+        if path_construction is not None:
+
+            t0, K, n, multiplier = _averaging_adjustment(t0, texp, tau, K, n,
+                                                         accruedAverage)
+
+            times = t0 + (texp - t0) / n * np.arange(1, n + 1)
+            if t0 > 0.0:
+                times = np.concatenate(([t0], times))
+
+            generator = BrownianPathGenerator(times, 1, path_construction,
+                                              seed=seed)
+            w = np.ascontiguousarray(generator.next_chunk(num_paths)[:, :, 0])
+
+            v = _value_mc_paths_cv_numba(texp, K, n, self._option_type,
+                                         stock_price, r, q, volatility,
+                                         times, w, multiplier, v_g_exact)
+            return v
+
         v = _value_mc_fast_cv_numba(t0,
                                     texp,
                                     tau,
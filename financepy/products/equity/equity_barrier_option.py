@@ -292,12 +292,15 @@ class EquityBarrierOption(EquityOption):
                  model_params,
                  numAnnObs: int = 252,
                  num_paths: int = 10000,
-                 seed: int = 4242):
+                 seed: int = 4242,
+                 path_construction=None):
         """ A Monte-Carlo based valuation of the barrier option which simulates
         the evolution of the stock price of at a specified number of annual
         observation times until expiry to examine if the barrier has been
         crossed and the corresponding value of the final payoff, if any. It
-        assumes a GBM model for the stock price. """
+        assumes a GBM model for the stock price. If a path construction of
+        type PathConstructionTypes is given then the paths are driven by
+        scrambled Sobol numbers in that order. """
 
         texp = (self._expiry_date - valuation_date) / gDaysInYear
         num_time_steps = int(texp * numAnnObs)
@@ -341,7 +344,8 @@ class EquityBarrierOption(EquityOption):
 
         if simple_put or simple_call:
             Sall = process.get_process(
-                process_type, texp, model_params, 1, num_paths, seed)
+                process_type, texp, model_params, 1, num_paths, seed,
+                path_construction)
 
         if simple_call:
             c = (np.maximum(Sall[:, -1] - K, 0.0)).mean()
@@ -355,7 +359,7 @@ class EquityBarrierOption(EquityOption):
 
         # Get full set of paths
         Sall = process.get_process(process_type, texp, model_params, num_time_steps,
-                                   num_paths, seed)
+                                   num_paths, seed, path_construction)
 
         (num_paths, num_time_steps) = Sall.shape
 
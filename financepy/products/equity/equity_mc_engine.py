@@ -0,0 +1,614 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from ...utils.global_vars import gDaysInYear
+from ...utils.error import FinError
+from ...utils.global_types import OptionTypes
+from ...utils.helpers import label_to_string, check_argument_types
+from ...utils.date import Date
+from ...market.curves.discount_curve import DiscountCurve
+from ...models.black_scholes import BlackScholes
+from ...models.process_simulator import FinProcessSimulator, ProcessTypes
+from ...models.process_simulator import FinGBMNumericalScheme
+from ...models.black_scholes_analytic import bs_value
+from ...models.variance_reduction import VarianceReductionTypes
+from ...models.variance_reduction import check_variance_reduction
+from ...models.variance_reduction import antithetic_pair_means
+from ...models.variance_reduction import moment_match_normals
+from ...models.variance_reduction import control_variate_samples
+from ...models.variance_reduction import lognormal_shift, gaussian_shift
+from ...models.variance_reduction import variance_ratio
+from .equity_vanilla_option import EquityVanillaOption
+from .equity_digital_option import EquityDigitalOption, FinDigitalOptionTypes
+from .equity_asian_option import EquityAsianOption
+from .equity_barrier_option import EquityBarrierOption, EquityBarrierTypes
+from .equity_fixed_lookback_option import EquityFixedLookbackOption
+from .equity_float_lookback_option import EquityFloatLookbackOption
+
+###############################################################################
+# The engine simulates one set of paths of a stock and values all of the
+# options on it. The paths come from FinProcessSimulator as a driftless GBM
+# which is then scaled by the forward of the stock at each time step so that
+# the term structure of both curves is respected. Option dates are rounded to
+# the nearest time step. As the stock is S(t) = F(t) X(t) the derivative of
+# each path with respect to the spot is S(t) / S(0) and with respect to the
+# volatility is S(t) (W(t) - sigma t). The pathwise greeks differentiate the
+# payoff along these. They are not defined for payoffs which jump, such as
+# digitals and barriers, and are returned as NaN for them. The likelihood
+# ratio greeks multiply the payoff by the score of the density of the path
+# with respect to the spot and the volatility and work for every payoff.
+#
+# The variance reduction techniques in VarianceReductionTypes can be combined.
+# Antithetic paths and moment matching change the paths and so apply to every
+# output. Control variates and importance sampling apply to the values. The
+# built in controls are the stock at expiry, the geometric average option for
+# Asian options and the vanilla option with the same strike for digital,
+# barrier and fixed strike lookback options, all with closed form values on
+# the simulation grid. Importance sampling shifts the terminal Brownian
+# motion of out of the money digitals so that it is centred on the strike.
+###############################################################################
+
+MC_ENGINE_OUTPUTS = ("value", "delta_pathwise", "vega_pathwise", "delta_lr",
+                     "vega_lr")
+
+###############################################################################
+
+
+def _payoff_sign(option_type):
+
+    if option_type == OptionTypes.EUROPEAN_CALL:
+        return 1.0
+    elif option_type == OptionTypes.EUROPEAN_PUT:
+        return -1.0
+    else:
+        raise FinError("Unknown option type " + str(option_type))
+
+###############################################################################
+
+
+def _vanilla_type(option):
+    """ The option type of the vanilla option with the same strike and
+    expiry that is used as a control variate. """
+
+    if isinstance(option, EquityBarrierOption):
+        if option._option_type in (EquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                   EquityBarrierTypes.DOWN_AND_IN_CALL,
+                                   EquityBarrierTypes.UP_AND_OUT_CALL,
+                                   EquityBarrierTypes.UP_AND_IN_CALL):
+            return OptionTypes.EUROPEAN_CALL
+        else:
+            return OptionTypes.EUROPEAN_PUT
+
+    return option._option_type
+
+###############################################################################
+
+
+def _extremum(paths, dpaths_dspot, dpaths_dvol, running_value, is_max):
+    """ The running maximum or minimum of each path including the extreme
+    already reached together with its derivatives. """
+
+    if is_max:
+        index = np.argmax(paths, axis=1)
+    else:
+        index = np.argmin(paths, axis=1)
+
+    index = index[:, np.newaxis]
+    value = np.take_along_axis(paths, index, axis=1)[:, 0]
+    d_dspot = np.take_along_axis(dpaths_dspot, index, axis=1)[:, 0]
+    d_dvol = np.take_along_axis(dpaths_dvol, index, axis=1)[:, 0]
+
+    if is_max:
+        on_path = value > running_value
+    else:
+        on_path = value < running_value
+
+    value = np.where(on_path, value, running_value)
+    return value, d_dspot * on_path, d_dvol * on_path
+
+###############################################################################
+
+
+class EquityMCEngine():
+    """ Monte Carlo engine which values many options on the same stock using
+    one set of simulated paths and common random numbers. Each option gets
+    its value and its pathwise and likelihood ratio deltas and vegas, all
+    with standard errors. The supported options are EquityVanillaOption (as
+    a European option), EquityDigitalOption, EquityAsianOption,
+    EquityBarrierOption, EquityFixedLookbackOption and
+    EquityFloatLookbackOption. The model must be BlackScholes. """
+
+    def __init__(self,
+                 valuation_date: Date,
+                 stock_price: float,
+                 discount_curve: DiscountCurve,
+                 dividend_curve: DiscountCurve,
+                 model: BlackScholes,
+                 num_paths: int = 10000,
+                 num_steps_per_year: int = 252,
+                 seed: int = 4242,
+                 path_construction=None,
+                 variance_reduction=None):
+        """ Create the engine for a stock with its curves and model and the
+        number of paths and time steps per year to simulate. A path
+        construction of type PathConstructionTypes drives the paths with
+        scrambled Sobol numbers. The variance_reduction is a list of the
+        VarianceReductionTypes to use. """
+
+        check_argument_types(self.__init__, locals())
+
+        variance_reduction = check_variance_reduction(variance_reduction)
+
+        if num_paths < 2:
+            raise FinError("Number of paths must be at least two")
+
+        if VarianceReductionTypes.ANTITHETIC in variance_reduction and \
+                num_paths < 4:
+            raise FinError("Antithetic paths need at least four paths")
+
+        if num_steps_per_year < 1:
+            raise FinError("Number of steps per year must be at least one")
+
+        self._valuation_date = valuation_date
+        self._stock_price = stock_price
+        self._discount_curve = discount_curve
+        self._dividend_curve = dividend_curve
+        self._model = model
+        self._num_paths = num_paths
+        self._num_steps_per_year = num_steps_per_year
+        self._seed = seed
+        self._path_construction = path_construction
+        self._variance_reduction = variance_reduction
+        self._options = []
+
+    ###########################################################################
+
+    def _check_option(self, option):
+
+        supported = (EquityVanillaOption, EquityDigitalOption,
+                     EquityAsianOption, EquityBarrierOption,
+                     EquityFixedLookbackOption, EquityFloatLookbackOption)
+
+        if isinstance(option, supported) is False:
+            raise FinError("Option type " + type(option).__name__ +
+                           " not supported by the engine")
+
+        if option._expiry_date <= self._valuation_date:
+            raise FinError("Option expiry date must be after valuation date")
+
+        if isinstance(option, EquityAsianOption):
+            if option._startAveragingDate <= self._valuation_date:
+                raise FinError("Asian option is already in averaging period")
+
+    ###########################################################################
+
+    def add_option(self,
+                   option,
+                   stock_min_max: float = None,
+                   controls: list = None):
+        """ Add an option to be valued and return its index in the results.
+        For lookback options stock_min_max is the extreme of the stock price
+        reached so far and is the stock price if it is not given. Extra
+        control variates can be given as a list of tuples of an option the
+        engine supports and its value from an analytic pricer. Any error in
+        that value on the simulation grid becomes a bias in the result. """
+
+        self._check_option(option)
+
+        if stock_min_max is None:
+            stock_min_max = self._stock_price
+
+        if controls is None:
+            controls = []
+
+        for (control_option, _) in controls:
+            self._check_option(control_option)
+
+        self._options.append((option, stock_min_max, controls))
+        return len(self._options) - 1
+
+    ###########################################################################
+
+    def add_options(self,
+                    options: list):
+        """ Add a list of options and return the list of their indices. """
+
+        return [self.add_option(option) for option in options]
+
+    ###########################################################################
+
+    def num_options(self):
+        return len(self._options)
+
+    ###########################################################################
+
+    def _simulate(self):
+        """ Simulate the paths to the last expiry with their derivatives with
+        respect to the spot and volatility and the likelihood ratio scores of
+        each path up to each time step. """
+
+        texps = [(option._expiry_date - self._valuation_date) / gDaysInYear
+                 for (option, _, _) in self._options]
+
+        # A short expiry must still have a time step
+        t_max = max(max(texps), 1.0 / self._num_steps_per_year)
+        volatility = self._model._volatility
+        s0 = self._stock_price
+
+        if VarianceReductionTypes.ANTITHETIC in self._variance_reduction:
+            scheme = FinGBMNumericalScheme.ANTITHETIC
+            num_paths = self._num_paths // 2
+        else:
+            scheme = FinGBMNumericalScheme.NORMAL
+            num_paths = self._num_paths
+
+        model_params = (1.0, 0.0, volatility, scheme)
+        process = FinProcessSimulator()
+        x = process.get_process(ProcessTypes.GBM, t_max, model_params,
+                                self._num_steps_per_year, num_paths,
+                                self._seed, self._path_construction)
+
+        num_steps = x.shape[1] - 1
+        dt = 1.0 / self._num_steps_per_year
+        times = dt * np.arange(0, num_steps + 1)
+
+        dq = self._dividend_curve._df(times)
+        df = self._discount_curve._df(times)
+        fwds = s0 * np.array(dq) / np.array(df)
+
+        log_x = np.log(x)
+        w = (log_x + 0.5 * volatility * volatility * times) / volatility
+        z = np.diff(w, axis=1) / np.sqrt(dt)
+
+        if VarianceReductionTypes.MOMENT_MATCHING in self._variance_reduction:
+            z = moment_match_normals(z)
+            w[:, 1:] = np.cumsum(z * np.sqrt(dt), axis=1)
+            x = np.exp(volatility * w - 0.5 * volatility * volatility * times)
+
+        paths = x * fwds
+        dpaths_dspot = paths / s0
+        dpaths_dvol = paths * (w - volatility * times)
+
+        delta_score = z[:, 0] / (s0 * volatility * np.sqrt(dt))
+        vega_score = np.zeros(x.shape)
+        vega_score[:, 1:] = np.cumsum((z * z - 1.0) / volatility -
+                                      z * np.sqrt(dt), axis=1)
+
+        return (times, dt, fwds, w, paths, dpaths_dspot, dpaths_dvol,
+                delta_score, vega_score)
+
+    ###########################################################################
+
+    def _averaging_indices(self, option, texp, dt, num_steps):
+        """ The time steps of the averaging dates of an Asian option. """
+
+        n = option._num_observations
+        t0 = (option._startAveragingDate - self._valuation_date) / gDaysInYear
+        obs_times = t0 + (texp - t0) / n * np.arange(1, n + 1)
+        return np.clip(np.rint(obs_times / dt).astype(np.int64), 1, num_steps)
+
+    ###########################################################################
+
+    def _payoff(self, option, stock_min_max, texp, dt, paths, dpaths_dspot,
+                dpaths_dvol):
+        """ The payoff of the option on each path and its pathwise
+        derivatives with respect to the spot and volatility which are None if
+        the payoff is not continuous. Also returns the index of the expiry. """
+
+        num_steps = paths.shape[1] - 1
+        i_exp = min(max(int(texp / dt + 0.5), 1), num_steps)
+        s_exp = paths[:, i_exp]
+
+        if isinstance(option, EquityVanillaOption):
+
+            phi = _payoff_sign(option._option_type)
+            k = option._strike_price
+            itm = phi * (s_exp - k) > 0.0
+            payoff = np.maximum(phi * (s_exp - k), 0.0)
+            d_dspot = phi * itm * dpaths_dspot[:, i_exp]
+            d_dvol = phi * itm * dpaths_dvol[:, i_exp]
+            quantity = option._num_options
+
+        elif isinstance(option, EquityDigitalOption):
+
+            phi = _payoff_sign(option._option_type)
+            itm = phi * (s_exp - option._barrier_price) > 0.0
+
+            if option._underlying_type == \
+                    FinDigitalOptionTypes.CASH_OR_NOTHING:
+                payoff = itm * 1.0
+            else:
+                payoff = itm * s_exp
+
+            d_dspot = None
+            d_dvol = None
+            quantity = 1.0
+
+        elif isinstance(option, EquityAsianOption):
+
+            phi = _payoff_sign(option._option_type)
+            k = option._strike_price
+            obs = self._averaging_indices(option, texp, dt, num_steps)
+
+            average = paths[:, obs].mean(axis=1)
+            itm = phi * (average - k) > 0.0
+            payoff = np.maximum(phi * (average - k), 0.0)
+            d_dspot = phi * itm * dpaths_dspot[:, obs].mean(axis=1)
+            d_dvol = phi * itm * dpaths_dvol[:, obs].mean(axis=1)
+            quantity = 1.0
+
+        elif isinstance(option, EquityBarrierOption):
+
+            k = option._strike_price
+            b = option._barrier_level
+            barrier_type = option._option_type
+            s0 = self._stock_price
+
+            num_obs = max(int(texp * option._num_observations_per_year), 1)
+            obs_times = texp / num_obs * np.arange(1, num_obs + 1)
+            obs = np.clip(np.rint(obs_times / dt).astype(np.int64), 1,
+                          num_steps)
+
+            if barrier_type in (EquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                EquityBarrierTypes.DOWN_AND_IN_CALL,
+                                EquityBarrierTypes.DOWN_AND_OUT_PUT,
+                                EquityBarrierTypes.DOWN_AND_IN_PUT):
+                hit = np.any(paths[:, obs] <= b, axis=1) | (s0 <= b)
+            else:
+                hit = np.any(paths[:, obs] >= b, axis=1) | (s0 >= b)
+
+            if barrier_type in (EquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                EquityBarrierTypes.DOWN_AND_IN_CALL,
+                                EquityBarrierTypes.UP_AND_OUT_CALL,
+                                EquityBarrierTypes.UP_AND_IN_CALL):
+                vanilla = np.maximum(s_exp - k, 0.0)
+            else:
+                vanilla = np.maximum(k - s_exp, 0.0)
+
+            if barrier_type in (EquityBarrierTypes.DOWN_AND_IN_CALL,
+                                EquityBarrierTypes.UP_AND_IN_CALL,
+                                EquityBarrierTypes.DOWN_AND_IN_PUT,
+                                EquityBarrierTypes.UP_AND_IN_PUT):
+                payoff = vanilla * hit
+            else:
+                payoff = vanilla * (1.0 - hit)
+
+            d_dspot = None
+            d_dvol = None
+            quantity = option._notional
+
+        elif isinstance(option, EquityFixedLookbackOption):
+
+            k = option._strike_price
+            phi = _payoff_sign(option._option_type)
+
+            (extreme, d_dspot, d_dvol) = \
+                _extremum(paths[:, :i_exp + 1], dpaths_dspot[:, :i_exp + 1],
+                          dpaths_dvol[:, :i_exp + 1], stock_min_max, phi > 0)
+
+            itm = phi * (extreme - k) > 0.0
+            payoff = np.maximum(phi * (extreme - k), 0.0)
+            d_dspot = phi * itm * d_dspot
+            d_dvol = phi * itm * d_dvol
+            quantity = 1.0
+
+        else:
+
+            phi = _payoff_sign(option._option_type)
+
+            (extreme, d_dspot, d_dvol) = \
+                _extremum(paths[:, :i_exp + 1], dpaths_dspot[:, :i_exp + 1],
+                          dpaths_dvol[:, :i_exp + 1], stock_min_max, phi < 0)
+
+            payoff = phi * (s_exp - extreme)
+            d_dspot = phi * (dpaths_dspot[:, i_exp] - d_dspot)
+            d_dvol = phi * (dpaths_dvol[:, i_exp] - d_dvol)
+            quantity = 1.0
+
+        return payoff, d_dspot, d_dvol, i_exp, quantity
+
+    ###########################################################################
+
+    def _controls(self, option, texp, i_exp, dt, times, fwds, paths,
+                  dpaths_dspot, dpaths_dvol, user_controls, scale):
+        """ The control variate samples of an option as the columns of an
+        array with their expected values, both in the units of the payoff. """
+
+        num_steps = paths.shape[1] - 1
+        volatility = self._model._volatility
+        t = times[i_exp]
+
+        samples = [paths[:, i_exp]]
+        means = [fwds[i_exp]]
+
+        if isinstance(option, EquityAsianOption):
+
+            # The log of the geometric average is normal on the grid
+            obs = self._averaging_indices(option, texp, dt, num_steps)
+            t_obs = times[obs]
+            m = np.mean(np.log(fwds[obs]) - 0.5 * volatility**2 * t_obs)
+            v = volatility**2 * np.mean(np.minimum.outer(t_obs, t_obs))
+
+            phi = _payoff_sign(option._option_type)
+            k = option._strike_price
+            geometric = np.exp(np.mean(np.log(paths[:, obs]), axis=1))
+            samples.append(np.maximum(phi * (geometric - k), 0.0))
+            means.append(bs_value(np.exp(m + 0.5 * v), 1.0, k, 0.0, 0.0,
+                                  np.sqrt(v), option._option_type.value))
+
+        elif isinstance(option, (EquityDigitalOption, EquityBarrierOption,
+                                 EquityFixedLookbackOption)):
+
+            if isinstance(option, EquityDigitalOption):
+                k = option._barrier_price
+            else:
+                k = option._strike_price
+
+            option_type = _vanilla_type(option)
+            phi = _payoff_sign(option_type)
+            samples.append(np.maximum(phi * (paths[:, i_exp] - k), 0.0))
+            means.append(bs_value(fwds[i_exp], t, k, 0.0, 0.0, volatility,
+                                  option_type.value))
+
+        for (control_option, control_value) in user_controls:
+
+            texp_c = (control_option._expiry_date - self._valuation_date) / \
+                gDaysInYear
+            (payoff_c, _, _, _, quantity_c) = \
+                self._payoff(control_option, self._stock_price, texp_c, dt,
+                             paths, dpaths_dspot, dpaths_dvol)
+
+            scale_c = self._discount_curve.df(control_option._expiry_date) * \
+                quantity_c
+            samples.append(payoff_c * scale_c / scale)
+            means.append(control_value / scale)
+
+        return np.column_stack(samples), np.array(means)
+
+    ###########################################################################
+
+    def _digital_importance_samples(self, option, i_exp, times, fwds, w):
+        """ The payoff samples of an out of the money digital option times
+        their likelihood ratios when the terminal Brownian motion is shifted
+        to centre the stock on the strike. Returns None for an in the money
+        digital for which the shift does not help. """
+
+        volatility = self._model._volatility
+        t = times[i_exp]
+        fwd = fwds[i_exp]
+        k = option._barrier_price
+        phi = _payoff_sign(option._option_type)
+
+        theta = lognormal_shift(fwd, k, t, volatility)
+
+        if phi * theta <= 0.0:
+            return None
+
+        (w_shifted, likelihood_ratio) = gaussian_shift(w[:, i_exp], theta, t)
+        s_exp = fwd * np.exp(volatility * w_shifted -
+                             0.5 * volatility * volatility * t)
+        itm = phi * (s_exp - k) > 0.0
+
+        if option._underlying_type == FinDigitalOptionTypes.CASH_OR_NOTHING:
+            payoff = itm * 1.0
+        else:
+            payoff = itm * s_exp
+
+        return payoff * likelihood_ratio
+
+    ###########################################################################
+
+    def value(self):
+        """ Simulate the paths once and value all of the options on them.
+        Returns a dictionary keyed by the names in MC_ENGINE_OUTPUTS of arrays
+        with one entry per option, and the same names ending in _std_error
+        for their Monte Carlo standard errors. The value_variance_ratio entry
+        is the variance of a plain estimate of the value from the same number
+        of independent paths divided by the variance of the estimate. """
+
+        if len(self._options) == 0:
+            raise FinError("No options have been added to the engine")
+
+        (times, dt, fwds, w, paths, dpaths_dspot, dpaths_dvol,
+         delta_score, vega_score) = self._simulate()
+
+        variance_reduction = self._variance_reduction
+        antithetic = VarianceReductionTypes.ANTITHETIC in variance_reduction
+        num_options = len(self._options)
+
+        results = {}
+        for name in MC_ENGINE_OUTPUTS:
+            results[name] = np.full(num_options, np.nan)
+            results[name + "_std_error"] = np.full(num_options, np.nan)
+
+        results["value_variance_ratio"] = np.full(num_options, np.nan)
+
+        def _independent(samples):
+            # Antithetic pairs are averaged to give independent samples
+            if antithetic:
+                return antithetic_pair_means(samples)
+            return samples
+
+        def _store(name, i, samples, scale):
+            results[name][i] = np.mean(samples) * scale
+            results[name + "_std_error"][i] = \
+                np.std(samples, ddof=1) / np.sqrt(len(samples)) * abs(scale)
+
+        for i, (option, stock_min_max, user_controls) in \
+                enumerate(self._options):
+
+            texp = (option._expiry_date - self._valuation_date) / gDaysInYear
+            (payoff, d_dspot, d_dvol, i_exp, quantity) = \
+                self._payoff(option, stock_min_max, texp, dt, paths,
+                             dpaths_dspot, dpaths_dvol)
+
+            scale = self._discount_curve.df(option._expiry_date) * quantity
+
+            value_samples = None
+
+            if VarianceReductionTypes.IMPORTANCE_SAMPLING in \
+                    variance_reduction and \
+                    isinstance(option, EquityDigitalOption):
+                value_samples = \
+                    self._digital_importance_samples(option, i_exp, times,
+                                                     fwds, w)
+                if value_samples is not None:
+                    value_samples = _independent(value_samples)
+
+            if value_samples is None:
+
+                value_samples = _independent(payoff)
+
+                if VarianceReductionTypes.CONTROL_VARIATE in \
+                        variance_reduction:
+                    (controls, control_means) = \
+                        self._controls(option, texp, i_exp, dt, times, fwds,
+                                       paths, dpaths_dspot, dpaths_dvol,
+                                       user_controls, scale)
+                    (value_samples, _) = \
+                        control_variate_samples(value_samples,
+                                                _independent(controls),
+                                                control_means)
+
+            _store("value", i, value_samples, scale)
+
+            std_error = np.std(value_samples, ddof=1) / \
+                np.sqrt(len(value_samples))
+            results["value_variance_ratio"][i] = variance_ratio(payoff,
+                                                                std_error)
+
+            _store("delta_lr", i, _independent(payoff * delta_score), scale)
+            _store("vega_lr", i, _independent(payoff * vega_score[:, i_exp]),
+                   scale)
+
+            if d_dspot is not None:
+                _store("delta_pathwise", i, _independent(d_dspot), scale)
+                _store("vega_pathwise", i, _independent(d_dvol), scale)
+
+        return results
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("VALUATION DATE", self._valuation_date)
+        s += label_to_string("STOCK PRICE", self._stock_price)
+        s += label_to_string("NUM OPTIONS", len(self._options))
+        s += label_to_string("NUM PATHS", self._num_paths)
+        s += label_to_string("NUM STEPS PER YEAR", self._num_steps_per_year)
+        s += label_to_string("VARIANCE REDUCTION",
+                             sorted(v.name for v in self._variance_reduction))
+        s += label_to_string("SEED", self._seed, "")
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        """ Simple print function for backward compatibility. """
+        print(self)
+
+###############################################################################
@@ -14,6 +14,8 @@ from ...utils.helpers import label_to_string, check_argument_types
 from ...utils.date import Date
 from ...market.curves.discount_curve import DiscountCurve
 from ...models.gbm_process_simulator import get_paths
+from ...models.process_simulator import get_gbm_paths_qmc
+from ...models.process_simulator import FinGBMNumericalScheme
 
 from numba import njit
 
@@ -408,11 +410,14 @@ class EquityOneTouchOption(EquityOption):
                  model,
                  num_paths: int = 10000,
                  num_steps_per_year: int = 252,
-                 seed: int = 4242):
+                 seed: int = 4242,
+                 path_construction=None):
         """ Touch Option valuation using the Black-Scholes model and Monte
         Carlo simulation. Accuracy is not great when compared to the analytical
         result as we only observe the barrier a finite number of times. The
-        convergence is slow. """
+        convergence is slow. If a path construction of type
+        PathConstructionTypes is given then the paths are driven by scrambled
+        Sobol numbers in that order. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
 
@@ -429,7 +434,12 @@ class EquityOneTouchOption(EquityOption):
         s0 = stock_price
         mu = r - q
 
-        s = get_paths(num_paths, num_time_steps, t, mu, s0, v, seed)
+        if path_construction is None:
+            s = get_paths(num_paths, num_time_steps, t, mu, s0, v, seed)
+        else:
+            s = get_gbm_paths_qmc(num_paths, num_time_steps / t, t, mu, s0, v,
+                                  FinGBMNumericalScheme.ANTITHETIC.value,
+                                  seed, path_construction)
 
         H = self._barrier_price
         X = self._payment_size
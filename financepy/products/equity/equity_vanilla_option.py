@@ -8,6 +8,7 @@ from numba import njit
 
 # from scipy import optimize
 from ...utils.date import Date
+from ...utils.date_array import DateArray
 from ...utils.global_vars import gDaysInYear
 from ...utils.error import FinError
 from ...utils.global_types import OptionTypes
@@ -25,6 +26,8 @@ from ...models.black_scholes_analytic import bs_vanna
 from ...models.black_scholes_analytic import bs_theta
 from ...models.black_scholes_analytic import bs_implied_volatility
 from ...models.black_scholes_analytic import bs_intrinsic
+from ...models.black_scholes_analytic import bs_value_batch
+from ...models.black_scholes_analytic import bs_implied_volatility_batch
 
 
 from ...models.black_scholes_mc import _value_mc_nonumba_nonumpy
@@ -32,6 +35,8 @@ from ...models.black_scholes_mc import _value_mc_numpy_numba
 from ...models.black_scholes_mc import _value_mc_numba_only
 from ...models.black_scholes_mc import _value_mc_numpy_only
 from ...models.black_scholes_mc import _value_mc_numba_parallel
+from ...models.black_scholes_mc import value_mc_adaptive
+from ...models.counter_rng import mc_threads
 
 ###############################################################################
 
@@ -69,6 +74,39 @@ def _fvega(v, *args):
 ###############################################################################
 
 
+def _batch_inputs(options, valuation_date, discount_curve, dividend_curve):
+    """ Times to expiry, strikes, rates, dividend yields and option type
+    values of a list of options. The curves are evaluated once on the
+    distinct expiry dates. """
+
+    expiry_dates = np.array([option._expiry_date._excel_date
+                             for option in options])
+
+    texp = (expiry_dates - valuation_date._excel_date) / gDaysInYear
+
+    if np.any(texp < 0.0):
+        raise FinError("Time to expiry must be positive.")
+
+    texp = np.maximum(texp, 1e-10)
+
+    unique_dates, inverse = np.unique(expiry_dates, return_inverse=True)
+    unique_dates = DateArray(unique_dates)
+
+    df = np.asarray(discount_curve.df(unique_dates)).reshape(-1)[inverse]
+    r = -np.log(df)/texp
+
+    dq = np.asarray(dividend_curve.df(unique_dates)).reshape(-1)[inverse]
+    q = -np.log(dq)/texp
+
+    k = np.array([option._strike_price for option in options])
+    option_types = np.array([option._option_type.value
+                             for option in options])
+
+    return texp, k, r, q, option_types
+
+###############################################################################
+
+
 class EquityVanillaOption():
     """ Class for managing plain vanilla European calls and puts on equities.
     For American calls and puts see the EquityAmericanOption class. """
@@ -172,6 +210,43 @@ class EquityVanillaOption():
         value = value * self._num_options
         return value
 
+###############################################################################
+
+    @classmethod
+    def value_batch(cls,
+                    options: list,
+                    valuation_date: Date,
+                    stock_price: (float, np.ndarray),
+                    discount_curve: DiscountCurve,
+                    dividend_curve: DiscountCurve,
+                    model: Model,
+                    parallel: bool = False):
+        """ Value a list of equity vanilla options, such as a whole option
+        chain, in one pass using the Black-Scholes model. The discount and
+        dividend curves are evaluated once on the distinct expiry dates. The
+        model volatility can be a single value or an array with one value per
+        option. Returns a dictionary of arrays of the value, which includes
+        the number of options as in value(), and of the delta, gamma, vega,
+        theta, rho, vanna and volga of a single option. """
+
+        if isinstance(model, BlackScholes) is False:
+            raise FinError("Unknown Model Type")
+
+        if np.any(stock_price <= 0.0):
+            raise FinError("Stock price must be greater than zero.")
+
+        texp, k, r, q, option_types = _batch_inputs(options, valuation_date,
+                                                    discount_curve,
+                                                    dividend_curve)
+
+        num_options = np.array([option._num_options for option in options])
+
+        results = bs_value_batch(stock_price, texp, k, r, q,
+                                 model._volatility, option_types, parallel)
+
+        results["value"] = results["value"] * num_options
+        return results
+
 ###############################################################################
 
     def delta(self,
@@ -436,7 +511,9 @@ class EquityVanillaOption():
                            dividend_curve: DiscountCurve,
                            price):
         """ Calculate the Black-Scholes implied volatility of a European 
-        vanilla option. """
+        vanilla option. If the price is an array then the volatilities are
+        found with the batch solver and are NaN where a price cannot be
+        matched. """
 
         texp = (self._expiry_date - valuation_date) / gDaysInYear
 
@@ -453,11 +530,40 @@ class EquityVanillaOption():
         k = self._strike_price
         s0 = stock_price
 
+        if isinstance(price, np.ndarray):
+            sigma, _ = bs_implied_volatility_batch(s0, texp, k, r, q, price,
+                                                   self._option_type.value)
+            return sigma
+
         sigma = bs_implied_volatility(s0, texp, k, r, q, price,
                                       self._option_type.value)
 
         return sigma
 
+###############################################################################
+
+    @classmethod
+    def implied_volatility_batch(cls,
+                                 options: list,
+                                 valuation_date: Date,
+                                 stock_price: (float, np.ndarray),
+                                 discount_curve: DiscountCurve,
+                                 dividend_curve: DiscountCurve,
+                                 prices: np.ndarray,
+                                 parallel: bool = False):
+        """ Calculate the Black-Scholes implied volatilities of a list of
+        European vanilla options, such as a whole option chain, from their
+        prices per option. Returns an array of volatilities and an array of
+        ImpliedVolStatus values. Options whose prices cannot be matched have
+        a NaN volatility and a status which says why. """
+
+        texp, k, r, q, option_types = _batch_inputs(options, valuation_date,
+                                                    discount_curve,
+                                                    dividend_curve)
+
+        return bs_implied_volatility_batch(stock_price, texp, k, r, q,
+                                           prices, option_types, parallel)
+
 ###############################################################################
 
     def value_mc_numpy_only(self,
@@ -538,7 +644,12 @@ class EquityVanillaOption():
                                 model: Model,
                                 num_paths: int = 10000,
                                 seed: int = 4242,
-                                useSobol: int = 0):
+                                useSobol: int = 0,
+                                num_threads: int = None):
+        """ Value European style call or put option using Monte Carlo with
+        the paths spread across num_threads threads or all of the threads
+        if it is None. The value does not depend on the number of threads.
+        """
 
         texp = (self._expiry_date - valuation_date) / gDaysInYear
 
@@ -550,18 +661,17 @@ class EquityVanillaOption():
 
         vol = model._volatility
 
-        v = _value_mc_numba_parallel(stock_price,
-                                     texp,
-                                     self._strike_price,
-                                     self._option_type.value,
-                                     r,
-                                     q,
-                                     vol,
-                                     num_paths,
-                                     seed,
-                                     useSobol)
-
-#        _value_mc_NUMBA_ONLY.parallel_diagnostics(level=4)
+        with mc_threads(num_threads):
+            v = _value_mc_numba_parallel(stock_price,
+                                         texp,
+                                         self._strike_price,
+                                         self._option_type.value,
+                                         r,
+                                         q,
+                                         vol,
+                                         num_paths,
+                                         seed,
+                                         useSobol)
 
         return v
 
@@ -645,9 +755,43 @@ class EquityVanillaOption():
                  model: Model,
                  num_paths: int = 10000,
                  seed: int = 4242,
-                 useSobol: int = 0):
-        """ Value European style call or put option using Monte Carlo. This is
-        mainly for educational purposes. Sobol numbers can be used. """
+                 useSobol: int = 0,
+                 num_threads: int = None):
+        """ Value European style call or put option using Monte Carlo with
+        the parallel kernel. The paths are spread across num_threads threads
+        or all of the threads if it is None. Each normal is found from the
+        seed and the path index so the value does not depend on the number
+        of threads. Sobol numbers can be used. """
+
+        return self.value_mc_numba_parallel(valuation_date,
+                                            stock_price,
+                                            discount_curve,
+                                            dividend_curve,
+                                            model,
+                                            num_paths,
+                                            seed,
+                                            useSobol,
+                                            num_threads)
+
+###############################################################################
+
+    def value_mc_adaptive(self,
+                          valuation_date: Date,
+                          stock_price: float,
+                          discount_curve: DiscountCurve,
+                          dividend_curve: DiscountCurve,
+                          model: Model,
+                          abs_tolerance: float = None,
+                          rel_tolerance: float = None,
+                          time_budget: float = None,
+                          seed: int = 4242,
+                          num_threads: int = None):
+        """ Value the option using Monte Carlo with as many paths as are
+        needed for the standard error to be within abs_tolerance or
+        rel_tolerance of the value, or as fit in time_budget seconds.
+        Returns the value, its standard error, the number of paths and the
+        wall time. Calling value_mc with that number of paths and the same
+        seed gives the same value. """
 
         texp = (self._expiry_date - valuation_date) / gDaysInYear
 
@@ -659,18 +803,13 @@ class EquityVanillaOption():
 
         vol = model._volatility
 
-        v = _value_mc_numba_only(stock_price,
-                                 texp,
-                                 self._strike_price,
-                                 self._option_type.value,
-                                 r,
-                                 q,
-                                 vol,
-                                 num_paths,
-                                 seed,
-                                 useSobol)
+        with mc_threads(num_threads):
+            result = value_mc_adaptive(stock_price, texp, self._strike_price,
+                                       self._option_type.value, r, q, vol,
+                                       seed, abs_tolerance, rel_tolerance,
+                                       time_budget)
 
-        return v
+        return result
 
 ###############################################################################
 
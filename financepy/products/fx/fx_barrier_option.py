@@ -248,8 +248,11 @@ class FXBarrierOption(FXOption):
                  model_params,
                  num_ann_steps=552,
                  num_paths=5000,
-                 seed=4242):
-        """ Value the FX Barrier Option using Monte Carlo. """
+                 seed=4242,
+                 path_construction=None):
+        """ Value the FX Barrier Option using Monte Carlo. If a path
+        construction of type PathConstructionTypes is given then the paths
+        are driven by scrambled Sobol numbers in that order. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
         num_time_steps = int(t * num_ann_steps)
@@ -289,7 +292,8 @@ class FXBarrierOption(FXOption):
 
         if simple_put or simple_call:
             Sall = process.get_process(
-                process_type, t, model_params, 1, num_paths, seed)
+                process_type, t, model_params, 1, num_paths, seed,
+                path_construction)
 
         if simple_call:
             sT = Sall[:, -1]
@@ -309,7 +313,8 @@ class FXBarrierOption(FXOption):
                                    model_params,
                                    num_time_steps,
                                    num_paths,
-                                   seed)
+                                   seed,
+                                   path_construction)
 
         (num_paths, num_time_steps) = Sall.shape
 
@@ -22,12 +22,64 @@ from ...models.sabr import SABR
 from ...models.black_scholes import BlackScholes
 
 from ...models.black_scholes_analytic import bs_value, bs_delta
+from ...models.black_scholes_analytic import bs_value_batch
+from ...models.black_scholes_analytic import bs_implied_volatility_batch
+from ...models.black_scholes_mc import _value_mc_numba_parallel
+from ...models.counter_rng import mc_threads
 
 from ...utils.helpers import check_argument_types, label_to_string
 
 from ...utils.math import N
 
 
+###############################################################################
+
+
+def _batch_inputs(options, valuation_date, dom_discount_curve,
+                  for_discount_curve):
+    """ Times to expiry, strikes, domestic and foreign rates and option type
+    values of a list of European FX options with the rates set over the time
+    to delivery as in value(). The curves are evaluated once on the distinct
+    times to delivery. """
+
+    for option in options:
+        if option._option_type != OptionTypes.EUROPEAN_CALL and \
+           option._option_type != OptionTypes.EUROPEAN_PUT:
+            raise FinError("Batch valuation needs European options")
+
+    # The spot date only depends on the number of spot days
+    spot_dates = {}
+    for option in options:
+        if option._spot_days not in spot_dates:
+            spot_date = valuation_date.add_weekdays(option._spot_days)
+            spot_dates[option._spot_days] = spot_date._excel_date
+
+    tdel = np.array([option._delivery_date._excel_date -
+                     spot_dates[option._spot_days]
+                     for option in options]) / gDaysInYear
+
+    texp = np.array([option._expiry_date - valuation_date
+                     for option in options]) / gDaysInYear
+
+    if np.any(tdel < 0.0):
+        raise FinError("Time to expiry must be positive.")
+
+    tdel = np.maximum(tdel, 1e-10)
+
+    unique_tdel, inverse = np.unique(tdel, return_inverse=True)
+
+    domDF = np.asarray(dom_discount_curve._df(unique_tdel)).reshape(-1)
+    forDF = np.asarray(for_discount_curve._df(unique_tdel)).reshape(-1)
+
+    rd = -np.log(domDF[inverse]) / tdel
+    rf = -np.log(forDF[inverse]) / tdel
+
+    K = np.array([option._strike_fx_rate for option in options])
+    option_types = np.array([option._option_type.value
+                             for option in options])
+
+    return texp, K, rd, rf, option_types
+
 ###############################################################################
 # TODO: Refactor code to use FinBlackScholesAnalytic
 ###############################################################################
@@ -351,6 +403,45 @@ class FXVanillaOption():
                 "ccy_dom": self._domName,
                 "ccy_for": self._forName}
 
+###############################################################################
+
+    @classmethod
+    def value_batch(cls,
+                    options: list,
+                    valuation_date: Date,
+                    spot_fx_rate: (float, np.ndarray),
+                    dom_discount_curve,
+                    for_discount_curve,
+                    model,
+                    parallel: bool = False):
+        """ Value a list of European FX options in one pass using the Black-
+        Scholes model with the rates and times to delivery set as in value().
+        The model volatility can be a single value or an array with one value
+        per option. Returns a dictionary of arrays of the value in domestic
+        pips, which is 'v' in value(), and of the spot delta, gamma, vega,
+        theta, rho, vanna and volga of one unit of the foreign currency. """
+
+        if type(model) != BlackScholes:
+            raise FinError("Batch valuation needs a Black-Scholes model")
+
+        if np.any(spot_fx_rate <= 0.0):
+            raise FinError("spot_fx_rate must be greater than zero.")
+
+        texp, K, rd, rf, option_types = _batch_inputs(options,
+                                                      valuation_date,
+                                                      dom_discount_curve,
+                                                      for_discount_curve)
+
+        volatility = model._volatility
+
+        if np.any(volatility < 0.0):
+            raise FinError("Volatility should not be negative.")
+
+        v = np.maximum(volatility, 1e-10)
+
+        return bs_value_batch(spot_fx_rate, texp, K, rd, rf, v, option_types,
+                              parallel)
+
 ###############################################################################
 
     def delta_bump(self,
@@ -676,6 +767,31 @@ class FXVanillaOption():
                                 tol=1e-6, maxiter=50, fprime2=None)
         return sigma
 
+###############################################################################
+
+    @classmethod
+    def implied_volatility_batch(cls,
+                                 options: list,
+                                 valuation_date: Date,
+                                 spot_fx_rate: (float, np.ndarray),
+                                 dom_discount_curve,
+                                 for_discount_curve,
+                                 prices: np.ndarray,
+                                 parallel: bool = False):
+        """ Calculate the Black-Scholes implied volatilities of a list of
+        European FX options from their values in domestic pips, which is 'v'
+        in value(). Returns an array of volatilities and an array of
+        ImpliedVolStatus values. Options whose prices cannot be matched have
+        a NaN volatility and a status which says why. """
+
+        texp, K, rd, rf, option_types = _batch_inputs(options,
+                                                      valuation_date,
+                                                      dom_discount_curve,
+                                                      for_discount_curve)
+
+        return bs_implied_volatility_batch(spot_fx_rate, texp, K, rd, rf,
+                                           prices, option_types, parallel)
+
 ###############################################################################
 
     def value_mc(self,
@@ -685,19 +801,24 @@ class FXVanillaOption():
                  for_discount_curve,
                  model,
                  num_paths=10000,
-                 seed=4242):
+                 seed=4242,
+                 num_threads: int = None):
         """ Calculate the value of an FX Option using Monte Carlo methods.
         This function can be used to validate the risk measures calculated
         above or used as the starting code for a model exotic FX product that
-        cannot be priced analytically. This function uses Numpy vectorisation
-        for speed of execution."""
+        cannot be priced analytically. The paths are spread across
+        num_threads threads or all of the threads if it is None and the value
+        does not depend on the number of threads. """
 
         if isinstance(model, BlackScholes):
             volatility = model._volatility
         else:
             raise FinError("Model Type invalid")
 
-        np.random.seed(seed)
+        if self._option_type != OptionTypes.EUROPEAN_CALL and \
+           self._option_type != OptionTypes.EUROPEAN_PUT:
+            raise FinError("Unknown option type.")
+
         t = (self._expiry_date - valuation_date) / gDaysInYear
 
         domDF = dom_discount_curve.df(self._expiry_date)
@@ -706,29 +827,15 @@ class FXVanillaOption():
         rd = -np.log(domDF)/t
         rf = -np.log(forDF)/t
 
-        mu = rd - rf
-        v2 = volatility**2
         K = self._strike_fx_rate
-        sqrt_dt = np.sqrt(t)
 
         # Use Antithetic variables
-        g = np.random.normal(0.0, 1.0, size=(1, num_paths))
-        s = spot_fx_rate * np.exp((mu - v2 / 2.0) * t)
-        m = np.exp(g * sqrt_dt * volatility)
-        s_1 = s * m
-        s_2 = s / m
-
-        if self._option_type == OptionTypes.EUROPEAN_CALL:
-            payoff_a_1 = np.maximum(s_1 - K, 0.0)
-            payoff_a_2 = np.maximum(s_2 - K, 0.0)
-        elif self._option_type == OptionTypes.EUROPEAN_PUT:
-            payoff_a_1 = np.maximum(K - s_1, 0.0)
-            payoff_a_2 = np.maximum(K - s_2, 0.0)
-        else:
-            raise FinError("Unknown option type.")
+        with mc_threads(num_threads):
+            v = _value_mc_numba_parallel(spot_fx_rate, t, K,
+                                         self._option_type.value,
+                                         rd, rf, volatility,
+                                         num_paths, seed, 0)
 
-        payoff = np.mean(payoff_a_1) + np.mean(payoff_a_2)
-        v = payoff * np.exp(-rd * t) / 2.0
         return v
 
 ###############################################################################
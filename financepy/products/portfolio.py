@@ -0,0 +1,390 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from ..utils.error import FinError
+from ..utils.date import Date
+from ..utils.date_array import DateArray
+from ..utils.global_types import SwapTypes
+from ..utils.helpers import label_to_string, check_argument_types
+from .rates.swap_fixed_leg import SwapFixedLeg
+from .rates.swap_float_leg import SwapFloatLeg
+from .rates.ibor_swap import IborSwap
+from .rates.ois import OIS
+from .bonds.bond import Bond
+from .credit.cds import CDS
+
+###############################################################################
+# The cash flows of all of the linear trades are held in columns with one row
+# per flow and the rows of each trade stored contiguously. A flow pays
+#
+#    (amount + float_notional * (df_index(start) / df_index(end) - 1))
+#
+# on its payment date where the second term is the Ibor payment of a floating
+# leg. The flow is discounted on the discount curve and divided by the
+# discount factor to the anchor date of the trade. Each curve is evaluated
+# once on the set of unique dates on which it is needed.
+###############################################################################
+
+
+def _unique_dates(rows, serials):
+    """ The rows selected by a mask with the distinct dates on those rows and
+    the index of each row into the distinct dates. Returns None if no rows
+    are selected. """
+
+    rows = np.nonzero(rows)[0]
+
+    if len(rows) == 0:
+        return None
+
+    unique_serials, inverse = np.unique(serials[rows], return_inverse=True)
+    return rows, unique_serials, inverse
+
+###############################################################################
+
+
+class Portfolio():
+    """ Class for valuing a portfolio of trades in one vectorised pass. The
+    cash flows of each IborSwap, OIS, SwapFixedLeg, SwapFloatLeg and Bond are
+    extracted once into columns of payment dates and amounts which are
+    discounted together with one call to each curve and reduced by trade. A
+    CDS is valued using its own value method as the premium and protection
+    legs depend on the issuer survival curve. Curves are referred to by an
+    id and are supplied when the portfolio is valued so that it can be
+    revalued on new or bumped curves. """
+
+    def __init__(self,
+                 valuation_date: Date):
+        """ Create an empty portfolio to be valued as of the valuation date.
+        Only payments after the valuation date are included. A bond is valued
+        as if it settles on the valuation date. """
+
+        check_argument_types(self.__init__, locals())
+
+        self._valuation_date = valuation_date
+
+        self._trades = []
+        self._curve_ids = []
+
+        # Columns are built up trade by trade in lists of numpy arrays
+        self._columns = {"trade": [], "pay": [], "amount": [],
+                         "float_notional": [], "start": [], "end": [],
+                         "discount_curve": [], "index_curve": []}
+
+        self._anchors = []
+        self._cds_trade_ids = []
+        self._flows = None
+
+    ###########################################################################
+
+    def add_trade(self,
+                  trade,
+                  discount_curve_id,
+                  index_curve_id=None):
+        """ Add a trade to the portfolio and return its trade id which is its
+        position in the portfolio. The curve ids can be any hashable labels.
+        For a swap or floating leg the index curve id is the curve used to
+        project Ibor rates and defaults to the discount curve. For a CDS the
+        discount curve id refers to the issuer curve. """
+
+        if index_curve_id is None:
+            index_curve_id = discount_curve_id
+
+        trade_id = len(self._trades)
+        self._trades.append(trade)
+        self._curve_ids.append((discount_curve_id, index_curve_id))
+        self._anchors.append(self._valuation_date._excel_date)
+
+        flows = []
+
+        if isinstance(trade, (IborSwap, OIS)):
+            self._add_fixed_leg(trade._fixed_leg, flows)
+            self._add_float_leg(trade._floatLeg, flows)
+        elif isinstance(trade, SwapFixedLeg):
+            self._add_fixed_leg(trade, flows)
+        elif isinstance(trade, SwapFloatLeg):
+            self._add_float_leg(trade, flows)
+        elif isinstance(trade, Bond):
+            self._add_bond(trade, flows)
+        elif isinstance(trade, CDS):
+            self._cds_trade_ids.append(trade_id)
+        else:
+            raise FinError("Portfolio cannot value " + type(trade).__name__)
+
+        num_flows = len(flows)
+
+        columns = self._columns
+        columns["trade"].append(np.full(num_flows, trade_id, np.int64))
+        columns["discount_curve"].append([discount_curve_id] * num_flows)
+        columns["index_curve"].append([index_curve_id] * num_flows)
+
+        for i, name in enumerate(("pay", "amount", "float_notional",
+                                  "start", "end")):
+            columns[name].append(np.array([flow[i] for flow in flows],
+                                          dtype=np.float64))
+
+        self._flows = None
+        return trade_id
+
+    ###########################################################################
+
+    def add_trades(self,
+                   trades: list,
+                   discount_curve_id,
+                   index_curve_id=None):
+        """ Add a list of trades which all use the same curves and return a
+        vector of their trade ids. """
+
+        return np.array([self.add_trade(trade, discount_curve_id,
+                                        index_curve_id) for trade in trades])
+
+    ###########################################################################
+
+    def _add_fixed_leg(self, leg, flows):
+        """ Each fixed payment and the principal at the last payment. """
+
+        sign = 1.0
+        if leg._leg_type == SwapTypes.PAY:
+            sign = -1.0
+
+        valuation_date = self._valuation_date
+
+        for pmnt_date, pmnt in zip(leg._payment_dates, leg._payments):
+            if pmnt_date > valuation_date:
+                flows.append((pmnt_date._excel_date, sign * pmnt, 0.0,
+                              0.0, 0.0))
+
+        pmnt_date = leg._payment_dates[-1]
+        if pmnt_date > valuation_date and leg._principal != 0.0:
+            flows.append((pmnt_date._excel_date,
+                          sign * leg._principal * leg._notional, 0.0,
+                          0.0, 0.0))
+
+    ###########################################################################
+
+    def _add_float_leg(self, leg, flows):
+        """ Each Ibor payment, with its spread, and the principal at the last
+        payment. The first fixing is projected from the index curve. """
+
+        sign = 1.0
+        if leg._leg_type == SwapTypes.PAY:
+            sign = -1.0
+
+        valuation_date = self._valuation_date
+        notional = sign * leg._notional
+
+        for i, pmnt_date in enumerate(leg._payment_dates):
+            if pmnt_date > valuation_date:
+                alpha = leg._year_fracs[i]
+                flows.append((pmnt_date._excel_date,
+                              notional * leg._spread * alpha,
+                              notional,
+                              leg._startAccruedDates[i]._excel_date,
+                              leg._endAccruedDates[i]._excel_date))
+
+        pmnt_date = leg._payment_dates[-1]
+        if pmnt_date > valuation_date and leg._principal != 0.0:
+            flows.append((pmnt_date._excel_date,
+                          notional * leg._principal, 0.0, 0.0, 0.0))
+
+    ###########################################################################
+
+    def _add_bond(self, bond, flows):
+        """ Bond coupons paid on or after settlement and the redemption. The
+        value is the bond principal which is its full price times the face
+        amount divided by par. """
+
+        settlement_date = self._valuation_date
+        coupon = bond._face_amount * bond._coupon / bond._frequency
+
+        flow_date = None
+        for flow_date in bond._flow_dates[1:]:
+            if flow_date >= settlement_date:
+                flows.append((flow_date._excel_date, coupon, 0.0, 0.0, 0.0))
+
+        if flow_date is not None and flow_date >= settlement_date:
+            flows.append((flow_date._excel_date,
+                          bond._face_amount * bond._redemption,
+                          0.0, 0.0, 0.0))
+
+    ###########################################################################
+
+    def _freeze(self):
+        """ Join the columns of all of the trades into single vectors. """
+
+        if self._flows is not None:
+            return
+
+        columns = self._columns
+        flows = {}
+
+        for name in ("trade", "pay", "amount", "float_notional",
+                     "start", "end"):
+            if len(columns[name]) > 0:
+                flows[name] = np.concatenate(columns[name])
+            else:
+                flows[name] = np.zeros(0)
+
+        # Curve ids are mapped to small integers for the grouping by curve
+        curve_labels = []
+        for name in ("discount_curve", "index_curve"):
+            labels = [label for labels in columns[name] for label in labels]
+            curve_labels.append(labels)
+
+        unique_ids = list(dict.fromkeys(curve_labels[0] + curve_labels[1] +
+                                        [ids[0] for ids in self._curve_ids]))
+        index = {curve_id: i for i, curve_id in enumerate(unique_ids)}
+
+        flows["discount_curve"] = np.array([index[x] for x in
+                                            curve_labels[0]], dtype=np.int64)
+        flows["index_curve"] = np.array([index[x] for x in curve_labels[1]],
+                                        dtype=np.int64)
+        flows["anchor_curve"] = np.array([index[ids[0]] for ids in
+                                          self._curve_ids], dtype=np.int64)
+        flows["anchor"] = np.array(self._anchors, dtype=np.float64)
+        flows["is_float"] = flows["float_notional"] != 0.0
+
+        # The rows of each trade are contiguous so reduceat can sum them
+        counts = np.bincount(flows["trade"], minlength=len(self._trades))
+        flows["offsets"] = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        flows["counts"] = counts
+
+        # The distinct dates on which each curve is needed do not depend on
+        # the curves and so they are found once here
+        counts_positive = counts > 0
+        lookups = []
+
+        for i in range(0, len(unique_ids)):
+            pay_rows = flows["discount_curve"] == i
+            float_rows = (flows["index_curve"] == i) & flows["is_float"]
+            anchor_rows = (flows["anchor_curve"] == i) & counts_positive
+            lookups.append({
+                "pay": _unique_dates(pay_rows, flows["pay"]),
+                "start": _unique_dates(float_rows, flows["start"]),
+                "end": _unique_dates(float_rows, flows["end"]),
+                "anchor": _unique_dates(anchor_rows, flows["anchor"])})
+
+        self._unique_curve_ids = unique_ids
+        self._curve_lookups = lookups
+        self._flows = flows
+
+    ###########################################################################
+
+    def _curve_dfs(self, curve, lookup):
+        """ Discount factors on the rows of a lookup evaluated once for each
+        distinct date. """
+
+        rows, unique_serials, inverse = lookup
+        dfs = np.asarray(curve.df(DateArray(unique_serials)), np.float64)
+        return rows, dfs.reshape(-1)[inverse]
+
+    ###########################################################################
+
+    def flow_pvs(self,
+                 curves: dict):
+        """ Returns the column of trade ids and the present value of each of
+        the cash flows in the portfolio given a dictionary of the curves
+        keyed by curve id. These match the payment PVs of the legs. """
+
+        self._freeze()
+        flows = self._flows
+
+        for curve_id in self._unique_curve_ids:
+            if curve_id not in curves:
+                raise FinError("No curve supplied with id " + str(curve_id))
+
+        amounts = flows["amount"].copy()
+        pay_dfs = np.zeros(len(amounts))
+        anchor_dfs = np.ones(len(self._trades))
+
+        for i, curve_id in enumerate(self._unique_curve_ids):
+
+            curve = curves[curve_id]
+            lookup = self._curve_lookups[i]
+
+            if lookup["pay"] is not None:
+                rows, dfs = self._curve_dfs(curve, lookup["pay"])
+                pay_dfs[rows] = dfs
+
+            if lookup["start"] is not None:
+                rows, df_start = self._curve_dfs(curve, lookup["start"])
+                rows, df_end = self._curve_dfs(curve, lookup["end"])
+                amounts[rows] += flows["float_notional"][rows] * \
+                    (df_start / df_end - 1.0)
+
+            if lookup["anchor"] is not None:
+                rows, dfs = self._curve_dfs(curve, lookup["anchor"])
+                anchor_dfs[rows] = dfs
+
+        pvs = amounts * pay_dfs / anchor_dfs[flows["trade"]]
+        return flows["trade"], pvs
+
+    ###########################################################################
+
+    def cumulative_pvs(self,
+                       curves: dict):
+        """ Returns the column of trade ids and the cumulative present value
+        of the cash flows of each trade in the order in which they are held.
+        """
+
+        trade_ids, pvs = self.flow_pvs(curves)
+        flows = self._flows
+
+        cumulative = np.cumsum(pvs)
+        offsets = flows["offsets"][trade_ids]
+        start_totals = np.concatenate(([0.0], cumulative))[offsets]
+        return trade_ids, cumulative - start_totals
+
+    ###########################################################################
+
+    def value(self,
+              curves: dict):
+        """ Returns a vector of the present value of each trade given a
+        dictionary of curves keyed by curve id. """
+
+        trade_ids, pvs = self.flow_pvs(curves)
+        flows = self._flows
+
+        values = np.zeros(len(self._trades))
+
+        # reduceat needs every segment to be non-empty
+        has_flows = flows["counts"] > 0
+        if np.any(has_flows):
+            values[has_flows] = np.add.reduceat(pvs,
+                                                flows["offsets"][has_flows])
+
+        for trade_id in self._cds_trade_ids:
+            issuer_curve = curves[self._curve_ids[trade_id][0]]
+            v = self._trades[trade_id].value(self._valuation_date,
+                                             issuer_curve)
+            values[trade_id] = v['full_pv']
+
+        return values
+
+    ###########################################################################
+
+    def num_trades(self):
+        """ Returns the number of trades in the portfolio. """
+        return len(self._trades)
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        self._freeze()
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("VALUATION DATE", self._valuation_date)
+        s += label_to_string("NUM TRADES", len(self._trades))
+        s += label_to_string("NUM FLOWS", len(self._flows["trade"]))
+        s += label_to_string("CURVE IDS", self._unique_curve_ids, "")
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
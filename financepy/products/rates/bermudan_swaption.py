@@ -89,13 +89,12 @@ class IborBermudanSwaption:
 
 ###############################################################################
 
-    def value(self,
-              valuation_date,
-              discount_curve,
-              model):
-        """ Value the Bermudan swaption using the specified model and a
-        discount curve. The choices of model are the Hull-White model, the 
-        Black-Karasinski model and the Black-Derman-Toy model. """
+    def _tree_flows(self,
+                    valuation_date,
+                    discount_curve):
+        """ The expiry and maturity times and the fixed leg coupon times and
+        flows per unit notional from the expiry onwards which the tree models
+        need. The first coupon time is the expiry with no flow. """
 
         float_spread = 0.0
 
@@ -151,6 +150,21 @@ class IborBermudanSwaption:
         # Allow exercise on coupon dates but control this later for europeans
         self._call_times = cpn_times
 
+        return texp, tmat, cpn_times, cpn_flows
+
+###############################################################################
+
+    def value(self,
+              valuation_date,
+              discount_curve,
+              model):
+        """ Value the Bermudan swaption using the specified model and a
+        discount curve. The choices of model are the Hull-White model, the 
+        Black-Karasinski model and the Black-Derman-Toy model. """
+
+        texp, tmat, cpn_times, cpn_flows = \
+            self._tree_flows(valuation_date, discount_curve)
+
         df_times = discount_curve._times
         df_values = discount_curve._dfs
 
@@ -222,3 +236,49 @@ class IborBermudanSwaption:
         print(self)
 
 ###############################################################################
+
+
+def value_bermudan_swaption_book(valuation_date,
+                                 discount_curve,
+                                 model,
+                                 swaptions: list):
+    """ Value a book of Bermudan swaptions together in a single backward
+    induction through one lattice of the Hull-White, Black-Karasinski or
+    Black-Derman-Toy model with nodes on the dates of all of the trades.
+    Returns arrays of the values and of the deltas which are the change in
+    value per unit change in the short rate. """
+
+    if isinstance(model, (BDTTree, BKTree, HWTree)) is False:
+        raise FinError("Invalid model choice for Bermudan Swaption")
+
+    if len(swaptions) == 0:
+        raise FinError("Need at least one swaption")
+
+    texps = []
+    cpn_times = []
+    cpn_flows = []
+
+    for swaption in swaptions:
+        texp, _, times, flows = swaption._tree_flows(valuation_date,
+                                                     discount_curve)
+        texps.append(texp)
+        cpn_times.append(times)
+        cpn_flows.append(flows)
+
+    exercise_types = [swaption._exercise_type for swaption in swaptions]
+
+    v = model.bermudan_swaption_batch(texps, 1.0, 1.0, cpn_times, cpn_flows,
+                                      exercise_types,
+                                      discount_curve._times,
+                                      discount_curve._dfs)
+
+    notionals = np.array([swaption._notional for swaption in swaptions])
+    pay = np.array([swaption._fixed_leg_type == SwapTypes.PAY
+                    for swaption in swaptions])
+
+    values = notionals * np.where(pay, v['pay'], v['rec'])
+    deltas = notionals * np.where(pay, v['pay_delta'], v['rec_delta'])
+
+    return values, deltas
+
+###############################################################################
@@ -0,0 +1,709 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import copy
+import numpy as np
+from numba import njit
+
+from ...utils.error import FinError
+from ...utils.date import Date
+from ...utils.day_count import DayCount
+from ...utils.global_vars import gDaysInYear
+from ...utils.global_types import SwapTypes
+from ...utils.helpers import label_to_string
+from ...market.curves.interpolator import InterpTypes, Interpolator
+from ...market.curves.interpolator import _uinterpolate
+from ...market.curves.interpolator import _LINEAR_INTERP_TYPES
+
+swaptol = 1e-10
+
+###############################################################################
+# Each calibration instrument fixes one node of the curve. A deposit and a FRA
+# that starts inside the curve already built are solved directly. The node of
+# every other FRA and of each swap is found by a Newton root search on the
+# value of the instrument which is held as a sum of terms of the form
+#
+#     (c0 + c1 * quote) * df(ta) * df(tb) / df(tc)
+#
+# where any of the three discount factors may be missing. A fixed coupon is
+# linear in the quote and a forward Ibor payment is df(tpay) df(ts) / df(te).
+# Discount factors from a separate discounting curve are folded into c0, c1.
+###############################################################################
+
+_DEPOSIT = 0
+_DIRECT_FRA = 1
+_SOLVED = 2
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _df_and_slope(t, times, dfs, method):
+    """ Interpolated discount factor at time t and its derivative with respect
+    to the discount factor at the last node of the grid. Only the last node
+    is being solved for and so only times after the previous node see it. """
+
+    small = 1e-10
+
+    y = _uinterpolate(t, times, dfs, method)
+
+    n = times.size - 1
+
+    if n < 1 or t <= times[n - 1]:
+        return y, 0.0
+
+    tn = times[n]
+    tp = times[n - 1]
+    dfn = dfs[n]
+    dt = tn - tp
+
+    if method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+        # Zero rate at the last node has weight one beyond the previous node
+        # except inside the last interval when there is more than one interval
+        if t <= tn and n > 1:
+            w = (t - tp) / dt
+        else:
+            w = 1.0
+
+        return y, y * t * w / (dfn * tn)
+
+    elif method == InterpTypes.FLAT_FWD_RATES.value:
+
+        return y, y * (t - tp) / (dt * dfn)
+
+    elif method == InterpTypes.LINEAR_FWD_RATES.value:
+
+        if t <= tn and n == 1:
+            return y, y * t / ((tn + small) * (dfn + small))
+        elif t <= tn:
+            return y, y * (t - tp) * (t - tp) / (dfn * dt * dt)
+        else:
+            return y, y * (1.0 + (t - tn) / dt) / dfn
+
+    return y, 0.0
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _instrument_value(k, times, dfs, method, quotes,
+                      term_start, term_end, coef0, coef1,
+                      idx_a, idx_b, idx_c,
+                      time_start, time_end, flow_times, flow_dfs, flow_slopes):
+    """ Value of calibration instrument k per unit notional and its derivative
+    with respect to the discount factor at the last node of the grid. """
+
+    for j in range(time_start[k], time_end[k]):
+        flow_dfs[j], flow_slopes[j] = _df_and_slope(flow_times[j], times,
+                                                    dfs, method)
+
+    q = quotes[k]
+    v = 0.0
+    dv = 0.0
+
+    for j in range(term_start[k], term_end[k]):
+
+        c = coef0[j] + coef1[j] * q
+
+        a = 1.0
+        da = 0.0
+        b = 1.0
+        db = 0.0
+        e = 1.0
+        de = 0.0
+
+        if idx_a[j] >= 0:
+            a = flow_dfs[idx_a[j]]
+            da = flow_slopes[idx_a[j]]
+
+        if idx_b[j] >= 0:
+            b = flow_dfs[idx_b[j]]
+            db = flow_slopes[idx_b[j]]
+
+        if idx_c[j] >= 0:
+            e = flow_dfs[idx_c[j]]
+            de = flow_slopes[idx_c[j]]
+
+        ratio = b / e
+        v += c * a * ratio
+        dv += c * (da * ratio + a * (db * e - b * de) / (e * e))
+
+    return v, dv
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _bootstrap(first_node, times, dfs, method, kinds, start_times, accruals,
+               quotes, term_start, term_end, coef0, coef1, idx_a, idx_b, idx_c,
+               time_start, time_end, flow_times, tol, max_iter):
+    """ Bootstrap the discount factors at nodes first_node onwards. Node zero
+    is the valuation date and node k + 1 is fixed by instrument k. Earlier
+    nodes must already hold their values. Returns the index of an instrument
+    whose root search failed or -1 if all nodes were found. """
+
+    num_nodes = times.size
+    flow_dfs = np.zeros(flow_times.size)
+    flow_slopes = np.zeros(flow_times.size)
+
+    for n in range(first_node, num_nodes):
+
+        k = n - 1
+        kind = kinds[k]
+
+        if kind == _DEPOSIT:
+            df_settle = _uinterpolate(start_times[k], times[:n], dfs[:n],
+                                      method)
+            dfs[n] = (1.0 / (1.0 + accruals[k] * quotes[k])) * df_settle
+
+        elif kind == _DIRECT_FRA:
+            df_settle = _uinterpolate(start_times[k], times[:n], dfs[:n],
+                                      method)
+            dfs[n] = df_settle / (1.0 + accruals[k] * quotes[k])
+
+        else:
+            x = dfs[n - 1]
+            converged = False
+
+            for _ in range(0, max_iter):
+
+                dfs[n] = x
+
+                v, dv = _instrument_value(k, times[:n + 1], dfs[:n + 1],
+                                          method, quotes, term_start,
+                                          term_end, coef0, coef1,
+                                          idx_a, idx_b, idx_c,
+                                          time_start, time_end, flow_times,
+                                          flow_dfs, flow_slopes)
+
+                if dv == 0.0:
+                    break
+
+                dx = v / dv
+                x_new = x - dx
+
+                # Discount factors must stay positive for the log interpolation
+                if x_new <= 0.0:
+                    x_new = 0.5 * x
+
+                x = x_new
+
+                if abs(dx) < tol:
+                    converged = True
+                    break
+
+            dfs[n] = x
+
+            if converged is False:
+                return k
+
+    return -1
+
+###############################################################################
+
+
+class CurveBootstrap():
+    """ Bootstrap engine used by IborSingleCurve, IborDualCurve and OISCurve
+    when they interpolate with FLAT_FWD_RATES, LINEAR_FWD_RATES or
+    LINEAR_ZERO_RATES. The cash flow times, accrual factors and any discount
+    factors from a separate discount curve are laid out in arrays once. The
+    curve nodes are then found in a single Numba kernel which solves each
+    node using Newton's method with an analytical derivative. The quotes are
+    held in a vector so that the curve can be rebuilt cheaply. """
+
+    def __init__(self,
+                 valuation_date: Date,
+                 deposits: list,
+                 fras: list,
+                 swaps: list,
+                 interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
+                 discount_curve=None):
+        """ Lay out the cash flows of the deposits, FRAs and swaps, which
+        must be in the order in which they are bootstrapped. If a discount
+        curve is supplied then the curve built is an index curve and the
+        payments are discounted on the discount curve. """
+
+        if interp_type not in _LINEAR_INTERP_TYPES:
+            raise FinError("Bootstrap engine does not support " +
+                           str(interp_type))
+
+        self._valuation_date = valuation_date
+        self._interp_type = interp_type
+        self._discount_curve = discount_curve
+        self._instruments = list(deposits) + list(fras) + list(swaps)
+
+        self._layout(deposits, fras, swaps)
+
+        num_nodes = len(self._instruments) + 1
+        self._times = np.zeros(num_nodes)
+        self._times[1:] = self._node_times
+        self._dfs = np.ones(num_nodes)
+
+    ###########################################################################
+
+    def _time(self, dt):
+        return (dt - self._valuation_date) / gDaysInYear
+
+    ###########################################################################
+
+    def _add_term(self, c0, c1, dta=None, dtb=None, dtc=None):
+        """ Add a term (c0 + c1 * quote) * df(dta) * df(dtb) / df(dtc) where
+        any date left as None contributes a factor of one. """
+
+        indices = []
+
+        for dt in (dta, dtb, dtc):
+
+            if dt is None:
+                indices.append(-1)
+                continue
+
+            t = self._time(dt)
+
+            if t not in self._flow_index:
+                self._flow_index[t] = len(self._flow_times)
+                self._flow_times.append(t)
+
+            indices.append(self._flow_index[t])
+
+        self._terms.append((c0, c1, indices[0], indices[1], indices[2]))
+
+    ###########################################################################
+
+    def _discount(self, dt):
+        """ Discount factor from the discount curve or None when the payment
+        is discounted on the curve being built. """
+
+        if self._discount_curve is None:
+            return None
+
+        return self._discount_curve.df(dt)
+
+    ###########################################################################
+
+    def _add_payment(self, c0, c1, pmnt_dt, dtb=None, dtc=None):
+        """ Add a payment term, discounting on the discount curve if there is
+        one and otherwise on the curve being built. """
+
+        df = self._discount(pmnt_dt)
+
+        if df is None:
+            self._add_term(c0, c1, pmnt_dt, dtb, dtc)
+        else:
+            self._add_term(c0 * df, c1 * df, None, dtb, dtc)
+
+    ###########################################################################
+
+    def _add_fra_terms(self, fra, acc_factor):
+        """ FRA value per unit notional is acc * (fwd - K) * df(maturity). """
+
+        self._add_payment(1.0, 0.0, fra._maturity_date,
+                          fra._start_date, fra._maturity_date)
+        self._add_payment(-1.0, -acc_factor, fra._maturity_date)
+
+    ###########################################################################
+
+    def _add_swap_terms(self, swap):
+        """ Swap value per unit notional from its fixed and floating legs. """
+
+        valuation_date = self._valuation_date
+
+        fixed_leg = swap._fixed_leg
+        sign = 1.0
+        if fixed_leg._leg_type == SwapTypes.PAY:
+            sign = -1.0
+
+        last_dt = None
+        for i in range(0, len(fixed_leg._payment_dates)):
+            pmnt_dt = fixed_leg._payment_dates[i]
+            if pmnt_dt > valuation_date:
+                self._add_payment(0.0, sign * fixed_leg._year_fracs[i],
+                                  pmnt_dt)
+                last_dt = pmnt_dt
+
+        if last_dt is not None and fixed_leg._principal != 0.0:
+            self._add_payment(sign * fixed_leg._principal, 0.0, last_dt)
+
+        float_leg = swap._floatLeg
+        sign = 1.0
+        if float_leg._leg_type == SwapTypes.PAY:
+            sign = -1.0
+
+        last_dt = None
+        for i in range(0, len(float_leg._payment_dates)):
+            pmnt_dt = float_leg._payment_dates[i]
+            if pmnt_dt > valuation_date:
+                alpha = float_leg._year_fracs[i]
+                self._add_payment(sign, 0.0, pmnt_dt,
+                                  float_leg._startAccruedDates[i],
+                                  float_leg._endAccruedDates[i])
+                self._add_payment(sign * (float_leg._spread * alpha - 1.0),
+                                  0.0, pmnt_dt)
+                last_dt = pmnt_dt
+
+        if last_dt is not None and float_leg._principal != 0.0:
+            self._add_payment(sign * float_leg._principal, 0.0, last_dt)
+
+    ###########################################################################
+
+    def _layout(self, deposits, fras, swaps):
+        """ Calculate the node time, quote and cash flow terms of each of the
+        calibration instruments. """
+
+        kinds = []
+        node_times = []
+        start_times = []
+        accruals = []
+        quotes = []
+
+        self._terms = []
+        self._flow_times = []
+        term_start = []
+        term_end = []
+        time_start = []
+        time_end = []
+
+        def start_instrument():
+            self._flow_index = {}
+            term_start.append(len(self._terms))
+            time_start.append(len(self._flow_times))
+
+        def end_instrument():
+            term_end.append(len(self._terms))
+            time_end.append(len(self._flow_times))
+
+        tmat = 0.0
+
+        for depo in deposits:
+            start_instrument()
+            dc = DayCount(depo._day_count_type)
+            acc_factor = dc.year_frac(depo._start_date, depo._maturity_date)[0]
+            tmat = self._time(depo._maturity_date)
+            kinds.append(_DEPOSIT)
+            node_times.append(tmat)
+            start_times.append(self._time(depo._start_date))
+            accruals.append(acc_factor)
+            quotes.append(depo._deposit_rate)
+            end_instrument()
+
+        # FRAs which start before the last deposit matures are implied from
+        # the curve at their start date. This matches the 1D solver build.
+        oldtmat = tmat
+
+        for fra in fras:
+            start_instrument()
+            dc = DayCount(fra._day_count_type)
+            acc_factor = dc.year_frac(fra._start_date, fra._maturity_date)[0]
+            tset = self._time(fra._start_date)
+            tmat = self._time(fra._maturity_date)
+
+            if tset < oldtmat and tmat > oldtmat:
+                kinds.append(_DIRECT_FRA)
+            else:
+                kinds.append(_SOLVED)
+                self._add_fra_terms(fra, acc_factor)
+
+            node_times.append(tmat)
+            start_times.append(tset)
+            accruals.append(acc_factor)
+            quotes.append(fra._fraRate)
+            end_instrument()
+
+        for swap in swaps:
+            start_instrument()
+            # The last payment date is used in case it has been adjusted
+            maturity_date = swap._fixed_leg._payment_dates[-1]
+            kinds.append(_SOLVED)
+            node_times.append(self._time(maturity_date))
+            start_times.append(self._time(swap._effective_date))
+            accruals.append(0.0)
+            quotes.append(swap._fixed_leg._coupon)
+            self._add_swap_terms(swap)
+            end_instrument()
+
+        self._kinds = np.array(kinds, dtype=np.int64)
+        self._node_times = np.array(node_times, dtype=np.float64)
+        self._start_times = np.array(start_times, dtype=np.float64)
+        self._accruals = np.array(accruals, dtype=np.float64)
+        self._quotes = np.array(quotes, dtype=np.float64)
+
+        self._term_start = np.array(term_start, dtype=np.int64)
+        self._term_end = np.array(term_end, dtype=np.int64)
+        self._time_start = np.array(time_start, dtype=np.int64)
+        self._time_end = np.array(time_end, dtype=np.int64)
+        self._flow_times = np.array(self._flow_times, dtype=np.float64)
+
+        terms = self._terms
+        self._coef0 = np.array([x[0] for x in terms], dtype=np.float64)
+        self._coef1 = np.array([x[1] for x in terms], dtype=np.float64)
+        self._idx_a = np.array([x[2] for x in terms], dtype=np.int64)
+        self._idx_b = np.array([x[3] for x in terms], dtype=np.int64)
+        self._idx_c = np.array([x[4] for x in terms], dtype=np.int64)
+
+        del self._terms
+        del self._flow_index
+
+    ###########################################################################
+
+    def build(self,
+              first_node: int = 1):
+        """ Bootstrap the discount factors at the curve nodes from first_node
+        onwards and return the arrays of node times and discount factors. """
+
+        failed = _bootstrap(first_node, self._times, self._dfs,
+                            self._interp_type.value, self._kinds,
+                            self._start_times, self._accruals, self._quotes,
+                            self._term_start, self._term_end,
+                            self._coef0, self._coef1,
+                            self._idx_a, self._idx_b, self._idx_c,
+                            self._time_start, self._time_end,
+                            self._flow_times, swaptol, 50)
+
+        if failed >= 0:
+            raise FinError("Bootstrap failed to converge for instrument " +
+                           str(failed))
+
+        return self._times, self._dfs
+
+    ###########################################################################
+
+    def num_instruments(self):
+        """ Returns the number of calibration instruments. """
+        return len(self._instruments)
+
+    ###########################################################################
+
+    def quotes(self):
+        """ Returns a copy of the instrument quotes in the order deposits,
+        FRAs and then swaps. These are the deposit rates, the FRA rates and
+        the swap fixed coupons. """
+        return self._quotes.copy()
+
+    ###########################################################################
+
+    def update_quote(self,
+                     instrument_index: int,
+                     new_rate: float):
+        """ Change the quote of a single instrument and re-solve only the
+        curve nodes from that instrument onwards as the earlier nodes do not
+        depend on it. Returns the node times and discount factors. """
+
+        if instrument_index < 0 or instrument_index >= len(self._quotes):
+            raise FinError("Instrument index " + str(instrument_index) +
+                           " out of range")
+
+        self._quotes[instrument_index] = new_rate
+        return self.build(instrument_index + 1)
+
+    ###########################################################################
+
+    def set_quotes(self,
+                   quotes: np.ndarray):
+        """ Replace all of the instrument quotes and re-solve the curve nodes
+        from the first quote that has changed. Returns the node times and
+        discount factors. """
+
+        quotes = np.asarray(quotes, dtype=np.float64)
+
+        if quotes.shape != self._quotes.shape:
+            raise FinError("Need " + str(len(self._quotes)) + " quotes")
+
+        changed = np.nonzero(quotes != self._quotes)[0]
+
+        if len(changed) == 0:
+            return self._times, self._dfs
+
+        self._quotes[:] = quotes
+        return self.build(changed[0] + 1)
+
+    ###########################################################################
+
+    def copy(self):
+        """ Returns a copy of the engine that shares the instrument layout,
+        which is never changed, but has its own quotes and discount factors.
+        """
+
+        other = copy.copy(self)
+        other._quotes = self._quotes.copy()
+        other._dfs = self._dfs.copy()
+        return other
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("VALUATION DATE", self._valuation_date)
+        s += label_to_string("INTERP TYPE", self._interp_type)
+        s += label_to_string("NUM INSTRUMENTS", len(self._instruments))
+        s += label_to_string("NUM CASH FLOW TERMS", len(self._coef0), "")
+        return s
+
+###############################################################################
+
+
+def _instrument_quotes(curve):
+    """ Vector of the deposit rates, FRA rates and swap fixed coupons of the
+    instruments used to build an IborSingleCurve, IborDualCurve or OISCurve.
+    """
+
+    quotes = [depo._deposit_rate for depo in curve._usedDeposits]
+    quotes += [fra._fraRate for fra in curve._usedFRAs]
+    quotes += [swap._fixed_leg._coupon for swap in curve._usedSwaps]
+    return np.array(quotes)
+
+###############################################################################
+
+
+def _requote_instruments(curve, quotes):
+    """ Replace the instruments of a curve by shallow copies that only differ
+    in their quotes. The instruments passed to the curve are not changed. """
+
+    num_depos = len(curve._usedDeposits)
+    num_fras = len(curve._usedFRAs)
+
+    deposits = []
+    for depo, rate in zip(curve._usedDeposits, quotes[:num_depos]):
+        depo = copy.copy(depo)
+        depo._deposit_rate = rate
+        deposits.append(depo)
+
+    fras = []
+    for fra, rate in zip(curve._usedFRAs,
+                         quotes[num_depos:num_depos + num_fras]):
+        fra = copy.copy(fra)
+        fra._fraRate = rate
+        fras.append(fra)
+
+    swaps = []
+    for swap, coupon in zip(curve._usedSwaps, quotes[num_depos + num_fras:]):
+        swap = copy.copy(swap)
+        leg = copy.copy(swap._fixed_leg)
+        leg._coupon = coupon
+        leg._rates = [coupon] * len(leg._year_fracs)
+        leg._payments = [year_frac * leg._notional * coupon
+                         for year_frac in leg._year_fracs]
+        swap._fixed_leg = leg
+        swaps.append(swap)
+
+    curve._usedDeposits = deposits
+    curve._usedFRAs = fras
+    curve._usedSwaps = swaps
+
+###############################################################################
+
+
+def _rebuild_curve(curve, quotes, in_place):
+    """ Rebuild an IborSingleCurve, IborDualCurve or OISCurve from a new
+    vector of instrument quotes. Either the curve is updated or a copy is
+    returned. The instruments held by the curve are replaced by requoted
+    copies so that they still reprice to par on the rebuilt curve. A curve
+    built with the bootstrap engine shares the instrument layout with its
+    copy and only re-solves from the first changed quote. A curve using
+    spline interpolation is rebuilt in full. """
+
+    if len(quotes) != len(_instrument_quotes(curve)):
+        raise FinError("Need " + str(len(_instrument_quotes(curve))) +
+                       " quotes")
+
+    if in_place is False:
+        curve = copy.copy(curve)
+
+    _requote_instruments(curve, quotes)
+
+    if getattr(curve, "_bootstrap", None) is None:
+        curve._build_curve()
+        return curve
+
+    if in_place is False:
+        curve._bootstrap = curve._bootstrap.copy()
+
+    curve._times, curve._dfs = curve._bootstrap.set_quotes(quotes)
+
+    curve._interpolator = Interpolator(curve._interp_type)
+    curve._interpolator.fit(curve._times, curve._dfs)
+    return curve
+
+###############################################################################
+
+
+class BootstrapCurveMixin():
+    """ Quote handling and bootstrap engine construction shared by
+    IborSingleCurve, IborDualCurve and OISCurve. The curve must hold its
+    valuation date, interpolation type and the deposits, FRAs and swaps used
+    in the bootstrap, and provide _build_curve and _check_refits. """
+
+    def _build_curve_using_bootstrap_engine(self, discount_curve=None):
+        """ Construct the discount curve using the same bootstrap as the 1D
+        solver but with the cash flows laid out in arrays once and each node
+        solved by Newton's method using an analytical derivative inside a
+        Numba kernel. Only linear interpolation schemes are supported. If a
+        discount curve is supplied then the payments are discounted on it. """
+
+        self._bootstrap = CurveBootstrap(self._valuation_date,
+                                         self._usedDeposits,
+                                         self._usedFRAs,
+                                         self._usedSwaps,
+                                         self._interp_type,
+                                         discount_curve)
+
+        self._times, self._dfs = self._bootstrap.build()
+
+        self._interpolator = Interpolator(self._interp_type)
+        self._interpolator.fit(self._times, self._dfs)
+
+        if self._check_refit is True:
+            self._check_refits(1e-10, 1e-10, 1e-5)
+
+###############################################################################
+
+    def quotes(self):
+        """ Returns a vector of the deposit rates, FRA rates and swap fixed
+        coupons of the instruments used to build the curve in that order. """
+
+        if self._interp_type not in _LINEAR_INTERP_TYPES:
+            return _instrument_quotes(self)
+
+        return self._bootstrap.quotes()
+
+###############################################################################
+
+    def update_quotes(self,
+                      quotes: np.ndarray,
+                      in_place: bool = True):
+        """ Rebuild the curve from a new vector of instrument quotes ordered
+        as returned by quotes(). With a linear interpolation scheme only the
+        curve nodes from the first changed quote onwards are re-solved. If
+        in_place is False then this curve is left unchanged and a copy is
+        updated and returned. The instruments passed to the curve are never
+        changed. """
+
+        return _rebuild_curve(self, quotes, in_place)
+
+###############################################################################
+
+    def update_quote(self,
+                     instrument_index: int,
+                     new_rate: float,
+                     in_place: bool = True):
+        """ Change the quote of a single deposit, FRA or swap and rebuild
+        only the curve nodes which depend on it. The instruments are indexed
+        in the order deposits, FRAs and then swaps, counting any synthetic
+        deposit inserted to start the curve on the valuation date, and the
+        quote is the deposit rate, FRA rate or swap fixed coupon. The
+        instruments passed to the curve are not changed but the curve's own
+        copies are requoted. If in_place is False then this curve is left
+        unchanged and a copy is updated and returned. """
+
+        quotes = self.quotes()
+
+        if instrument_index < 0 or instrument_index >= len(quotes):
+            raise FinError("Instrument index " + str(instrument_index) +
+                           " out of range")
+
+        quotes[instrument_index] = new_rate
+        return _rebuild_curve(self, quotes, in_place)
+
+###############################################################################
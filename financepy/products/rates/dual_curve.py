@@ -12,7 +12,9 @@ from ...utils.helpers import label_to_string
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import InterpTypes, Interpolator
+from ...market.curves.interpolator import _LINEAR_INTERP_TYPES
 from ...market.curves.discount_curve import DiscountCurve
+from ...products.rates.curve_bootstrap import BootstrapCurveMixin
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ibor_fra import IborFRA
 from ...products.rates.ibor_swap import IborSwap
@@ -64,7 +66,7 @@ def _g(df, *args):
 ###############################################################################
 
 
-class IborDualCurve(DiscountCurve):
+class IborDualCurve(BootstrapCurveMixin, DiscountCurve):
     """ Constructs an index curve as implied by the prices of Ibor
     deposits, FRAs and IRS. Discounting is assumed to be at a discount rate
     that is an input and usually derived from OIS rates. """
@@ -103,7 +105,10 @@ class IborDualCurve(DiscountCurve):
     def _build_curve(self):
         """ Build curve based on interpolation. """
 
-        self._build_curve_using_1d_solver()
+        if self._interp_type in _LINEAR_INTERP_TYPES:
+            self._build_curve_using_bootstrap_engine(self._discount_curve)
+        else:
+            self._build_curve_using_1d_solver()
 
 ###############################################################################
 
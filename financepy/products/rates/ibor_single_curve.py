@@ -16,7 +16,9 @@ from ...utils.helpers import label_to_string
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import InterpTypes, Interpolator
+from ...market.curves.interpolator import _LINEAR_INTERP_TYPES
 from ...market.curves.discount_curve import DiscountCurve
+from ...products.rates.curve_bootstrap import BootstrapCurveMixin
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ibor_fra import IborFRA
 from ...products.rates.ibor_swap import IborSwap
@@ -106,7 +108,7 @@ def _cost_function(dfs, *args):
 ###############################################################################
 
 
-class IborSingleCurve(DiscountCurve):
+class IborSingleCurve(BootstrapCurveMixin, DiscountCurve):
     """ Constructs one discount and index curve as implied by prices of Ibor
     deposits, FRAs and IRS. Discounting is assumed to be at Libor and the value
     of the floating leg (including a notional) is assumed to be par. This 
@@ -174,7 +176,10 @@ class IborSingleCurve(DiscountCurve):
     def _build_curve(self):
         """ Build curve based on interpolation. """
 
-        self._build_curve_using_1d_solver()
+        if self._interp_type in _LINEAR_INTERP_TYPES:
+            self._build_curve_using_bootstrap_engine()
+        else:
+            self._build_curve_using_1d_solver()
 
 ###############################################################################
 
@@ -32,6 +32,7 @@ from ...models.sabr_shifted import SABRShifted
 from ...models.hw_tree import HWTree
 from ...models.bk_tree import BKTree
 from ...models.bdt_tree import BDTTree
+from ...models.hw_calibration import HWCalibration
 
 from ...utils.global_types import OptionTypes
 from ...utils.global_types import SwapTypes
@@ -97,15 +98,8 @@ class IborSwaption():
 
 ###############################################################################
 
-    def value(self,
-              valuation_date,
-              discount_curve,
-              model):
-        """ Valuation of a Ibor European-style swaption using a choice of
-        models on a specified valuation date. Models include FinModelBlack,
-        FinModelBlackShifted, SABR, SABRShifted, FinModelHW,
-        FinModelBK and FinModelBDT. The last two involved a tree-based
-        valuation. """
+    def _underlying_swap(self):
+        """ The swap into which the swaption exercises. """
 
         float_spread = 0.0
 
@@ -124,24 +118,18 @@ class IborSwaption():
                         self._bus_day_adjust_type,
                         self._date_gen_rule_type)
 
-        k = self._fixed_coupon
+        return swap
 
-        # The pv01 is the value of the swap cash flows as of the curve date
-        pv01 = swap.pv01(valuation_date, discount_curve)
+###############################################################################
 
-        # We need to calculate the forward swap rate on the swaption exercise
-        # date that makes the forward swap worth par including principal
-        s = swap.swap_rate(valuation_date, discount_curve)
+    def _coupon_flows(self,
+                      valuation_date,
+                      swap):
+        """ The fixed leg coupon times and flows per unit notional of the
+        underlying swap from the expiry onwards which the short rate models
+        need. The first coupon time is the expiry with no flow. """
 
         texp = (self._exercise_date - self._settlement_date) / gDaysInYear
-        tmat = (self._maturity_date - self._settlement_date) / gDaysInYear
-
-        # Discounting is done via the PV01 annuity so no discounting in Black
-        df = 1.0
-
-        #######################################################################
-        # For the tree models we need to generate a vector of the coupons
-        #######################################################################
 
         cpn_times = [texp]
         cpn_flows = [0.0]
@@ -164,11 +152,63 @@ class IborSwaption():
         cpn_times = np.array(cpn_times)
         cpn_flows = np.array(cpn_flows)
 
+        if np.any(cpn_times < 0.0):
+            raise FinError("No coupon times can be before the value date.")
+
+        return cpn_times, cpn_flows
+
+###############################################################################
+
+    def _tree_flows(self,
+                    valuation_date):
+        """ The underlying swap, the expiry and maturity times and the fixed
+        leg coupon times and flows per unit notional from the expiry onwards
+        which the short rate models need. """
+
+        swap = self._underlying_swap()
+
+        texp = (self._exercise_date - self._settlement_date) / gDaysInYear
+        tmat = (self._maturity_date - self._settlement_date) / gDaysInYear
+
+        cpn_times, cpn_flows = self._coupon_flows(valuation_date, swap)
+
+        return swap, texp, tmat, cpn_times, cpn_flows
+
+###############################################################################
+
+    def value(self,
+              valuation_date,
+              discount_curve,
+              model):
+        """ Valuation of a Ibor European-style swaption using a choice of
+        models on a specified valuation date. Models include FinModelBlack,
+        FinModelBlackShifted, SABR, SABRShifted, FinModelHW,
+        FinModelBK and FinModelBDT. The last two involved a tree-based
+        valuation. """
+
+        swap = self._underlying_swap()
+
+        k = self._fixed_coupon
+
+        # The pv01 is the value of the swap cash flows as of the curve date
+        pv01 = swap.pv01(valuation_date, discount_curve)
+
+        # We need to calculate the forward swap rate on the swaption exercise
+        # date that makes the forward swap worth par including principal
+        s = swap.swap_rate(valuation_date, discount_curve)
+
+        texp = (self._exercise_date - self._settlement_date) / gDaysInYear
+        tmat = (self._maturity_date - self._settlement_date) / gDaysInYear
+
+        # Discounting is done via the PV01 annuity so no discounting in Black
+        df = 1.0
+
         df_times = discount_curve._times
         df_values = discount_curve._dfs
 
-        if np.any(cpn_times < 0.0):
-            raise FinError("No coupon times can be before the value date.")
+        # Only the short rate models need the vector of fixed coupons
+        if isinstance(model, (HWTree, BKTree, BDTTree)):
+            cpn_times, cpn_flows = self._coupon_flows(valuation_date, swap)
 
         strike_price = 1.0
         face_amount = 1.0
@@ -403,3 +443,162 @@ class IborSwaption():
         print(self)
 
 ###############################################################################
+
+
+def _swaption_strikes(strikes, num_swaptions):
+    """ One strike per swaption from a single strike or a list. """
+
+    strikes = np.broadcast_to(np.array(strikes, dtype=np.float64),
+                              (num_swaptions,))
+    return [float(k) for k in strikes]
+
+###############################################################################
+
+
+def co_terminal_swaptions(settlement_date: Date,
+                          expiry_tenors: list,
+                          maturity_date: Date,
+                          fixed_leg_type: SwapTypes,
+                          fixed_frequency_type: FrequencyTypes,
+                          fixed_day_count_type: DayCountTypes,
+                          strikes=None,
+                          discount_curve=None):
+    """ Swaptions expiring after each of the expiry tenors into swaps that all
+    end on the maturity date. The strikes can be one strike, a list with one
+    per expiry or None for at the money strikes on the discount curve. """
+
+    exercise_dates = [settlement_date.add_tenor(tenor)
+                      for tenor in expiry_tenors]
+
+    if strikes is None:
+        strikes = [_atm_strike(settlement_date, discount_curve, exercise_date,
+                               maturity_date, fixed_leg_type,
+                               fixed_frequency_type, fixed_day_count_type)
+                   for exercise_date in exercise_dates]
+
+    strikes = _swaption_strikes(strikes, len(exercise_dates))
+
+    return [IborSwaption(settlement_date, exercise_dates[i], maturity_date,
+                         fixed_leg_type, strikes[i], fixed_frequency_type,
+                         fixed_day_count_type)
+            for i in range(0, len(exercise_dates))]
+
+###############################################################################
+
+
+def swaption_grid(settlement_date: Date,
+                  expiry_tenors: list,
+                  swap_tenors: list,
+                  fixed_leg_type: SwapTypes,
+                  fixed_frequency_type: FrequencyTypes,
+                  fixed_day_count_type: DayCountTypes,
+                  strikes=None,
+                  discount_curve=None):
+    """ Swaptions for every pair of expiry tenor and swap tenor ordered by
+    expiry and then by swap tenor. The strikes can be one strike, a list with
+    one per swaption or None for at the money strikes on the discount
+    curve. """
+
+    exercise_dates = []
+    maturity_dates = []
+
+    for expiry_tenor in expiry_tenors:
+        exercise_date = settlement_date.add_tenor(expiry_tenor)
+        for swap_tenor in swap_tenors:
+            exercise_dates.append(exercise_date)
+            maturity_dates.append(exercise_date.add_tenor(swap_tenor))
+
+    if strikes is None:
+        strikes = [_atm_strike(settlement_date, discount_curve,
+                               exercise_dates[i], maturity_dates[i],
+                               fixed_leg_type, fixed_frequency_type,
+                               fixed_day_count_type)
+                   for i in range(0, len(exercise_dates))]
+
+    strikes = _swaption_strikes(np.ravel(strikes), len(exercise_dates))
+
+    return [IborSwaption(settlement_date, exercise_dates[i],
+                         maturity_dates[i], fixed_leg_type, strikes[i],
+                         fixed_frequency_type, fixed_day_count_type)
+            for i in range(0, len(exercise_dates))]
+
+###############################################################################
+
+
+def _atm_strike(settlement_date, discount_curve, exercise_date, maturity_date,
+                fixed_leg_type, fixed_frequency_type, fixed_day_count_type):
+    """ The forward swap rate of the swap underlying a swaption. """
+
+    if discount_curve is None:
+        raise FinError("Need a discount curve for at the money strikes")
+
+    # The swap rate does not depend on the coupon which must not be zero
+    swap = IborSwap(exercise_date, maturity_date, fixed_leg_type, 0.01,
+                    fixed_frequency_type, fixed_day_count_type)
+
+    return swap.swap_rate(settlement_date, discount_curve)
+
+###############################################################################
+
+
+def swaption_market_prices(valuation_date: Date,
+                           discount_curve,
+                           swaptions: list,
+                           volatilities):
+    """ The Black prices of the swaptions per unit notional which are the
+    prices that hw_swaption_calibration fits. The volatilities are a list
+    with one per swaption or a SwaptionVolSurface. """
+
+    # A SwaptionVolSurface gives the volatility at each strike and expiry
+    if hasattr(volatilities, "volatility_from_strike_date"):
+        volatilities = [volatilities.volatility_from_strike_date(
+            swaption._fixed_coupon, swaption._exercise_date)
+            for swaption in swaptions]
+
+    if len(volatilities) != len(swaptions):
+        raise FinError("Need a volatility for each swaption")
+
+    prices = []
+
+    for swaption, volatility in zip(swaptions, volatilities):
+        v = swaption.value(valuation_date, discount_curve, Black(volatility))
+        df = discount_curve.df(swaption._settlement_date)
+        prices.append(v * df / swaption._notional)
+
+    return np.array(prices)
+
+###############################################################################
+
+
+def hw_swaption_calibration(valuation_date: Date,
+                            swaptions: list,
+                            sigma_times: (list, np.ndarray) = None,
+                            calibrate_a: bool = True):
+    """ The HWCalibration to a set of swaptions such as a co-terminal strip
+    or a full grid. Volatility k applies up to sigma_times[k] and the last
+    one also applies after its time. With no sigma_times the volatility is
+    constant. """
+
+    texps = []
+    flow_times = []
+    flows = []
+    is_payer = []
+
+    for swaption in swaptions:
+
+        _, texp, _, cpn_times, cpn_flows = \
+            swaption._tree_flows(valuation_date)
+
+        # The first coupon time is the expiry with no flow
+        cpn_flows = cpn_flows[1:].copy()
+        cpn_flows[-1] += 1.0
+
+        texps.append(texp)
+        flow_times.append(cpn_times[1:])
+        flows.append(cpn_flows)
+        is_payer.append(swaption._fixed_leg_type == SwapTypes.PAY)
+
+    return HWCalibration(texps, flow_times, flows, is_payer, sigma_times,
+                         calibrate_a)
+
+###############################################################################
@@ -12,7 +12,9 @@ from ...utils.helpers import label_to_string
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import InterpTypes, Interpolator
+from ...market.curves.interpolator import _LINEAR_INTERP_TYPES
 from ...market.curves.discount_curve import DiscountCurve
+from ...products.rates.curve_bootstrap import BootstrapCurveMixin
 
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ois import OIS
@@ -85,7 +87,7 @@ def _g(df, *args):
 ###############################################################################
 
 
-class OISCurve(DiscountCurve):
+class OISCurve(BootstrapCurveMixin, DiscountCurve):
     """ Constructs a discount curve as implied by the prices of Overnight
     Index Rate swaps. The curve date is the date on which we are
     performing the valuation based on the information available on the
@@ -130,8 +132,11 @@ class OISCurve(DiscountCurve):
 
     def _build_curve(self):
         """ Build curve based on interpolation. """
-            
-        self._build_curve_using_1d_solver()
+
+        if self._interp_type in _LINEAR_INTERP_TYPES:
+            self._build_curve_using_bootstrap_engine()
+        else:
+            self._build_curve_using_1d_solver()
 
 ###############################################################################
 
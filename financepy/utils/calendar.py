@@ -7,9 +7,10 @@
 # TODO: Do some timings and tidy up logic in adjustment function
 ###############################################################################
 
-import datetime
 from enum import Enum
-from .date import Date
+import numpy as np
+from .date import Date, days_in_month
+from .date_array import DateArray
 from .error import FinError
 
 # from numba import njit, jit, int64, boolean
@@ -77,6 +78,215 @@ class DateGenRuleTypes(Enum):
     BACKWARD = 2
 
 ###############################################################################
+# Process-wide cache of business day tables, one per calendar type. Each table
+# covers a range of whole years which grows lazily as dates are requested.
+###############################################################################
+
+_business_day_tables = {}
+
+# Years either side of a requested year that are added when a table grows
+_TABLE_PADDING_YEARS = 5
+
+# Last year for which the Easter Monday table is populated
+_LAST_EASTER_YEAR = 1900 + len(easterMondayDay)
+
+###############################################################################
+
+
+class _BusinessDayTable():
+    """ Precomputed holiday and business day bitmaps for a calendar over a
+    range of years, indexed by the Excel serial number of the date less that
+    of the first date in the range. We also store for each day the index of
+    the next and previous business day and the cumulative number of business
+    days so that date adjustment and business day arithmetic are lookups. """
+
+    def __init__(self,
+                 calendar_type: CalendarTypes):
+
+        self._type = calendar_type
+        self._start_year = None
+        self._end_year = None
+        self._start_serial = 0
+        self._holiday = np.zeros(0, dtype=bool)
+        self._weekend = np.zeros(0, dtype=bool)
+        self._d = np.zeros(0, dtype=np.int32)
+        self._m = np.zeros(0, dtype=np.int32)
+        self._y = np.zeros(0, dtype=np.int32)
+
+    ###########################################################################
+
+    def _year_flags(self, y):
+        """ Evaluate the holiday rules of the calendar for each day of year y.
+        This is the only place where the rules are evaluated. """
+
+        rules = Calendar(self._type)
+        holiday = []
+        weekend = []
+        dd = []
+        mm = []
+
+        for m in range(1, 13):
+            for d in range(1, days_in_month(m, y) + 1):
+                dt = Date(d, m, y)
+                holiday.append(rules._is_holiday_by_rules(dt))
+                weekend.append(dt.is_weekend())
+                dd.append(d)
+                mm.append(m)
+
+        n = len(dd)
+        yy = [y] * n
+        return (np.array(holiday, dtype=bool), np.array(weekend, dtype=bool),
+                np.array(dd, dtype=np.int32), np.array(mm, dtype=np.int32),
+                np.array(yy, dtype=np.int32))
+
+    ###########################################################################
+
+    def ensure_years(self, y1, y2):
+        """ Make sure that the table covers all of the years from y1 to y2
+        inclusive, padding any extension so that it happens rarely. """
+
+        if self._start_year is not None and \
+                y1 >= self._start_year and y2 <= self._end_year:
+            return
+
+        new_start = max(1900, min(y1, y1 - _TABLE_PADDING_YEARS))
+        new_end = max(y2, min(y2 + _TABLE_PADDING_YEARS, _LAST_EASTER_YEAR))
+
+        if self._start_year is None:
+            before = range(new_start, new_end + 1)
+            after = []
+        else:
+            new_start = min(new_start, self._start_year)
+            new_end = max(new_end, self._end_year)
+            before = range(new_start, self._start_year)
+            after = range(self._end_year + 1, new_end + 1)
+
+        before_flags = [self._year_flags(y) for y in before]
+        after_flags = [self._year_flags(y) for y in after]
+        current = [(self._holiday, self._weekend, self._d, self._m, self._y)]
+
+        blocks = before_flags + current + after_flags
+        self._holiday = np.concatenate([b[0] for b in blocks])
+        self._weekend = np.concatenate([b[1] for b in blocks])
+        self._d = np.concatenate([b[2] for b in blocks])
+        self._m = np.concatenate([b[3] for b in blocks])
+        self._y = np.concatenate([b[4] for b in blocks])
+
+        self._start_year = new_start
+        self._end_year = new_end
+        self._start_serial = int(Date(1, 1, new_start)._excel_date)
+
+        n = len(self._holiday)
+        index = np.arange(n)
+        self._business = ~self._weekend & ~self._holiday
+        self._business_index = np.flatnonzero(self._business)
+        self._cum_business = np.cumsum(self._business)
+
+        num_business = len(self._business_index)
+        pos = np.searchsorted(self._business_index, index, side='left')
+        self._next_business = np.where(pos < num_business,
+                                       self._business_index[
+                                           np.minimum(pos, num_business - 1)],
+                                       -1)
+
+        pos = np.searchsorted(self._business_index, index, side='right') - 1
+        self._prev_business = np.where(pos >= 0,
+                                       self._business_index[
+                                           np.maximum(pos, 0)],
+                                       -1)
+
+    ###########################################################################
+
+    def index(self, dt: Date):
+        """ Position of a date in the table, extending the table so that the
+        year either side of the date is also covered. """
+
+        self.ensure_years(dt._y - 1, dt._y + 1)
+        return int(dt._excel_date) - self._start_serial
+
+    ###########################################################################
+
+    def indices(self, dates: DateArray):
+        """ Positions of an array of dates in the table. """
+
+        if len(dates) > 0:
+            self.ensure_years(int(dates._y.min()) - 1,
+                              int(dates._y.max()) + 1)
+
+        return dates._excel_dates.astype(np.int64) - self._start_serial
+
+    ###########################################################################
+
+    def date(self, i):
+        """ Date at position i of the table. """
+        return Date._from_serial(self._start_serial + int(i))
+
+    ###########################################################################
+
+    def next_business(self, dt: Date):
+        """ Position of the first business day after a date which is not a
+        business day. The table is extended if that day is beyond its end.
+        Returns None if there is no such day in the years that the holiday
+        rules cover. """
+
+        i = self.index(dt)
+        j = self._next_business[i]
+
+        while j < 0:
+
+            if self._end_year >= _LAST_EASTER_YEAR:
+                return None
+
+            self.ensure_years(self._start_year, self._end_year + 1)
+            j = self._next_business[i]
+
+        return j
+
+    ###########################################################################
+
+    def prev_business(self, dt: Date):
+        """ Position of the last business day before a date which is not a
+        business day. The table is extended if that day is before its start,
+        which moves the positions of all of the dates in the table. Returns
+        None if there is no such day on or after 1 Jan 1900. """
+
+        i = self.index(dt)
+        j = self._prev_business[i]
+
+        while j < 0:
+
+            if self._start_year <= 1900:
+                return None
+
+            self.ensure_years(self._start_year - 1, self._end_year)
+            i = self.index(dt)
+            j = self._prev_business[i]
+
+        return j
+
+###############################################################################
+
+
+def _business_day_table(calendar_type: CalendarTypes):
+    """ Return the process-wide business day table for a calendar type. """
+
+    table = _business_day_tables.get(calendar_type)
+
+    if table is None:
+        table = _BusinessDayTable(calendar_type)
+        _business_day_tables[calendar_type] = table
+
+    return table
+
+###############################################################################
+
+
+def clear_business_day_tables():
+    """ Remove all of the cached business day tables. They are rebuilt the
+    next time that a calendar is used. """
+    _business_day_tables.clear()
+
+###############################################################################
 
 
 class Calendar:
@@ -111,69 +321,100 @@ class Calendar:
         if busDayConventionType == BusDayAdjustTypes.NONE:
             return dt
 
-        elif busDayConventionType == BusDayAdjustTypes.FOLLOWING:
-
-            # step forward until we find a business day
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(1)
+        table = _business_day_table(self._type)
+        i = table.index(dt)
 
+        if table._business[i]:
             return dt
 
-        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_FOLLOWING:
+        if busDayConventionType == BusDayAdjustTypes.FOLLOWING:
 
-            d_start = dt._d
-            m_start = dt._m
-            y_start = dt._y
+            # step forward to the next business day
+            j = table.next_business(dt)
 
-            # step forward until we find a business day
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(1)
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_FOLLOWING:
 
-            # if the business day is in a different month look back
-            # for previous first business day one day at a time
-            # TODO: I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = Date(d_start, m_start, y_start)
-                while self.is_business_day(dt) is False:
-                    dt = dt.add_days(-1)
+            # step forward to the next business day and if that is in a
+            # different month look back for the previous business day
+            j = table.next_business(dt)
 
-            return dt
+            if j is None or table._m[j] != dt._m:
+                j = table.prev_business(dt)
 
         elif busDayConventionType == BusDayAdjustTypes.PRECEDING:
 
-            # if the business day is in the next month look back
-            # for previous first business day one day at a time
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(-1)
-
-            return dt
+            # step back to the previous business day
+            j = table.prev_business(dt)
 
         elif busDayConventionType == BusDayAdjustTypes.MODIFIED_PRECEDING:
 
-            d_start = dt._d
-            m_start = dt._m
-            y_start = dt._y
+            # step back to the previous business day and if that is in a
+            # different month look forward for the next business day
+            j = table.prev_business(dt)
 
-            # step backward until we find a business day
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(-1)
+            if j is None or table._m[j] != dt._m:
+                j = table.next_business(dt)
 
-            # if the business day is in a different month look forward
-            # for previous first business day one day at a time
-            # I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = Date(d_start, m_start, y_start)
-                while self.is_business_day(dt) is False:
-                    dt = dt.add_days(+1)
+        else:
 
-            return dt
+            raise FinError("Unknown adjustment convention" +
+                           str(busDayConventionType))
 
-        else:
+        if j is None:
+            raise FinError("Business day table does not cover result date")
+
+        return table.date(j)
+
+###############################################################################
+
+    def adjust_dates(self,
+                     dates: DateArray,
+                     busDayConventionType: BusDayAdjustTypes):
+        """ Vectorised version of adjust that adjusts all of the dates in a
+        DateArray at once and returns a new DateArray. """
+
+        if type(busDayConventionType) != BusDayAdjustTypes:
+            raise FinError("Invalid type passed. Need FinBusDayConventionType")
 
+        if isinstance(dates, DateArray) is False:
+            dates = DateArray(dates)
+
+        if busDayConventionType == BusDayAdjustTypes.NONE:
+            return dates
+
+        table = _business_day_table(self._type)
+        idx = table.indices(dates)
+
+        next_idx = table._next_business[idx]
+        prev_idx = table._prev_business[idx]
+
+        if busDayConventionType == BusDayAdjustTypes.FOLLOWING:
+            adj_idx = next_idx
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_FOLLOWING:
+            same_month = table._m[next_idx] == dates._m
+            adj_idx = np.where(same_month, next_idx, prev_idx)
+        elif busDayConventionType == BusDayAdjustTypes.PRECEDING:
+            adj_idx = prev_idx
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_PRECEDING:
+            same_month = table._m[prev_idx] == dates._m
+            adj_idx = np.where(same_month, prev_idx, next_idx)
+        else:
             raise FinError("Unknown adjustment convention" +
                            str(busDayConventionType))
 
-        return dt
+        # Business days keep their serial which may have an intraday part
+        adj_idx = np.where(table._business[idx], idx, adj_idx)
+        serials = np.where(adj_idx == idx, dates._excel_dates,
+                           adj_idx + table._start_serial).astype(np.float64)
+
+        # Dates with an adjacent business day beyond the ends of the table are
+        # adjusted one at a time as that extends the table
+        outside = ~table._business[idx] & ((next_idx < 0) | (prev_idx < 0))
+
+        for k in np.flatnonzero(outside):
+            serials[k] = self.adjust(dates[k], busDayConventionType)._excel_date
+
+        return DateArray(serials)
 
 ###############################################################################
 
@@ -183,33 +424,36 @@ class Calendar:
         """ Returns a new date that is numDays business days after Date.
         All holidays in the chosen calendar are assumed not business days. """
 
-        # TODO: REMOVE DATETIME DEPENDENCE HERE ???
-
         if isinstance(numDays, int) is False:
             raise FinError("Num days must be an integer")
 
-        dt = datetime.date(start_date._y, start_date._m, start_date._d)
-        d = dt.day
-        m = dt.month
-        y = dt.year
-        newDt = Date(d, m, y)
+        if numDays == 0:
+            return Date._from_serial(int(start_date._excel_date))
 
-        s = +1
-        if numDays < 0:
-            numDays = -1 * numDays
-            s = -1
+        table = _business_day_table(self._type)
 
-        while numDays > 0:
-            dt = dt + s * datetime.timedelta(days=1)
-            d = dt.day
-            m = dt.month
-            y = dt.year
-            newDt = Date(d, m, y)
+        # Roughly 250 business days a year so extend the table to cover
+        num_years = abs(numDays) // 200 + 1
 
-            if self.is_business_day(newDt) is True:
-                numDays -= 1
+        if numDays > 0:
+            table.ensure_years(start_date._y - 1, start_date._y + num_years)
+        else:
+            table.ensure_years(start_date._y - num_years, start_date._y + 1)
 
-        return newDt
+        i = table.index(start_date)
+        num_business_before = table._cum_business[i] - table._business[i]
+
+        if numDays > 0:
+            # count the business days strictly after the start date
+            k = table._cum_business[i] + numDays - 1
+        else:
+            # count the business days strictly before the start date
+            k = num_business_before + numDays
+
+        if k < 0 or k >= len(table._business_index):
+            raise FinError("Business day table does not cover result date")
+
+        return table.date(table._business_index[k])
 
 ###############################################################################
 
@@ -220,13 +464,9 @@ class Calendar:
 
         # For all calendars so far, SAT and SUN are not business days
         # If this ever changes I will need to add a filter here.
-        if dt.is_weekend():
-            return False
-
-        if self.is_holiday(dt) is True:
-            return False
-        else:
-            return True
+        table = _business_day_table(self._type)
+        i = table.index(dt)
+        return bool(table._business[i])
 
 ###############################################################################
 
@@ -234,7 +474,18 @@ class Calendar:
                   dt: Date):
         """ Determines if a date is a Holiday according to the specified
         calendar. Weekends are not holidays unless the holiday falls on a 
-        weekend date. """
+        weekend date. This is a lookup in the cached business day table. """
+
+        table = _business_day_table(self._type)
+        i = table.index(dt)
+        return bool(table._holiday[i])
+
+###############################################################################
+
+    def _is_holiday_by_rules(self,
+                             dt: Date):
+        """ Evaluate the holiday rules of the calendar for a date. This is
+        used to build the cached business day table. """
 
         start_date = Date(1, 1, dt._y)
         day_in_year = dt._excel_date - start_date._excel_date + 1
@@ -104,6 +104,11 @@ gDateCounterList = None
 gStartYear = 1900
 gEndYear = 2100
 
+# Day, month and year of each Excel serial number covered by gDateCounterList
+gDayFromSerial = None
+gMonthFromSerial = None
+gYearFromSerial = None
+
 
 def calculate_list():
     """ Calculate list of dates so that we can do quick lookup to get the
@@ -111,45 +116,79 @@ def calculate_list():
     FACT THAT EXCEL MISTAKENLY CALLS 1900 A LEAP YEAR. For us, agreement with
     Excel is more important than this leap year error and in any case, we will
     not usually be calculating day differences with start dates before 28 Feb
-    1900. Note that Excel inherited this "BUG" from LOTUS 1-2-3. """
+    1900. Note that Excel inherited this "BUG" from LOTUS 1-2-3.
 
-    day_counter = 0
-    max_days = 0
+    The list is a Numpy array padded to 31 days in every month, with invalid
+    days set to -999. We also calculate the reverse mapping from the Excel
+    serial number to the day, month and year so that dates can be created
+    directly from a serial number. """
 
     global gDateCounterList
-    global gStartYear
-    global gEndYear
+    global gDayFromSerial
+    global gMonthFromSerial
+    global gYearFromSerial
 
-    gDateCounterList = []
+    years = np.arange(1900, gEndYear + 1)
 
-    idx = -1  # the first element will be idx=0
+    leap_years = ((years % 4 == 0) & (years % 100 != 0)) | (years % 400 == 0)
 
-    for yy in range(1900, gEndYear+1):
+    # DO NOT CHANGE THIS FOR AGREEMENT WITH EXCEL WHICH ASSUMES THAT 1900
+    # WAS A LEAP YEAR AND THAT 29 FEB 1900 ACTUALLY HAPPENED. A LOTUS BUG.
+    leap_years[0] = True
 
-        # DO NOT CHANGE THIS FOR AGREEMENT WITH EXCEL WHICH ASSUMES THAT 1900
-        # WAS A LEAP YEAR AND THAT 29 FEB 1900 ACTUALLY HAPPENED. A LOTUS BUG.
-        if yy == 1900:
-            leap_year = True
-        else:
-            leap_year = is_leap_year(yy)
+    max_days = np.where(leap_years[:, None],
+                        np.array(monthDaysLeapYear),
+                        np.array(monthDaysNotLeapYear))
 
-        for mm in range(1, 13):
+    valid = np.arange(1, 32)[None, None, :] <= max_days[:, :, None]
+    valid = valid.ravel()
 
-            if leap_year is True:
-                max_days = monthDaysLeapYear[mm-1]
-            else:
-                max_days = monthDaysNotLeapYear[mm-1]
+    day_counter = np.cumsum(valid)
+    counter_list = np.where(valid, day_counter, -999)
+
+    # The padded list starts in the start year
+    first_idx = (gStartYear - 1900) * 12 * 31
+    gDateCounterList = counter_list[first_idx:]
+
+    idx = np.flatnonzero(valid)
+    num_serials = day_counter[-1] + 1
+
+    gDayFromSerial = np.zeros(num_serials, dtype=np.int64)
+    gMonthFromSerial = np.zeros(num_serials, dtype=np.int64)
+    gYearFromSerial = np.zeros(num_serials, dtype=np.int64)
+
+    gDayFromSerial[day_counter[idx]] = idx % 31 + 1
+    gMonthFromSerial[day_counter[idx]] = (idx // 31) % 12 + 1
+    gYearFromSerial[day_counter[idx]] = 1900 + idx // (12 * 31)
+
+
+calculate_list()
+
+###############################################################################
+
+
+def _extend_date_list(y):
+    """ Extend the date list so that it runs to the end of year y. """
+
+    global gEndYear
+
+    if y > gEndYear:
+        gEndYear = y
+        calculate_list()
+
+###############################################################################
 
-            for _ in range(1, max_days+1):
-                idx += 1
-                day_counter += 1
-                if yy >= gStartYear:
-                    gDateCounterList.append(day_counter)
 
-            for _ in range(max_days, 31):
-                idx += 1
-                if yy >= gStartYear:
-                    gDateCounterList.append(-999)
+def _serial(d, m, y):
+    """ Excel serial number of a valid date d/m/y. No checks are done on the
+    day and month so this is only for dates calculated internally. """
+
+    if y > gEndYear:
+        _extend_date_list(y)
+
+    return gDateCounterList.item((y - gStartYear) * 372 + (m - 1) * 31 + d - 1)
+
+###############################################################################
 
 ###############################################################################
 # The index in these functions is not the excel date index used as the
@@ -186,6 +225,75 @@ def weekday(day_count):
 
 ###############################################################################
 
+TENOR_DAYS = 1
+TENOR_WEEKS = 2
+TENOR_MONTHS = 3
+TENOR_YEARS = 4
+
+
+def _parse_tenor(tenStr: str):
+    """ Split a tenor string such as 3M into its period type and the number
+    of periods. ON and TN are both treated as one day. """
+
+    tenStr = tenStr.upper()
+
+    if tenStr == "ON":   # overnight - should be used only if spot days = 0
+        return (TENOR_DAYS, 1)
+    elif tenStr == "TN":  # overnight - should be used when spot days > 0
+        return (TENOR_DAYS, 1)
+    elif tenStr[-1] == "D":
+        return (TENOR_DAYS, int(tenStr[0:-1]))
+    elif tenStr[-1] == "W":
+        return (TENOR_WEEKS, int(tenStr[0:-1]))
+    elif tenStr[-1] == "M":
+        return (TENOR_MONTHS, int(tenStr[0:-1]))
+    elif tenStr[-1] == "Y":
+        return (TENOR_YEARS, int(tenStr[0:-1]))
+    else:
+        raise FinError("Unknown tenor type in " + tenStr)
+
+###############################################################################
+
+
+def _add_months(d, m, y, num_months):
+    """ Day, month and year num_months after d/m/y. If the day is after the
+    end of the new month it is moved back to the month end. """
+
+    (dy, m0) = divmod(m - 1 + num_months, 12)
+    m = m0 + 1
+    y = y + dy
+
+    if d > 28:
+        if is_leap_year(y):
+            d = min(d, monthDaysLeapYear[m - 1])
+        else:
+            d = min(d, monthDaysNotLeapYear[m - 1])
+
+    return (d, m, y)
+
+###############################################################################
+
+
+def _step_months(d, m, y, step, num_steps):
+    """ Day, month and year after num_steps steps of step months from d/m/y.
+    The day is moved back to the month end at each step where necessary so
+    that 31 JAN stepped by 1M twice gives 28 MAR. Negative num_steps step
+    backwards in time. """
+
+    if d <= 28:
+        return _add_months(d, m, y, step * num_steps)
+
+    if num_steps < 0:
+        step = -step
+        num_steps = -num_steps
+
+    for _ in range(0, num_steps):
+        (d, m, y) = _add_months(d, m, y, step)
+
+    return (d, m, y)
+
+###############################################################################
+
 
 class Date():
     """ A date class to manage dates that is simple to use and includes a
@@ -199,6 +307,10 @@ class Date():
     SAT = 5
     SUN = 6
 
+    # Dates are created in very large numbers so we do without a __dict__
+    __slots__ = ("_y", "_m", "_d", "_hh", "_mm", "_ss",
+                 "_excel_date", "_weekday")
+
     ###########################################################################
 
     def __init__(self, d, m, y, hh=0, mm=0, ss=0):
@@ -211,29 +323,18 @@ class Date():
         start_date = Date(1, 1, 2018)
         """
 
-        global gStartYear
-        global gEndYear
-
         # If the date has been entered as y, m, d we flip it to d, m, y
         # This message should be removed after a few releases
         if d >= gStartYear and d < gEndYear and y > 0 and y <= 31:
             raise FinError(
                 "Date arguments must now be in the order Date(dd, mm, yyyy)")
 
-        if gDateCounterList is None:
-            calculate_list()
-
         if y < 1900:
             raise FinError("Year cannot be before 1900")
 
         # Resize date list dynamically if required
-        if y < gStartYear:
-            gStartYear = y
-            calculate_list()
-
         if y > gEndYear:
-            gEndYear = y
-            calculate_list()
+            _extend_date_list(y)
 
         if y < gStartYear or y > gEndYear:
             raise FinError(
@@ -295,15 +396,55 @@ class Date():
 
     ###########################################################################
 
+    @classmethod
+    def from_excel_date(cls, excel_date: (int, float)):
+        """ Create a Date from its Excel serial day number. Any fraction of a
+        day is ignored.
+        Example Input:
+        start_date = Date.from_excel_date(43101) """
+
+        serial = int(excel_date)
+
+        if serial < 1:
+            raise FinError("Excel date must be on or after 1 Jan 1900")
+
+        return cls._from_serial(serial)
+
+    ###########################################################################
+
+    @classmethod
+    def _from_serial(cls, serial: int):
+        """ Trusted construction of a Date from an integer Excel serial day
+        number. This skips all of the checks done by the constructor and is
+        used by the date arithmetic functions which generate valid serials."""
+
+        if serial < 1:
+            raise FinError("Date cannot be before 1 Jan 1900")
+
+        if serial >= len(gYearFromSerial):
+            _extend_date_list(gEndYear + (serial - len(gYearFromSerial)) //
+                              365 + 1)
+
+        dt = object.__new__(cls)
+        dt._d = gDayFromSerial.item(serial)
+        dt._m = gMonthFromSerial.item(serial)
+        dt._y = gYearFromSerial.item(serial)
+        dt._hh = 0
+        dt._mm = 0
+        dt._ss = 0
+        dt._excel_date = float(serial)
+        dt._weekday = (serial + 5) % 7
+        return dt
+
+    ###########################################################################
+
     def _refresh(self):
         """ Update internal representation of date as number of days since the
         1st Jan 1900. This is same as Excel convention. """
 
-        idx = date_index(self._d, self._m, self._y)
-        daysSinceFirstJan1900 = gDateCounterList[idx]
-        wd = weekday(daysSinceFirstJan1900)
+        daysSinceFirstJan1900 = _serial(self._d, self._m, self._y)
         self._excel_date = daysSinceFirstJan1900
-        self._weekday = wd
+        self._weekday = (daysSinceFirstJan1900 + 5) % 7
 
     ###########################################################################
 
@@ -377,12 +518,10 @@ class Date():
 
         if leap_year:
             lastDay = monthDaysLeapYear[m - 1]
-            return Date(lastDay, m, y)
         else:
             lastDay = monthDaysNotLeapYear[m - 1]
-            return Date(lastDay, m, y)
 
-        return False
+        return Date._from_serial(_serial(lastDay, m, y))
 
     ###########################################################################
 
@@ -411,20 +550,8 @@ class Date():
         """ Returns a new date that is numDays after the Date. I also make
         it possible to go backwards a number of days. """
 
-        idx = date_index(self._d, self._m, self._y)
-
-        step = +1
-        if numDays < 0:
-            step = -1
-
-        while numDays != 0:
-            idx += step
-            if gDateCounterList[idx] > 0:
-                numDays -= step
-
-        (d, m, y) = date_from_index(idx)
-        newDt = Date(d, m, y)
-        return newDt
+        serial = _serial(self._d, self._m, self._y) + int(numDays)
+        return Date._from_serial(serial)
 
     ###########################################################################
 
@@ -489,30 +616,12 @@ class Date():
             if int(mmi) != mmi:
                 raise FinError("Must only pass integers or float integers.")
 
-            mmi = int(mmi)
-
-            d = self._d
-            m = self._m + mmi
-            y = self._y
+            (d, m, y) = _add_months(self._d, self._m, self._y, int(mmi))
 
-            while m > 12:
-                m = m - 12
-                y += 1
+            if y < 1900:
+                raise FinError("Year cannot be before 1900")
 
-            while m < 1:
-                m = m + 12
-                y -= 1
-
-            leap_year = is_leap_year(y)
-
-            if leap_year:
-                if d > monthDaysLeapYear[m - 1]:
-                    d = monthDaysLeapYear[m-1]
-            else:
-                if d > monthDaysNotLeapYear[m - 1]:
-                    d = monthDaysNotLeapYear[m-1]
-
-            newDt = Date(d, m, y)
+            newDt = Date._from_serial(_serial(d, m, y))
             dateList.append(newDt)
 
         if scalarFlag is True:
@@ -668,7 +777,7 @@ class Date():
         letter being d, w, m , y for day, week, month or year. This is case
         independent. For example 10Y means 10 years while 120m also means 10
         years. The date is NOT weekend or holiday calendar adjusted. This must
-        be done AFTERWARDS. """
+        be done AFTERWARDS. A negative tenor such as -3M moves backwards. """
 
         listFlag = False
 
@@ -684,52 +793,29 @@ class Date():
                 raise FinError("Tenor must be a string e.g. '5Y'")
 
         newDates = []
+        serial = _serial(self._d, self._m, self._y)
 
         for tenStr in tenor:
-            tenStr = tenStr.upper()
-            DAYS = 1
-            WEEKS = 2
-            MONTHS = 3
-            YEARS = 4
-
-            periodType = 0
-            num_periods = 0
-
-            if tenStr == "ON":   # overnight - should be used only if spot days = 0
-                periodType = DAYS
-                num_periods = 1
-            elif tenStr == "TN":  # overnight - should be used when spot days > 0
-                periodType = DAYS
-                num_periods = 1
-            elif tenStr[-1] == "D":
-                periodType = DAYS
-                num_periods = int(tenStr[0:-1])
-            elif tenStr[-1] == "W":
-                periodType = WEEKS
-                num_periods = int(tenStr[0:-1])
-            elif tenStr[-1] == "M":
-                periodType = MONTHS
-                num_periods = int(tenStr[0:-1])
-            elif tenStr[-1] == "Y":
-                periodType = YEARS
-                num_periods = int(tenStr[0:-1])
+
+            (periodType, num_periods) = _parse_tenor(tenStr)
+
+            if periodType == TENOR_DAYS:
+                newDate = Date._from_serial(serial + num_periods)
+            elif periodType == TENOR_WEEKS:
+                newDate = Date._from_serial(serial + 7 * num_periods)
             else:
-                raise FinError("Unknown tenor type in " + tenor)
-
-            newDate = Date(self._d, self._m, self._y)
-
-            if periodType == DAYS:
-                for _ in range(0, num_periods):
-                    newDate = newDate.add_days(1)
-            elif periodType == WEEKS:
-                for _ in range(0, num_periods):
-                    newDate = newDate.add_days(7)
-            elif periodType == MONTHS:
-                for _ in range(0, num_periods):
-                    newDate = newDate.add_months(1)
-            elif periodType == YEARS:
-                for _ in range(0, num_periods):
-                    newDate = newDate.add_months(12)
+                if periodType == TENOR_MONTHS:
+                    step = 1
+                else:
+                    step = 12
+
+                (d, m, y) = _step_months(self._d, self._m, self._y,
+                                         step, num_periods)
+
+                if y < 1900:
+                    raise FinError("Year cannot be before 1900")
+
+                newDate = Date._from_serial(_serial(d, m, y))
 
             newDates.append(newDate)
 
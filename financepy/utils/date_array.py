@@ -0,0 +1,322 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from numba import njit, int64
+import numpy as np
+
+from .date import Date, _parse_tenor
+from .date import TENOR_DAYS, TENOR_WEEKS, TENOR_MONTHS
+from .error import FinError
+
+###############################################################################
+# The Excel serial day number counts 1 Jan 1900 as day 1 and includes the
+# fictitious 29 Feb 1900 as day 60. We convert to and from the proleptic
+# Gregorian day count using the civil calendar algorithms of Howard Hinnant so
+# that whole arrays of dates can be processed without building Date objects.
+###############################################################################
+
+# Serial number of 30 Dec 1899 in the day count used by _days_from_civil
+EXCEL_EPOCH = -25569
+
+###############################################################################
+
+
+@njit(int64(int64, int64, int64), fastmath=True, cache=True)
+def _days_from_civil(y, m, d):
+    """ Number of days since 1 Jan 1970 of the date d/m/y. """
+
+    if m <= 2:
+        y -= 1
+
+    era = y // 400
+    yoe = y - era * 400
+
+    if m > 2:
+        mp = m - 3
+    else:
+        mp = m + 9
+
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+###############################################################################
+
+
+@njit(int64(int64, int64, int64), fastmath=True, cache=True)
+def excel_serial(y, m, d):
+    """ Excel serial day number of the date d/m/y. This agrees with the table
+    used by the Date class including the 1900 leap year error. """
+
+    serial = _days_from_civil(y, m, d) - EXCEL_EPOCH
+
+    # Dates before 1 Mar 1900 do not see the fictitious 29 Feb 1900
+    if serial < 61:
+        serial -= 1
+
+    return serial
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _ymd_from_excel_serials(serials):
+    """ Convert a vector of Excel serial day numbers into vectors of day,
+    month and year. Any intraday fraction of the serial is ignored. """
+
+    n = len(serials)
+    dd = np.empty(n, np.int32)
+    mm = np.empty(n, np.int32)
+    yy = np.empty(n, np.int32)
+
+    for i in range(0, n):
+
+        serial = int(np.floor(serials[i]))
+
+        if serial == 60:
+            dd[i] = 29
+            mm[i] = 2
+            yy[i] = 1900
+            continue
+        elif serial < 60:
+            serial += 1
+
+        z = serial + EXCEL_EPOCH + 719468
+        era = z // 146097
+        doe = z - era * 146097
+        yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+        y = yoe + era * 400
+        doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+        mp = (5 * doy + 2) // 153
+        d = doy - (153 * mp + 2) // 5 + 1
+
+        if mp < 10:
+            m = mp + 3
+        else:
+            m = mp - 9
+
+        if m <= 2:
+            y += 1
+
+        dd[i] = d
+        mm[i] = m
+        yy[i] = y
+
+    return dd, mm, yy
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _excel_serials_from_ymd(dd, mm, yy):
+    """ Convert vectors of day, month and year into Excel serial numbers. """
+
+    n = len(dd)
+    serials = np.empty(n)
+
+    for i in range(0, n):
+        serials[i] = excel_serial(yy[i], mm[i], dd[i])
+
+    return serials
+
+###############################################################################
+
+
+@njit(int64(int64, int64), fastmath=True, cache=True)
+def _month_days(m, y):
+    """ Number of days in month m of year y. """
+
+    if m == 2:
+        if (y % 4 == 0 and y % 100 != 0) or y % 400 == 0:
+            return 29
+        return 28
+    elif m == 4 or m == 6 or m == 9 or m == 11:
+        return 30
+
+    return 31
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _step_months_vector(dd, mm, yy, step, num_steps):
+    """ Vectorised version of the month stepping used by Date.add_tenor. Each
+    date is moved num_steps times by step months with the day moved back to
+    the month end at each step where necessary. """
+
+    n = len(dd)
+    d_out = np.empty(n, np.int32)
+    m_out = np.empty(n, np.int32)
+    y_out = np.empty(n, np.int32)
+
+    if num_steps < 0:
+        step = -step
+        num_steps = -num_steps
+
+    for i in range(0, n):
+
+        d = dd[i]
+        m = mm[i]
+        y = yy[i]
+
+        # Days up to the 28th never need moving so we can jump in one go
+        if d <= 28:
+            k = step * num_steps
+            num_loops = 1
+        else:
+            k = step
+            num_loops = num_steps
+
+        for _ in range(0, num_loops):
+            z = m - 1 + k
+            y += z // 12
+            m = z % 12 + 1
+            d = min(d, _month_days(m, y))
+
+        d_out[i] = d
+        m_out[i] = m
+        y_out[i] = y
+
+    return d_out, m_out, y_out
+
+###############################################################################
+
+
+class DateArray():
+    """ A compact array of dates that holds the Excel serial day numbers of
+    the dates as a Numpy vector together with vectors of their day, month and
+    year. It is built once from a list of Dates, from a vector of Excel serial
+    numbers or from another DateArray and can then be passed to functions such
+    as times_from_dates, DayCount.year_frac and DiscountCurve.df which process
+    all of the dates in a single vectorised pass. """
+
+    def __init__(self,
+                 dates: (list, np.ndarray)):
+        """ Create a DateArray from a list of Dates or from a Numpy array of
+        Excel serial day numbers such as that returned by excel_dates(). """
+
+        if isinstance(dates, DateArray):
+
+            self._excel_dates = dates._excel_dates
+            self._d = dates._d
+            self._m = dates._m
+            self._y = dates._y
+
+        elif isinstance(dates, np.ndarray):
+
+            if dates.ndim != 1:
+                raise FinError("DateArray needs a one dimensional array")
+
+            self._excel_dates = dates.astype(np.float64)
+            self._d, self._m, self._y = \
+                _ymd_from_excel_serials(self._excel_dates)
+
+        elif isinstance(dates, (list, tuple)):
+
+            try:
+                fields = np.array([(dt._excel_date, dt._d, dt._m, dt._y)
+                                   for dt in dates], dtype=np.float64)
+            except AttributeError:
+                raise FinError("DateArray list must only contain Dates")
+
+            fields = fields.reshape(len(dates), 4)
+            self._excel_dates = fields[:, 0].copy()
+            self._d = fields[:, 1].astype(np.int32)
+            self._m = fields[:, 2].astype(np.int32)
+            self._y = fields[:, 3].astype(np.int32)
+
+        else:
+            raise FinError("DateArray needs a list of Dates or an ndarray")
+
+    ###########################################################################
+
+    def excel_dates(self):
+        """ Returns the Excel serial day numbers of the dates. """
+        return self._excel_dates
+
+    ###########################################################################
+
+    def to_list(self):
+        """ Returns the dates as a list of Date objects. """
+        return [self[i] for i in range(0, len(self))]
+
+    ###########################################################################
+
+    def add_tenor(self,
+                  tenor: str):
+        """ Returns a DateArray of the dates moved forward by the tenor, with
+        exactly the same result as calling Date.add_tenor on each date. The
+        dates are NOT weekend or holiday calendar adjusted. """
+
+        if isinstance(tenor, str) is False:
+            raise FinError("Tenor must be a string e.g. '5Y'")
+
+        (periodType, num_periods) = _parse_tenor(tenor)
+
+        serials = np.floor(self._excel_dates)
+
+        if periodType == TENOR_DAYS:
+            serials = serials + num_periods
+        elif periodType == TENOR_WEEKS:
+            serials = serials + 7 * num_periods
+        else:
+            if periodType == TENOR_MONTHS:
+                step = 1
+            else:
+                step = 12
+
+            dd, mm, yy = _step_months_vector(self._d, self._m, self._y,
+                                             step, num_periods)
+
+            if len(yy) > 0 and yy.min() < 1900:
+                raise FinError("Year cannot be before 1900")
+
+            serials = _excel_serials_from_ymd(dd, mm, yy)
+
+        if len(serials) > 0 and serials.min() < 1:
+            raise FinError("Date cannot be before 1 Jan 1900")
+
+        return DateArray(serials)
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._excel_dates)
+
+    ###########################################################################
+
+    def __getitem__(self, i):
+
+        if isinstance(i, slice):
+            return DateArray(self._excel_dates[i])
+
+        return Date._from_serial(int(self._excel_dates[i]))
+
+    ###########################################################################
+
+    def __sub__(self, other):
+        """ Returns the number of days between each date and a Date or the
+        corresponding date of another DateArray. """
+
+        if isinstance(other, Date):
+            return self._excel_dates - other._excel_date
+        elif isinstance(other, DateArray):
+            return self._excel_dates - other._excel_dates
+        else:
+            raise FinError("Can only subtract a Date or a DateArray")
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ Returns a string showing the dates in the array. """
+
+        n = len(self)
+        s = "DateArray(" + str(n) + " dates"
+
+        if n > 0:
+            s += ": " + str(self[0]) + " to " + str(self[n - 1])
+
+        return s + ")"
+
+###############################################################################
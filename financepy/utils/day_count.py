@@ -2,8 +2,12 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+from numba import njit
+import numpy as np
+
 from .date import Date, monthDaysLeapYear, monthDaysNotLeapYear, datediff
 from .date import is_leap_year
+from .date_array import DateArray, excel_serial
 from .error import FinError
 from .frequency import FrequencyTypes, annual_frequency
 from .global_vars import gDaysInYear
@@ -32,6 +36,130 @@ def is_last_day_of_feb(dt: Date):
 
 ###############################################################################
 
+
+@njit(fastmath=True, cache=True)
+def _is_leap_year(y):
+    """ Numba version of is_leap_year for use inside the vector kernels. """
+    return ((y % 4 == 0) and (y % 100 != 0) or (y % 400 == 0))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _thirty_360_nums(d1s, m1s, y1s, d2s, m2s, y2s, dcc, is_termination):
+    """ Vectorised day count numerators for the 30/360 family. The value of
+    dcc is the value of the DayCountTypes enum. The logic is the same as in
+    DayCount.year_frac. """
+
+    n = len(d1s)
+    nums = np.empty(n)
+
+    for i in range(0, n):
+
+        d1 = d1s[i]
+        m1 = m1s[i]
+        y1 = y1s[i]
+        d2 = d2s[i]
+        m2 = m2s[i]
+        y2 = y2s[i]
+
+        if dcc == 1:  # THIRTY_360_BOND
+
+            if d1 == 31:
+                d1 = 30
+
+            if d2 == 31 and d1 == 30:
+                d2 = 30
+
+        elif dcc == 2:  # THIRTY_E_360
+
+            if d1 == 31:
+                d1 = 30
+
+            if d2 == 31:
+                d2 = 30
+
+        elif dcc == 3:  # THIRTY_E_360_ISDA
+
+            if d1 == 31:
+                d1 = 30
+
+            if m1 == 2:
+                if _is_leap_year(y1):
+                    if d1 == 29:
+                        d1 = 30
+                elif d1 == 28:
+                    d1 = 30
+
+            if d2 == 31:
+                d2 = 30
+
+            if m2 == 2 and is_termination is False:
+                if _is_leap_year(y2):
+                    if d2 == 29:
+                        d2 = 30
+                elif d2 == 28:
+                    d2 = 30
+
+        elif dcc == 4:  # THIRTY_E_PLUS_360
+
+            if d1 == 31:
+                d1 = 30
+
+            if d2 == 31:
+                m2 = m2 + 1
+                d2 = 1
+
+        nums[i] = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+
+    return nums
+
+###############################################################################
+
+
+@njit(cache=True)
+def _act_act_isda_fracs(dt1s, y1s, dt2s, y2s):
+    """ Vectorised ACT ACT ISDA year fractions, numerators and denominators
+    using the same logic as DayCount.year_frac. The dates are passed as
+    Excel serial numbers. We avoid fastmath so that the sums are evaluated in
+    the same order as in the scalar calculation. """
+
+    n = len(dt1s)
+    acc_factors = np.empty(n)
+    nums = np.empty(n)
+    dens = np.empty(n)
+
+    for i in range(0, n):
+
+        y1 = y1s[i]
+        y2 = y2s[i]
+
+        if _is_leap_year(y1):
+            denom1 = 366
+        else:
+            denom1 = 365
+
+        if _is_leap_year(y2):
+            denom2 = 366
+        else:
+            denom2 = 365
+
+        if y1 == y2:
+            nums[i] = dt2s[i] - dt1s[i]
+            dens[i] = denom1
+            acc_factors[i] = (dt2s[i] - dt1s[i]) / denom1
+        else:
+            daysYear1 = int(excel_serial(y1 + 1, 1, 1) - dt1s[i])
+            daysYear2 = int(dt2s[i] - excel_serial(y2, 1, 1))
+            acc_factor1 = daysYear1 / denom1
+            acc_factor2 = daysYear2 / denom2
+            yearDiff = y2 - y1 - 1.0
+            nums[i] = daysYear1 + daysYear2
+            dens[i] = denom1 + denom2
+            acc_factors[i] = acc_factor1 + acc_factor2 + yearDiff
+
+    return acc_factors, nums, dens
+
 ###############################################################################
 #    THIRTY_360_BOND = 1  # 30E/360 ISDA 2006 4.16f, German, Eurobond(ISDA 2000)
 #    THIRTY_E_360 = 2  # ISDA 2006 4.16(g) 30/360 ISMA, ICMA
@@ -102,8 +230,17 @@ class DayCount:
         https://en.wikipedia.org/wiki/Day_count_convention
         and
         http://data.cbonds.info/files/cbondscalc/Calculator.pdf
+
+        Any of the dates can also be a DateArray in which case the year
+        fractions are calculated for all of the dates in one vectorised pass
+        and the outputs are Numpy arrays. Scalar dates are broadcast.
         """
 
+        if isinstance(dt1, DateArray) or isinstance(dt2, DateArray) or \
+                isinstance(dt3, DateArray):
+            return self._year_frac_array(dt1, dt2, dt3, freq_type,
+                                         isTerminationDate)
+
         d1 = dt1._d
         m1 = dt1._m
         y1 = dt1._y
@@ -285,6 +422,101 @@ class DayCount:
             raise FinError(str(self._type) +
                            " is not one of DayCountTypes")
 
+###############################################################################
+
+    def _year_frac_array(self,
+                         dt1: (Date, DateArray),
+                         dt2: (Date, DateArray),
+                         dt3: (Date, DateArray) = None,
+                         freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
+                         isTerminationDate: bool = False):
+        """ Vectorised version of year_frac for when at least one of the dates
+        is a DateArray. Returns arrays of year fractions, numerators and
+        denominators. """
+
+        n = 0
+        for dt in (dt1, dt2, dt3):
+            if isinstance(dt, DateArray):
+                if n > 0 and len(dt) != n:
+                    raise FinError("DateArrays must have the same length")
+                n = len(dt)
+
+        def broadcast(dt):
+            if isinstance(dt, DateArray):
+                return dt
+            return DateArray(np.full(n, dt._excel_date))
+
+        a1 = broadcast(dt1)
+        a2 = broadcast(dt2)
+
+        if self._type in (DayCountTypes.THIRTY_360_BOND,
+                          DayCountTypes.THIRTY_E_360,
+                          DayCountTypes.THIRTY_E_360_ISDA,
+                          DayCountTypes.THIRTY_E_PLUS_360):
+
+            num = _thirty_360_nums(a1._d, a1._m, a1._y, a2._d, a2._m, a2._y,
+                                   self._type.value, bool(isTerminationDate))
+            den = np.full(n, 360.0)
+            acc_factor = num / den
+            return (acc_factor, num, den)
+
+        elif self._type == DayCountTypes.ACT_ACT_ISDA:
+
+            return _act_act_isda_fracs(a1._excel_dates, a1._y,
+                                       a2._excel_dates, a2._y)
+
+        elif self._type == DayCountTypes.ACT_ACT_ICMA:
+
+            freq = annual_frequency(freq_type)
+
+            if dt3 is None or freq is None:
+                raise FinError("ACT_ACT_ICMA requires three dates and a freq")
+
+            a3 = broadcast(dt3)
+            num = a2._excel_dates - a1._excel_dates
+            den = freq * (a3._excel_dates - a1._excel_dates)
+            acc_factor = num / den
+            return (acc_factor, num, den)
+
+        elif self._type in (DayCountTypes.ACT_365F,
+                            DayCountTypes.ACT_360,
+                            DayCountTypes.SIMPLE):
+
+            if self._type == DayCountTypes.ACT_365F:
+                days_in_year = 365
+            elif self._type == DayCountTypes.ACT_360:
+                days_in_year = 360
+            else:
+                days_in_year = gDaysInYear
+
+            num = a2._excel_dates - a1._excel_dates
+            den = np.full(n, days_in_year, dtype=np.float64)
+            acc_factor = num / days_in_year
+            return (acc_factor, num, den)
+
+        # The remaining conventions are rare so we loop over the dates
+        acc_factor = np.empty(n)
+        num = np.empty(n)
+        den = np.empty(n)
+
+        for i in range(0, n):
+
+            d1 = a1[i]
+            d2 = a2[i]
+
+            if dt3 is None:
+                d3 = None
+            elif isinstance(dt3, DateArray):
+                d3 = dt3[i]
+            else:
+                d3 = dt3
+
+            acc_factor[i], num[i], den[i] = self.year_frac(d1, d2, d3,
+                                                           freq_type,
+                                                           isTerminationDate)
+
+        return (acc_factor, num, den)
+
 ###############################################################################
 
     def __repr__(self):
@@ -7,6 +7,7 @@ import numpy as np
 from numba import njit, float64
 from typing import Union
 from .date import Date
+from .date_array import DateArray
 from .global_vars import gDaysInYear, gSmall
 from .error import FinError
 from .day_count import DayCountTypes, DayCount
@@ -75,13 +76,15 @@ def pv01_times(t: float,
 ###############################################################################
 
 
-def times_from_dates(dt: (Date, list),
+def times_from_dates(dt: (Date, list, DateArray),
                      valuation_date: Date,
                      day_count_type: DayCountTypes = None):
     """ If a single date is passed in then return the year from valuation date
     but if a whole vector of dates is passed in then convert to a vector of
     times from the valuation date. The output is always a numpy vector of times
-    which has only one element if the input is only one date. """
+    which has only one element if the input is only one date. A vector of
+    dates can be a list of Dates or a DateArray. Both are converted in a single
+    vectorised pass. """
 
     if isinstance(valuation_date, Date) is False:
         raise FinError("Valuation date is not a Date")
@@ -101,17 +104,22 @@ def times_from_dates(dt: (Date, list),
 
         return times[0]
 
+    elif isinstance(dt, DateArray):
+
+        if dcCounter is None:
+            times = (dt._excel_dates - valuation_date._excel_date) / gDaysInYear
+        else:
+            times = dcCounter.year_frac(valuation_date, dt)[0]
+
+        return times
+
     elif isinstance(dt, list) and isinstance(dt[0], Date):
-        num_dates = len(dt)
-        times = []
-        for i in range(0, num_dates):
-            if dcCounter is None:
-                t = (dt[i] - valuation_date) / gDaysInYear
-            else:
-                t = dcCounter.year_frac(valuation_date, dt[i])[0]
-            times.append(t)
 
-        return np.array(times)
+        if dcCounter is None:
+            excel_dates = np.array([d._excel_date for d in dt])
+            return (excel_dates - valuation_date._excel_date) / gDaysInYear
+
+        return dcCounter.year_frac(valuation_date, DateArray(dt))[0]
 
     elif isinstance(dt, np.ndarray):
         raise FinError("You passed an ndarray instead of dates.")
@@ -366,7 +374,7 @@ def to_usable_type(t):
         origin = t.__origin__
         # t comes from the `typing` module
         if origin is list:
-            return (list, np.ndarray)
+            return (list, tuple, np.ndarray)
         elif origin is Union:
             types = t.__args__
             return tuple(to_usable_type(tp) for tp in types)
@@ -419,6 +427,47 @@ def uniform_to_default_time(u, t, v):
     return tau
 
 
+###############################################################################
+
+
+def uniforms_to_default_times(u, t, v):
+    """ Map an array of uniform random variables to default times given a
+    survival probability curve in the same way as uniform_to_default_time.
+    The cumulative hazards -log(v) increase with time so the curve interval
+    of every uniform is found with a single searchsorted call. The default
+    time is then linear in the cumulative hazard with a slope and an origin
+    taken from a table with one entry per interval. """
+
+    u = np.asarray(u, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    hazards = -np.log(np.asarray(v, dtype=np.float64))
+    num_points = len(hazards)
+
+    # Entry i is the interval ending at point i and the last entry is beyond
+    # the last point where the average hazard to the last time is used
+    t_origin = np.zeros(num_points + 1)
+    h_origin = np.zeros(num_points + 1)
+    slope = np.zeros(num_points + 1)
+
+    t_origin[1:num_points] = t[:-1]
+    h_origin[1:num_points] = hazards[:-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope[1:num_points] = np.diff(t) / np.diff(hazards)
+        slope[num_points] = t[-1] / hazards[-1]
+        h = -np.log(u)
+
+    index = np.searchsorted(hazards, h, side="right")
+
+    with np.errstate(invalid="ignore"):
+        tau = t_origin[index] + slope[index] * (h - h_origin[index])
+
+    tau = np.where(u == 0.0, 99999.0, tau)
+    tau = np.where(u == 1.0, 0.0, tau)
+
+    return tau
+
+
 ###############################################################################
 # THIS IS NOT USED
 
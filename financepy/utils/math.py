@@ -3,7 +3,7 @@
 ###############################################################################
 
 
-from math import exp, sqrt, fabs, log
+from math import exp, sqrt, fabs, log, lgamma
 from numba import njit, boolean, int64, float64, vectorize
 import numpy as np
 from .error import FinError
@@ -539,6 +539,12 @@ def norminvcdf(p):
 
     return inverseCDF
 
+###############################################################################
+
+@vectorize([float64(float64)], fastmath=True, cache=True)
+def norminvcdf_vect(p):
+    return norminvcdf(p)
+
 ###############################################################################
 # This is used for consistency with Haug and its conciseness. Consider renaming
 # phi2 to M
@@ -624,6 +630,91 @@ def phi2(h1, hk, r):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _beta_continued_fraction(a, b, x):
+    """ Continued fraction for the regularised incomplete beta function
+    evaluated with the modified Lentz method. """
+
+    tiny = 1e-300
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+
+    if fabs(d) < tiny:
+        d = tiny
+
+    d = 1.0 / d
+    h = d
+
+    for m in range(1, 200):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        if fabs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if fabs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        h *= d * c
+
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        if fabs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if fabs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+
+        if fabs(delta - 1.0) < 1e-15:
+            break
+
+    return h
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def incomplete_beta(a, b, x):
+    """ Regularised incomplete beta function I_x(a, b) for x in [0, 1]. """
+
+    if x <= 0.0:
+        return 0.0
+
+    if x >= 1.0:
+        return 1.0
+
+    lbt = lgamma(a + b) - lgamma(a) - lgamma(b) + \
+        a * log(x) + b * log(1.0 - x)
+
+    if x < (a + 1.0) / (a + b + 2.0):
+        return exp(lbt) * _beta_continued_fraction(a, b, x) / a
+    else:
+        return 1.0 - exp(lbt) * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def student_t_cdf(x, dof):
+    """ The CDF of the Student-T distribution with dof degrees of freedom
+    which need not be an integer. """
+
+    p = 0.5 * incomplete_beta(0.5 * dof, 0.5, dof / (dof + x * x))
+
+    if x > 0.0:
+        return 1.0 - p
+    else:
+        return p
+
+###############################################################################
+
+
 @njit(float64[:, :](float64[:, :]), cache=True, fastmath=True)
 def cholesky(rho):
     """ Numba-compliant wrapper around Numpy cholesky function. """
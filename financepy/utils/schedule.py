@@ -2,6 +2,7 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+from collections import OrderedDict
 
 from .error import FinError
 from .date import Date
@@ -17,6 +18,110 @@ from .helpers import check_argument_types
 ###############################################################################
 
 
+class ScheduleCache():
+    """ A bounded least-recently-used cache of generated schedule dates. Each
+    entry maps a key built from all of the inputs which determine a schedule
+    to an immutable tuple of Dates. Trades which share the same dates and
+    conventions therefore only generate their schedule once. The number of
+    hits and misses can be obtained from info() and the cache can be cleared
+    or resized at any time. A maximum size of zero switches caching off. """
+
+    def __init__(self,
+                 max_size: int = 4096):
+        """ Create a cache which holds up to max_size schedules. """
+
+        if max_size < 0:
+            raise FinError("Schedule cache size cannot be negative")
+
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    ###########################################################################
+
+    def lookup(self, key, generator):
+        """ Return the tuple of dates stored under the key. If there is none
+        the generator function is called to calculate the dates which are
+        then stored, discarding the least recently used entry if full. """
+
+        dates = self._entries.get(key)
+
+        if dates is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dates
+
+        self._misses += 1
+        dates = tuple(generator())
+
+        if self._max_size > 0:
+            self._entries[key] = dates
+
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+        return dates
+
+    ###########################################################################
+
+    def clear(self):
+        """ Remove all of the schedules and reset the hit and miss counts. """
+
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+
+    ###########################################################################
+
+    def resize(self, max_size: int):
+        """ Change the maximum number of schedules held, discarding the least
+        recently used schedules if the cache is now too large. """
+
+        if max_size < 0:
+            raise FinError("Schedule cache size cannot be negative")
+
+        self._max_size = max_size
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    ###########################################################################
+
+    def info(self):
+        """ Returns a dictionary with the number of hits and misses, and the
+        current and maximum number of schedules held. """
+
+        return {"hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._entries),
+                "max_size": self._max_size}
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._entries)
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("MAX SIZE", self._max_size)
+        s += label_to_string("SIZE", len(self._entries))
+        s += label_to_string("HITS", self._hits)
+        s += label_to_string("MISSES", self._misses, "")
+        return s
+
+###############################################################################
+
+
+# Shared by Schedule and by the products which generate their own dates
+schedule_cache = ScheduleCache()
+
+###############################################################################
+
+
 class Schedule:
     """ A schedule is a set of dates generated according to ISDA standard
     rules which starts on the next date after the effective date and runs up to
@@ -115,7 +220,7 @@ class Schedule:
     ###############################################################################
 
     def schedule_dates(self):
-        """ Returns a list of the schedule of Dates. """
+        """ Returns a tuple of the schedule of Dates. """
 
         if self._adjusted_dates is None:
             self._generate()
@@ -127,18 +232,41 @@ class Schedule:
     def _generate(self):
         """ Generate schedule of dates according to specified date generation
         rules and also adjust these dates for holidays according to the
-        specified business day convention and the specified calendar. """
+        specified business day convention and the specified calendar. The
+        dates are shared with all schedules which have the same inputs and
+        so are returned as a tuple. """
+
+        key = ("Schedule",
+               self._effective_date._excel_date,
+               self._termination_date._excel_date,
+               self._freq_type,
+               self._calendar_type,
+               self._bus_day_adjust_type,
+               self._date_gen_rule_type,
+               self._adjust_termination_date,
+               self._end_of_month_flag)
+
+        self._adjusted_dates = schedule_cache.lookup(key,
+                                                     self._generate_dates)
+
+        return self._adjusted_dates
+
+    ###############################################################################
+
+    def _generate_dates(self):
+        """ Calculate the list of schedule dates without using the cache. """
 
         calendar = Calendar(self._calendar_type)
         frequency = annual_frequency(self._freq_type)
         num_months = int(12 / frequency)
 
+        termination_date = self._termination_date
         unadjusted_schedule_dates = []
-        self._adjusted_dates = []
+        adjusted_dates = []
 
         if self._date_gen_rule_type == DateGenRuleTypes.BACKWARD:
 
-            next_date = self._termination_date
+            next_date = termination_date
             flow_num = 0
 
             while next_date > self._effective_date:
@@ -158,7 +286,7 @@ class Schedule:
             # reverse order and holiday adjust dates
             # the first date is not adjusted as this was provided
             dt = unadjusted_schedule_dates[flow_num - 1]
-            self._adjusted_dates.append(dt)
+            adjusted_dates.append(dt)
 
             # We adjust all flows after the effective date and before the
             # termination date to fall on business days according to their cal
@@ -166,9 +294,9 @@ class Schedule:
                 dt = calendar.adjust(unadjusted_schedule_dates[flow_num - i - 1],
                                      self._bus_day_adjust_type)
 
-                self._adjusted_dates.append(dt)
+                adjusted_dates.append(dt)
 
-            self._adjusted_dates.append(self._termination_date)
+            adjusted_dates.append(termination_date)
 
         elif self._date_gen_rule_type == DateGenRuleTypes.FORWARD:
 
@@ -179,7 +307,7 @@ class Schedule:
             unadjusted_schedule_dates.append(next_date)
             flow_num = 1
 
-            while next_date < self._termination_date:
+            while next_date < termination_date:
                 unadjusted_schedule_dates.append(next_date)
                 next_date = next_date.add_months(num_months)
                 flow_num = flow_num + 1
@@ -189,32 +317,32 @@ class Schedule:
                 dt = calendar.adjust(unadjusted_schedule_dates[i],
                                      self._bus_day_adjust_type)
 
-                self._adjusted_dates.append(dt)
+                adjusted_dates.append(dt)
 
-            self._adjusted_dates.append(self._termination_date)
+            adjusted_dates.append(termination_date)
 
-        if self._adjusted_dates[0] < self._effective_date:
-            self._adjusted_dates[0] = self._effective_date
+        if adjusted_dates[0] < self._effective_date:
+            adjusted_dates[0] = self._effective_date
 
         # The market standard for swaps is not to adjust the termination date 
         # unless it is specified in the contract. It is standard for CDS. 
         # We change it if the adjust_termination_date flag is True.
         if self._adjust_termination_date is True:
-            self._termination_date = calendar.adjust(self._termination_date,
-                                                     self._bus_day_adjust_type)
+            termination_date = calendar.adjust(termination_date,
+                                               self._bus_day_adjust_type)
 
-            self._adjusted_dates[-1] = self._termination_date
+            adjusted_dates[-1] = termination_date
 
         #######################################################################
         # Check the resulting schedule to ensure that no two dates are the
         # same and that they are monotonic - this should never happen but ...
         #######################################################################
 
-        if len(self._adjusted_dates) < 2:
+        if len(adjusted_dates) < 2:
             raise FinError("Schedule has two dates only.")
 
-        prev_dt = self._adjusted_dates[0]
-        for dt in self._adjusted_dates[1:]:
+        prev_dt = adjusted_dates[0]
+        for dt in adjusted_dates[1:]:
 
             if dt == prev_dt:
                 raise FinError("Two matching dates in schedule")
@@ -226,7 +354,7 @@ class Schedule:
 
         #######################################################################
 
-        return self._adjusted_dates
+        return adjusted_dates
 
     ##############################################################################
 
@@ -236,7 +364,7 @@ class Schedule:
 
         s = label_to_string("OBJECT TYPE", type(self).__name__)
         s += label_to_string("EFFECTIVE DATE", self._effective_date)
-        s += label_to_string("END DATE", self._termination_date)
+        s += label_to_string("END DATE", self._adjusted_dates[-1])
         s += label_to_string("FREQUENCY", self._freq_type)
         s += label_to_string("CALENDAR", self._calendar_type)
         s += label_to_string("BUSDAYRULE", self._bus_day_adjust_type)
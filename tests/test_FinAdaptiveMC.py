@@ -0,0 +1,132 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import OptionTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import BlackScholes
+from financepy.models.adaptive_mc import adaptive_mc, ADAPTIVE_MC_MIN_PATHS
+from financepy.models.lmm_mc import lmm_swaption_book_adaptive
+from financepy.models.lmm_mc import lmm_swaption_book_pricer
+from financepy.models.process_simulator import FinProcessSimulator
+from financepy.models.process_simulator import ProcessTypes
+from financepy.models.process_simulator import FinGBMNumericalScheme
+from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
+
+
+def test_adaptive_mc_tolerance():
+
+    rng = np.random.default_rng(11)
+
+    def sampler(first_sample, num_samples):
+        return rng.normal(1.0, 2.0, size=(num_samples, 2)) * [1.0, 0.1]
+
+    (value, std_error, num_paths, wall_time) = \
+        adaptive_mc(sampler, abs_tolerance=0.01)
+
+    assert np.all(std_error <= 0.01)
+    # About (2/0.01)^2 samples are needed for the noisier output
+    assert 40000 <= num_paths <= 100000
+    assert np.all(np.abs(value - [1.0, 0.1]) < 5.0 * std_error)
+    assert wall_time > 0.0
+
+
+def test_vanilla_adaptive_matches_fixed_paths():
+
+    valuation_date = Date(1, 1, 2015)
+    option = EquityVanillaOption(Date(1, 1, 2016), 105.0,
+                                 OptionTypes.EUROPEAN_CALL)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.02)
+    model = BlackScholes(0.25)
+
+    (value, std_error, num_paths, _) = \
+        option.value_mc_adaptive(valuation_date, 100.0, discount_curve,
+                                 dividend_curve, model, rel_tolerance=0.002)
+
+    assert std_error <= 0.002 * value
+
+    v = option.value_mc(valuation_date, 100.0, discount_curve,
+                        dividend_curve, model, num_paths=num_paths)
+    assert abs(value - v) < 1e-10
+
+    exact = option.value(valuation_date, 100.0, discount_curve,
+                         dividend_curve, model)
+    assert abs(value - exact) < 4.0 * std_error
+
+
+def test_process_adaptive():
+
+    simulator = FinProcessSimulator()
+    model_params = (100.0, 0.03, 0.2, FinGBMNumericalScheme.ANTITHETIC)
+
+    def payoff(paths):
+        return np.exp(-0.03) * np.maximum(paths[:, -1] - 100.0, 0.0)
+
+    (value, std_error, num_paths, _) = \
+        simulator.value_adaptive(ProcessTypes.GBM, 1.0, model_params, 12,
+                                 payoff, 7, abs_tolerance=0.05)
+
+    assert std_error <= 0.05
+    assert num_paths % 2 == 0
+    assert abs(value - 9.4134) < 4.0 * std_error
+
+
+
+def test_process_adaptive_batch_seeds():
+
+    class RecordingSimulator(FinProcessSimulator):
+
+        def __init__(self):
+            self.seeds = []
+
+        def get_process(self, process_type, t, model_params, numAnnSteps,
+                        num_paths, seed):
+            self.seeds.append(seed)
+            return super().get_process(process_type, t, model_params,
+                                       numAnnSteps, num_paths, seed)
+
+    model_params = (100.0, 0.03, 0.2, FinGBMNumericalScheme.NORMAL)
+
+    def payoff(paths):
+        return np.exp(-0.03) * np.maximum(paths[:, -1] - 100.0, 0.0)
+
+    seeds = []
+    for seed in [7, 8, 7 + ADAPTIVE_MC_MIN_PATHS]:
+        simulator = RecordingSimulator()
+        simulator.value_adaptive(ProcessTypes.GBM, 1.0, model_params, 4,
+                                 payoff, seed, abs_tolerance=0.02)
+        assert len(simulator.seeds) > 1
+        seeds.append(simulator.seeds)
+
+    assert len(set(seeds[0] + seeds[1] + seeds[2])) == \
+        len(seeds[0]) + len(seeds[1]) + len(seeds[2])
+
+    simulator = RecordingSimulator()
+    simulator.value_adaptive(ProcessTypes.GBM, 1.0, model_params, 4,
+                             payoff, 7, abs_tolerance=0.02)
+    assert simulator.seeds == seeds[0]
+
+
+def test_lmm_adaptive_matches_book_pricer():
+
+    numForwards = 12
+    fwd0 = np.linspace(0.03, 0.05, numForwards)
+    taus = np.full(numForwards, 0.25)
+    lambdas = np.full((1, numForwards), 0.2)
+
+    (values, std_errors, num_paths, _) = \
+        lmm_swaption_book_adaptive(numForwards, 1, fwd0, lambdas, taus, 42,
+                                   [0.04, 0.04], [4, 8], [12, 12], [1, 0],
+                                   rel_tolerance=0.02)
+
+    assert np.all(std_errors <= 0.02 * values)
+
+    (v, _) = lmm_swaption_book_pricer(numForwards, 1, num_paths, fwd0,
+                                      lambdas, taus, 0, 42, [0.04, 0.04],
+                                      [4, 8], [12, 12], [1, 0])
+
+    assert np.max(np.abs(values - v)) < 1e-12
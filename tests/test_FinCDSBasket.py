@@ -0,0 +1,140 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+from scipy.stats import t as student
+
+from financepy.utils.date import Date
+from financepy.utils.math import corr_matrix_generator, student_t_cdf
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds_basket import CDSBasket
+from financepy.models.gauss_copula import default_times_gc
+from financepy.models.gauss_copula import default_times_factor_gc
+from financepy.models.student_t_copula import StudentTCopula
+from financepy.utils.helpers import uniform_to_default_time
+from financepy.utils.helpers import uniforms_to_default_times
+
+valuation_date = Date(2, 3, 2007)
+basket_maturity = Date(20, 12, 2011)
+libor_curve = DiscountCurveFlat(valuation_date, 0.05)
+num_credits = 5
+
+
+def build_issuer_curves():
+
+    issuer_curves = []
+
+    for i in range(0, num_credits):
+        spread = 0.004 + 0.001 * i
+        contracts = [CDS(valuation_date, valuation_date.next_cds_date(m),
+                         spread) for m in (36, 60, 84, 120)]
+        issuer_curves.append(CDSCurve(valuation_date, contracts,
+                                      libor_curve, 0.40))
+
+    return issuer_curves
+
+
+def test_student_t_cdf():
+
+    for dof in [0.5, 3.0, 7.5]:
+        for x in np.linspace(-20.0, 20.0, 81):
+            assert abs(student_t_cdf(x, dof) - student.cdf(x, dof)) < 1e-12
+
+
+def test_value_all_mc():
+
+    issuer_curves = build_issuer_curves()
+    basket = CDSBasket(valuation_date, basket_maturity)
+    corr = corr_matrix_generator(0.3, num_credits)
+
+    (values, rpv01s, spreads) = basket.value_all_mc(valuation_date,
+                                                    issuer_curves, corr,
+                                                    libor_curve, 50000, 42)
+
+    assert len(values) == num_credits
+    assert np.all(np.diff(spreads) < 0.0)
+    assert np.all(np.diff(rpv01s) > 0.0)
+
+    # The first to default matches the legacy Gaussian copula pricer
+    (value, rpv01, spread) = basket.value_gaussian_mc(valuation_date, 1,
+                                                      issuer_curves, corr,
+                                                      libor_curve, 50000, 42)
+
+    assert abs(spreads[0] - spread) < 0.02 * spread
+    assert abs(rpv01s[0] - rpv01) < 0.005 * rpv01
+
+    (values_t, _, spreads_t) = basket.value_all_mc(valuation_date,
+                                                   issuer_curves, corr,
+                                                   libor_curve, 50000, 42,
+                                                   degreesOfFreedom=4)
+
+    # Tail dependence makes the senior baskets riskier
+    assert spreads_t[0] < spreads[0]
+    assert spreads_t[-1] > spreads[-1]
+
+    # The adaptive pricer uses the same trials
+    (value, std_error, num_trials, _) = \
+        basket.value_mc_adaptive(valuation_date, 2, issuer_curves, corr,
+                                 libor_curve, 42, min_trials=8192,
+                                 max_trials=8192, abs_tolerance=0.0)
+
+    (values, _, _) = basket.value_all_mc(valuation_date, issuer_curves, corr,
+                                         libor_curve, 4096, 42)
+
+    assert num_trials == 8192
+    assert abs(value - values[1]) < 1e-6
+
+
+def test_uniforms_to_default_times():
+
+    issuer_curve = build_issuer_curves()[2]
+    times = issuer_curve._times
+    values = issuer_curve._values
+
+    u = np.concatenate((np.linspace(0.0, 1.0, 1001), values, [1e-12]))
+    taus = uniforms_to_default_times(u, times, values)
+
+    for i in range(0, len(u)):
+        tau = uniform_to_default_time(u[i], times, values)
+        assert abs(taus[i] - tau) < 1e-10 * max(tau, 1.0)
+
+
+def test_factor_default_times():
+
+    issuer_curves = build_issuer_curves()
+    num_trials = 50000
+    beta = np.sqrt(0.3)
+
+    corr = corr_matrix_generator(0.3, num_credits)
+    full = default_times_gc(issuer_curves, corr, num_trials, 5)
+    factor = default_times_factor_gc(issuer_curves,
+                                     np.full(num_credits, beta),
+                                     num_trials, 5)
+
+    assert factor.dtype == np.float32
+    assert factor.shape == full.shape
+
+    # Same marginal default probabilities and the same clustering
+    t = 5.0
+    q = np.array([c.survival_prob(t) for c in issuer_curves])
+    assert np.all(np.abs(np.mean(factor < t, axis=1) - (1.0 - q)) < 0.01)
+
+    no_default_full = np.mean(np.sum(full < t, axis=0) == 0)
+    no_default_factor = np.mean(np.sum(factor < t, axis=0) == 0)
+    assert abs(no_default_full - no_default_factor) < 0.01
+
+    # Two factors whose loadings give the same correlation
+    factor2 = default_times_factor_gc(issuer_curves,
+                                      np.full((num_credits, 2), beta / np.sqrt(2.0)),
+                                      num_trials, 5)
+    no_default_factor2 = np.mean(np.sum(factor2 < t, axis=0) == 0)
+    assert abs(no_default_factor2 - no_default_factor) < 0.01
+
+    model = StudentTCopula()
+    factor_t = model.default_times_factor(issuer_curves,
+                                          np.full(num_credits, beta),
+                                          4, num_trials, 5)
+    assert np.all(np.abs(np.mean(factor_t < t, axis=1) - (1.0 - q)) < 0.01)
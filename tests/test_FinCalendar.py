@@ -0,0 +1,58 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import pytest
+
+from financepy.utils.error import FinError
+from financepy.utils.calendar import Calendar, CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.date import Date
+from financepy.utils.date_array import DateArray
+
+cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+
+
+def test_is_business_day():
+    assert cal.is_business_day(Date(25, 12, 2020)) is False
+    assert cal.is_business_day(Date(26, 12, 2020)) is False
+    assert cal.is_business_day(Date(29, 12, 2020)) is True
+    assert cal.is_holiday(Date(28, 12, 2020)) is True
+
+
+def test_adjust():
+    dt = Date(31, 5, 2020)
+    assert cal.adjust(dt, BusDayAdjustTypes.FOLLOWING) == Date(1, 6, 2020)
+    assert cal.adjust(dt, BusDayAdjustTypes.MODIFIED_FOLLOWING) == \
+        Date(29, 5, 2020)
+    assert cal.adjust(dt, BusDayAdjustTypes.PRECEDING) == Date(29, 5, 2020)
+
+
+def test_add_business_days():
+    dt = Date(24, 12, 2020)
+    assert cal.add_business_days(dt, 1) == Date(29, 12, 2020)
+    assert cal.add_business_days(dt, -1) == Date(23, 12, 2020)
+    assert cal.add_business_days(dt, 0) == dt
+
+
+def test_adjust_dates():
+    dates = [Date(31, 5, 2020), Date(25, 12, 2020), Date(2, 6, 2020)]
+    for bus_day_adjust_type in BusDayAdjustTypes:
+        adjusted = cal.adjust_dates(DateArray(dates), bus_day_adjust_type)
+        for i in range(0, len(dates)):
+            assert adjusted[i] == cal.adjust(dates[i], bus_day_adjust_type)
+
+
+def test_adjust_at_start_of_calendar():
+    # There is no business day before the first date of the table
+    dt = Date(1, 1, 1900)
+    following = cal.adjust(dt, BusDayAdjustTypes.FOLLOWING)
+    assert cal.adjust(dt, BusDayAdjustTypes.MODIFIED_PRECEDING) == following
+
+    with pytest.raises(FinError):
+        cal.adjust(dt, BusDayAdjustTypes.PRECEDING)
+
+    adjusted = cal.adjust_dates(DateArray([dt, Date(2, 6, 2020)]),
+                                BusDayAdjustTypes.MODIFIED_PRECEDING)
+    assert adjusted[0] == following
+    assert adjusted[1] == Date(2, 6, 2020)
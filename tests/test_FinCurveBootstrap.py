@@ -0,0 +1,161 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_fra import IborFRA
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ois import OIS
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.dual_curve import IborDualCurve
+from financepy.products.rates.ois_curve import OISCurve
+
+valuation_date = Date(6, 10, 2018)
+settle_date = valuation_date.add_weekdays(2)
+
+linear_types = [InterpTypes.FLAT_FWD_RATES,
+                InterpTypes.LINEAR_FWD_RATES,
+                InterpTypes.LINEAR_ZERO_RATES]
+
+
+def build_instruments(swap_class=IborSwap):
+
+    dc_type = DayCountTypes.ACT_360
+
+    depos = []
+    for tenor, rate in [("1M", 0.0023), ("3M", 0.0033), ("6M", 0.0045)]:
+        depos.append(IborDeposit(settle_date, tenor, rate, dc_type))
+
+    fras = []
+    for start, rate in [("6M", 0.0055), ("9M", 0.0065)]:
+        fras.append(IborFRA(settle_date.add_tenor(start), "6M", rate,
+                            dc_type))
+
+    swaps = []
+    for tenor, rate in [("2Y", 0.0071), ("3Y", 0.0090), ("5Y", 0.0120),
+                        ("7Y", 0.0135), ("10Y", 0.0150), ("20Y", 0.0180),
+                        ("30Y", 0.0185)]:
+        swaps.append(swap_class(settle_date, tenor, SwapTypes.PAY, rate,
+                                FrequencyTypes.SEMI_ANNUAL,
+                                DayCountTypes.THIRTY_E_360))
+
+    return depos, fras, swaps
+
+
+def solver_dfs(curve):
+    """ Rebuild a copy of the curve with the scipy 1D solver. """
+
+    other = curve.__class__.__new__(curve.__class__)
+    other.__dict__.update(curve.__dict__)
+    other._check_refit = False
+    other._build_curve_using_1d_solver()
+    return other._dfs
+
+
+def test_single_curve_matches_solver():
+
+    depos, fras, swaps = build_instruments()
+
+    for interp_type in linear_types:
+
+        curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                interp_type)
+
+        assert np.max(np.abs(curve._dfs - solver_dfs(curve))) < 1e-9
+
+        for swap in swaps:
+            v = swap.value(valuation_date, curve) / swap._fixed_leg._notional
+            assert abs(v) < 1e-12
+
+
+def test_dual_curve_matches_solver():
+
+    depos, fras, swaps = build_instruments()
+
+    discount_curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                     InterpTypes.FLAT_FWD_RATES)
+
+    spread_swaps = []
+    for swap in swaps:
+        coupon = swap._fixed_leg._coupon + 0.001
+        spread_swaps.append(IborSwap(settle_date, swap._termination_date,
+                                     SwapTypes.PAY, coupon,
+                                     FrequencyTypes.SEMI_ANNUAL,
+                                     DayCountTypes.THIRTY_E_360))
+
+    for interp_type in linear_types:
+
+        curve = IborDualCurve(valuation_date, discount_curve, depos, fras,
+                              spread_swaps, interp_type)
+
+        assert np.max(np.abs(curve._dfs - solver_dfs(curve))) < 1e-9
+
+        for swap in spread_swaps:
+            v = swap.value(valuation_date, discount_curve, curve)
+            assert abs(v / swap._fixed_leg._notional) < 1e-12
+
+
+def test_ois_curve_matches_solver():
+
+    depos, fras, swaps = build_instruments(OIS)
+
+    curve = OISCurve(valuation_date, depos, fras, swaps)
+
+    assert np.max(np.abs(curve._dfs - solver_dfs(curve))) < 1e-9
+
+
+def test_update_quote_matches_full_build():
+
+    depos, fras, swaps = build_instruments()
+
+    curve = IborSingleCurve(valuation_date, depos, fras, swaps)
+    old_dfs = curve._dfs.copy()
+
+    # Change the 10Y swap quote. The curve inserts a synthetic deposit.
+    index = len(curve._usedDeposits) + len(curve._usedFRAs) + 4
+    new_swap = IborSwap(settle_date, "10Y", SwapTypes.PAY, 0.0160,
+                        FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+    new_swaps = swaps[:4] + [new_swap] + swaps[5:]
+    rebuilt = IborSingleCurve(valuation_date, depos, fras, new_swaps)
+
+    bumped = curve.update_quote(index, 0.0160, in_place=False)
+
+    assert np.max(np.abs(curve._dfs - old_dfs)) == 0.0
+    assert np.max(np.abs(bumped._dfs - rebuilt._dfs)) < 1e-14
+    assert np.max(np.abs(bumped._dfs[:index] - old_dfs[:index])) == 0.0
+    assert abs(bumped.df(Date(1, 1, 2035)) -
+               rebuilt.df(Date(1, 1, 2035))) < 1e-14
+
+    same = curve.update_quote(index, 0.0160)
+    assert same is curve
+    assert np.max(np.abs(curve._dfs - rebuilt._dfs)) < 1e-14
+
+
+def test_update_quote_requotes_curve_instruments():
+
+    depos, fras, swaps = build_instruments()
+
+    for interp_type in linear_types + [InterpTypes.FINCUBIC_ZERO_RATES]:
+
+        curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                interp_type)
+        index = len(curve._usedDeposits) + len(curve._usedFRAs) + 4
+        curve.update_quote(index, 0.0160)
+
+        assert swaps[4]._fixed_leg._coupon == 0.0150
+        assert curve._usedSwaps[4]._fixed_leg._coupon == 0.0160
+
+        if interp_type not in linear_types:
+            continue
+
+        for swap in curve._usedSwaps:
+            v = swap.value(valuation_date, curve, curve, None)
+            assert abs(v / swap._fixed_leg._notional) < 1e-10
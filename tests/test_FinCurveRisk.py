@@ -0,0 +1,121 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.market.curves.curve_risk import CurveRiskEngine
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+
+valuation_date = Date(20, 6, 2018)
+settle_date = valuation_date.add_weekdays(2)
+
+
+def build_libor_curve(interp_type=InterpTypes.FLAT_FWD_RATES):
+
+    dc_type = DayCountTypes.ACT_360
+    depos = [IborDeposit(settle_date, "3M", 0.0150, dc_type),
+             IborDeposit(settle_date, "6M", 0.0160, dc_type)]
+
+    swaps = []
+    for tenor, rate in [("2Y", 0.0200), ("3Y", 0.0220), ("5Y", 0.0250),
+                        ("7Y", 0.0270), ("10Y", 0.0290)]:
+        swaps.append(IborSwap(settle_date, tenor, SwapTypes.PAY, rate,
+                              FrequencyTypes.SEMI_ANNUAL,
+                              DayCountTypes.THIRTY_E_360))
+
+    return IborSingleCurve(valuation_date, depos, [], swaps, interp_type)
+
+
+def build_issuer_curve(libor_curve):
+
+    cds_contracts = []
+    for years, spread in [(1, 0.0080), (3, 0.0095), (5, 0.0110),
+                          (7, 0.0120), (10, 0.0130)]:
+        maturity_date = valuation_date.add_months(12 * years)
+        cds_contracts.append(CDS(valuation_date, maturity_date, spread))
+
+    return CDSCurve(valuation_date, cds_contracts, libor_curve, 0.40)
+
+
+def test_swap_ladder():
+
+    libor_curve = build_libor_curve()
+    old_dfs = libor_curve._dfs.copy()
+
+    swap = IborSwap(settle_date, "6Y", SwapTypes.PAY, 0.03,
+                    FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360,
+                    notional=1000000)
+
+    engine = CurveRiskEngine(libor_curve)
+    parallel, buckets = engine.ladder(swap, valuation_date)
+
+    assert len(buckets) == len(libor_curve.quotes())
+    assert parallel > 0.0
+    assert abs(parallel - buckets.sum()) < 0.01 * abs(parallel)
+
+    # Only the 5Y and 7Y swaps bracket the 6Y maturity
+    assert abs(buckets[-1]) < 1e-6 * abs(parallel)
+
+    assert np.max(np.abs(libor_curve._dfs - old_dfs)) == 0.0
+
+
+def test_spline_curve_is_requoted():
+
+    libor_curve = build_libor_curve(InterpTypes.FINCUBIC_ZERO_RATES)
+    quotes = libor_curve.quotes()
+
+    bumped_curve = libor_curve.update_quotes(quotes + 0.0001, False)
+
+    assert np.max(np.abs(libor_curve.quotes() - quotes)) == 0.0
+    assert np.max(np.abs(bumped_curve.quotes() - quotes - 0.0001)) < 1e-15
+    assert bumped_curve.df(Date(20, 6, 2025)) < \
+        libor_curve.df(Date(20, 6, 2025))
+
+
+def test_cds_dv01_matches_engine():
+
+    libor_curve = build_libor_curve()
+    issuer_curve = build_issuer_curve(libor_curve)
+    coupons = issuer_curve.quotes()
+
+    cds = CDS(valuation_date, Date(20, 6, 2023), 0.0150, 1000000)
+
+    credit_dv01 = cds.credit_dv01(valuation_date, issuer_curve)
+    engine = CurveRiskEngine(issuer_curve)
+    parallel, buckets = engine.ladder(cds, valuation_date)
+
+    assert abs(credit_dv01 - parallel) < 1e-9
+    assert abs(buckets.sum() - parallel) < 0.01 * abs(parallel)
+    assert np.max(np.abs(issuer_curve.quotes() - coupons)) == 0.0
+
+    interest_dv01 = cds.interest_dv01(valuation_date, issuer_curve)
+    engine = CurveRiskEngine(libor_curve, dependent_curve=issuer_curve)
+    parallel, buckets = engine.ladder(cds, valuation_date)
+
+    assert abs(interest_dv01 - parallel) < 1e-9
+    assert issuer_curve._libor_curve is libor_curve
+
+
+def test_process_pool_matches_serial():
+
+    libor_curve = build_libor_curve()
+
+    swap = IborSwap(settle_date, "4Y", SwapTypes.RECEIVE, 0.025,
+                    FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+
+    serial = CurveRiskEngine(libor_curve).ladder(swap, valuation_date)
+    pooled = CurveRiskEngine(libor_curve,
+                             num_processes=2).ladder(swap, valuation_date)
+
+    assert abs(serial[0] - pooled[0]) < 1e-9
+    assert np.max(np.abs(serial[1] - pooled[1])) < 1e-9
@@ -0,0 +1,60 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.date_array import DateArray
+from financepy.utils.day_count import DayCount, DayCountTypes
+from financepy.utils.helpers import times_from_dates
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+
+valuation_date = Date(15, 6, 2020)
+dates = [Date(28, 2, 2021), Date(31, 3, 2022), Date(29, 2, 2024),
+         Date(31, 12, 2025), Date(1, 1, 2030)]
+
+
+def test_round_trip_excel_dates():
+
+    date_array = DateArray(dates)
+    serials = date_array.excel_dates()
+    assert DateArray(serials).to_list() == dates
+    assert DateArray(np.array([1.0, 59.0, 60.0, 61.0]))[3] == Date(1, 3, 1900)
+
+
+def test_year_frac_matches_scalar():
+
+    date_array = DateArray(dates)
+
+    for day_count_type in DayCountTypes:
+
+        if day_count_type in (DayCountTypes.ACT_ACT_ICMA,
+                              DayCountTypes.ACT_365L):
+            continue
+
+        day_count = DayCount(day_count_type)
+        vector = day_count.year_frac(valuation_date, date_array)[0]
+
+        for i in range(0, len(dates)):
+            scalar = day_count.year_frac(valuation_date, dates[i])[0]
+            assert vector[i] == scalar
+
+
+def test_discount_curve_accepts_date_array():
+
+    curve = DiscountCurveFlat(valuation_date, 0.05)
+    date_array = DateArray(dates)
+    assert np.all(curve.df(date_array) == curve.df(dates))
+
+    times = times_from_dates(date_array, valuation_date)
+    assert np.all(times == times_from_dates(dates, valuation_date))
+
+
+def test_add_tenor_matches_scalar():
+    dates = [Date(31, 1, 2020), Date(29, 2, 2020), Date(15, 6, 2021)]
+    dateArray = DateArray(dates)
+
+    for tenor in ["1D", "2W", "2M", "-1M", "1Y", "10Y"]:
+        shifted = dateArray.add_tenor(tenor).to_list()
+        assert shifted == [dt.add_tenor(tenor) for dt in dates]
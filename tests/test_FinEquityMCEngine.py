@@ -0,0 +1,149 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import OptionTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import BlackScholes
+from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
+from financepy.products.equity.equity_asian_option import EquityAsianOption
+from financepy.products.equity.equity_digital_option import \
+    EquityDigitalOption, FinDigitalOptionTypes
+from financepy.products.equity.equity_barrier_option import \
+    EquityBarrierOption, EquityBarrierTypes
+from financepy.products.equity.equity_fixed_lookback_option import \
+    EquityFixedLookbackOption
+from financepy.products.equity.equity_mc_engine import EquityMCEngine
+from financepy.models.variance_reduction import VarianceReductionTypes
+
+valuation_date = Date(1, 1, 2015)
+expiry_date = Date(1, 1, 2016)
+stock_price = 100.0
+discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+dividend_curve = DiscountCurveFlat(valuation_date, 0.02)
+
+options = [EquityVanillaOption(expiry_date, 105.0,
+                               OptionTypes.EUROPEAN_CALL),
+           EquityVanillaOption(Date(1, 7, 2015), 95.0,
+                               OptionTypes.EUROPEAN_PUT),
+           EquityAsianOption(Date(1, 4, 2015), expiry_date, 100.0,
+                             OptionTypes.EUROPEAN_CALL, 50),
+           EquityBarrierOption(expiry_date, 100.0,
+                               EquityBarrierTypes.DOWN_AND_OUT_CALL, 85.0,
+                               252),
+           EquityFixedLookbackOption(expiry_date, OptionTypes.EUROPEAN_CALL,
+                                     105.0)]
+
+
+def engine_results(spot, volatility):
+
+    engine = EquityMCEngine(valuation_date, spot, discount_curve,
+                            dividend_curve, BlackScholes(volatility),
+                            num_paths=20000, seed=7)
+    engine.add_options(options)
+    return engine.value()
+
+
+def test_vanilla_values_and_greeks():
+
+    model = BlackScholes(0.25)
+    results = engine_results(stock_price, 0.25)
+
+    for i in range(0, 2):
+        value = options[i].value(valuation_date, stock_price, discount_curve,
+                                 dividend_curve, model)
+        delta = options[i].delta(valuation_date, stock_price, discount_curve,
+                                 dividend_curve, model)
+        vega = options[i].vega(valuation_date, stock_price, discount_curve,
+                               dividend_curve, model)
+
+        assert abs(results["value"][i] - value) < \
+            4.0 * results["value_std_error"][i]
+        assert abs(results["delta_pathwise"][i] - delta) < \
+            4.0 * results["delta_pathwise_std_error"][i]
+        assert abs(results["vega_pathwise"][i] - vega) < \
+            4.0 * results["vega_pathwise_std_error"][i]
+        assert abs(results["delta_lr"][i] - delta) < \
+            4.0 * results["delta_lr_std_error"][i]
+        assert abs(results["vega_lr"][i] - vega) < \
+            4.0 * results["vega_lr_std_error"][i]
+
+
+def test_greeks_match_bumped_engine():
+
+    results = engine_results(stock_price, 0.25)
+
+    # With common random numbers the pathwise greeks are the limit of the
+    # bumped differences for continuous payoffs
+    up = engine_results(stock_price + 0.5, 0.25)["value"]
+    down = engine_results(stock_price - 0.5, 0.25)["value"]
+    delta = (up - down) / 1.0
+
+    up = engine_results(stock_price, 0.255)["value"]
+    down = engine_results(stock_price, 0.245)["value"]
+    vega = (up - down) / 0.01
+
+    for i in [0, 1, 2, 4]:
+        assert abs(results["delta_pathwise"][i] - delta[i]) < 0.002
+        assert abs(results["vega_pathwise"][i] - vega[i]) < 0.05
+
+    # The barrier only has likelihood ratio greeks
+    assert np.isnan(results["delta_pathwise"][3])
+    assert abs(results["delta_lr"][3] - delta[3]) < \
+        4.0 * results["delta_lr_std_error"][3]
+
+
+def test_variance_reduction():
+
+    model = BlackScholes(0.25)
+
+    book = [EquityDigitalOption(expiry_date, 160.0,
+                                OptionTypes.EUROPEAN_CALL,
+                                FinDigitalOptionTypes.CASH_OR_NOTHING),
+            EquityDigitalOption(expiry_date, 60.0, OptionTypes.EUROPEAN_PUT,
+                                FinDigitalOptionTypes.ASSET_OR_NOTHING),
+            EquityBarrierOption(expiry_date, 100.0,
+                                EquityBarrierTypes.UP_AND_OUT_PUT, 120.0,
+                                252),
+            options[2]]
+
+    plain = EquityMCEngine(valuation_date, stock_price, discount_curve,
+                           dividend_curve, model, num_paths=20000, seed=5)
+    plain.add_options(book)
+    plain_results = plain.value()
+
+    engine = EquityMCEngine(valuation_date, stock_price, discount_curve,
+                            dividend_curve, model, num_paths=20000, seed=5,
+                            variance_reduction=[
+                                VarianceReductionTypes.ANTITHETIC,
+                                VarianceReductionTypes.CONTROL_VARIATE,
+                                VarianceReductionTypes.IMPORTANCE_SAMPLING])
+
+    # A control from an analytic pricer given by the user
+    vanilla = EquityVanillaOption(expiry_date, 120.0,
+                                  OptionTypes.EUROPEAN_PUT)
+    vanilla_value = vanilla.value(valuation_date, stock_price,
+                                  discount_curve, dividend_curve, model)
+
+    engine.add_options(book[0:2])
+    engine.add_option(book[2], controls=[(vanilla, vanilla_value)])
+    engine.add_option(book[3])
+    results = engine.value()
+
+    for i in range(0, 2):
+        value = book[i].value(valuation_date, stock_price, discount_curve,
+                              dividend_curve, model)
+        assert abs(results["value"][i] - value) < \
+            4.0 * results["value_std_error"][i]
+
+    for i in range(0, len(book)):
+        assert abs(results["value"][i] - plain_results["value"][i]) < \
+            4.0 * plain_results["value_std_error"][i]
+        assert results["value_variance_ratio"][i] > 5.0
+        assert abs(results["value_variance_ratio"][i] -
+                   (plain_results["value_std_error"][i] /
+                    results["value_std_error"][i])**2) < \
+            0.5 * results["value_variance_ratio"][i]
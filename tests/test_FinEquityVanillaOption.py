@@ -2,10 +2,15 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import numpy as np
+
 from financepy.utils.global_types import OptionTypes
 from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
 from financepy.models.black_scholes import BlackScholes
+from financepy.models.black_scholes_analytic import ImpliedVolStatus
+from financepy.models.black_scholes_analytic import \
+    bs_implied_volatility_batch
 from financepy.utils.date import Date
 
 
@@ -48,3 +53,108 @@ def test_put_option():
     v = put_option.value(valueDate, stockPrice,
                          discountCurve, dividendCurve, model)
     assert v.round(4) == 7.3478
+
+
+def test_value_batch():
+    strikes = [80.0, 95.0, 100.0, 110.0, 130.0]
+    expiries = [expiryDate, Date(1, 1, 2016), Date(1, 7, 2017)]
+
+    options = []
+    for expiry in expiries:
+        for strike in strikes:
+            for option_type in (OptionTypes.EUROPEAN_CALL,
+                                OptionTypes.EUROPEAN_PUT):
+                options.append(EquityVanillaOption(expiry, strike,
+                                                   option_type, 10.0))
+
+    for parallel in (False, True):
+        results = EquityVanillaOption.value_batch(options, valueDate,
+                                                  stockPrice, discountCurve,
+                                                  dividendCurve, model,
+                                                  parallel)
+
+        for i, option in enumerate(options):
+            args = (valueDate, stockPrice, discountCurve, dividendCurve, model)
+            assert abs(results["value"][i] - option.value(*args)) < 1e-10
+            assert abs(results["delta"][i] - option.delta(*args)) < 1e-10
+            assert abs(results["gamma"][i] - option.gamma(*args)) < 1e-10
+            assert abs(results["vega"][i] - option.vega(*args)) < 1e-10
+            assert abs(results["theta"][i] - option.theta(*args)) < 1e-10
+            assert abs(results["rho"][i] - option.rho(*args)) < 1e-10
+
+
+def test_implied_volatility_batch():
+    options = []
+    vols = []
+    for expiry in (expiryDate, Date(1, 1, 2017)):
+        for strike in (80.0, 90.0, 100.0, 115.0, 130.0):
+            for option_type in (OptionTypes.EUROPEAN_CALL,
+                                OptionTypes.EUROPEAN_PUT):
+                options.append(EquityVanillaOption(expiry, strike,
+                                                   option_type))
+                vols.append(0.2 + 0.01 * len(vols))
+
+    prices = EquityVanillaOption.value_batch(options, valueDate, stockPrice,
+                                             discountCurve, dividendCurve,
+                                             BlackScholes(np.array(vols)))
+
+    implied_vols, status = EquityVanillaOption.implied_volatility_batch(
+        options, valueDate, stockPrice, discountCurve, dividendCurve,
+        prices["value"])
+
+    assert np.all(status == ImpliedVolStatus.CONVERGED.value)
+    assert np.max(np.abs(implied_vols - vols)) < 1e-8
+
+    # Bad prices are flagged rather than raising an error
+    bad_prices = np.array([-1.0, 0.5, 150.0, np.nan])
+    implied_vols, status = call_option.implied_volatility_batch(
+        [call_option] * 4, valueDate, stockPrice, discountCurve,
+        dividendCurve, bad_prices)
+
+    assert list(status) == [ImpliedVolStatus.BELOW_INTRINSIC.value,
+                            ImpliedVolStatus.BELOW_INTRINSIC.value,
+                            ImpliedVolStatus.ABOVE_MAXIMUM.value,
+                            ImpliedVolStatus.BAD_INPUT.value]
+    assert np.all(np.isnan(implied_vols))
+
+
+
+def test_implied_volatility_arbitrage_price():
+    # A put worth more than the discounted strike and a call worth less than
+    # its discounted intrinsic value cannot be matched by any volatility
+    put_price = np.array([1.01 * 100.0 * discountCurve.df(expiryDate)])
+    vol = put_option.implied_volatility(valueDate, stockPrice, discountCurve,
+                                        dividendCurve, put_price)
+    assert np.isnan(vol[0])
+
+    deep_call = EquityVanillaOption(expiryDate, 50.0,
+                                    OptionTypes.EUROPEAN_CALL)
+    vols, status = EquityVanillaOption.implied_volatility_batch(
+        [deep_call], valueDate, stockPrice, discountCurve, dividendCurve,
+        np.array([45.0]))
+    assert status[0] == ImpliedVolStatus.BELOW_INTRINSIC.value
+    assert np.isnan(vols[0])
+
+    # A solve stopped before it converges also gives NaN
+    price = call_option.value(valueDate, stockPrice, discountCurve,
+                              dividendCurve, model)
+    vols, status = bs_implied_volatility_batch(stockPrice, 0.5, 100.0,
+                                               interest_rate, dividend_yield,
+                                               price, 1, max_iterations=0)
+    assert status == ImpliedVolStatus.NOT_CONVERGED.value
+    assert np.isnan(vols)
+
+def test_value_mc_parallel():
+    v = call_option.value(valueDate, stockPrice, discountCurve,
+                          dividendCurve, model)
+
+    args = (valueDate, stockPrice, discountCurve, dividendCurve, model)
+    v_mc = call_option.value_mc(*args, num_paths=200000)
+    v_mc_one_thread = call_option.value_mc(*args, num_paths=200000,
+                                           num_threads=1)
+    v_sobol = call_option.value_mc(*args, num_paths=200000, useSobol=1)
+
+    assert v_mc == v_mc_one_thread
+    assert abs(v_mc - v) < 0.05
+    assert abs(v_sobol - v) < 0.005
+    assert v_mc != call_option.value_mc(*args, num_paths=200000, seed=1)
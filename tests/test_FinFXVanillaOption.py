@@ -0,0 +1,59 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.global_types import OptionTypes
+from financepy.products.fx.fx_vanilla_option import FXVanillaOption
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import BlackScholes
+from financepy.utils.date import Date
+
+valuation_date = Date(13, 2, 2018)
+spot_fx_rate = 1.2500
+dom_discount_curve = DiscountCurveFlat(valuation_date, 0.025)
+for_discount_curve = DiscountCurveFlat(valuation_date, 0.010)
+
+
+def test_value_batch():
+
+    options = []
+    for expiry_date in (Date(13, 5, 2018), Date(13, 2, 2019)):
+        for strike in np.linspace(1.10, 1.40, 7):
+            for option_type in (OptionTypes.EUROPEAN_CALL,
+                                OptionTypes.EUROPEAN_PUT):
+                options.append(FXVanillaOption(expiry_date, strike, "EURUSD",
+                                               option_type, 1000000, "USD",
+                                               2))
+
+    vols = np.linspace(0.08, 0.14, len(options))
+    results = FXVanillaOption.value_batch(options, valuation_date,
+                                          spot_fx_rate, dom_discount_curve,
+                                          for_discount_curve,
+                                          BlackScholes(vols))
+
+    for i, option in enumerate(options):
+        v = option.value(valuation_date, spot_fx_rate, dom_discount_curve,
+                         for_discount_curve, BlackScholes(vols[i]))['v']
+        assert abs(results["value"][i] - v) < 1e-12
+
+
+def test_implied_volatility_batch():
+
+    options = [FXVanillaOption(Date(13, 8, 2018), strike, "EURUSD",
+                               OptionTypes.EUROPEAN_PUT, 1000000, "USD", 2)
+               for strike in np.linspace(1.15, 1.35, 5)]
+
+    vols = np.array([0.11, 0.10, 0.09, 0.095, 0.105])
+    prices = FXVanillaOption.value_batch(options, valuation_date,
+                                         spot_fx_rate, dom_discount_curve,
+                                         for_discount_curve,
+                                         BlackScholes(vols))["value"]
+
+    implied_vols, status = FXVanillaOption.implied_volatility_batch(
+        options, valuation_date, spot_fx_rate, dom_discount_curve,
+        for_discount_curve, prices)
+
+    assert np.all(status == 0)
+    assert np.max(np.abs(implied_vols - vols)) < 1e-8
@@ -0,0 +1,131 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.hw_tree import HWTree
+from financepy.models.hw_calibration import calibrate_hw_parallel
+from financepy.products.rates.ibor_swaption import co_terminal_swaptions
+from financepy.products.rates.ibor_swaption import swaption_grid
+from financepy.products.rates.ibor_swaption import swaption_market_prices
+from financepy.products.rates.ibor_swaption import hw_swaption_calibration
+
+valuation_date = Date(1, 1, 2020)
+libor_curve = DiscountCurveFlat(valuation_date, 0.03,
+                                FrequencyTypes.ANNUAL,
+                                DayCountTypes.ACT_365F)
+df_times = libor_curve._times
+df_values = libor_curve._dfs
+
+grid = swaption_grid(valuation_date, ["1Y", "2Y", "5Y", "10Y"],
+                     ["1Y", "5Y", "10Y"], SwapTypes.PAY,
+                     FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F,
+                     discount_curve=libor_curve)
+
+grid += swaption_grid(valuation_date, ["3Y"], ["4Y"], SwapTypes.RECEIVE,
+                      FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F,
+                      strikes=0.035)
+
+
+def test_prices_match_jamshidian():
+
+    calibration = hw_swaption_calibration(valuation_date, grid)
+    prices, _ = calibration.prices(df_times, df_values, 0.07, [0.012])
+
+    model = HWTree(0.012, 0.07)
+
+    for swaption, price in zip(grid, prices):
+        v = swaption.value(valuation_date, libor_curve, model)
+        assert abs(v / swaption._notional - price) < 1e-4 * price
+
+
+def test_analytic_jacobian():
+
+    calibration = hw_swaption_calibration(valuation_date, grid,
+                                          sigma_times=[1.5, 4.0, 8.0])
+    a = 0.05
+    sigmas = np.array([0.010, 0.012, 0.009])
+    prices, jacobian = calibration.prices(df_times, df_values, a, sigmas)
+
+    bump = 1e-7
+    bumped, _ = calibration.prices(df_times, df_values, a + bump, sigmas)
+    fd = (bumped - prices) / bump
+    assert np.max(np.abs(fd - jacobian[:, 0])) < 1e-5
+
+    for m in range(0, len(sigmas)):
+        sigmas_bumped = sigmas.copy()
+        sigmas_bumped[m] += bump
+        bumped, _ = calibration.prices(df_times, df_values, a, sigmas_bumped)
+        fd = (bumped - prices) / bump
+        assert np.max(np.abs(fd - jacobian[:, 1 + m])) < 1e-4
+
+
+def test_calibrate_full_grid_and_warm_start():
+
+    calibration = hw_swaption_calibration(valuation_date, grid,
+                                          sigma_times=[1.5, 4.0, 8.0])
+    sigmas = np.array([0.010, 0.012, 0.009])
+    prices, _ = calibration.prices(df_times, df_values, 0.05, sigmas)
+
+    result = calibration.calibrate(df_times, df_values, prices)
+
+    assert abs(result['a'] - 0.05) < 1e-6
+    assert np.max(np.abs(result['sigmas'] - sigmas)) < 1e-7
+    assert result['max_error'] < 1e-10
+
+    # Starting from the last parameters a small move needs fewer iterations
+    cold = hw_swaption_calibration(valuation_date, grid,
+                                   sigma_times=[1.5, 4.0, 8.0])
+    cold_result = cold.calibrate(df_times, df_values, prices * 1.001)
+    warm_result = calibration.calibrate(df_times, df_values, prices * 1.001)
+
+    assert warm_result['num_evaluations'] < cold_result['num_evaluations']
+    assert abs(warm_result['rmse'] - cold_result['rmse']) < 1e-9
+
+
+def test_calibrate_co_terminal_to_black():
+
+    expiries = ["1Y", "2Y", "3Y", "4Y", "5Y", "6Y", "7Y", "8Y", "9Y"]
+    swaptions = co_terminal_swaptions(valuation_date, expiries,
+                                      valuation_date.add_years(10),
+                                      SwapTypes.RECEIVE,
+                                      FrequencyTypes.ANNUAL,
+                                      DayCountTypes.ACT_365F,
+                                      discount_curve=libor_curve)
+
+    volatilities = np.linspace(0.35, 0.25, len(swaptions))
+    market_prices = swaption_market_prices(valuation_date, libor_curve,
+                                           swaptions, volatilities)
+
+    sigma_times = [s._tree_flows(valuation_date)[1] for s in swaptions]
+    calibration = hw_swaption_calibration(valuation_date, swaptions,
+                                          sigma_times, calibrate_a=False)
+    result = calibration.calibrate(df_times, df_values, market_prices)
+
+    # One volatility per expiry fits each swaption exactly
+    assert result['max_error'] < 1e-10
+    assert result['a'] == 0.05
+
+
+def test_calibrate_in_process_pool():
+
+    calibrations = [hw_swaption_calibration(valuation_date, grid)
+                    for _ in range(0, 2)]
+
+    tasks = []
+    for calibration, (a, sigma) in zip(calibrations,
+                                       [(0.05, 0.01), (0.10, 0.015)]):
+        prices, _ = calibration.prices(df_times, df_values, a, [sigma])
+        tasks.append((calibration, df_times, df_values, prices))
+
+    results = calibrate_hw_parallel(tasks, 2)
+
+    assert abs(results[0]['a'] - 0.05) < 1e-6
+    assert abs(results[1]['sigmas'][0] - 0.015) < 1e-8
+    assert abs(calibrations[1]._a - 0.10) < 1e-6
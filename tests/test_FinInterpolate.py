@@ -0,0 +1,57 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.market.curves.interpolator import Interpolator, InterpTypes
+from financepy.market.curves.interpolator import _uinterpolate
+
+times = np.array([0.0, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0])
+dfs = np.exp(-0.03 * times - 0.001 * times * times)
+t_values = np.linspace(0.0, 12.0, 101)
+
+linear_types = [InterpTypes.FLAT_FWD_RATES,
+                InterpTypes.LINEAR_FWD_RATES,
+                InterpTypes.LINEAR_ZERO_RATES]
+
+
+def test_vectorised_matches_scalar():
+
+    for interp_type in linear_types:
+
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(times, dfs)
+        v = interpolator.interpolate(t_values)
+
+        for i in range(0, len(t_values)):
+            u = _uinterpolate(t_values[i], times, dfs, interp_type.value)
+            assert abs(v[i] - u) < 1e-12
+
+
+def test_nodes_are_refitted():
+
+    for interp_type in linear_types:
+
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(times, dfs)
+        v = interpolator.interpolate(times)
+        assert np.max(np.abs(v - dfs)) < 1e-9
+
+
+def test_discount_factors_changed_in_place():
+
+    for interp_type in linear_types:
+
+        curve_dfs = dfs.copy()
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(times, curve_dfs)
+        interpolator.interpolate(t_values)
+
+        # A bootstrap moves the last node without calling fit
+        curve_dfs[-1] *= 0.99
+        v = interpolator.interpolate(t_values)
+
+        for i in range(0, len(t_values)):
+            u = _uinterpolate(t_values[i], times, curve_dfs, interp_type.value)
+            assert abs(v[i] - u) < 1e-12
@@ -0,0 +1,86 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import OptionTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import BlackScholes
+from financepy.models.path_construction import BrownianPathGenerator
+from financepy.models.path_construction import PathConstructionTypes
+from financepy.models.process_simulator import FinProcessSimulator
+from financepy.models.process_simulator import ProcessTypes
+from financepy.models.process_simulator import FinGBMNumericalScheme
+from financepy.products.equity.equity_asian_option import EquityAsianOption
+from financepy.products.equity.equity_barrier_option import \
+    EquityBarrierOption, EquityBarrierTypes
+
+
+def test_brownian_covariance():
+
+    times = np.array([0.1, 0.25, 0.5, 0.6, 1.0, 1.5, 2.0])
+    exact = np.minimum.outer(times, times)
+
+    for path_construction in PathConstructionTypes:
+        generator = BrownianPathGenerator(times, 2, path_construction, seed=3)
+        w = generator.next_chunk(2**13)
+        for f in range(0, 2):
+            cov = w[:, :, f].T @ w[:, :, f] / w.shape[0]
+            assert np.max(np.abs(cov - exact)) < 0.01
+
+        generator.reset()
+        normals = generator.next_normals(100)
+        generator.reset()
+        generator.skip(40)
+        assert np.max(np.abs(generator.next_normals(60) - normals[40:])) < 1e-12
+
+
+def test_high_dimension_paths_chunk():
+
+    times = np.arange(1, 801) / 400.0
+    generator = BrownianPathGenerator(times, 2, seed=7)
+    normals = generator.next_normals(300)
+
+    generator.reset()
+    chunks = [generator.next_normals(n) for n in [100, 200]]
+    assert np.max(np.abs(np.vstack(chunks) - normals)) < 1e-12
+    assert abs(normals[:, -10:, :].std() - 1.0) < 0.05
+
+
+def test_qmc_options():
+
+    valuation_date = Date(1, 1, 2015)
+    expiry_date = Date(1, 1, 2016)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.02)
+    model = BlackScholes(0.20)
+
+    process = FinProcessSimulator()
+    model_params = (100.0, 0.03, 0.20, FinGBMNumericalScheme.NORMAL)
+    paths = process.get_process(ProcessTypes.GBM, 1.0, model_params, 50,
+                                4096, 1,
+                                PathConstructionTypes.BROWNIAN_BRIDGE)
+    assert paths.shape == (4096, 51)
+    assert abs(paths[:, -1].mean() - 100.0 * np.exp(0.03)) < 0.05
+
+    asian = EquityAsianOption(Date(1, 4, 2015), expiry_date, 100.0,
+                              OptionTypes.EUROPEAN_CALL, 50)
+    value = asian.value_mc(valuation_date, 100.0, discount_curve,
+                           dividend_curve, model, 100000, 1, None)
+    value_qmc = asian.value_mc(valuation_date, 100.0, discount_curve,
+                               dividend_curve, model, 4096, 1, None,
+                               PathConstructionTypes.PCA)
+    assert abs(value - value_qmc) < 0.01
+
+    barrier = EquityBarrierOption(expiry_date, 100.0,
+                                  EquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                  90.0, 252)
+    value = barrier.value(valuation_date, 100.0, discount_curve,
+                          dividend_curve, model)
+    value_qmc = barrier.value_mc(valuation_date, 100.0, discount_curve,
+                                 dividend_curve, ProcessTypes.GBM,
+                                 model_params, 252, 8192, 1,
+                                 PathConstructionTypes.BROWNIAN_BRIDGE)
+    assert abs(value - value_qmc) < 0.1
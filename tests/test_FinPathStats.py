@@ -0,0 +1,122 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.models.process_simulator import FinProcessSimulator
+from financepy.models.process_simulator import ProcessTypes
+from financepy.models.process_simulator import FinGBMNumericalScheme
+from financepy.models.process_simulator import FinHestonNumericalScheme
+from financepy.models.process_simulator import PathAccumulatorTypes
+from financepy.models.lmm_mc import lmm_simulate_fwds_mf
+from financepy.models.lmm_mc import lmm_swaption_pricer
+from financepy.models.lmm_mc import lmm_swaption_book_pricer
+
+accumulators = [PathAccumulatorTypes.FINAL,
+                PathAccumulatorTypes.AVERAGE,
+                (PathAccumulatorTypes.AVERAGE, 10),
+                PathAccumulatorTypes.MINIMUM,
+                PathAccumulatorTypes.MAXIMUM,
+                (PathAccumulatorTypes.DOWN_HIT, 0, 90.0),
+                (PathAccumulatorTypes.UP_HIT, 5, 115.0),
+                (PathAccumulatorTypes.DISCOUNTED_SUM, 1, 0.04)]
+
+
+def dense_stats(paths, dt):
+
+    dfs = np.exp(-0.04 * dt * np.arange(paths.shape[1]))
+
+    return np.column_stack([paths[:, -1],
+                            paths.mean(axis=1),
+                            paths[:, 10:].mean(axis=1),
+                            paths.min(axis=1),
+                            paths.max(axis=1),
+                            paths.min(axis=1) <= 90.0,
+                            paths[:, 5:].max(axis=1) >= 115.0,
+                            paths[:, 1:] @ dfs[1:]])
+
+
+def dense_mean_and_error(stats, num_paths):
+
+    if len(stats) == 2 * num_paths:
+        stats = 0.5 * (stats[:num_paths] + stats[num_paths:])
+
+    return stats.mean(axis=0), stats.std(axis=0, ddof=1) / np.sqrt(num_paths)
+
+
+def test_gbm_path_stats():
+
+    simulator = FinProcessSimulator()
+
+    for scheme in FinGBMNumericalScheme:
+        model_params = (100.0, 0.03, 0.25, scheme)
+        paths = simulator.get_process(ProcessTypes.GBM, 1.0, model_params,
+                                      252, 2000, 42)
+        stats, means, std_errors = \
+            simulator.get_process_stats(ProcessTypes.GBM, 1.0, model_params,
+                                        252, 2000, 42, accumulators)
+        assert stats.shape == (len(paths), len(accumulators))
+
+        dense = dense_stats(paths, 1.0 / 252)
+        assert np.max(np.abs(stats - dense)) < 1e-10
+
+        dense_means, dense_errors = dense_mean_and_error(dense, 2000)
+        assert np.max(np.abs(means - dense_means)) < 1e-10
+        assert np.max(np.abs(std_errors - dense_errors)) < 1e-10
+        assert std_errors[-1] > 0.0
+
+
+def test_heston_path_stats():
+
+    simulator = FinProcessSimulator()
+
+    for scheme in FinHestonNumericalScheme:
+        model_params = (100.0, 0.03, 0.04, 2.0, 0.04, 0.3, -0.7, scheme)
+        paths = simulator.get_process(ProcessTypes.HESTON, 1.0, model_params,
+                                      52, 500, 42)
+        stats, means, std_errors = \
+            simulator.get_process_stats(ProcessTypes.HESTON, 1.0,
+                                        model_params, 52, 500, 42,
+                                        accumulators)
+
+        dense = dense_stats(paths, 1.0 / 52)
+        assert np.max(np.abs(stats - dense)) < 1e-10
+
+        dense_means, dense_errors = dense_mean_and_error(dense, 500)
+        assert np.max(np.abs(means - dense_means)) < 1e-10
+        assert np.max(np.abs(std_errors - dense_errors)) < 1e-10
+
+
+def test_lmm_swaption_book():
+
+    numForwards = 20
+    numFactors = 2
+    num_paths = 2000
+    fwd0 = np.linspace(0.03, 0.05, numForwards)
+    taus = np.full(numForwards, 0.25)
+    lambdas = np.vstack([np.full(numForwards, 0.20),
+                         0.05 * np.linspace(-1.0, 1.0, numForwards)])
+
+    strikes = [0.04, 0.035, 0.045]
+    aIndices = [4, 8, 12]
+    bIndices = [12, 16, 20]
+    isPayers = [1, 0, 1]
+
+    for useSobol in (0, 1):
+
+        fwds = lmm_simulate_fwds_mf(numForwards, numFactors, num_paths, 0,
+                                    fwd0, lambdas, taus, useSobol, 42)
+
+        values, stdErrors = lmm_swaption_book_pricer(numForwards, numFactors,
+                                                     num_paths, fwd0, lambdas,
+                                                     taus, useSobol, 42,
+                                                     strikes, aIndices,
+                                                     bIndices, isPayers,
+                                                     chunkSize=300)
+
+        for i in range(0, len(strikes)):
+            v = lmm_swaption_pricer(strikes[i], aIndices[i], bIndices[i],
+                                    num_paths, fwd0, fwds, taus, isPayers[i])
+            assert abs(values[i] - v) < 1e-12
+            assert 0.0 < stdErrors[i] < 0.1 * values[i]
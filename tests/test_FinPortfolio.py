@@ -0,0 +1,97 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.bonds.bond import Bond
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.portfolio import Portfolio
+
+valuation_date = Date(20, 6, 2018)
+settle_date = valuation_date.add_weekdays(2)
+
+
+def build_libor_curve():
+
+    dc_type = DayCountTypes.ACT_360
+    depos = [IborDeposit(settle_date, "6M", 0.0160, dc_type)]
+
+    swaps = []
+    for tenor, rate in [("2Y", 0.0200), ("5Y", 0.0250), ("10Y", 0.0290)]:
+        swaps.append(IborSwap(settle_date, tenor, SwapTypes.PAY, rate,
+                              FrequencyTypes.SEMI_ANNUAL,
+                              DayCountTypes.THIRTY_E_360))
+
+    return IborSingleCurve(valuation_date, depos, [], swaps)
+
+
+def test_swaps_match_swap_value():
+
+    libor_curve = build_libor_curve()
+    discount_curve = DiscountCurveFlat(valuation_date, 0.02)
+
+    swaps = []
+    for i, tenor in enumerate(["1Y", "3Y", "7Y", "9Y"]):
+        swap_type = SwapTypes.PAY if i % 2 else SwapTypes.RECEIVE
+        swaps.append(IborSwap(settle_date, tenor, swap_type, 0.025,
+                              FrequencyTypes.SEMI_ANNUAL,
+                              DayCountTypes.THIRTY_E_360,
+                              notional=1000000 * (i + 1),
+                              float_spread=0.001 * i))
+
+    portfolio = Portfolio(valuation_date)
+    portfolio.add_trades(swaps[:2], "LIBOR")
+    portfolio.add_trades(swaps[2:], "OIS", "LIBOR")
+    values = portfolio.value({"LIBOR": libor_curve, "OIS": discount_curve})
+
+    for i, swap in enumerate(swaps):
+        if i < 2:
+            v = swap.value(valuation_date, libor_curve)
+        else:
+            v = swap.value(valuation_date, discount_curve, libor_curve)
+        assert abs(values[i] - v) < 1e-7
+
+    # The cumulative PVs of the fixed leg of the first swap
+    trade_ids, cumulative_pvs = portfolio.cumulative_pvs({"LIBOR": libor_curve,
+                                                          "OIS": discount_curve})
+    fixed_leg = swaps[0]._fixed_leg
+    fixed_leg.value(valuation_date, libor_curve)
+    n = len(fixed_leg._payment_dates)
+    assert np.max(np.abs(cumulative_pvs[:n] -
+                         fixed_leg._cumulativePVs)) < 1e-7
+    assert abs(cumulative_pvs[trade_ids == 0][-1] - values[0]) < 1e-7
+
+
+def test_bonds_and_cds():
+
+    libor_curve = build_libor_curve()
+
+    bond = Bond(Date(15, 5, 2017), Date(15, 5, 2027), 0.035,
+                FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_ACT_ICMA,
+                2000000)
+
+    cds_contracts = [CDS(valuation_date, valuation_date.add_years(years),
+                         spread) for years, spread in [(3, 0.01), (5, 0.012)]]
+    issuer_curve = CDSCurve(valuation_date, cds_contracts, libor_curve, 0.40)
+    cds = CDS(valuation_date, Date(20, 6, 2022), 0.0150, 1000000)
+
+    portfolio = Portfolio(valuation_date)
+    portfolio.add_trade(cds, "ISSUER")
+    portfolio.add_trade(bond, "LIBOR")
+    values = portfolio.value({"LIBOR": libor_curve, "ISSUER": issuer_curve})
+
+    v = cds.value(valuation_date, issuer_curve)['full_pv']
+    assert abs(values[0] - v) < 1e-9
+
+    px = bond.full_price_from_discount_curve(valuation_date, libor_curve)
+    assert abs(values[1] - px * bond._face_amount / bond._par) < 1e-6
@@ -0,0 +1,60 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.utils.schedule import Schedule, ScheduleCache, schedule_cache
+from financepy.utils.calendar import CalendarTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.date import Date
+
+
+def test_schedule_cache_hit():
+    schedule_cache.clear()
+
+    s1 = Schedule(Date(20, 6, 2018), Date(20, 6, 2028),
+                  FrequencyTypes.SEMI_ANNUAL, CalendarTypes.TARGET)
+    s2 = Schedule(Date(20, 6, 2018), Date(20, 6, 2028),
+                  FrequencyTypes.SEMI_ANNUAL, CalendarTypes.TARGET)
+
+    assert s1.schedule_dates() is s2.schedule_dates()
+    assert isinstance(s1.schedule_dates(), tuple)
+    assert schedule_cache.info()["misses"] == 1
+    assert len(s1.schedule_dates()) == 21
+
+
+
+def test_schedule_regeneration_hits_cache():
+    schedule_cache.clear()
+
+    # The termination date is a Sunday and so is moved by the adjustment
+    termination_date = Date(21, 6, 2020)
+    schedule = Schedule(Date(20, 6, 2018), termination_date,
+                        FrequencyTypes.QUARTERLY, CalendarTypes.TARGET)
+    dates = schedule._generate()
+
+    assert dates[-1] == Date(22, 6, 2020)
+    assert schedule._termination_date == termination_date
+    assert schedule._generate() is dates
+    assert schedule_cache.info()["misses"] == 1
+
+def test_schedule_cache_matches_generation():
+    schedule = Schedule(Date(31, 1, 2020), Date(31, 1, 2025),
+                        FrequencyTypes.QUARTERLY, CalendarTypes.UNITED_STATES)
+
+    assert list(schedule.schedule_dates()) == schedule._generate_dates()
+
+
+def test_schedule_cache_resize():
+    cache = ScheduleCache(2)
+
+    for i in range(0, 3):
+        assert cache.lookup(i, lambda: [i]) == (i,)
+
+    assert len(cache) == 2
+    assert cache.lookup(2, lambda: []) == (2,)
+
+    cache.resize(1)
+    assert cache.info() == {"hits": 1, "misses": 3, "size": 1, "max_size": 1}
+
+    cache.clear()
+    assert len(cache) == 0
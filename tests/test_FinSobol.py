@@ -0,0 +1,58 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.models.sobol import get_uniform_sobol, get_gaussian_sobol
+from financepy.models.sobol import SobolGenerator, SobolScrambleTypes
+
+
+def test_chunks_match_sobol():
+
+    num_points = 3000
+    dimension = 30
+    points = get_uniform_sobol(num_points, dimension)
+
+    generator = SobolGenerator(dimension)
+    chunks = [generator.next_chunk(n) for n in [1, 1023, 976, 1000]]
+    assert np.max(np.abs(np.vstack(chunks) - points)) == 0.0
+
+    generator.reset()
+    generator.skip(1500)
+    assert np.max(np.abs(generator.next_chunk(1500) - points[1500:])) == 0.0
+
+    generator.reset()
+    gaussians = generator.next_gaussian_chunk(num_points)
+    assert np.max(np.abs(gaussians -
+                         get_gaussian_sobol(num_points, dimension))) < 1e-12
+
+
+def test_scrambled_points():
+
+    num_points = 4096
+    dimension = 250
+
+    for scramble_type in [SobolScrambleTypes.DIGITAL_SHIFT,
+                          SobolScrambleTypes.OWEN]:
+
+        generator1 = SobolGenerator(dimension, scramble_type, 1)
+        generator2 = SobolGenerator(dimension, scramble_type, 2)
+        generator1.skip(num_points - 1)
+        generator2.skip(num_points - 1)
+        u1 = generator1.next_chunk(num_points)
+        u2 = generator2.next_chunk(num_points)
+
+        assert u1.min() > 0.0 and u1.max() < 1.0
+        assert np.max(np.abs(u1 - u2)) > 0.1
+
+        # Each of the gray code points 2**12 to 2**13 - 1 of a dimension has
+        # different leading 12 bits and this is kept by the scrambling
+        for j in range(0, dimension):
+            cells = np.floor(u1[:, j] * num_points)
+            assert len(np.unique(cells)) == num_points
+
+        generator = SobolGenerator(dimension, scramble_type, 1)
+        generator.skip(num_points + 999)
+        assert np.max(np.abs(generator.next_chunk(100) -
+                             u1[1000:1100])) == 0.0
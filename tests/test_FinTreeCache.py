@@ -0,0 +1,95 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinExerciseTypes, SwapTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.hw_tree import HWTree
+from financepy.models.bk_tree import BKTree
+from financepy.models.bdt_tree import BDTTree
+from financepy.models.tree_cache import TreeCache
+from financepy.products.rates.bermudan_swaption import IborBermudanSwaption
+
+valuation_date = Date(1, 1, 2011)
+libor_curve = DiscountCurveFlat(valuation_date, 0.0625,
+                                FrequencyTypes.SEMI_ANNUAL,
+                                DayCountTypes.ACT_365F)
+
+
+def bermudan(years):
+
+    return IborBermudanSwaption(valuation_date,
+                                valuation_date.add_years(1),
+                                valuation_date.add_years(years),
+                                SwapTypes.PAY,
+                                FinExerciseTypes.BERMUDAN,
+                                0.06,
+                                FrequencyTypes.SEMI_ANNUAL,
+                                DayCountTypes.ACT_365F)
+
+
+def test_tree_cache_lru():
+
+    cache = TreeCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {'size': 2, 'max_size': 2, 'hits': 3,
+                             'misses': 1, 'evictions': 1}
+
+    off = TreeCache(0)
+    off.put("a", 1)
+    assert off.get("a") is None
+
+
+def test_tree_reuse_across_trades():
+
+    for model_type in [HWTree, BKTree, BDTTree]:
+
+        cache = TreeCache()
+
+        if model_type == BDTTree:
+            model1 = model_type(0.2, 100, tree_cache=cache)
+            model2 = model_type(0.2, 100, tree_cache=cache)
+        else:
+            model1 = model_type(0.01, 0.05, 100, tree_cache=cache)
+            model2 = model_type(0.01, 0.05, 100, tree_cache=cache)
+
+        v1 = bermudan(4).value(valuation_date, libor_curve, model1)
+        v2 = bermudan(4).value(valuation_date, libor_curve, model2)
+
+        assert v1 == v2
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hits'] == 1
+
+
+def test_prebuilt_tree():
+
+    cache = TreeCache()
+    model = HWTree(0.01, 0.05, 400, tree_cache=cache)
+
+    v_own = [bermudan(y).value(valuation_date, libor_curve, model)
+             for y in [4, 6, 8]]
+    assert cache.stats()['misses'] == 3
+
+    model.prebuild_tree(8.0, libor_curve._times, libor_curve._dfs)
+    v_shared = [bermudan(y).value(valuation_date, libor_curve, model)
+                for y in [4, 6, 8]]
+
+    # Only the prebuilt tree was used. Its time step of 0.02 puts the
+    # exercise dates on its grid but is twice that of the 4 year trade
+    assert cache.stats()['misses'] == 4
+
+    for i in range(0, 3):
+        assert abs(v_shared[i] - v_own[i]) < 0.02 * v_own[i]
+
+    model.release_tree()
+    assert bermudan(4).value(valuation_date, libor_curve, model) == v_own[0]
@@ -0,0 +1,170 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.error import FinError
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinExerciseTypes, SwapTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.hw_tree import HWTree
+from financepy.models.bk_tree import BKTree, build_tree_fast
+from financepy.models.bdt_tree import BDTTree
+from financepy.models.tree_cache import TreeCache
+from financepy.models.tree_grid import TreeGridTypes, event_time_grid
+from financepy.products.rates.bermudan_swaption import IborBermudanSwaption
+from financepy.products.rates.bermudan_swaption import \
+    value_bermudan_swaption_book
+
+valuation_date = Date(1, 1, 2011)
+libor_curve = DiscountCurveFlat(valuation_date, 0.0625,
+                                FrequencyTypes.SEMI_ANNUAL,
+                                DayCountTypes.ACT_365F)
+
+swaption = IborBermudanSwaption(valuation_date,
+                                Date(17, 2, 2012),
+                                Date(17, 2, 2017),
+                                SwapTypes.PAY,
+                                FinExerciseTypes.BERMUDAN,
+                                0.0625,
+                                FrequencyTypes.SEMI_ANNUAL,
+                                DayCountTypes.ACT_365F)
+
+
+def test_event_time_grid():
+
+    events = [0.3, 1.1, 2.0]
+    grid = event_time_grid(events, 2.0, 20, refine_times=[1.1])
+
+    assert grid[0] == 0.0
+    assert grid[-1] == 2.0
+    assert np.all(np.diff(grid) > 0.0)
+
+    for t in events:
+        assert np.min(np.abs(grid - t)) < 1e-12
+
+    # The step before the refine time is split in two
+    i = np.argmin(np.abs(grid - 1.1))
+    assert abs((grid[i] - grid[i-1]) - (grid[i-1] - grid[i-2])) < 1e-12
+    assert grid[i-1] - grid[i-2] < grid[i-2] - grid[i-3]
+
+
+def test_event_grid_converges_faster():
+
+    models = [lambda n, g: HWTree(0.01, 0.05, n, tree_cache=TreeCache(0),
+                                  grid_type=g),
+              lambda n, g: BKTree(0.2, 0.05, n, tree_cache=TreeCache(0),
+                                  grid_type=g),
+              lambda n, g: BDTTree(0.2, n, tree_cache=TreeCache(0),
+                                   grid_type=g)]
+
+    for model in models:
+
+        exact = swaption.value(valuation_date, libor_curve,
+                               model(2000, TreeGridTypes.EVENT_ALIGNED))
+
+        uniform = swaption.value(valuation_date, libor_curve,
+                                 model(50, TreeGridTypes.UNIFORM))
+
+        event = swaption.value(valuation_date, libor_curve,
+                               model(50, TreeGridTypes.EVENT_ALIGNED))
+
+        assert abs(event - exact) < 0.005 * exact
+        assert abs(event - exact) < abs(uniform - exact)
+
+
+def test_event_grid_only_values_swaptions():
+
+    model = BKTree(0.2, 0.05, 50, grid_type=TreeGridTypes.EVENT_ALIGNED)
+    model.build_tree(5.0, libor_curve._times, libor_curve._dfs)
+
+    with pytest.raises(FinError):
+        model.bond_option(1.0, 100.0, 100.0, np.array([1.0, 5.0]),
+                          np.array([0.05, 0.05]), FinExerciseTypes.EUROPEAN)
+
+
+def test_bermudan_swaption_book():
+
+    book = []
+
+    for years in [3, 5, 7]:
+        for swap_type in [SwapTypes.PAY, SwapTypes.RECEIVE]:
+            book.append(IborBermudanSwaption(valuation_date,
+                                             Date(17, 2, 2012),
+                                             Date(17, 2, 2012 + years),
+                                             swap_type,
+                                             FinExerciseTypes.BERMUDAN,
+                                             0.0625,
+                                             FrequencyTypes.SEMI_ANNUAL,
+                                             DayCountTypes.ACT_365F))
+
+    model = BKTree(0.2, 0.05, 100, tree_cache=TreeCache(0))
+    values, deltas = value_bermudan_swaption_book(valuation_date,
+                                                  libor_curve, model, book)
+
+    # All of the dates are on the lattice of the longest trade so that
+    # trade is valued as it is on its own
+    event_model = BKTree(0.2, 0.05, 100, tree_cache=TreeCache(0),
+                         grid_type=TreeGridTypes.EVENT_ALIGNED)
+    assert abs(values[4] - book[4].value(valuation_date, libor_curve,
+                                         event_model)) < 1e-6
+
+    for k in range(0, len(book)):
+        v = book[k].value(valuation_date, libor_curve, event_model)
+        assert abs(values[k] - v) < 0.01 * v
+
+    # Payers gain and receivers lose when rates rise
+    assert np.all(deltas[0::2] > 0.0)
+    assert np.all(deltas[1::2] < 0.0)
+
+    # The lattice does not depend on the order of the trades
+    values_reversed, _ = value_bermudan_swaption_book(valuation_date,
+                                                      libor_curve, model,
+                                                      book[::-1])
+    assert np.all(values_reversed[::-1] == values)
+
+
+def test_bk_tree_fits_curve_with_shift():
+
+    negative_curve = DiscountCurveFlat(valuation_date, -0.005,
+                                       FrequencyTypes.SEMI_ANNUAL,
+                                       DayCountTypes.ACT_365F)
+
+    for curve, shift in [(libor_curve, 0.0), (negative_curve, 0.02)]:
+
+        tree_times = np.linspace(0.0, 5.0, 1002)
+        dfs = np.array([curve._df(t) for t in tree_times])
+
+        (Q, _, _, _, rt, _) = build_tree_fast(0.05, 0.2, tree_times, 1000,
+                                              dfs, shift)
+
+        # Each step of the Arrow-Debreu prices reprices the curve
+        assert np.max(np.abs(np.sum(Q[1:], axis=1) - dfs[1:])) < 1e-12
+
+        # The rates are bounded below by the shift
+        assert np.min(rt[:-1][Q[:-1] > 0.0]) > -shift
+
+    assert np.min(rt[:-1][Q[:-1] > 0.0]) < 0.0
+
+    model = BKTree(0.2, 0.05, 500, tree_cache=TreeCache(0), shift=0.02)
+    event_model = BKTree(0.2, 0.05, 100, tree_cache=TreeCache(0),
+                         grid_type=TreeGridTypes.EVENT_ALIGNED, shift=0.02)
+
+    otm_swaption = IborBermudanSwaption(valuation_date,
+                                        Date(17, 2, 2012),
+                                        Date(17, 2, 2017),
+                                        SwapTypes.PAY,
+                                        FinExerciseTypes.BERMUDAN,
+                                        0.001,
+                                        FrequencyTypes.SEMI_ANNUAL,
+                                        DayCountTypes.ACT_365F)
+
+    v = otm_swaption.value(valuation_date, negative_curve, model)
+    event = otm_swaption.value(valuation_date, negative_curve, event_model)
+
+    assert v > 0.0
+    assert abs(event - v) < 0.01 * v
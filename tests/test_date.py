@@ -33,6 +33,19 @@ def test_excel_representation():
     assert Date(1, 3, 2020)._excel_date == 43891
 
 
+def test_from_excel_date():
+    dt = Date.from_excel_date(43891)
+    assert dt == Date(1, 3, 2020)
+    assert (dt._d, dt._m, dt._y, dt._weekday) == (1, 3, 2020, Date.SUN)
+
+
+def test_add_tenor_month_end():
+    assert Date(31, 1, 2020).add_tenor("2M") == Date(29, 3, 2020)
+    assert Date(31, 1, 2020).add_months(2) == Date(31, 3, 2020)
+    assert Date(29, 2, 2020).add_tenor("4Y") == Date(28, 2, 2024)
+    assert Date(31, 3, 2020).add_tenor("-1M") == Date(29, 2, 2020)
+
+
 # tests not refactored below
 # - print() should be assert to value
 # - do not need many values, just one call